@@ -0,0 +1,71 @@
+"""Durchsatz des vektorisierten Backtesters (bots.trade_api.backtest.engine).
+
+    python -m benchmarks.bench_backtest --candles 50000 --grid 4 --processes 1 4
+
+Synthetische OHLCV-Kerzen; gemessen werden candles/sec je Strategie
+(signal inkl. Feature-Berechnung, grid, dca) und für ein Parameter-Gitter
+(signal: entry x exit x risk_pct) seriell und über den Prozess-Pool.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_indicators import _synthetic_ohlcv
+from bots.trade_api.backtest import engine
+
+_STRATEGIES = (
+    ("signal", {}),
+    ("grid", {"levels": 10, "spread_pct": 1.0}),
+    ("dca", {"amount": 50.0, "interval_hours": 24}),
+)
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--candles", type=int, default=50_000)
+    ap.add_argument("--grid", type=int, default=4, help="Werte je Gitter-Achse (3 Achsen)")
+    ap.add_argument("--processes", type=int, nargs="+", default=[1, 4])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    ohlcv = _synthetic_ohlcv(1, args.candles, args.seed)[0]
+    fill = engine.FillModel(liquidity_usd=1e6, slippage_bps=5)
+    n = len(ohlcv)
+    print(f"{n} candles")
+
+    for name, params in _STRATEGIES:
+        dt = _best(lambda: engine.run(ohlcv, name, params, "1H", fill), args.repeat)
+        print(f"{name:<8} {dt * 1000:9.1f} ms  {n / dt:13,.0f} candles/sec")
+
+    g = args.grid
+    grid = {
+        "entry": np.linspace(0.05, 0.4, g).round(3).tolist(),
+        "exit": np.linspace(-0.4, -0.05, g).round(3).tolist(),
+        "risk_pct": np.linspace(0.005, 0.03, g).round(4).tolist(),
+    }
+    combos = g ** 3
+    for p in args.processes:
+        t0 = time.perf_counter()
+        res = engine.run_grid(ohlcv, "signal", grid, "1H", fill, processes=p)
+        dt = time.perf_counter() - t0
+        print(f"grid x{combos:<4} processes={p:<3} {dt:7.2f} s  {combos * n / dt:13,.0f} candles/sec"
+              f"  best sharpe {res[0]['sharpe']:.2f} {res[0]['params']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Latenz pro Request: psycopg2.connect() je Aufruf vs. gepoolte Verbindung.
+
+    DATABASE_URL=... python -m benchmarks.bench_db_pool --n 200
+    DATABASE_URL=... python -m benchmarks.bench_db_pool --query "SELECT * FROM dao_proposals LIMIT 10"
+
+Misst das Muster der database.py-Funktionen (Verbindung holen, Query, commit,
+close) einmal mit neuer Verbindung pro Aufruf und einmal über shared.pgpool.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import psycopg2
+
+from shared import pgpool
+
+
+def _run(get_conn, query: str, n: int) -> list[float]:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        conn = get_conn()
+        try:
+            cur = conn.cursor()
+            cur.execute(query)
+            cur.fetchall()
+            conn.commit()
+            cur.close()
+        finally:
+            conn.close()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    qs = statistics.quantiles(samples, n=100)
+    print(f"{label:<22} n={len(samples):<5} mean={statistics.fmean(samples):7.2f} ms  "
+          f"p50={qs[49]:7.2f} ms  p95={qs[94]:7.2f} ms  max={max(samples):7.2f} ms")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=100, help="Requests je Variante")
+    ap.add_argument("--query", default="SELECT 1")
+    args = ap.parse_args()
+
+    dsn = os.getenv("DATABASE_URL")
+    if not dsn:
+        sys.exit("DATABASE_URL ist nicht gesetzt")
+
+    direct = _run(lambda: psycopg2.connect(dsn), args.query, args.n)
+    _run(lambda: pgpool.connect("bench"), args.query, 3)  # Pool aufwärmen
+    pooled = _run(lambda: pgpool.connect("bench"), args.query, args.n)
+    pgpool.close_all()
+
+    _report("psycopg2.connect/call", direct)
+    _report("shared.pgpool", pooled)
+    print(f"Speedup (p50): {statistics.median(direct) / statistics.median(pooled):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""FinBERT-Durchsatz auf CPU (bots.trade_api.sentiment.finbert).
+
+    python -m benchmarks.bench_finbert --texts 256 --batch 1 8 32 64
+
+Misst texts/sec der gepaddeten Forward-Passes je Batch-Größe (Cache aus)
+und einmal den zweiten Durchlauf mit Cache. Braucht transformers + torch;
+das Modell wird einmal geladen und nicht mitgemessen.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bots.trade_api.sentiment import finbert
+
+_WORDS = ("shares", "profit", "loss", "guidance", "record", "quarter", "revenue", "cut", "raises",
+          "bitcoin", "rally", "slump", "outlook", "beats", "misses", "estimates", "market", "fed")
+
+
+def _texts(n: int, seed: int) -> list:
+    rnd = random.Random(seed)
+    return [" ".join(rnd.choice(_WORDS) for _ in range(rnd.randint(6, 40))) + f" #{i}" for i in range(n)]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--texts", type=int, default=256)
+    ap.add_argument("--batch", type=int, nargs="+", default=[1, 8, 32, 64])
+    ap.add_argument("--seed", type=int, default=3)
+    args = ap.parse_args()
+
+    texts = _texts(args.texts, args.seed)
+    t0 = time.perf_counter()
+    finbert._load()
+    print(f"model load       {time.perf_counter() - t0:7.2f} s")
+
+    for b in args.batch:
+        finbert.FINBERT_BATCH_SIZE = b
+        _, seconds = finbert._infer(texts)
+        print(f"batch={b:<4}       {len(texts) / seconds:7.1f} texts/sec")
+
+    w = finbert.SentimentWorker(mode="thread")
+    w.score(texts)
+    t0 = time.perf_counter()
+    w.score(texts)
+    dt = time.perf_counter() - t0
+    print(f"cached           {len(texts) / dt:7.0f} texts/sec  ({w.stats()})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Kosten der Indikator-Engine pro Symbol (bots.trade_api.ml.indicators).
+
+    python -m benchmarks.bench_indicators --symbols 200 --candles 10000
+
+Erzeugt synthetische OHLCV-Daten (S, N, 5) und misst
+- features() für alle Symbole in einem Aufruf (Batch),
+- features() Symbol für Symbol,
+- score_signals() (Feature-Tensor + Regel, nur letzte Zeile),
+jeweils als ms pro Symbol.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bots.trade_api.ml import indicators as ind
+from bots.trade_api.ml.xgb_signals import score_signals
+
+
+def _synthetic_ohlcv(symbols: int, candles: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (symbols, candles)), axis=-1))
+    open_ = close * (1 + rng.normal(0, 0.002, close.shape))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.005, close.shape))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.005, close.shape))
+    vol = rng.uniform(1e3, 1e5, close.shape)
+    return np.stack([open_, high, low, close, vol], axis=-1)
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--symbols", type=int, default=200)
+    ap.add_argument("--candles", type=int, default=10_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    ohlcv = _synthetic_ohlcv(args.symbols, args.candles, args.seed)
+    s = args.symbols
+    print(f"{s} symbols x {args.candles} candles, {len(ind.FEATURE_NAMES)} features")
+
+    batch = _time(lambda: ind.features(ohlcv), args.repeat)
+    print(f"features (batch)      {batch:9.1f} ms total  {batch / s:7.3f} ms/symbol")
+
+    single = _time(lambda: [ind.features(ohlcv[i]) for i in range(s)], args.repeat)
+    print(f"features (per symbol) {single:9.1f} ms total  {single / s:7.3f} ms/symbol")
+
+    scan = _time(lambda: score_signals(ohlcv), args.repeat)
+    print(f"score_signals (batch) {scan:9.1f} ms total  {scan / s:7.3f} ms/symbol")
+
+
+if __name__ == "__main__":
+    main()
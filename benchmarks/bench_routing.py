@@ -0,0 +1,79 @@
+"""Latenz einer Swap-Quote über bots.trade_dex.routing (ohne Netzwerk).
+
+    python -m benchmarks.bench_routing --tokens 60 --pools 300 --n 200
+
+Baut einen synthetischen Pool-Snapshot (PancakeSwap + Aerodome, einige Hub-
+Tokens mit vielen Pools wie WBNB/USDT) und misst best_route() für zufällige
+Token-Paare – einmal nur Einzelroute, einmal mit Split.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bots.trade_dex.market_data import _build_snapshot
+from bots.trade_dex.routing import best_route
+
+
+def _synthetic_snapshot(n_tokens: int, n_pools: int, hubs: int, seed: int):
+    rnd = random.Random(seed)
+    tokens = [f"0x{i:040x}" for i in range(n_tokens)]
+    pools, seen = [], set()
+    while len(pools) < n_pools:
+        # ~Hälfte der Pools hängt an einem Hub-Token
+        a = rnd.randrange(hubs) if rnd.random() < 0.5 else rnd.randrange(n_tokens)
+        b = rnd.randrange(n_tokens)
+        dex = rnd.choice(("pancakeswap", "aerodome"))
+        if a == b or (a, b, dex) in seen:
+            continue
+        seen.add((a, b, dex))
+        r0, r1 = rnd.uniform(1e3, 1e7), rnd.uniform(1e3, 1e7)
+        pools.append({
+            "id": f"0x{len(pools):040x}",
+            "dex": dex,
+            "token0": {"id": tokens[a], "symbol": f"T{a}"},
+            "token1": {"id": tokens[b], "symbol": f"T{b}"},
+            "reserve0": str(r0), "reserve1": str(r1),
+            "reserveUSD": str(r0 + r1), "volumeUSD": "0",
+        })
+    return tokens, _build_snapshot(1, [], pools)
+
+
+def _report(label: str, samples: list[float]) -> None:
+    qs = statistics.quantiles(samples, n=100)
+    print(f"{label:<14} n={len(samples):<5} mean={statistics.fmean(samples):7.2f} ms  "
+          f"p50={qs[49]:7.2f} ms  p95={qs[94]:7.2f} ms  max={max(samples):7.2f} ms")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--tokens", type=int, default=60)
+    ap.add_argument("--pools", type=int, default=300)
+    ap.add_argument("--hubs", type=int, default=4)
+    ap.add_argument("--n", type=int, default=200, help="Quotes je Variante")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    tokens, snapshot = _synthetic_snapshot(args.tokens, args.pools, args.hubs, args.seed)
+    rnd = random.Random(args.seed)
+    pairs = [tuple(rnd.sample(tokens, 2)) for _ in range(args.n)]
+    best_route(snapshot, *pairs[0], Decimal(1000))  # Graph aufbauen (einmal je Snapshot-Version)
+
+    for label, split in (("single route", False), ("split routes", True)):
+        samples, found = [], 0
+        for a, b in pairs:
+            t0 = time.perf_counter()
+            res = best_route(snapshot, a, b, Decimal(1000), split=split)
+            samples.append((time.perf_counter() - t0) * 1000)
+            found += res is not None
+        _report(label, samples)
+        print(f"{'':<14} routes found for {found}/{len(pairs)} pairs")
+
+
+if __name__ == "__main__":
+    main()
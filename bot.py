@@ -47,6 +47,9 @@ except Exception:
 
 
 DEFAULT_BOT_NAMES = ["content", "trade_api", "trade_dex", "crossposter", "learning", "support", "dao", "affliate"]
+# Bots, deren Jobs auch als Nicht-Primary laufen: Market-Data-Ingestor, Strategie-Executor,
+# Watchlist-Scanner und Proof-Sealer hängen an ihrem eigenen Bot, nicht am Content-Bot
+ALWAYS_REGISTER_JOBS = {"trade_api", "trade_dex"}
 APP_BASE_URL = os.getenv("APP_BASE_URL")
 PORT = int(os.getenv("PORT", "8443"))
 DEVELOPER_CHAT_ID = os.getenv("DEVELOPER_CHAT_ID", "5114518219")
@@ -156,7 +159,7 @@ async def build_application(bot_cfg: Dict, is_primary: bool) -> Application:
         result = pkg.register(app)
         if asyncio.iscoroutine(result):
             await result
-    if is_primary and hasattr(pkg, "register_jobs"):
+    if (is_primary or name in ALWAYS_REGISTER_JOBS) and hasattr(pkg, "register_jobs"):
         result = pkg.register_jobs(app)
         if asyncio.iscoroutine(result):
             await result
@@ -187,10 +190,28 @@ async def webhook_handler(request: web.Request):
     return web.json_response({"ok": True})
 
 async def health_handler(_: web.Request):
+    try:
+        from shared.db import pool_stats
+        db_stats = pool_stats()
+    except Exception:
+        db_stats = None
+    try:
+        from shared.cache import cache_stats
+        caches = cache_stats()
+    except Exception:
+        caches = None
+    try:
+        from shared.candles import get_store
+        candles = get_store().stats()
+    except Exception:
+        candles = None
     return web.json_response({
         "status": "ok",
         "bots": list(APPLICATIONS.keys()),
-        "webhook_urls": WEBHOOK_URLS
+        "webhook_urls": WEBHOOK_URLS,
+        "db": db_stats,
+        "caches": caches,
+        "candles": candles
     })
 
 async def env_handler(_: web.Request):
@@ -284,6 +305,16 @@ async def main():
 
     from devdash_api import register_devdash_routes, ensure_tables, cors_middleware
     webapp = web.Application(middlewares=[cors_middleware])
+    try:
+        from shared.db import setup_aiohttp
+        setup_aiohttp(webapp)
+    except Exception as e:
+        logging.warning("Shared DB pool lifecycle not attached: %s", e)
+    try:
+        from shared import http_clients
+        http_clients.setup_aiohttp(webapp)
+    except Exception as e:
+        logging.warning("Shared HTTP clients lifecycle not attached: %s", e)
     
     # Register miniapp routes for all bots
     if _register_content_miniapp_routes and "content" in APPLICATIONS:
@@ -378,6 +409,8 @@ async def main():
         for app in APPLICATIONS.values():
             await app.stop()
             await app.shutdown()
+        # on_cleanup-Hooks (Shared DB pool, HTTP-Clients) laufen hier
+        await runner.cleanup()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
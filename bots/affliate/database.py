@@ -1,124 +1,35 @@
 """Affiliate Database - Referrals, Conversions, Commissions"""
 
-import os
-import psycopg2
 from datetime import datetime
 import logging
+from pathlib import Path
+
+from shared import pgpool
+from shared.migrations import run_migrations
 
 logger = logging.getLogger(__name__)
 
 
 def get_connection():
-    """Get database connection"""
+    """Get pooled database connection (conn.close() gibt sie an den Pool zurück)"""
     try:
-        return psycopg2.connect(os.getenv("DATABASE_URL"))
+        return pgpool.connect("affliate")
     except Exception as e:
         logger.error(f"DB connection error: {e}")
         return None
 
 
+MIGRATIONS_DIR = Path(__file__).with_name("migrations")
+
+
 def init_all_schemas():
     """Initialize all database schemas"""
-    conn = get_connection()
-    if not conn:
-        return False
-    
     try:
-        cur = conn.cursor()
-        
-        # Referrals table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS aff_referrals (
-                id SERIAL PRIMARY KEY,
-                referrer_id BIGINT NOT NULL,
-                referral_id BIGINT NOT NULL,
-                referral_link TEXT,
-                status VARCHAR(50) DEFAULT 'pending',
-                conversion_date TIMESTAMP,
-                created_at TIMESTAMP DEFAULT NOW(),
-                UNIQUE(referrer_id, referral_id)
-            )
-        """)
-        
-        # Conversions table (no FK to aff_referrals: referrer_id is a Telegram user id, not aff_referrals.id)
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS aff_conversions (
-                id SERIAL PRIMARY KEY,
-                referrer_id BIGINT NOT NULL,
-                referral_id BIGINT NOT NULL,
-                conversion_type VARCHAR(50),
-                value NUMERIC(20,2),
-                commission NUMERIC(20,2),
-                status VARCHAR(50) DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT NOW()
-            )
-        """)
-
-        # If the table existed before with a wrong FK, drop all FKs safely
-        cur.execute("""
-        DO $$
-        DECLARE r RECORD;
-        BEGIN
-            IF to_regclass('public.aff_conversions') IS NOT NULL THEN
-                FOR r IN (
-                    SELECT conname
-                    FROM pg_constraint
-                    WHERE conrelid = 'aff_conversions'::regclass
-                      AND contype = 'f'
-                ) LOOP
-                    EXECUTE format('ALTER TABLE aff_conversions DROP CONSTRAINT IF EXISTS %I', r.conname);
-                END LOOP;
-            END IF;
-        END$$;
-        """)
-        
-        # Commissions table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS aff_commissions (
-                id SERIAL PRIMARY KEY,
-                referrer_id BIGINT NOT NULL UNIQUE,
-                total_earned NUMERIC(20,2) DEFAULT 0,
-                total_withdrawn NUMERIC(20,2) DEFAULT 0,
-                pending NUMERIC(20,2) DEFAULT 0,
-                tier VARCHAR(50) DEFAULT 'bronze',
-                wallet_address VARCHAR(255),
-                ton_connect_verified BOOLEAN DEFAULT FALSE,
-                updated_at TIMESTAMP DEFAULT NOW()
-            )
-        """)
-        
-        # Payouts table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS aff_payouts (
-                id SERIAL PRIMARY KEY,
-                referrer_id BIGINT NOT NULL,
-                amount NUMERIC(20,2),
-                status VARCHAR(50) DEFAULT 'pending',
-                tx_hash VARCHAR(255),
-                wallet_address VARCHAR(255),
-                requested_at TIMESTAMP DEFAULT NOW(),
-                completed_at TIMESTAMP,
-                FOREIGN KEY (referrer_id) REFERENCES aff_commissions(referrer_id)
-            )
-        """)
-        
-        # Helpful indexes
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_aff_referrals_referrer ON aff_referrals(referrer_id)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_aff_conversions_referrer ON aff_conversions(referrer_id)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_aff_payouts_referrer ON aff_payouts(referrer_id)")
-
-        conn.commit()
-        logger.info("Affiliate schemas initialized")
+        run_migrations("affliate", MIGRATIONS_DIR)
         return True
     except Exception as e:
-        logger.error(f"Schema init error: {e}")
-        conn.rollback()
+        logger.error(f"Schema migration error: {e}")
         return False
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
 
 
 
@@ -0,0 +1,88 @@
+"""0001 – Bestandsschema des Affiliate-Bots (früher bei jedem Boot via init_all_schemas).
+
+Das DDL ist hier eingefroren: Schemaänderungen gehören in eine neue
+Migrationsdatei, nicht in diese Datei oder in database.py.
+"""
+
+
+def upgrade(cur):
+    # Referrals table
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS aff_referrals (
+            id SERIAL PRIMARY KEY,
+            referrer_id BIGINT NOT NULL,
+            referral_id BIGINT NOT NULL,
+            referral_link TEXT,
+            status VARCHAR(50) DEFAULT 'pending',
+            conversion_date TIMESTAMP,
+            created_at TIMESTAMP DEFAULT NOW(),
+            UNIQUE(referrer_id, referral_id)
+        )
+    """)
+    
+    # Conversions table (no FK to aff_referrals: referrer_id is a Telegram user id, not aff_referrals.id)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS aff_conversions (
+            id SERIAL PRIMARY KEY,
+            referrer_id BIGINT NOT NULL,
+            referral_id BIGINT NOT NULL,
+            conversion_type VARCHAR(50),
+            value NUMERIC(20,2),
+            commission NUMERIC(20,2),
+            status VARCHAR(50) DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT NOW()
+        )
+    """)
+
+    # If the table existed before with a wrong FK, drop all FKs safely
+    cur.execute("""
+    DO $$
+    DECLARE r RECORD;
+    BEGIN
+        IF to_regclass('public.aff_conversions') IS NOT NULL THEN
+            FOR r IN (
+                SELECT conname
+                FROM pg_constraint
+                WHERE conrelid = 'aff_conversions'::regclass
+                  AND contype = 'f'
+            ) LOOP
+                EXECUTE format('ALTER TABLE aff_conversions DROP CONSTRAINT IF EXISTS %I', r.conname);
+            END LOOP;
+        END IF;
+    END$$;
+    """)
+    
+    # Commissions table
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS aff_commissions (
+            id SERIAL PRIMARY KEY,
+            referrer_id BIGINT NOT NULL UNIQUE,
+            total_earned NUMERIC(20,2) DEFAULT 0,
+            total_withdrawn NUMERIC(20,2) DEFAULT 0,
+            pending NUMERIC(20,2) DEFAULT 0,
+            tier VARCHAR(50) DEFAULT 'bronze',
+            wallet_address VARCHAR(255),
+            ton_connect_verified BOOLEAN DEFAULT FALSE,
+            updated_at TIMESTAMP DEFAULT NOW()
+        )
+    """)
+    
+    # Payouts table
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS aff_payouts (
+            id SERIAL PRIMARY KEY,
+            referrer_id BIGINT NOT NULL,
+            amount NUMERIC(20,2),
+            status VARCHAR(50) DEFAULT 'pending',
+            tx_hash VARCHAR(255),
+            wallet_address VARCHAR(255),
+            requested_at TIMESTAMP DEFAULT NOW(),
+            completed_at TIMESTAMP,
+            FOREIGN KEY (referrer_id) REFERENCES aff_commissions(referrer_id)
+        )
+    """)
+    
+    # Helpful indexes
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_aff_referrals_referrer ON aff_referrals(referrer_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_aff_conversions_referrer ON aff_conversions(referrer_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_aff_payouts_referrer ON aff_payouts(referrer_id)")
@@ -3,6 +3,7 @@ import os
 import json
 import logging
 from urllib.parse import urlparse
+from pathlib import Path
 from datetime import date
 from typing import List, Dict, Tuple, Optional
 from psycopg2 import pool, OperationalError, InterfaceError
@@ -10,6 +11,8 @@ from psycopg2.extras import Json
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
+from shared.migrations import run_migrations
+
 # Logger setup
 logger = logging.getLogger(__name__)
 
@@ -1920,26 +1923,6 @@ def record_reply_time(cur, chat_id: int,
         ON CONFLICT DO NOTHING;
     """, (chat_id, question_msg_id, question_user, answer_msg_id, answer_user, delta_ms))
 
-def _ensure_agg_group_day(cur):
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS agg_group_day (
-          chat_id BIGINT,
-          stat_date DATE,
-          messages_total INT,
-          active_users INT,
-          joins INT,
-          leaves INT,
-          kicks INT,
-          reply_median_ms BIGINT,
-          reply_p90_ms BIGINT,
-          autoresp_hits INT,
-          autoresp_helpful INT,
-          spam_actions INT,
-          night_deletes INT,
-          PRIMARY KEY (chat_id, stat_date)
-        );
-    """)
-
 @_with_cursor
 def upsert_agg_group_day(cur, chat_id:int, stat_date, payload:dict):
     cur.execute("""
@@ -2041,7 +2024,6 @@ def compute_agg_group_day(cur, chat_id:int, stat_date):
 
 @_with_cursor
 def get_agg_summary(cur, chat_id:int, d_start, d_end):
-    _ensure_agg_group_day(cur)
     cur.execute("""
         SELECT
           COALESCE(SUM(messages_total),0),
@@ -3162,7 +3144,6 @@ def prune_old_stats(cur, days: int = 90):
 
     try:
         logger.info(f"[prune_old_stats] Lösche agg_group_day älter als {days} Tage...")
-        _ensure_agg_group_day(cur)
         cur.execute("""
             DELETE FROM agg_group_day
              WHERE stat_date < (CURRENT_DATE - (%s || ' days')::interval);
@@ -3627,18 +3608,31 @@ def migrate_db():
         cur.close()
         conn.close()
 
-def init_all_schemas():
-    """Initialize all database schemas including ads"""
-    logger.info("Initializing all database schemas...")
+MIGRATIONS_DIR = Path(__file__).with_name("migrations")
+
+def bootstrap_legacy_schema():
+    """
+    Bisherige Init-Kette (idempotente CREATE/ALTER ... IF NOT EXISTS).
+    Läuft nur noch einmalig als Migration 0001_baseline, nicht mehr bei jedem Boot.
+    Eingefroren: Die Prüfsumme von 0001 deckt dieses DDL nicht ab, Änderungen
+    hier würden auf bestehenden Datenbanken nie ausgeführt. Neue Tabellen oder
+    Spalten gehören in bots/content/migrations/NNNN_*.py.
+    """
     init_db()
     ensure_multi_bot_schema()
-    init_ads_schema()  # Hinzufügen
+    init_ads_schema()
     migrate_db()
     migrate_stats_rollup()
     ensure_spam_topic_schema()
     ensure_forum_topics_schema()
     ensure_ai_moderation_schema()
-    logger.info("✅ All schemas initialized successfully")
+    ensure_payments_schema()
+
+def init_all_schemas():
+    """Wendet ausstehende Schema-Migrationen an (Fast-Path: ein Versions-Lookup)."""
+    applied = run_migrations("content", MIGRATIONS_DIR)
+    if applied:
+        logger.info("✅ %d Schema-Migration(en) angewendet", applied)
 
 if __name__ == "__main__":
     init_all_schemas()
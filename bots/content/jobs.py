@@ -22,7 +22,7 @@ from .statistic import (
     DEVELOPER_IDS, get_group_meta, fetch_message_stats,
     compute_response_times, fetch_media_and_poll_stats, get_member_stats, 
     get_message_insights, get_engagement_metrics, get_trend_analysis, update_group_activity_score, 
-    migrate_stats_rollup, compute_agg_group_day, upsert_agg_group_day)
+    compute_agg_group_day, upsert_agg_group_day)
 from telegram.constants import ParseMode
 from .utils import clean_delete_accounts_for_chat, _apply_hard_permissions, cleanup_removed_chats
 
@@ -380,7 +380,6 @@ async def dev_stats_nightly_job(context: ContextTypes.DEFAULT_TYPE):
                 pass
 
 async def rollup_yesterday(context):
-    migrate_stats_rollup()
     tz = ZoneInfo("Europe/Berlin")
     today = datetime.now(tz).date()
     target_day = today - timedelta(days=1)
@@ -399,7 +398,6 @@ async def rollup_yesterday(context):
             
 async def backfill_missing_agg(context: ContextTypes.DEFAULT_TYPE):
     """Füllt fehlende agg_group_day-Tage pro Chat automatisch bis gestern auf."""
-    migrate_stats_rollup()
     tz = ZoneInfo(TIMEZONE)
     today = datetime.now(tz).date()
     end_day = today - timedelta(days=1)
@@ -0,0 +1,18 @@
+"""0001 – Bestandsschema des Content-Bots.
+
+Die bisherigen Init-Funktionen verwalten ihre Transaktionen selbst
+(@_with_cursor bzw. migrate_db), daher bleibt `cur` hier ungenutzt: das DDL
+committet in eigenen Transaktionen, der Eintrag in schema_migrations folgt
+erst danach. Bricht der Schritt ab, bleibt ein Teil des Schemas stehen und
+der Lauf wird beim nächsten Boot wiederholt – das geht nur, weil alle
+Init-Funktionen idempotent sind (IF NOT EXISTS).
+
+Die Prüfsumme deckt nur diese Datei ab, nicht das DDL in database.py. Die
+Init-Funktionen hinter bootstrap_legacy_schema() sind deshalb eingefroren;
+Schemaänderungen gehören in eine neue Migrationsdatei.
+"""
+
+
+def upgrade(cur):
+    from bots.content.database import bootstrap_legacy_schema
+    bootstrap_legacy_schema()
@@ -0,0 +1,10 @@
+"""0002 – Statistik-Tabellen (früher bei jeder Handler-Registrierung via init_stats_db).
+
+Wie 0001: init_stats_db() holt sich über @_with_cursor eine eigene Verbindung
+und ist eingefroren – neue Statistik-Spalten kommen in eine neue Migration.
+"""
+
+
+def upgrade(cur):
+    from bots.content.statistic import init_stats_db
+    init_stats_db()
@@ -4,7 +4,6 @@ import os
 import urllib.parse
 import logging
 import asyncio
-import hmac
 import hashlib
 import inspect
 from io import BytesIO
@@ -23,6 +22,7 @@ from bots.content.database import upsert_forum_topic
 from .access import parse_webapp_user_id, is_admin_or_owner
 from .patchnotes import __version__, PATCH_NOTES
 from shared.payments import create_payment_order 
+from shared import initdata
 
 logger = logging.getLogger(__name__)
 
@@ -36,67 +36,15 @@ MINIAPP_API_BASE = os.getenv("MINIAPP_API_BASE", "").rstrip("/")
 BOT_TOKEN = (os.getenv("BOT1_TOKEN"))
 SECRET = hashlib.sha256(BOT_TOKEN.encode()).digest() if BOT_TOKEN else None
 
-TOKENS = [
-    os.getenv("BOT1_TOKEN"),
-    os.getenv("BOT2_TOKEN"),
-    os.getenv("BOT3_TOKEN"),
-    os.getenv("BOT4_TOKEN"),
-    os.getenv("BOT5_TOKEN"),
-    os.getenv("BOT6_TOKEN"),
-]
-TOKENS = [t for t in TOKENS if t]  # nur gesetzte Tokens
-
-# Sammelbecken für alle Tokens (auch dynamisch von PTB-Apps)
-_ALL_TOKENS: set[str] = set(TOKENS)
-
 routes = web.RouteTableDef()
 
-def _all_token_secrets() -> list[bytes]:
-    secs: list[bytes] = []
-    for t in list(_ALL_TOKENS):
-        try:
-            secs.append(hashlib.sha256(t.encode()).digest())
-        except Exception:
-            pass
-    return secs
-
-def _verify_with_secret(init_data: str, secret: bytes) -> int:
-    # Nach Telegram-Doku: data_check_string = sortierte key=value-Liste ohne 'hash'
-    parsed = dict(urllib.parse.parse_qsl(init_data, keep_blank_values=True))
-    recv_hash = parsed.get("hash")
-    if not recv_hash:
-        return 0
-    items = [(k, v) for k, v in parsed.items() if k != "hash"]
-    check_str = "\n".join(f"{k}={v}" for k, v in sorted(items))
-    calc = hmac.new(secret, msg=check_str.encode(), digestmod=hashlib.sha256).hexdigest()
-    if not hmac.compare_digest(calc, recv_hash):
-        return 0
-    try:
-        user = json.loads(parsed.get("user") or "{}")
-        return int(user.get("id") or 0)
-    except Exception:
-        return 0
-
-def _verify_init_data_any(init_data: str) -> int:
+def _verify_init_data_any(init_data: str, hint: Optional[str] = None) -> int:
     """
-    Verifiziert Telegram WebApp initData.
+    Verifiziert Telegram WebApp initData (shared/initdata, ``hint`` = X-Telegram-Bot).
     SECURITY: Ohne gültige Hash-Verifikation wird KEIN user.id akzeptiert.
     (Spoofing-Schutz)
     """
-    if not init_data:
-        return 0
-
-    # Offizieller Weg: hash-basierte Verifikation gegen bekannte BOT_TOKENs
-    try:
-        for secret in _all_token_secrets():  
-            uid = _verify_with_secret(init_data, secret)  
-            if uid:
-                return uid
-    except Exception:
-        pass
-
-    # Kein unsicherer Fallback in PROD.
-    return 0
+    return initdata.user_id(init_data, hint)
 
 def _resolve_uid(request: web.Request) -> int:
     # 1) WebApp InitData aus Header / Query ziehen
@@ -2101,11 +2049,9 @@ async def miniapp_pagination_handler(update: Update, context: ContextTypes.DEFAU
     await query.answer()
 
 def register_miniapp(app: Application):
-    # Bot-Token dynamisch sammeln (für die Init-Data-Verifikation)
+    # Bot-Token dynamisch registrieren (für die Init-Data-Verifikation)
     try:
-        tok = getattr(app.bot, "token", None)
-        if tok:
-            _ALL_TOKENS.add(tok)
+        initdata.register_token(getattr(app.bot, "token", None), getattr(app.bot, "username", None))
     except Exception:
         pass
     
@@ -2,7 +2,9 @@ import re
 import os
 import logging
 import csv
+import gzip
 import json
+import tempfile
 from psycopg2.extras import Json
 from openai import OpenAI
 from collections import Counter
@@ -13,7 +15,7 @@ from telegram.ext import ContextTypes, CommandHandler, MessageHandler, filters,
 from shared.telethon_client import telethon_client
 from telethon.tl.functions.channels import GetFullChannelRequest
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from bots.content.database import (_with_cursor, _db_pool, record_reply_time, get_group_language, migrate_stats_rollup, compute_agg_group_day, 
+from bots.content.database import (_with_cursor, _db_pool, record_reply_time, get_group_language, compute_agg_group_day, 
 upsert_agg_group_day, get_global_config, get_agg_summary, get_heatmap, get_agg_rows, get_group_stats, get_top_responders
 )
 from shared.translator import translate_hybrid
@@ -65,6 +67,9 @@ else:
     openai_client = None
     print("[Warnung] OPENAI_API_KEY nicht gesetzt – Sentiment/Summary deaktiviert.")
 
+# Zeilen je Roundtrip beim Streamen großer Exporte (serverseitiger Cursor)
+EXPORT_ITERSIZE = int(os.getenv("STATS_EXPORT_ITERSIZE", "2000"))
+
 # Hilfsfunktion für rohe DB-Verbindung
 def get_db_connection():
     conn = _db_pool.getconn()
@@ -120,7 +125,8 @@ def schedule_telethon_jobs(chat_usernames: list[str]):
         scheduler.add_job(lambda u=username: fetch_and_store_stats(u), trigger='cron', hour=2, minute=0)
     scheduler.start()
 
-# --- Schema-Migration für Stats ---
+# --- Schema für Stats (angewendet über Migration 0002_stats_schema, eingefroren:
+#     Änderungen nur über neue Migrationsdateien) ---
 @_with_cursor
 def init_stats_db(cur):
 
@@ -438,6 +444,24 @@ def get_ai_mod_logs_range(cur, chat_id:int, d0, d1):
     """, (chat_id, d0, d1))
     return cur.fetchall() or []
 
+def _iter_rows(sql: str, params: tuple, itersize: int = EXPORT_ITERSIZE):
+    """Zeilen über einen benannten (serverseitigen) Cursor blockweise liefern."""
+    conn = _db_pool.getconn()
+    autocommit = conn.autocommit
+    try:
+        conn.autocommit = False  # named cursor braucht eine Transaktion
+        with conn.cursor(name=f"stats_export_{id(conn)}") as cur:
+            cur.itersize = itersize
+            cur.execute(sql, params)
+            yield from cur
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.autocommit = autocommit
+        _db_pool.putconn(conn)
+
 @_with_cursor
 def get_user_strikes_snapshot(cur, chat_id:int):
     cur.execute("SELECT user_id, points, updated FROM user_strikes WHERE chat_id=%s ORDER BY points DESC;", (chat_id,))
@@ -941,9 +965,12 @@ async def export_stats_csv_command(update: Update, context: ContextTypes.DEFAULT
     finally:
         _db_pool.putconn(conn)
 
-    # --- CSV schreiben
-    fname = f"/tmp/stats_{chat.id}_{d0.isoformat()}_{d1.isoformat()}.csv"
-    with open(fname, "w", encoding="utf-8", newline="") as f:
+    # --- CSV schreiben (progressiv in eine Temp-Datei; gzip=1 -> .csv.gz)
+    gz = params.get("gzip", "").lower() in ("1", "true", "yes")
+    suffix = ".csv.gz" if gz else ".csv"
+    fd, fname = tempfile.mkstemp(prefix=f"stats_{chat.id}_", suffix=suffix)
+    os.close(fd)
+    with (gzip.open if gz else open)(fname, "wt", encoding="utf-8", newline="") as f:
         wr = csv.writer(f, delimiter=";")
 
         # Kopf: Metadaten
@@ -1063,22 +1090,33 @@ async def export_stats_csv_command(update: Update, context: ContextTypes.DEFAULT
         for uid, last_seen in inactive_30d:
             wr.writerow([uid, getattr(last_seen, "isoformat", lambda: str(last_seen))()])
 
-            # AI Moderation Logs
-        rows = get_ai_mod_logs_range(chat.id, d0, d1)
+        # AI Moderation Logs (unbegrenzt – serverseitiger Cursor, direkt in die Datei)
+        wr.writerow([])
+        wr.writerow(["# AI-Moderation"])
         wr.writerow(["ts","user_id","topic_id","category","score","action"])
-        for ts, uid, tid, cat, sc, act in rows:
-            wr.writerow([ts, uid, tid, cat, sc, act])
+        wr.writerows(_iter_rows("""
+            SELECT ts, user_id, topic_id, category, score, action
+              FROM ai_mod_logs
+             WHERE chat_id=%s AND ts >= %s AND ts < %s
+             ORDER BY ts ASC
+        """, (chat.id, ts_start, ts_end)))
 
         # User Strikes Snapshot
-        rows = get_user_strikes_snapshot(chat.id)
+        wr.writerow([])
+        wr.writerow(["# User-Strikes"])
         wr.writerow(["user_id","points","updated"])
-        for uid, pts, upd in rows:
-            wr.writerow([uid, pts, upd])
-        
-    await update.effective_message.reply_document(
-        open(fname, "rb"),
-        filename=f"stats_{chat.id}_{d0}_{d1}.csv"
-    )
+        wr.writerows(_iter_rows(
+            "SELECT user_id, points, updated FROM user_strikes WHERE chat_id=%s ORDER BY points DESC",
+            (chat.id,)))
+
+    try:
+        with open(fname, "rb") as f:
+            await update.effective_message.reply_document(
+                f,
+                filename=f"stats_{chat.id}_{d0}_{d1}{suffix}"
+            )
+    finally:
+        os.remove(fname)
 
 # --- Stats-Command ---
 async def stats_command(update, context):
@@ -1387,7 +1425,6 @@ def update_group_activity_score(chat_id: int, score: float):
 
 # --- Handler-Registrierung ---
 def register_statistics_handlers(app):
-    init_stats_db()
     app.add_handler(CommandHandler(['stats', 'statistik'], stats_command), group=10)
     async def command_logger(update: Update, context: ContextTypes.DEFAULT_TYPE):
         cmd = update.effective_message.text.split()[0].lstrip('/')
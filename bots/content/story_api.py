@@ -7,12 +7,8 @@ Story Sharing API Endpoints (Emerald)
 
 import logging
 import os
-import json
-import urllib.parse
 from aiohttp import web
-from typing import Optional, List
-import hmac
-import hashlib
+from typing import Optional
 from .story_sharing import (
     create_story_share,
     track_story_click,
@@ -28,6 +24,7 @@ from .story_sharing import (
 )
 from .story_card_generator import generate_share_card
 from .database import get_story_settings, get_group_title
+from shared import initdata
 try:
     from shared.emrd_rewards import get_pending_rewards, create_reward_claim
 except Exception:
@@ -41,64 +38,22 @@ try:
 except Exception:  # pragma: no cover
     award_points = None  # type: ignore
 
-def _token_secrets_from_request(request: web.Request) -> List[bytes]:
-    """Sammelt mögliche BOT-Token-Secrets (sha256(token)) aus Env + PTB-App."""
-    secrets: List[bytes] = []
-
-    # 1) Env Tokens (Multi-Bot)
-    for k in ("BOT1_TOKEN","BOT2_TOKEN","BOT3_TOKEN","BOT4_TOKEN","BOT5_TOKEN","BOT6_TOKEN","BOT_TOKEN"):
-        t = os.getenv(k)
-        if t:
-            try:
-                secrets.append(hashlib.sha256(t.encode()).digest())
-            except Exception:
-                pass
-
-    # 2) PTB-App Token (falls vorhanden)
+def _register_ptb_token(request: web.Request) -> None:
+    """PTB-App-Token (falls vorhanden) für die initData-Prüfung registrieren."""
     try:
         ptb_app = request.app.get("ptb_app")
-        tok = getattr(getattr(ptb_app, "bot", None), "token", None)
-        if tok:
-            secrets.append(hashlib.sha256(str(tok).encode()).digest())
+        bot = getattr(ptb_app, "bot", None)
+        initdata.register_token(getattr(bot, "token", None))
     except Exception:
         pass
 
-    # de-dupe
-    uniq = []
-    seen = set()
-    for s in secrets:
-        if s not in seen:
-            uniq.append(s)
-            seen.add(s)
-    return uniq
-
-
-def _verify_init_data(init_data: str, secret: bytes) -> int:
-    """Telegram WebApp initData Signatur-Prüfung (HMAC-SHA256)."""
-    parsed = dict(urllib.parse.parse_qsl(init_data, keep_blank_values=True))
-    recv_hash = parsed.get("hash")
-    if not recv_hash:
-        return 0
-    items = [(k, v) for k, v in parsed.items() if k != "hash"]
-    check_str = "\n".join(f"{k}={v}" for k, v in sorted(items))
-    calc = hmac.new(secret, msg=check_str.encode(), digestmod=hashlib.sha256).hexdigest()
-    if not hmac.compare_digest(calc, recv_hash):
-        return 0
-    try:
-        user = json.loads(parsed.get("user") or "{}")
-        return int(user.get("id") or 0)
-    except Exception:
-        return 0
 
 def parse_webapp_user_id(request: web.Request, init_data: Optional[str]) -> int:
     """Extrahiert user.id aus Telegram WebApp initData – NUR wenn Signatur gültig."""
     if not init_data:
         return 0
-    for secret in _token_secrets_from_request(request):
-        uid = _verify_init_data(init_data, secret)
-        if uid:
-            return uid
-    return 0
+    _register_ptb_token(request)
+    return initdata.user_id(init_data, initdata.bot_hint(request))
 
 
 def _resolve_uid(request: web.Request) -> int:
@@ -2,7 +2,10 @@
 import asyncpg
 import os
 import logging
-import psycopg2
+from pathlib import Path
+
+from shared.db import pool_size_for, statement_timeout_for
+from shared.migrations import run_migrations
 
 logger = logging.getLogger(__name__)
 _pool = None
@@ -13,76 +16,25 @@ async def get_pool():
         dsn = os.environ.get("DATABASE_URL")
         if not dsn:
             raise RuntimeError("DATABASE_URL ist nicht gesetzt")
-        _pool = await asyncpg.create_pool(dsn, min_size=1, max_size=5)
+        # asyncpg bleibt vorerst ($n-Platzhalter), Größe/Timeout aber aus der zentralen Quote
+        _pool = await asyncpg.create_pool(
+            dsn,
+            min_size=1,
+            max_size=pool_size_for("crossposter"),
+            statement_cache_size=int(os.getenv("DB_PREPARED_MAX", "128")),
+            server_settings={"statement_timeout": str(statement_timeout_for("crossposter"))},
+        )
     return _pool
 
 
+MIGRATIONS_DIR = Path(__file__).with_name("migrations")
+
+
 def init_all_schemas():
     """Initialize Crossposter database schemas"""
-    conn = None
     try:
-        conn = psycopg2.connect(os.environ.get("DATABASE_URL"))
-        cur = conn.cursor()
-        
-        # Crossposter posts table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS crossposter_posts (
-                id SERIAL PRIMARY KEY,
-                user_id BIGINT NOT NULL,
-                source_channel BIGINT,
-                source_message_id BIGINT,
-                target_channels TEXT DEFAULT '[]',
-                content TEXT,
-                media JSONB DEFAULT '[]',
-                status VARCHAR(50) DEFAULT 'draft',
-                scheduled_at TIMESTAMP,
-                posted_at TIMESTAMP,
-                created_at TIMESTAMP DEFAULT NOW(),
-                updated_at TIMESTAMP DEFAULT NOW()
-            )
-        """)
-        
-        # Crossposter channels configuration
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS crossposter_channels (
-                id SERIAL PRIMARY KEY,
-                user_id BIGINT NOT NULL,
-                channel_id BIGINT NOT NULL,
-                channel_name VARCHAR(255),
-                is_enabled BOOLEAN DEFAULT TRUE,
-                auto_forward BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT NOW(),
-                UNIQUE(user_id, channel_id)
-            )
-        """)
-        
-        # Crossposter rules
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS crossposter_rules (
-                id SERIAL PRIMARY KEY,
-                user_id BIGINT NOT NULL,
-                source_channel BIGINT NOT NULL,
-                target_channels TEXT DEFAULT '[]',
-                keywords TEXT DEFAULT '[]',
-                is_active BOOLEAN DEFAULT TRUE,
-                created_at TIMESTAMP DEFAULT NOW(),
-                updated_at TIMESTAMP DEFAULT NOW()
-            )
-        """)
-        
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_crossposter_posts_user ON crossposter_posts(user_id)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_crossposter_posts_status ON crossposter_posts(status)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_crossposter_channels_user ON crossposter_channels(user_id)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_crossposter_rules_user ON crossposter_rules(user_id)")
-        
-        conn.commit()
-        logger.info("Crossposter schemas initialized successfully")
+        run_migrations("crossposter", MIGRATIONS_DIR)
         return True
     except Exception as e:
-        logger.error(f"Crossposter schema init error: {e}")
-        if conn:
-            conn.rollback()
+        logger.error(f"Crossposter schema migration error: {e}")
         return False
-    finally:
-        if conn:
-            conn.close()
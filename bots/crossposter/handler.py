@@ -13,6 +13,7 @@ from bots.crossposter.database import get_pool
 from bots.crossposter.models import log_event
 from bots.crossposter.x_client import post_text as x_post_text, post_with_media as x_post_with_media
 import httpx
+from shared.http_clients import get_httpx
 
 logger = logging.getLogger(__name__)
 
@@ -47,10 +48,10 @@ async def discord_post(webhook_url: str, content: str, username: str = None, ava
     if username: data["username"] = username
     if avatar_url: data["avatar_url"] = avatar_url
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.post(webhook_url, json=data)
-            r.raise_for_status()
-            logger.info(f"Discord post erfolgreich: {webhook_url[:50]}...")
+        client = get_httpx("crossposter")
+        r = await client.post(webhook_url, json=data, timeout=30)
+        r.raise_for_status()
+        logger.info(f"Discord post erfolgreich: {webhook_url[:50]}...")
     except httpx.HTTPError as e:
         logger.error(f"Discord post fehlgeschlagen: {e}")
         raise
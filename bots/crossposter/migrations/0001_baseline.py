@@ -0,0 +1,58 @@
+"""0001 – Bestandsschema des Crossposter-Bots (früher bei jedem Boot via init_all_schemas).
+
+Das DDL ist hier eingefroren: Schemaänderungen gehören in eine neue
+Migrationsdatei, nicht in diese Datei oder in database.py.
+"""
+
+
+def upgrade(cur):
+    # Crossposter posts table
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS crossposter_posts (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            source_channel BIGINT,
+            source_message_id BIGINT,
+            target_channels TEXT DEFAULT '[]',
+            content TEXT,
+            media JSONB DEFAULT '[]',
+            status VARCHAR(50) DEFAULT 'draft',
+            scheduled_at TIMESTAMP,
+            posted_at TIMESTAMP,
+            created_at TIMESTAMP DEFAULT NOW(),
+            updated_at TIMESTAMP DEFAULT NOW()
+        )
+    """)
+    
+    # Crossposter channels configuration
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS crossposter_channels (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            channel_id BIGINT NOT NULL,
+            channel_name VARCHAR(255),
+            is_enabled BOOLEAN DEFAULT TRUE,
+            auto_forward BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT NOW(),
+            UNIQUE(user_id, channel_id)
+        )
+    """)
+    
+    # Crossposter rules
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS crossposter_rules (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            source_channel BIGINT NOT NULL,
+            target_channels TEXT DEFAULT '[]',
+            keywords TEXT DEFAULT '[]',
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT NOW(),
+            updated_at TIMESTAMP DEFAULT NOW()
+        )
+    """)
+    
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_crossposter_posts_user ON crossposter_posts(user_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_crossposter_posts_status ON crossposter_posts(status)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_crossposter_channels_user ON crossposter_channels(user_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_crossposter_rules_user ON crossposter_rules(user_id)")
@@ -1,5 +1,5 @@
 from aiohttp import web
-import json, httpx, hmac, hashlib, time
+import json, httpx
 import os
 import logging
 from bots.crossposter.models import (
@@ -7,6 +7,7 @@ from bots.crossposter.models import (
     list_routes, create_route, update_route, delete_route,
     stats, list_connectors, upsert_connector, get_logs, get_route
 )
+from shared import initdata
 
 logger = logging.getLogger(__name__)
 
@@ -21,32 +22,15 @@ TELEGRAM_API = f"https://api.telegram.org/bot{BOT_TOKEN}"
 
 def verify_init_data(init_data: str, bot_token: str) -> dict:
     """
-    Telegram WebApp Login-Verify (Serverseite).
+    Telegram WebApp Login-Verify (Serverseite, shared/initdata).
     """
     if not init_data:
         raise web.HTTPUnauthorized(text="missing initData")
-    pairs = {}
-    for kv in init_data.split("&"):
-        if "=" in kv:
-            k, v = kv.split("=", 1)
-            pairs[k] = v
-    if "hash" not in pairs:
-        raise web.HTTPUnauthorized(text="missing hash")
-    data_check_string = "\n".join(f"{k}={pairs[k]}" for k in sorted(pairs.keys()) if k != "hash")
-    secret = hashlib.sha256(bot_token.encode()).digest()
-    calc = hmac.new(secret, data_check_string.encode(), hashlib.sha256).hexdigest()
-    if calc != pairs["hash"]:
-        raise web.HTTPUnauthorized(text="bad hash")
-    if "auth_date" in pairs and time.time() - int(pairs["auth_date"]) > int(os.getenv("TELEGRAM_LOGIN_TTL_SECONDS", "86400")):
-        raise web.HTTPUnauthorized(text="login expired")
-    user_json = pairs.get("user", "{}")
     try:
-        user = json.loads(user_json)
-    except Exception:
-        user = {}
-    if not user.get("id"):
-        raise web.HTTPUnauthorized(text="no user in initData")
-    return {"user": user}
+        info = initdata.verify(init_data, tokens=[bot_token])
+    except initdata.InitDataError as e:
+        raise web.HTTPUnauthorized(text=str(e))
+    return {"user": info["user"]}
 
 async def _current_user(request: web.Request):
     init = request.headers.get("X-Telegram-Init-Data", "")
@@ -4,27 +4,28 @@ Verifies WebApp initData and manages secure user sessions
 """
 
 import logging
-import hashlib
-import hmac
 from typing import Optional, Dict
 from datetime import datetime
-import json
 import os
 from aiohttp import web
+from shared import initdata
 
 logger = logging.getLogger(__name__)
 
 class TelegramWebAppAuth:
     """Verify Telegram WebApp initData authenticity"""
     
-    def __init__(self, bot_token: str):
+    def __init__(self, bot_token: str, max_age: int = 300):
         """
         Initialize with bot token for verification
         
         Args:
             bot_token: Telegram Bot API Token
+            max_age: Maximum age of auth_date in seconds (default 5 minutes)
         """
         self.bot_token = bot_token
+        self.max_age = max_age
+        initdata.register_token(bot_token)
     
     @staticmethod
     def parse_init_data(init_data_raw: str) -> Dict:
@@ -61,80 +62,31 @@ class TelegramWebAppAuth:
             Parsed user data if valid, None otherwise
         """
         try:
-            params = self.parse_init_data(init_data_raw)
-            
-            if not params:
-                logger.warning("Empty init_data")
-                return None
-            
-            # Extract hash
-            hash_value = params.get('hash')
-            if not hash_value:
-                logger.warning("No hash in init_data")
-                return None
-            
-            # Create verification string
-            data_check_string = '\n'.join(
-                f"{k}={v}" for k, v in sorted(params.items())
-                if k != 'hash'
-            )
-            
-            # Calculate HMAC
-            secret_key = hashlib.sha256(
-                self.bot_token.encode()
-            ).digest()
-            
-            calculated_hash = hmac.new(
-                secret_key,
-                data_check_string.encode(),
-                hashlib.sha256
-            ).hexdigest()
-            
-            # Verify hash matches
-            if calculated_hash != hash_value:
-                logger.warning(f"Hash mismatch: {calculated_hash} != {hash_value}")
-                return None
-            
-            # Check auth_date not too old (5 minutes)
-            auth_date = int(params.get('auth_date', 0))
-            current_time = int(datetime.now().timestamp())
-            
-            if current_time - auth_date > 300:
-                logger.warning(f"Auth data too old: {current_time - auth_date}s")
-                return None
-            
-            # Parse user data
-            user_data = {}
-            if params.get('user'):
-                try:
-                    user_json = json.loads(
-                        params['user'].replace('%20', ' ')
-                    )
-                    user_data = {
-                        'id': user_json.get('id'),
-                        'is_bot': user_json.get('is_bot', False),
-                        'first_name': user_json.get('first_name'),
-                        'last_name': user_json.get('last_name'),
-                        'username': user_json.get('username'),
-                        'language_code': user_json.get('language_code'),
-                        'is_premium': user_json.get('is_premium', False),
-                    }
-                except json.JSONDecodeError:
-                    logger.error("Failed to parse user JSON")
-                    return None
-            
-            return {
-                'user': user_data,
-                'auth_date': auth_date,
-                'chat_instance': params.get('chat_instance'),
-                'chat_type': params.get('chat_type', 'private'),
-                'valid': True
-            }
-            
-        except Exception as e:
-            logger.error(f"Init data verification error: {e}")
+            info = initdata.verify(init_data_raw, tokens=[self.bot_token], max_age=self.max_age)
+        except initdata.InitDataError as e:
+            logger.warning(f"Init data rejected: {e}")
+            return None
+        if not info['auth_date']:
+            logger.warning("No auth_date in init_data")
             return None
 
+        user_json = info['user']
+        return {
+            'user': {
+                'id': user_json.get('id'),
+                'is_bot': user_json.get('is_bot', False),
+                'first_name': user_json.get('first_name'),
+                'last_name': user_json.get('last_name'),
+                'username': user_json.get('username'),
+                'language_code': user_json.get('language_code'),
+                'is_premium': user_json.get('is_premium', False),
+            },
+            'auth_date': info['auth_date'],
+            'chat_instance': info['fields'].get('chat_instance'),
+            'chat_type': info['fields'].get('chat_type', 'private'),
+            'valid': True
+        }
+
 
 class WebAppSessionManager:
     """Manage secure sessions for WebApp users"""
@@ -1,131 +1,37 @@
 """DAO Database - Proposals, Voting, Treasury"""
 
-import os
 import json
-import psycopg2
 from datetime import datetime, timedelta
 import logging
 from decimal import Decimal
+from pathlib import Path
+
+from shared import pgpool
+from shared.migrations import run_migrations
 
 logger = logging.getLogger(__name__)
 
 
 def get_connection():
-    """Get database connection"""
+    """Get pooled database connection (conn.close() gibt sie an den Pool zurück)"""
     try:
-        return psycopg2.connect(os.getenv("DATABASE_URL"))
+        return pgpool.connect("dao")
     except Exception as e:
         logger.error(f"DB connection error: {e}")
         return None
 
 
+MIGRATIONS_DIR = Path(__file__).with_name("migrations")
+
+
 def init_all_schemas():
     """Initialize all database schemas"""
-    conn = get_connection()
-    if not conn:
-        return False
-    
     try:
-        cur = conn.cursor()
-        
-        # Proposals table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS dao_proposals (
-                id SERIAL PRIMARY KEY,
-                proposal_id TEXT UNIQUE NOT NULL,
-                proposer_id BIGINT NOT NULL,
-                title VARCHAR(255) NOT NULL,
-                description TEXT,
-                proposal_type VARCHAR(50),
-                status VARCHAR(50) DEFAULT 'active',
-                voting_start TIMESTAMP DEFAULT NOW(),
-                voting_end TIMESTAMP,
-                min_quorum INTEGER DEFAULT 100000,
-                current_votes INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT NOW(),
-                updated_at TIMESTAMP DEFAULT NOW()
-            )
-        """)
-        
-        # Votes table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS dao_votes (
-                id SERIAL PRIMARY KEY,
-                proposal_id TEXT NOT NULL,
-                voter_id BIGINT NOT NULL,
-                vote_type VARCHAR(50),
-                voting_power NUMERIC(20,2),
-                timestamp TIMESTAMP DEFAULT NOW(),
-                FOREIGN KEY (proposal_id) REFERENCES dao_proposals(proposal_id),
-                UNIQUE(proposal_id, voter_id)
-            )
-        """)
-        
-        # Delegations table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS dao_delegations (
-                id SERIAL PRIMARY KEY,
-                delegator_id BIGINT NOT NULL,
-                delegate_id BIGINT NOT NULL,
-                voting_power NUMERIC(20,2),
-                created_at TIMESTAMP DEFAULT NOW(),
-                expires_at TIMESTAMP,
-                UNIQUE(delegator_id, delegate_id)
-            )
-        """)
-        
-        # Treasury table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS dao_treasury (
-                id SERIAL PRIMARY KEY,
-                transaction_id TEXT UNIQUE NOT NULL,
-                tx_type VARCHAR(50),
-                amount NUMERIC(20,2),
-                destination VARCHAR(255),
-                status VARCHAR(50),
-                approved_votes INTEGER,
-                proposal_id TEXT,
-                created_at TIMESTAMP DEFAULT NOW(),
-                FOREIGN KEY (proposal_id) REFERENCES dao_proposals(proposal_id)
-            )
-        """)
-        
-        # User voting power table (cached)
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS dao_user_voting_power (
-                user_id BIGINT PRIMARY KEY,
-                emrd_balance NUMERIC(20,2) DEFAULT 0,
-                delegated_power NUMERIC(20,2) DEFAULT 0,
-                received_delegations NUMERIC(20,2) DEFAULT 0,
-                total_power NUMERIC(20,2) DEFAULT 0,
-                updated_at TIMESTAMP DEFAULT NOW()
-            )
-        """)
-        
-        # Voting statistics
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS dao_vote_stats (
-                proposal_id TEXT PRIMARY KEY,
-                votes_for NUMERIC(20,2) DEFAULT 0,
-                votes_against NUMERIC(20,2) DEFAULT 0,
-                total_voters INTEGER DEFAULT 0,
-                updated_at TIMESTAMP DEFAULT NOW(),
-                FOREIGN KEY (proposal_id) REFERENCES dao_proposals(proposal_id)
-            )
-        """)
-
-        conn.commit()
-        logger.info("DAO schemas initialized")
+        run_migrations("dao", MIGRATIONS_DIR)
         return True
     except Exception as e:
-        logger.error(f"Schema init error: {e}")
-        conn.rollback()
+        logger.error(f"Schema migration error: {e}")
         return False
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
 
 
 def create_proposal(proposer_id, title, description, proposal_type):
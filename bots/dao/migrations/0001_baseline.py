@@ -0,0 +1,93 @@
+"""0001 – Bestandsschema des DAO-Bots (früher bei jedem Boot via init_all_schemas).
+
+Das DDL ist hier eingefroren: Schemaänderungen gehören in eine neue
+Migrationsdatei, nicht in diese Datei oder in database.py.
+"""
+
+
+def upgrade(cur):
+    # Proposals table
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS dao_proposals (
+            id SERIAL PRIMARY KEY,
+            proposal_id TEXT UNIQUE NOT NULL,
+            proposer_id BIGINT NOT NULL,
+            title VARCHAR(255) NOT NULL,
+            description TEXT,
+            proposal_type VARCHAR(50),
+            status VARCHAR(50) DEFAULT 'active',
+            voting_start TIMESTAMP DEFAULT NOW(),
+            voting_end TIMESTAMP,
+            min_quorum INTEGER DEFAULT 100000,
+            current_votes INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT NOW(),
+            updated_at TIMESTAMP DEFAULT NOW()
+        )
+    """)
+    
+    # Votes table
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS dao_votes (
+            id SERIAL PRIMARY KEY,
+            proposal_id TEXT NOT NULL,
+            voter_id BIGINT NOT NULL,
+            vote_type VARCHAR(50),
+            voting_power NUMERIC(20,2),
+            timestamp TIMESTAMP DEFAULT NOW(),
+            FOREIGN KEY (proposal_id) REFERENCES dao_proposals(proposal_id),
+            UNIQUE(proposal_id, voter_id)
+        )
+    """)
+    
+    # Delegations table
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS dao_delegations (
+            id SERIAL PRIMARY KEY,
+            delegator_id BIGINT NOT NULL,
+            delegate_id BIGINT NOT NULL,
+            voting_power NUMERIC(20,2),
+            created_at TIMESTAMP DEFAULT NOW(),
+            expires_at TIMESTAMP,
+            UNIQUE(delegator_id, delegate_id)
+        )
+    """)
+    
+    # Treasury table
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS dao_treasury (
+            id SERIAL PRIMARY KEY,
+            transaction_id TEXT UNIQUE NOT NULL,
+            tx_type VARCHAR(50),
+            amount NUMERIC(20,2),
+            destination VARCHAR(255),
+            status VARCHAR(50),
+            approved_votes INTEGER,
+            proposal_id TEXT,
+            created_at TIMESTAMP DEFAULT NOW(),
+            FOREIGN KEY (proposal_id) REFERENCES dao_proposals(proposal_id)
+        )
+    """)
+    
+    # User voting power table (cached)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS dao_user_voting_power (
+            user_id BIGINT PRIMARY KEY,
+            emrd_balance NUMERIC(20,2) DEFAULT 0,
+            delegated_power NUMERIC(20,2) DEFAULT 0,
+            received_delegations NUMERIC(20,2) DEFAULT 0,
+            total_power NUMERIC(20,2) DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT NOW()
+        )
+    """)
+    
+    # Voting statistics
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS dao_vote_stats (
+            proposal_id TEXT PRIMARY KEY,
+            votes_for NUMERIC(20,2) DEFAULT 0,
+            votes_against NUMERIC(20,2) DEFAULT 0,
+            total_voters INTEGER DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT NOW(),
+            FOREIGN KEY (proposal_id) REFERENCES dao_proposals(proposal_id)
+        )
+    """)
@@ -0,0 +1,148 @@
+"""0001 – Bestandsschema des Learning-Bots (früher bei jedem Boot via init_all_schemas).
+
+Das DDL ist hier eingefroren: Schemaänderungen gehören in eine neue
+Migrationsdatei, nicht in diese Datei oder in database.py.
+"""
+
+
+def upgrade(cur):
+    # Courses
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS learning_courses (
+            id SERIAL PRIMARY KEY,
+            title VARCHAR(255) NOT NULL,
+            description TEXT,
+            level VARCHAR(50),
+            duration_minutes INTEGER,
+            category VARCHAR(100),
+            icon VARCHAR(10),
+            reward_points INTEGER DEFAULT 100,
+            total_modules INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Course Modules
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS learning_modules (
+            id SERIAL PRIMARY KEY,
+            course_id INTEGER REFERENCES learning_courses(id) ON DELETE CASCADE,
+            title VARCHAR(255),
+            order_index INTEGER,
+            content TEXT,
+            video_url VARCHAR(500),
+            duration_minutes INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # User Enrollments
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS learning_enrollments (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            course_id INTEGER REFERENCES learning_courses(id) ON DELETE CASCADE,
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_at TIMESTAMP,
+            progress_percentage INTEGER DEFAULT 0,
+            UNIQUE(user_id, course_id)
+        )
+    """)
+    
+    # Module Progress
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS learning_progress (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            module_id INTEGER REFERENCES learning_modules(id) ON DELETE CASCADE,
+            completed_at TIMESTAMP,
+            time_spent_seconds INTEGER DEFAULT 0,
+            UNIQUE(user_id, module_id)
+        )
+    """)
+    
+    # AI-Generated Quizzes
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS learning_quizzes (
+            id SERIAL PRIMARY KEY,
+            module_id INTEGER REFERENCES learning_modules(id) ON DELETE CASCADE,
+            topic VARCHAR(255) NOT NULL,
+            question TEXT NOT NULL,
+            question_type VARCHAR(20) DEFAULT 'multiple_choice',
+            options JSONB,
+            correct_answer VARCHAR(500),
+            explanation TEXT,
+            difficulty VARCHAR(20) DEFAULT 'medium',
+            points INTEGER DEFAULT 10,
+            ai_generated BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Quiz Results
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS learning_quiz_results (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            quiz_id INTEGER REFERENCES learning_quizzes(id) ON DELETE CASCADE,
+            module_id INTEGER REFERENCES learning_modules(id),
+            course_id INTEGER REFERENCES learning_courses(id),
+            answer TEXT,
+            is_correct BOOLEAN,
+            points_earned INTEGER,
+            time_taken_seconds INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Certificates
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS learning_certificates (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            course_id INTEGER REFERENCES learning_courses(id) ON DELETE CASCADE,
+            issued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            certificate_hash VARCHAR(255) UNIQUE,
+            skill_tags JSONB
+        )
+    """)
+    
+    # Rewards & Progress
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS learning_rewards (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            course_id INTEGER REFERENCES learning_courses(id),
+            reward_type VARCHAR(50),
+            points_earned INTEGER,
+            emrd_earned NUMERIC(18,8),
+            claimed_at TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Learning Streaks
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS learning_streaks (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL UNIQUE,
+            current_streak INTEGER DEFAULT 1,
+            longest_streak INTEGER DEFAULT 1,
+            last_activity_date DATE,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # User Achievements
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS learning_achievements (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            achievement_type VARCHAR(50),
+            achievement_name VARCHAR(255),
+            achievement_icon VARCHAR(10),
+            earned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(user_id, achievement_type)
+        )
+    """)
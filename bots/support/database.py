@@ -8,22 +8,24 @@
 
 import logging
 import os
+from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-import psycopg2
 from psycopg2.extras import RealDictCursor
 
+from shared import pgpool
+from shared.migrations import run_migrations
+
 logger = logging.getLogger("bot.support.db")
 
 
 def get_db_connection():
-    dsn = os.getenv("DATABASE_URL")
-    if not dsn:
+    """Gepoolte Verbindung – conn.close() gibt sie an den Pool zurück."""
+    if not os.getenv("DATABASE_URL"):
         logger.error("DATABASE_URL missing")
         return None
     try:
-        conn = psycopg2.connect(dsn)
-        return conn
+        return pgpool.connect("support")
     except Exception:
         logger.exception("DB connection failed")
         return None
@@ -31,103 +33,17 @@ def get_db_connection():
 
 # ---------------- Schema ----------------
 
-def init_all_schemas() -> None:
-    """Initialize Support database schemas (idempotent)."""
-    conn = get_db_connection()
-    if not conn:
-        logger.error("init_all_schemas: no DB connection")
-        return
-
-    cur = None
-    try:
-        cur = conn.cursor()
+MIGRATIONS_DIR = Path(__file__).with_name("migrations")
 
-        # Tenants
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tenants (
-                id SERIAL PRIMARY KEY,
-                slug TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                created_at TIMESTAMPTZ DEFAULT now()
-            );
-        """)
-
-        # Tenant ↔ Telegram chats/groups mapping
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tenant_groups (
-                tenant_id INTEGER NOT NULL REFERENCES tenants(id) ON DELETE CASCADE,
-                chat_id BIGINT UNIQUE NOT NULL,
-                title TEXT,
-                created_at TIMESTAMPTZ DEFAULT now()
-            );
-        """)
-
-        # Users
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS support_users (
-                user_id BIGINT PRIMARY KEY,
-                handle TEXT,
-                first_name TEXT,
-                last_name TEXT,
-                created_at TIMESTAMPTZ DEFAULT now(),
-                updated_at TIMESTAMPTZ DEFAULT now()
-            );
-        """)
-
-        # Tickets
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS support_tickets (
-                id SERIAL PRIMARY KEY,
-                user_id BIGINT NOT NULL REFERENCES support_users(user_id) ON DELETE CASCADE,
-                tenant_id INTEGER REFERENCES tenants(id) ON DELETE SET NULL,
-                category VARCHAR(48) DEFAULT 'allgemein',
-                subject VARCHAR(140) NOT NULL,
-                status VARCHAR(32) DEFAULT 'neu',
-                created_at TIMESTAMPTZ DEFAULT now(),
-                updated_at TIMESTAMPTZ DEFAULT now(),
-                closed_at TIMESTAMPTZ
-            );
-        """)
-
-        # Messages
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS support_messages (
-                id SERIAL PRIMARY KEY,
-                ticket_id INTEGER NOT NULL REFERENCES support_tickets(id) ON DELETE CASCADE,
-                author_user_id BIGINT NOT NULL,
-                is_public BOOLEAN DEFAULT TRUE,
-                text TEXT NOT NULL,
-                attachments JSONB,
-                created_at TIMESTAMPTZ DEFAULT now()
-            );
-        """)
-
-        # KB articles
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS kb_articles (
-                id SERIAL PRIMARY KEY,
-                title TEXT NOT NULL,
-                body TEXT NOT NULL,
-                tags TEXT[],
-                score INTEGER DEFAULT 0,
-                updated_at TIMESTAMPTZ DEFAULT now()
-            );
-        """)
-
-        # Helpful indexes
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_support_tickets_user ON support_tickets(user_id);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_support_tickets_tenant ON support_tickets(tenant_id);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_support_messages_ticket ON support_messages(ticket_id);")
 
-        conn.commit()
-        logger.info("✅ Support schemas initialized/verified")
-    except Exception:
-        logger.exception("Schema init failed")
-        conn.rollback()
-    finally:
-        if cur:
-            cur.close()
-        conn.close()
+def init_all_schemas() -> bool:
+    """Initialize Support database schemas (idempotent)."""
+    try:
+        run_migrations("support", MIGRATIONS_DIR)
+        return True
+    except Exception as e:
+        logger.error(f"Schema migration error: {e}")
+        return False
 
 
 # ---------------- Core ops ----------------
@@ -0,0 +1,84 @@
+"""0001 – Bestandsschema des Support-Bots (früher bei jedem Boot via init_all_schemas).
+
+Das DDL ist hier eingefroren: Schemaänderungen gehören in eine neue
+Migrationsdatei, nicht in diese Datei oder in database.py.
+"""
+
+
+def upgrade(cur):
+    # Tenants
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tenants (
+            id SERIAL PRIMARY KEY,
+            slug TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT now()
+        );
+    """)
+
+    # Tenant ↔ Telegram chats/groups mapping
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tenant_groups (
+            tenant_id INTEGER NOT NULL REFERENCES tenants(id) ON DELETE CASCADE,
+            chat_id BIGINT UNIQUE NOT NULL,
+            title TEXT,
+            created_at TIMESTAMPTZ DEFAULT now()
+        );
+    """)
+
+    # Users
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS support_users (
+            user_id BIGINT PRIMARY KEY,
+            handle TEXT,
+            first_name TEXT,
+            last_name TEXT,
+            created_at TIMESTAMPTZ DEFAULT now(),
+            updated_at TIMESTAMPTZ DEFAULT now()
+        );
+    """)
+
+    # Tickets
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS support_tickets (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL REFERENCES support_users(user_id) ON DELETE CASCADE,
+            tenant_id INTEGER REFERENCES tenants(id) ON DELETE SET NULL,
+            category VARCHAR(48) DEFAULT 'allgemein',
+            subject VARCHAR(140) NOT NULL,
+            status VARCHAR(32) DEFAULT 'neu',
+            created_at TIMESTAMPTZ DEFAULT now(),
+            updated_at TIMESTAMPTZ DEFAULT now(),
+            closed_at TIMESTAMPTZ
+        );
+    """)
+
+    # Messages
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS support_messages (
+            id SERIAL PRIMARY KEY,
+            ticket_id INTEGER NOT NULL REFERENCES support_tickets(id) ON DELETE CASCADE,
+            author_user_id BIGINT NOT NULL,
+            is_public BOOLEAN DEFAULT TRUE,
+            text TEXT NOT NULL,
+            attachments JSONB,
+            created_at TIMESTAMPTZ DEFAULT now()
+        );
+    """)
+
+    # KB articles
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS kb_articles (
+            id SERIAL PRIMARY KEY,
+            title TEXT NOT NULL,
+            body TEXT NOT NULL,
+            tags TEXT[],
+            score INTEGER DEFAULT 0,
+            updated_at TIMESTAMPTZ DEFAULT now()
+        );
+    """)
+
+    # Helpful indexes
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_support_tickets_user ON support_tickets(user_id);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_support_tickets_tenant ON support_tickets(tenant_id);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_support_messages_ticket ON support_messages(ticket_id);")
@@ -1,29 +1,44 @@
 # sql.py — async psycopg3 Support Bot Database Layer (v1.0)
 """
 Async database layer für Emerald Support Bot.
-Nutzt psycopg (PostgreSQL async driver) mit Connection Pooling.
+Nutzt psycopg (PostgreSQL async driver) über den gemeinsamen Pool aus shared/db.py.
 """
-import os
 import logging
-from typing import Any, Dict, List, Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-import psycopg
-from psycopg.rows import dict_row
+from shared.db import get_db, setup_aiohttp
 
 logger = logging.getLogger(__name__)
 
-async def get_conn() -> psycopg.AsyncConnection:
-    """Get async DB connection"""
-    dsn = os.getenv("DATABASE_URL")
-    if not dsn:
-        raise RuntimeError("DATABASE_URL environment variable not set")
-    return await psycopg.AsyncConnection.connect(dsn, row_factory=dict_row)
+# Sub-Pool auf dem gemeinsamen AsyncConnectionPool (shared/db.py).
+# Größe: DB_QUOTA_SUPPORT (Default 3), Timeout: DB_TIMEOUT_MS_SUPPORT.
+_db = get_db("support")
+
+
+@asynccontextmanager
+async def connection() -> AsyncIterator[Any]:
+    """Verbindung aus dem Pool (autocommit) – für Lesezugriffe / Einzel-Statements."""
+    async with _db.connection() as conn:
+        yield conn
+
+
+@asynccontextmanager
+async def transaction() -> AsyncIterator[Any]:
+    """Mehrere Statements atomar, z.B. Ticket + erste Nachricht (COMMIT/ROLLBACK automatisch)."""
+    async with _db.transaction() as conn:
+        yield conn
+
+
+def setup(app) -> None:
+    """Pool-Lebenszyklus an eine aiohttp-App hängen (on_startup/on_cleanup)."""
+    setup_aiohttp(app)
 
 # ---------- Users ----------
 async def upsert_user(user: Dict[str, Any]) -> bool:
     """Create or update user"""
     try:
-        async with await get_conn() as conn:
+        async with transaction() as conn:
             async with conn.cursor() as cur:
                 await cur.execute(
                     """
@@ -36,7 +51,6 @@ async def upsert_user(user: Dict[str, Any]) -> bool:
                     """,
                     (user["user_id"], user.get("username"), user.get("first_name"), user.get("last_name")),
                 )
-            await conn.commit()
         logger.debug(f"User {user['user_id']} upserted")
         return True
     except Exception as e:
@@ -47,7 +61,7 @@ async def upsert_user(user: Dict[str, Any]) -> bool:
 async def create_ticket(user_id: int, category: str, subject: str, body: str, tenant_id: Optional[int] = None) -> Optional[int]:
     """Create new ticket with initial message"""
     try:
-        async with await get_conn() as conn:
+        async with transaction() as conn:
             async with conn.cursor() as cur:
                 # Validate inputs
                 if not subject or not body:
@@ -75,7 +89,6 @@ async def create_ticket(user_id: int, category: str, subject: str, body: str, te
                     """,
                     (tid, user_id, body),
                 )
-            await conn.commit()
         logger.info(f"Ticket #{tid} created by user {user_id}")
         return tid
     except Exception as e:
@@ -85,7 +98,7 @@ async def create_ticket(user_id: int, category: str, subject: str, body: str, te
 async def get_my_tickets(user_id: int, limit: int = 30, tenant_id: Optional[int] = None) -> List[Dict]:
     """Fetch all tickets for user"""
     try:
-        async with await get_conn() as conn:
+        async with connection() as conn:
             async with conn.cursor() as cur:
                 if tenant_id:
                     await cur.execute(
@@ -118,7 +131,7 @@ async def get_my_tickets(user_id: int, limit: int = 30, tenant_id: Optional[int]
 async def get_ticket(user_id: int, ticket_id: int) -> Optional[Dict]:
     """Fetch ticket with messages (only if user is owner)"""
     try:
-        async with await get_conn() as conn:
+        async with connection() as conn:
             async with conn.cursor() as cur:
                 # Fetch ticket
                 await cur.execute(
@@ -155,7 +168,7 @@ async def add_public_message(user_id: int, ticket_id: int, text: str) -> bool:
         if not text or len(text) > 4000:
             raise ValueError("Invalid message text")
         
-        async with await get_conn() as conn:
+        async with transaction() as conn:
             async with conn.cursor() as cur:
                 # Check ownership
                 await cur.execute("SELECT user_id FROM support_tickets WHERE id = %s", (ticket_id,))
@@ -178,7 +191,6 @@ async def add_public_message(user_id: int, ticket_id: int, text: str) -> bool:
                     "UPDATE support_tickets SET updated_at = now() WHERE id = %s",
                     (ticket_id,),
                 )
-            await conn.commit()
         logger.info(f"Message added to ticket #{ticket_id} by user {user_id}")
         return True
     except Exception as e:
@@ -188,7 +200,7 @@ async def add_public_message(user_id: int, ticket_id: int, text: str) -> bool:
 async def close_ticket(ticket_id: int, user_id: int) -> bool:
     """Close ticket (only owner can close)"""
     try:
-        async with await get_conn() as conn:
+        async with transaction() as conn:
             async with conn.cursor() as cur:
                 # Check ownership
                 await cur.execute("SELECT user_id FROM support_tickets WHERE id = %s", (ticket_id,))
@@ -205,7 +217,6 @@ async def close_ticket(ticket_id: int, user_id: int) -> bool:
                     """,
                     (ticket_id,),
                 )
-            await conn.commit()
         logger.info(f"Ticket #{ticket_id} closed by user {user_id}")
         return True
     except Exception as e:
@@ -220,7 +231,7 @@ async def kb_search(query: str, limit: int = 8) -> List[Dict]:
             return []
         
         like = f"%{query}%"
-        async with await get_conn() as conn:
+        async with connection() as conn:
             async with conn.cursor() as cur:
                 await cur.execute(
                     """
@@ -247,7 +258,7 @@ async def save_group_settings(chat_id: int, title: Optional[str], data: dict, up
         if not chat_id or not data:
             raise ValueError("Chat ID and data required")
         
-        async with await get_conn() as conn:
+        async with transaction() as conn:
             async with conn.cursor() as cur:
                 await cur.execute(
                     """
@@ -261,7 +272,6 @@ async def save_group_settings(chat_id: int, title: Optional[str], data: dict, up
                     """,
                     (chat_id, title, data, updated_by),
                 )
-            await conn.commit()
         logger.info(f"Group settings saved for chat {chat_id}")
         return True
     except Exception as e:
@@ -271,7 +281,7 @@ async def save_group_settings(chat_id: int, title: Optional[str], data: dict, up
 async def load_group_settings(chat_id: int) -> Dict:
     """Load group settings as dict"""
     try:
-        async with await get_conn() as conn:
+        async with connection() as conn:
             async with conn.cursor() as cur:
                 await cur.execute("SELECT data FROM group_settings WHERE chat_id = %s", (chat_id,))
                 row = await cur.fetchone()
@@ -288,7 +298,7 @@ async def load_group_stats(chat_id: int, days: int = 14) -> List[Dict]:
         if days < 1 or days > 365:
             days = 14
         
-        async with await get_conn() as conn:
+        async with connection() as conn:
             async with conn.cursor() as cur:
                 await cur.execute(
                     """
@@ -310,7 +320,7 @@ async def load_group_stats(chat_id: int, days: int = 14) -> List[Dict]:
 async def resolve_tenant_id_by_chat(chat_id: int) -> Optional[int]:
     """Resolve tenant ID for chat"""
     try:
-        async with await get_conn() as conn:
+        async with connection() as conn:
             async with conn.cursor() as cur:
                 await cur.execute(
                     "SELECT tenant_id FROM tenant_groups WHERE chat_id = %s LIMIT 1",
@@ -333,7 +343,7 @@ async def ensure_tenant_for_chat(chat_id: int, title: Optional[str] = None, slug
         # 2. Create new tenant
         gen_slug = (slug or f"tg-{chat_id}").lower().replace(" ", "-")
         
-        async with await get_conn() as conn:
+        async with transaction() as conn:
             async with conn.cursor() as cur:
                 # Try to create tenant
                 await cur.execute(
@@ -365,7 +375,6 @@ async def ensure_tenant_for_chat(chat_id: int, title: Optional[str] = None, slug
                         """,
                         (tid, chat_id, title),
                     )
-            await conn.commit()
         
         logger.info(f"Tenant {tid} ensured for chat {chat_id}")
         return tid
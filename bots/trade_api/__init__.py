@@ -1 +1 @@
-from .server import register, register_jobs, register_miniapp_routes, init_schema
+from .server import register, register_jobs, register_miniapp_routes
@@ -0,0 +1,41 @@
+"""Trade API - Preis-Alerts (tradeapi_alerts) an der gemeinsamen Alert-Engine"""
+import logging
+from typing import List, Tuple
+
+from shared.alerts import Alert, AlertSource, engine, side_of
+from shared.candles import okx_inst_id
+from .db import execute, fetch
+
+logger = logging.getLogger(__name__)
+
+SOURCE = "trade_api"
+
+
+def price_key(symbol: str) -> str:
+    # BTCUSDT -> "btc" (Basis-Symbol wie im Market-Snapshot)
+    return okx_inst_id(symbol).split("-")[0].lower()
+
+
+def to_alert(row) -> Alert:
+    return Alert(SOURCE, int(row["id"]), int(row["telegram_id"]), price_key(row["symbol"]),
+                 side_of(row["comparison"]), float(row["target_price"]), (row["symbol"] or "").upper())
+
+
+async def load() -> List[Alert]:
+    rows = await fetch(
+        "select id, telegram_id, symbol, target_price, comparison from tradeapi_alerts "
+        "where is_active=true and is_triggered=false and coalesce(alert_type,'price')='price' "
+        "and symbol is not null and target_price > 0"
+    )
+    return [to_alert(r) for r in rows if side_of(r["comparison"])]
+
+
+async def mark_triggered(hits: List[Tuple[Alert, float]]) -> None:
+    await execute(
+        "update tradeapi_alerts set is_triggered=true, is_active=false, triggered_at=now() where id = any(%s)",
+        ([a.id for a, _ in hits],)
+    )
+
+
+def register(application) -> None:
+    engine.register(AlertSource(SOURCE, load, mark_triggered, bot=getattr(application, "bot", None)))
@@ -11,9 +11,12 @@ try:
     from . import handlers
     from . import miniapp
     from . import database
+    from . import scanner
+    from . import alerts as price_alerts
+    from .proof import onchain as proofs
 except ImportError as e:
     logger.error(f"Failed to import modules: {e}")
-    handlers = miniapp = database = None
+    handlers = miniapp = database = scanner = price_alerts = proofs = None
 
 
 def register(app: Application):
@@ -26,13 +29,21 @@ def register(app: Application):
         miniapp.register_miniapp(app)
         logger.info("Trade API miniapp registered")
 
+    # Preis-Alerts an der gemeinsamen Alert-Engine (Ticks aus dem DEX-Snapshot)
+    if price_alerts:
+        price_alerts.register(app)
+
 
 def register_jobs(app: Application):
     """Register background jobs"""
+    # Job: Watchlist-Signal-Scanner
+    if scanner and hasattr(scanner, "register_jobs"):
+        scanner.register_jobs(app)
+    # Job: offene Signal-Proofs zu Merkle-Batches versiegeln
+    if proofs:
+        proofs.register_jobs(app)
     # Job: Check for triggered alerts
-    # Job: Update market data
     # Job: Check portfolio health
-    pass
 
 
 def init_schema():
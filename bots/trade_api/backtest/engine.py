@@ -0,0 +1,243 @@
+"""Vektorisierter Backtester über den Candle-Store.
+
+Eine Strategie liefert für jede Kerze eine Ziel-Gewichtung ``w[t]`` (Anteil des
+Kapitals im Asset, 0..1) – komplett als Array, ohne Zeitschleife:
+
+    signal  Regel-Score aus ``xgb_signals`` je Kerze (Hysterese entry/exit),
+            Größe wie ``position_size``: risk_pct * Close / max(ATR, 0.25 % Close)
+    grid    Grid-Trading um den Startkurs (trade_dex GRID_CONFIG: levels, spread_pct)
+    dca     fester USD-Betrag alle ``interval_hours`` (trade_dex DCA_CONFIG)
+
+Ausgeführt wird zum Schlusskurs der Signalkerze, gehalten bis zur nächsten
+(kein Look-ahead: Rendite t+1 mit Gewicht t). Fills laufen über ``FillModel``:
+Constant-Product wie ``calculate_swap_amount_out`` (0.25 % Pool-Fee, Price
+Impact aus der Pool-Tiefe) plus optionale Slippage in bps.
+
+``run_grid`` rechnet ein Parameter-Gitter über einen Prozess-Pool; die Kerzen
+gehen einmal pro Worker rüber (Initializer), nicht pro Kombination.
+"""
+from __future__ import annotations
+
+import itertools
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+from shared.candles import BAR_MS
+from ..ml import indicators as ind
+from ..ml.xgb_signals import compute_features, _rule_score
+
+BACKTEST_PROCESSES = int(os.getenv("TRADEAPI_BACKTEST_PROCESSES", "0"))   # 0 = os.cpu_count()
+# unter so vielen Kerzen x Kombinationen lohnt der Prozessstart (spawn) nicht
+BACKTEST_POOL_MIN_WORK = int(os.getenv("TRADEAPI_BACKTEST_POOL_MIN_WORK", "2000000"))
+_YEAR_MS = 365 * 86_400_000
+_EPS = 1e-12
+
+
+@dataclass(frozen=True)
+class FillModel:
+    fee: float = 0.0025            # Pool-Fee (PancakeSwap 0.25 %)
+    liquidity_usd: float = 0.0     # Quote-Reserve des Pools; 0 = kein Price Impact
+    slippage_bps: float = 0.0
+
+    def cost(self, notional) -> np.ndarray:
+        """Relative Kosten eines Swaps mit ``notional`` USD (Kauf und Verkauf symmetrisch).
+
+        Constant Product: out = R_out * a / (R_in + a), a = amount * (1 - fee);
+        gegenüber dem Mid-Preis fehlen 1 - (1 - fee) / (1 + a / R_in).
+        """
+        q = np.abs(np.asarray(notional, dtype=np.float64))
+        a = q * (1.0 - self.fee)
+        impact = a / self.liquidity_usd if self.liquidity_usd > 0 else 0.0
+        return 1.0 - (1.0 - self.fee) / (1.0 + impact) + self.slippage_bps * 1e-4
+
+
+# ---------------------------------------------------------------------------
+# Strategien -> Ziel-Gewichtung je Kerze
+# ---------------------------------------------------------------------------
+
+def _ffill(x: np.ndarray, start: float = 0.0) -> np.ndarray:
+    """NaN durch den letzten gültigen Wert ersetzen (vektorisiert über Indizes)"""
+    idx = np.where(np.isnan(x), 0, np.arange(len(x)))
+    np.maximum.accumulate(idx, out=idx)
+    out = x[idx]
+    return np.where(np.isnan(out), start, out)
+
+
+def signal_scores(ohlcv: np.ndarray) -> np.ndarray:
+    """Regel-Score je Kerze (dieselbe Formel wie ``score_signal`` für die letzte)"""
+    return _rule_score(compute_features(ohlcv)).astype(np.float64)
+
+
+def weights_signal(ohlcv: np.ndarray, entry: float = 0.15, exit: float = -0.15,
+                   risk_pct: float = 0.01, atr_period: int = 14, max_weight: float = 1.0,
+                   scores: Optional[np.ndarray] = None) -> np.ndarray:
+    scores = signal_scores(ohlcv) if scores is None else scores
+    # Long ab score > entry, flat ab score < exit, dazwischen Zustand halten
+    state = np.where(scores > entry, 1.0, np.where(scores < exit, 0.0, np.nan))
+    long = _ffill(state)
+    c = ohlcv[:, ind.C]
+    tr = ind.true_range(ohlcv[:, ind.H], ohlcv[:, ind.L], c)
+    atr_v = np.concatenate([[np.nan], ind.sma(tr, atr_period)])
+    stop = np.maximum(np.nan_to_num(atr_v, nan=0.0), c * 0.0025)
+    size = np.minimum(risk_pct * c / np.maximum(stop, _EPS), max_weight)
+    # Größe beim Einstieg festhalten, bis zum Ausstieg nicht nachjustieren
+    entries = (long > 0) & (np.concatenate([[0.0], long[:-1]]) == 0)
+    return long * _ffill(np.where(entries, size, np.nan))
+
+
+def weights_grid(ohlcv: np.ndarray, levels: int = 10, spread_pct: float = 2.0,
+                 center: Optional[float] = None) -> np.ndarray:
+    # je Level unter dem Startkurs ein weiterer 1/levels-Anteil, über der Mitte entsprechend weniger
+    c = ohlcv[:, ind.C]
+    mid = float(center or c[0])
+    step = mid * spread_pct / 100.0
+    filled = np.ceil((mid + levels * step / 2.0 - c) / max(step, _EPS))
+    return np.clip(filled, 0, levels) / levels
+
+
+def dca_buys(ohlcv: np.ndarray, bar: str, amount: float = 100.0, interval_hours: float = 24.0,
+             capital: float = 10_000.0) -> np.ndarray:
+    """USD-Käufe je Kerze (alle ``interval_hours``, solange Kapital da ist)"""
+    n = len(ohlcv)
+    every = max(1, int(round(interval_hours * 3_600_000 / BAR_MS.get(bar, 3_600_000))))
+    buys = np.zeros(n)
+    buys[::every] = amount
+    spent = np.cumsum(buys)
+    buys[spent > capital + _EPS] = 0.0
+    return buys
+
+
+# ---------------------------------------------------------------------------
+# Simulation + Kennzahlen
+# ---------------------------------------------------------------------------
+
+def simulate_weights(ohlcv: np.ndarray, w: np.ndarray, fill: FillModel = FillModel(),
+                     capital: float = 10_000.0) -> Dict[str, np.ndarray]:
+    """Gewichtungspfad -> Equity-Kurve.
+
+    Kosten je Umschichtung: ``|Δw| * cost(|Δw| * capital)`` als Anteil der
+    Equity – Price Impact wird auf Basis des Startkapitals geschätzt, damit
+    alles vektorisiert bleibt.
+    """
+    c = ohlcv[:, ind.C]
+    ret = np.zeros_like(c)
+    ret[1:] = c[1:] / np.maximum(c[:-1], _EPS) - 1.0
+    turn = np.abs(np.diff(w, prepend=0.0))
+    costs = turn * fill.cost(turn * capital)
+    growth = (1.0 + np.concatenate([[0.0], w[:-1]]) * ret) * (1.0 - costs)
+    equity = capital * np.cumprod(np.maximum(growth, 0.0))
+    return {"equity": equity, "weights": w, "turnover": turn, "costs": costs}
+
+
+def simulate_dca(ohlcv: np.ndarray, buys: np.ndarray, fill: FillModel = FillModel(),
+                 capital: float = 10_000.0) -> Dict[str, np.ndarray]:
+    c = ohlcv[:, ind.C]
+    units = np.cumsum(buys * (1.0 - fill.cost(buys)) / np.maximum(c, _EPS))
+    spent = np.cumsum(buys)
+    equity = capital - spent + units * c
+    w = np.where(equity > 0, units * c / np.maximum(equity, _EPS), 0.0)
+    turn = np.where(equity > 0, buys / np.maximum(equity, _EPS), 0.0)
+    costs = np.where(equity > 0, buys * fill.cost(buys) / np.maximum(equity, _EPS), 0.0)
+    return {"equity": equity, "weights": w, "turnover": turn, "costs": costs}
+
+
+def metrics(sim: Mapping[str, np.ndarray], bar: str, capital: float = 10_000.0) -> Dict:
+    eq = sim["equity"]
+    if len(eq) < 2:
+        return {"pnl": 0.0, "total_return": 0.0, "max_drawdown": 0.0, "sharpe": 0.0, "trades": 0}
+    r = eq[1:] / np.maximum(eq[:-1], _EPS) - 1.0
+    per_year = _YEAR_MS / BAR_MS.get(bar, 3_600_000)
+    sd = r.std()
+    dd = eq / np.maximum.accumulate(eq) - 1.0
+    return {
+        "pnl": float(eq[-1] - capital),
+        "total_return": float(eq[-1] / capital - 1.0),
+        "max_drawdown": float(-dd.min()),
+        "sharpe": float(r.mean() / sd * np.sqrt(per_year)) if sd > 0 else 0.0,
+        "trades": int(np.count_nonzero(sim["turnover"] > 1e-9)),
+        "costs": float(sim["costs"].sum()),       # Summe der Kostenanteile je Trade
+        "exposure": float(np.mean(sim["weights"] > 1e-9)),
+    }
+
+
+def run(ohlcv: np.ndarray, strategy: str = "signal", params: Optional[Mapping] = None, bar: str = "1H",
+        fill: FillModel = FillModel(), capital: float = 10_000.0, curve: bool = False) -> Dict:
+    """Eine Strategie über ``(N, 5)``-Kerzen rechnen; ``curve`` hängt die Equity-Kurve an"""
+    ohlcv = np.asarray(ohlcv, dtype=np.float64)
+    p = dict(params or {})
+    if strategy == "signal":
+        sim = simulate_weights(ohlcv, weights_signal(ohlcv, **p), fill, capital)
+    elif strategy == "grid":
+        sim = simulate_weights(ohlcv, weights_grid(ohlcv, **p), fill, capital)
+    elif strategy == "dca":
+        sim = simulate_dca(ohlcv, dca_buys(ohlcv, bar, capital=capital, **p), fill, capital)
+    else:
+        raise ValueError(f"unknown strategy: {strategy}")
+    out = {"strategy": strategy, "params": p, "bars": len(ohlcv), **metrics(sim, bar, capital)}
+    if curve:
+        out["equity"] = sim["equity"].round(2).tolist()
+    return out
+
+# ---------------------------------------------------------------------------
+# Parameter-Gitter über Prozesse
+# ---------------------------------------------------------------------------
+
+_worker_ohlcv: Optional[np.ndarray] = None
+_worker_scores: Optional[np.ndarray] = None
+
+
+def _init_worker(ohlcv: np.ndarray) -> None:
+    global _worker_ohlcv, _worker_scores
+    _worker_ohlcv, _worker_scores = ohlcv, None
+
+
+def _run_one(job) -> Dict:
+    global _worker_scores
+    strategy, params, bar, fill, capital = job
+    if strategy == "signal" and "scores" not in params:
+        # Features/Scores hängen nicht von den Gitter-Parametern ab: einmal je Worker
+        if _worker_scores is None:
+            _worker_scores = signal_scores(_worker_ohlcv)
+        res = run(_worker_ohlcv, strategy, {**params, "scores": _worker_scores}, bar, fill, capital)
+        res["params"].pop("scores", None)
+        return res
+    return run(_worker_ohlcv, strategy, params, bar, fill, capital)
+
+
+def expand(grid: Mapping[str, Iterable]) -> List[Dict]:
+    keys = list(grid)
+    return [dict(zip(keys, vals)) for vals in itertools.product(*(list(grid[k]) for k in keys))]
+
+
+def run_grid(ohlcv: np.ndarray, strategy: str, grid: Mapping[str, Iterable], bar: str = "1H",
+             fill: FillModel = FillModel(), capital: float = 10_000.0, processes: Optional[int] = None,
+             sort_by: str = "sharpe") -> List[Dict]:
+    """Alle Kombinationen aus ``grid`` rechnen, bestes ``sort_by`` zuerst.
+
+    ``processes``: None = BACKTEST_PROCESSES bzw. cpu_count (kleine Gitter im
+    aktuellen Prozess), 1 = immer im aktuellen Prozess.
+    """
+    ohlcv = np.ascontiguousarray(ohlcv, dtype=np.float64)
+    jobs = [(strategy, p, bar, fill, capital) for p in expand(grid)]
+    if processes is None and len(jobs) * len(ohlcv) < BACKTEST_POOL_MIN_WORK:
+        processes = 1
+    n = processes or BACKTEST_PROCESSES or os.cpu_count() or 1
+    n = max(1, min(n, len(jobs)))
+    if n == 1:
+        _init_worker(ohlcv)
+        results = [_run_one(j) for j in jobs]
+    else:
+        # spawn: läuft auch aus dem Thread des Webservers sicher (kein fork mit offenen Locks)
+        with ProcessPoolExecutor(max_workers=n, mp_context=mp.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(ohlcv,)) as pool:
+            results = list(pool.map(_run_one, jobs, chunksize=max(1, len(jobs) // (n * 4))))
+    return sorted(results, key=lambda r: r.get(sort_by, 0.0), reverse=sort_by != "max_drawdown")
+
+
+def fill_from(body: Mapping) -> FillModel:
+    return FillModel(**{k: float(body[k]) for k in asdict(FillModel()) if body.get(k) is not None})
@@ -15,3 +15,27 @@ ALLOWED_PROVIDERS = [
     {"id": "coinbase", "name": "Coinbase"},
     {"id": "mexc",     "name": "MEXC"},
 ]
+
+# Watchlist-Scanner (scanner.py)
+SCANNER_INTERVAL_SECONDS = int(os.getenv("TRADEAPI_SCANNER_INTERVAL", "300"))
+SCANNER_BAR = os.getenv("TRADEAPI_SCANNER_BAR", "1H")
+SCANNER_LOOKBACK = int(os.getenv("TRADEAPI_SCANNER_LOOKBACK", "200"))
+SCANNER_MIN_BARS = int(os.getenv("TRADEAPI_SCANNER_MIN_BARS", "50"))
+SCANNER_BALANCE_USD = float(os.getenv("TRADEAPI_SCANNER_BALANCE_USD", "1000"))
+SCANNER_DEFAULT_SYMBOLS = [s.strip().upper() for s in os.getenv("TRADEAPI_SCANNER_SYMBOLS", "").split(",") if s.strip()]
+SCANNER_NOTIFY_CONCURRENCY = int(os.getenv("TRADEAPI_SCANNER_NOTIFY_CONCURRENCY", "10"))
+
+# Entschlüsselte Credentials/Provider-Objekte (credentials.py) – nur im Speicher
+CREDENTIAL_CACHE_TTL_SECONDS = float(os.getenv("TRADEAPI_CREDENTIAL_CACHE_TTL", "120"))
+CREDENTIAL_CACHE_MAX = int(os.getenv("TRADEAPI_CREDENTIAL_CACHE_MAX", "1024"))
+
+# Portfolio-Bewertung im Speicher (valuation.py)
+VALUATION_FLUSH_SECONDS = float(os.getenv("TRADEAPI_VALUATION_FLUSH_SECONDS", "60"))
+VALUATION_MAX_USERS = int(os.getenv("TRADEAPI_VALUATION_MAX_USERS", "5000"))
+
+# Backtests über die MiniApp (backtest/engine.py)
+BACKTEST_MAX_GRID = int(os.getenv("TRADEAPI_BACKTEST_MAX_GRID", "64"))
+
+# Signal-Proofs: Merkle-Batch je Intervall (proof/onchain.py)
+PROOF_BATCH_SECONDS = int(os.getenv("TRADEAPI_PROOF_BATCH_SECONDS", "300"))
+PROOF_BATCH_MAX = int(os.getenv("TRADEAPI_PROOF_BATCH_MAX", "4096"))
@@ -0,0 +1,107 @@
+"""Trade API - kurzlebiger Cache für entschlüsselte Credentials + Provider-Objekte
+
+keys_verify / keys_ping brauchen sonst pro Aufruf: DB-Roundtrip auf
+tradeapi_keys, decrypt_blob (SecretBox) und ein neues Provider-Objekt.
+Hier liegt je (telegram_id, provider) das fertige Provider-Objekt für
+CREDENTIAL_CACHE_TTL_SECONDS im Speicher (nie in DB/Redis/Logs).
+
+- keys_upsert / keys_delete invalidieren explizit (``invalidate``)
+- beim Verdrängen/Ablauf wird nur die Referenz des Caches gelöscht. Bereits
+  herausgegebene Objekte werden nicht angefasst – ein laufendes
+  ``await p.balances()`` braucht seine Credentials bis zum Ende; danach gibt
+  der GC sie frei (Python-Strings lassen sich ohnehin nicht in-place nullen)
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Type
+
+from shared.cache import SingleFlight
+
+from .config import CREDENTIAL_CACHE_MAX, CREDENTIAL_CACHE_TTL_SECONDS, SECRET_KEY
+from .crypto_utils import decrypt_blob
+from .db import fetchrow
+from .providers.base import ProviderBase, ProviderCredentials
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[int, str]
+
+
+class CredentialCache:
+    def __init__(self, provider_map: Dict[str, Type[ProviderBase]],
+                 ttl: float = CREDENTIAL_CACHE_TTL_SECONDS, maxsize: int = CREDENTIAL_CACHE_MAX):
+        self.provider_map = provider_map
+        self.ttl = ttl
+        self.maxsize = maxsize
+        # Einfügereihenfolge = Ablaufreihenfolge (gleiche TTL für alle)
+        self._data: "OrderedDict[Key, Tuple[float, ProviderBase]]" = OrderedDict()
+        self._inflight = SingleFlight()
+        self._gen: Dict[int, int] = {}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    async def get(self, telegram_id: int, provider: str) -> Optional[ProviderBase]:
+        """Provider-Objekt mit entschlüsselten Credentials; None, wenn keine Keys hinterlegt sind"""
+        self._purge()
+        key = (telegram_id, provider)
+        item = self._data.get(key)
+        if item is not None:
+            self._stats["hits"] += 1
+            return item[1]
+        if key not in self._inflight:
+            self._stats["misses"] += 1
+        return await self._inflight.do(key, lambda: self._load(key))
+
+    async def _load(self, key: Key) -> Optional[ProviderBase]:
+        telegram_id, provider = key
+        gen = self._gen.get(telegram_id, 0)
+        obj = await self._build(telegram_id, provider)
+        # während des Aufbaus invalidiert (Keys geändert)? Dann nicht cachen
+        if obj is not None and self._gen.get(telegram_id, 0) == gen:
+            self._put(key, obj)
+        return obj
+
+    async def _build(self, telegram_id: int, provider: str) -> Optional[ProviderBase]:
+        Prov = self.provider_map.get(provider)
+        if not Prov:
+            return None
+        row = await fetchrow(
+            "select api_fields_enc from tradeapi_keys where telegram_id=%s and provider=%s order by updated_at desc limit 1",
+            (telegram_id, provider))
+        if not row:
+            return None
+        fields = decrypt_blob(SECRET_KEY, row["api_fields_enc"])
+        creds = ProviderCredentials(fields.get("api_key"), fields.get("api_secret"),
+                                    fields.get("passphrase") or None, fields.get("extras") or {})
+        fields.clear()
+        return Prov(creds)
+
+    def _put(self, key: Key, obj: ProviderBase) -> None:
+        self._data.pop(key, None)
+        self._data[key] = (time.monotonic() + self.ttl, obj)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._stats["evictions"] += 1
+        # auch ohne weitere Requests nach Ablauf aufräumen
+        asyncio.get_running_loop().call_later(self.ttl + 0.1, self._purge)
+
+    def _purge(self) -> None:
+        now = time.monotonic()
+        while self._data:
+            key, (expires, _) = next(iter(self._data.items()))
+            if expires > now:
+                break
+            del self._data[key]
+            self._stats["evictions"] += 1
+
+    def invalidate(self, telegram_id: int, provider: Optional[str] = None) -> None:
+        """Nach keys_upsert / keys_delete: Einträge des Users (ggf. nur eines Providers) verwerfen"""
+        for key in [k for k in self._data if k[0] == telegram_id and (provider is None or k[1] == provider)]:
+            del self._data[key]
+            self._stats["invalidations"] += 1
+        # laufende Aufbauten dieses Users nicht mehr cachen
+        self._gen[telegram_id] = self._gen.get(telegram_id, 0) + 1
+
+    def stats(self) -> Dict:
+        return {"size": len(self._data), **self._stats}
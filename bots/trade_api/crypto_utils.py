@@ -1,20 +1,27 @@
 import base64, json, hashlib
+from functools import lru_cache
 from nacl.secret import SecretBox
 from nacl import utils
 
 def derive_key(secret: str) -> bytes:
     return hashlib.sha256(secret.encode()).digest()
 
+@lru_cache(maxsize=4)
+def _box(secret_key: str) -> SecretBox:
+    # Schlüsselableitung nur einmal je SECRET_KEY statt bei jedem encrypt/decrypt
+    return SecretBox(derive_key(secret_key))
+
 def encrypt_blob(secret_key: str, data: dict) -> str:
-    key = derive_key(secret_key)
-    box = SecretBox(key)
+    box = _box(secret_key)
     nonce = utils.random(SecretBox.NONCE_SIZE)
     ct = box.encrypt(json.dumps(data).encode(), nonce)
     return base64.b64encode(ct).decode()
 
 def decrypt_blob(secret_key: str, b64cipher: str) -> dict:
-    key = derive_key(secret_key)
-    box = SecretBox(key)
+    box = _box(secret_key)
     raw = base64.b64decode(b64cipher)
-    pt = box.decrypt(raw)
-    return json.loads(pt.decode())
+    pt = bytearray(box.decrypt(raw))
+    try:
+        return json.loads(pt.decode())
+    finally:
+        pt[:] = bytes(len(pt))  # Klartext-Puffer überschreiben
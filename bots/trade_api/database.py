@@ -1,210 +1,36 @@
 """Trade API Bot - Database Operations with User Management"""
 
-import psycopg2
 from psycopg2.extras import RealDictCursor
 import logging
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict
+from pathlib import Path
+
+from shared import pgpool
+from shared.migrations import run_migrations
 
 logger = logging.getLogger(__name__)
 
 def get_db_connection():
-    """Get database connection"""
+    """Get pooled database connection (conn.close() gibt sie an den Pool zurück)"""
     try:
-        import os
-        conn = psycopg2.connect(os.getenv("DATABASE_URL"))
-        return conn
+        return pgpool.connect("trade_api")
     except Exception as e:
         logger.error(f"Database connection error: {e}")
         return None
 
 
+MIGRATIONS_DIR = Path(__file__).with_name("migrations")
+
+
 def init_all_schemas():
     """Initialize all Trade API database schemas"""
-    conn = get_db_connection()
-    if not conn:
-        logger.error("Cannot initialize schemas: No database connection")
-        return
-    
     try:
-        cur = conn.cursor()
-        
-        # ===== USER SETTINGS =====
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradeapi_user_settings (
-                telegram_id BIGINT PRIMARY KEY,
-                theme VARCHAR(20) DEFAULT 'dark',
-                notifications_enabled BOOLEAN DEFAULT TRUE,
-                alert_threshold_usd NUMERIC(18,2) DEFAULT 100.00,
-                preferred_currency VARCHAR(10) DEFAULT 'USD',
-                language VARCHAR(10) DEFAULT 'de',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # ===== API KEYS (encrypted) =====
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradeapi_keys (
-                id BIGSERIAL PRIMARY KEY,
-                telegram_id BIGINT NOT NULL,
-                provider VARCHAR(50) NOT NULL,
-                label VARCHAR(255),
-                api_fields_enc TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            )
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS tradeapi_keys_tid_idx ON tradeapi_keys(telegram_id)")
-        cur.execute("""CREATE UNIQUE INDEX IF NOT EXISTS idx_tradeapi_keys_unique ON tradeapi_keys(telegram_id, provider, COALESCE(label, ''))""")
-        
-        # ===== PORTFOLIOS =====
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradeapi_portfolios (
-                id BIGSERIAL PRIMARY KEY,
-                telegram_id BIGINT NOT NULL,
-                name VARCHAR(255) NOT NULL,
-                description TEXT,
-                total_value NUMERIC(18,8) DEFAULT 0,
-                cash NUMERIC(18,8) DEFAULT 0,
-                risk_level VARCHAR(20) DEFAULT 'medium',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(telegram_id, name)
-            )
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS tradeapi_portfolios_tid_idx ON tradeapi_portfolios(telegram_id)")
-        
-        # ===== PORTFOLIO POSITIONS =====
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradeapi_positions (
-                id BIGSERIAL PRIMARY KEY,
-                portfolio_id BIGINT NOT NULL REFERENCES tradeapi_portfolios(id) ON DELETE CASCADE,
-                asset_symbol VARCHAR(50),
-                quantity NUMERIC(18,8),
-                entry_price NUMERIC(18,8),
-                current_price NUMERIC(18,8),
-                cost_basis NUMERIC(18,8),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS tradeapi_positions_pid_idx ON tradeapi_positions(portfolio_id)")
-        
-        # ===== TRADING SIGNALS =====
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradeapi_signals (
-                id BIGSERIAL PRIMARY KEY,
-                telegram_id BIGINT NOT NULL,
-                symbol VARCHAR(50),
-                signal_type VARCHAR(20),
-                confidence NUMERIC(3,2),
-                strength NUMERIC(3,2),
-                atr_value NUMERIC(18,8),
-                entry_price NUMERIC(18,8),
-                stop_loss NUMERIC(18,8),
-                take_profit NUMERIC(18,8),
-                position_size NUMERIC(18,8),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS tradeapi_signals_tid_idx ON tradeapi_signals(telegram_id)")
-        
-        # ===== TRADING ALERTS =====
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradeapi_alerts (
-                id BIGSERIAL PRIMARY KEY,
-                telegram_id BIGINT NOT NULL,
-                symbol VARCHAR(50),
-                alert_type VARCHAR(20),
-                target_price NUMERIC(18,8),
-                comparison VARCHAR(20),
-                is_active BOOLEAN DEFAULT TRUE,
-                is_triggered BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                triggered_at TIMESTAMP
-            )
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS tradeapi_alerts_tid_idx ON tradeapi_alerts(telegram_id)")
-        cur.execute("CREATE INDEX IF NOT EXISTS tradeapi_alerts_active_idx ON tradeapi_alerts(is_active) WHERE is_active = TRUE")
-        
-        # ===== TRADING HISTORY =====
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradeapi_trades (
-                id BIGSERIAL PRIMARY KEY,
-                telegram_id BIGINT NOT NULL,
-                portfolio_id BIGINT REFERENCES tradeapi_portfolios(id),
-                symbol VARCHAR(50),
-                side VARCHAR(10),
-                quantity NUMERIC(18,8),
-                entry_price NUMERIC(18,8),
-                exit_price NUMERIC(18,8),
-                commission NUMERIC(18,8),
-                pnl NUMERIC(18,8),
-                pnl_percent NUMERIC(5,2),
-                status VARCHAR(20),
-                opened_at TIMESTAMP,
-                closed_at TIMESTAMP,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS tradeapi_trades_tid_idx ON tradeapi_trades(telegram_id)")
-        
-        # ===== SENTIMENT CACHE =====
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradeapi_sentiment (
-                id BIGSERIAL PRIMARY KEY,
-                text TEXT,
-                sentiment VARCHAR(20),
-                positive NUMERIC(3,2),
-                neutral NUMERIC(3,2),
-                negative NUMERIC(3,2),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS tradeapi_sentiment_created_idx ON tradeapi_sentiment(created_at)")
-        
-        # ===== MARKET DATA CACHE =====
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradeapi_market_cache (
-                id BIGSERIAL PRIMARY KEY,
-                symbol VARCHAR(50),
-                provider VARCHAR(50),
-                price NUMERIC(18,8),
-                volume NUMERIC(18,8),
-                change_24h NUMERIC(5,2),
-                high_24h NUMERIC(18,8),
-                low_24h NUMERIC(18,8),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(symbol, provider)
-            )
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS tradeapi_market_symbol_idx ON tradeapi_market_cache(symbol)")
-        
-        # ===== PROOFS (ON-CHAIN) =====
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradeapi_proofs (
-                id BIGSERIAL PRIMARY KEY,
-                telegram_id BIGINT NOT NULL,
-                provider VARCHAR(50),
-                symbol VARCHAR(50),
-                proof_data JSONB,
-                proof_hash VARCHAR(255),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS tradeapi_proofs_tid_idx ON tradeapi_proofs(telegram_id)")
-        
-        conn.commit()
-        logger.info("Trade API schemas initialized successfully")
-        
+        run_migrations("trade_api", MIGRATIONS_DIR)
+        return True
     except Exception as e:
-        logger.error(f"Error initializing schemas: {e}")
-        conn.rollback()
-    finally:
-        cur.close()
-        conn.close()
+        logger.error(f"Schema migration error: {e}")
+        return False
 
 
 # ===== USER SETTINGS FUNCTIONS =====
@@ -1,24 +1,17 @@
-from psycopg_pool import ConnectionPool
-import os
+from shared.db import get_db
 
-DB_URL = os.getenv("DATABASE_URL")
-pool = ConnectionPool(DB_URL, min_size=1, max_size=5, kwargs={"autocommit": True})
+# Sub-Pool "trade_api" auf dem gemeinsamen async Pool (shared/db.py)
+_db = get_db("trade_api")
 
-def execute(sql: str, params: tuple = ()):
-    with pool.connection() as con, con.cursor() as cur:
-        cur.execute(sql, params)
+async def execute(sql: str, params: tuple = ()):
+    await _db.execute(sql, params)
 
-def fetch(sql: str, params: tuple = ()):
-    with pool.connection() as con, con.cursor() as cur:
-        cur.execute(sql, params)
-        cols = [c.name for c in cur.description] if cur.description else []
-        rows = cur.fetchall() if cur.description else []
-        return [dict(zip(cols, r)) for r in rows]
+async def fetch(sql: str, params: tuple = ()):
+    return await _db.fetch(sql, params)
 
-def fetchrow(sql: str, params: tuple = ()):
-    with pool.connection() as con, con.cursor() as cur:
-        cur.execute(sql, params)
-        row = cur.fetchone()
-        if not row: return None
-        cols = [c.name for c in cur.description]
-        return dict(zip(cols, row))
+async def fetchrow(sql: str, params: tuple = ()):
+    return await _db.fetchrow(sql, params)
+
+def transaction():
+    # mehrere Statements atomar: async with transaction() as conn: await conn.execute(...)
+    return _db.transaction()
@@ -0,0 +1,52 @@
+"""0002 – Signal-Proofs mit Merkle-Batches (bisher bei jedem Boot via proof.onchain.ensure_table).
+
+Nicht-atomar: die Indizes entstehen mit CREATE INDEX CONCURRENTLY, damit
+laufende Inserts in tradeapi_signal_proofs nicht blockieren. Alle Schritte
+sind wiederholbar; ein abgebrochener CONCURRENTLY-Build hinterlässt einen
+ungültigen Index, der beim nächsten Lauf neu gebaut wird.
+"""
+
+ATOMIC = False
+
+
+def _create_index(cur, name: str, definition: str) -> None:
+    cur.execute(
+        "select i.indisvalid from pg_class c join pg_index i on i.indexrelid = c.oid where c.relname = %s",
+        (name,),
+    )
+    row = cur.fetchone()
+    if row and row[0]:
+        return
+    if row:
+        cur.execute(f"drop index concurrently if exists {name}")
+    cur.execute(f"create index concurrently {name} {definition}")
+
+
+def upgrade(cur):
+    cur.execute("""
+        create table if not exists tradeapi_signal_proofs (
+          id bigserial primary key,
+          telegram_id bigint not null,
+          provider text not null,
+          symbol text not null,
+          signal_json jsonb not null,
+          signal_hash text not null,
+          created_at timestamptz not null default now()
+        )
+    """)
+    cur.execute("""
+        create table if not exists tradeapi_proof_batches (
+          id bigserial primary key,
+          merkle_root text not null,
+          leaf_count integer not null,
+          anchor_tx text,
+          anchored_at timestamptz,
+          created_at timestamptz not null default now()
+        )
+    """)
+    cur.execute("alter table tradeapi_signal_proofs add column if not exists batch_id bigint references tradeapi_proof_batches(id)")
+    cur.execute("alter table tradeapi_signal_proofs add column if not exists leaf_index integer")
+    cur.execute("alter table tradeapi_signal_proofs add column if not exists merkle_path text[]")
+    _create_index(cur, "tradeapi_signal_proofs_tid_idx", "on tradeapi_signal_proofs(telegram_id)")
+    _create_index(cur, "tradeapi_signal_proofs_open_idx", "on tradeapi_signal_proofs(id) where batch_id is null")
+    _create_index(cur, "tradeapi_signal_proofs_hash_idx", "on tradeapi_signal_proofs(signal_hash)")
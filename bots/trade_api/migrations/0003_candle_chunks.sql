@@ -0,0 +1,14 @@
+-- 0003 – Kerzen-Blöcke des gemeinsamen OHLCV-Speichers (shared/candles.py),
+-- bisher beim ersten Zugriff per CREATE TABLE IF NOT EXISTS angelegt.
+-- Liegt hier, weil trade_api beim Boot vor trade_dex migriert; beide lesen dieselbe Tabelle.
+create table if not exists market_candle_chunks (
+  symbol text not null,
+  bar text not null,
+  chunk_start bigint not null,
+  n_bars integer not null,
+  first_ts bigint not null,
+  last_ts bigint not null,
+  data bytea not null,
+  updated_at timestamptz not null default now(),
+  primary key (symbol, bar, chunk_start)
+);
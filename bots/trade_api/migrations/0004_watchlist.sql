@@ -0,0 +1,20 @@
+-- 0004 – Watchlist und letzter Signalzustand je Serie für den Scanner-Job (scanner.py)
+create table if not exists tradeapi_watchlist (
+  telegram_id bigint not null,
+  symbol text not null,
+  bar text not null default '1H',
+  notify boolean not null default true,
+  created_at timestamptz not null default now(),
+  primary key (telegram_id, symbol, bar)
+);
+create index if not exists tradeapi_watchlist_symbol_idx on tradeapi_watchlist(symbol, bar);
+
+create table if not exists tradeapi_signal_state (
+  symbol text not null,
+  bar text not null,
+  signal text not null,
+  score numeric(6,4),
+  changed_at timestamptz not null default now(),
+  scanned_at timestamptz not null default now(),
+  primary key (symbol, bar)
+);
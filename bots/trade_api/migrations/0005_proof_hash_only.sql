@@ -0,0 +1,3 @@
+-- 0005 – Signal-Proofs speichern nur noch den Hash; signal_json ist optional
+-- (Altbestand bleibt lesbar und kann per "update ... set signal_json = null" geleert werden)
+alter table tradeapi_signal_proofs alter column signal_json drop not null;
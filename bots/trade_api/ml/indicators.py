@@ -0,0 +1,190 @@
+"""Vektorisierte Indikatoren (nur NumPy).
+
+Alle Funktionen arbeiten entlang der letzten Achse (Zeit) und akzeptieren
+beliebige führende Achsen – ein Symbol ``(N,)`` genauso wie viele Symbole
+``(S, N)`` auf einmal. OHLCV-Matrizen haben die Form ``(N, 5)`` bzw.
+``(S, N, 5)`` mit den Spalten O, H, L, C, V.
+
+- Rolling-Fenster über kumulierte Summen (O(N) unabhängig von der Fensterlänge)
+- EMA blockweise als Matrixprodukt mit Übertrag zwischen den Blöcken, damit
+  die Zeitschleife nur N/256 statt N Python-Iterationen hat
+- Warm-up-Bereiche sind NaN (wie pandas ``rolling``)
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+O, H, L, C, V = range(5)
+_EMA_BLOCK = 256
+_EPS = 1e-12
+
+
+def _f64(x) -> np.ndarray:
+    return np.asarray(x, dtype=np.float64)
+
+
+# ---------------------------------------------------------------------------
+# Rolling-Bausteine
+# ---------------------------------------------------------------------------
+
+def rolling_sum(x, window: int) -> np.ndarray:
+    x = _f64(x)
+    n = x.shape[-1]
+    out = np.full(x.shape, np.nan)
+    if window < 1 or window > n:
+        return out
+    c = np.cumsum(x, axis=-1)
+    out[..., window - 1] = c[..., window - 1]
+    out[..., window:] = c[..., window:] - c[..., :-window]
+    return out
+
+
+def sma(x, window: int) -> np.ndarray:
+    return rolling_sum(x, window) / window
+
+
+def rolling_std(x, window: int, ddof: int = 0) -> np.ndarray:
+    """Rollende Standardabweichung aus Summe und Quadratsumme.
+
+    Vorher wird pro Serie der Mittelwert abgezogen – das hält die Auslöschung
+    bei großen Preisniveaus klein.
+    """
+    x = _f64(x)
+    xc = x - np.nanmean(x, axis=-1, keepdims=True) if x.shape[-1] else x
+    s1 = rolling_sum(xc, window)
+    s2 = rolling_sum(xc * xc, window)
+    var = (s2 - s1 * s1 / window) / max(window - ddof, 1)
+    return np.sqrt(np.maximum(var, 0.0))
+
+
+def zscore(x, window: int) -> np.ndarray:
+    x = _f64(x)
+    return (x - sma(x, window)) / (rolling_std(x, window) + _EPS)
+
+
+def ema(x, span: Optional[float] = None, alpha: Optional[float] = None) -> np.ndarray:
+    """Exponentieller Durchschnitt (wie pandas ``ewm(adjust=False)``, Start = erster Wert)."""
+    x = _f64(x)
+    a = float(alpha) if alpha is not None else 2.0 / (float(span) + 1.0)
+    d = 1.0 - a
+    n = x.shape[-1]
+    out = np.empty(x.shape)
+    if n == 0:
+        return out
+
+    b = min(_EMA_BLOCK, n)
+    k = np.arange(b)
+    lag = k[:, None] - k[None, :]
+    # W[i, j] = a * d^(i-j) für j <= i  -> y_i = sum_j W[i, j] * x_j + d^(i+1) * y_prev
+    w = np.where(lag >= 0, a * d ** np.maximum(lag, 0), 0.0)
+    carry = d ** (k + 1)
+
+    prev = x[..., 0].copy()
+    for s in range(0, n, b):
+        blk = x[..., s:s + b]
+        m = blk.shape[-1]
+        y = blk @ w[:m, :m].T + prev[..., None] * carry[:m]
+        out[..., s:s + m] = y
+        prev = y[..., -1]
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Indikatoren
+# ---------------------------------------------------------------------------
+
+def returns(close) -> np.ndarray:
+    close = _f64(close)
+    prev = np.concatenate([close[..., :1], close[..., :-1]], axis=-1)
+    return (close - prev) / np.maximum(prev, _EPS)
+
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    """RSI mit Wilder-Glättung (EMA mit alpha = 1/period)."""
+    close = _f64(close)
+    delta = np.diff(close, axis=-1, prepend=close[..., :1])
+    gain = ema(np.maximum(delta, 0.0), alpha=1.0 / period)
+    loss = ema(np.maximum(-delta, 0.0), alpha=1.0 / period)
+    out = 100.0 - 100.0 / (1.0 + gain / (loss + _EPS))
+    out[..., :period] = np.nan
+    return out
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD-Linie, Signal-Linie, Histogramm."""
+    line = ema(close, fast) - ema(close, slow)
+    sig = ema(line, signal)
+    return line, sig, line - sig
+
+
+def bollinger(close, window: int = 20, k: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Mittelband, oberes, unteres Band und %B."""
+    close = _f64(close)
+    mid = sma(close, window)
+    sd = rolling_std(close, window)
+    upper, lower = mid + k * sd, mid - k * sd
+    pct_b = (close - lower) / (upper - lower + _EPS)
+    return mid, upper, lower, pct_b
+
+
+def true_range(high, low, close) -> np.ndarray:
+    """True Range ab dem zweiten Bar (Länge N-1), wie bisher in risk/atr.py."""
+    high, low, close = _f64(high), _f64(low), _f64(close)
+    prev = close[..., :-1]
+    return np.maximum(high[..., 1:], prev) - np.minimum(low[..., 1:], prev)
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    """ATR als einfacher gleitender Mittelwert der True Range (Länge N-1)."""
+    return sma(true_range(high, low, close), period)
+
+
+def obv(close, volume) -> np.ndarray:
+    close, volume = _f64(close), _f64(volume)
+    direction = np.sign(np.diff(close, axis=-1, prepend=close[..., :1]))
+    return np.cumsum(direction * volume, axis=-1)
+
+
+# ---------------------------------------------------------------------------
+# Feature-Matrix für Signale
+# ---------------------------------------------------------------------------
+
+FEATURE_NAMES = (
+    "ret", "ret_z20", "vol30", "volume_z20", "rsi14", "macd_hist", "boll_pct_b", "obv_z20", "atr14_pct",
+)
+
+
+def features(ohlcv, window: int = 20) -> np.ndarray:
+    """Feature-Tensor ``(..., N, F)`` aus ``(..., N, 5)``; Reihenfolge siehe FEATURE_NAMES.
+
+    Preisabhängige Größen (MACD, ATR) sind auf den Schlusskurs normiert, damit
+    Symbole mit unterschiedlichem Preisniveau vergleichbar sind.
+    """
+    ohlcv = _f64(ohlcv)
+    h, l, c, v = ohlcv[..., H], ohlcv[..., L], ohlcv[..., C], ohlcv[..., V]
+    ret = returns(c)
+    _, _, hist = macd(c)
+    _, _, _, pct_b = bollinger(c, window)
+    atr_full = np.concatenate([np.full(c.shape[:-1] + (1,), np.nan), atr(h, l, c)], axis=-1)
+    price = np.maximum(c, _EPS)
+
+    cols = [
+        ret,
+        zscore(ret, window),
+        rolling_std(ret, 30),
+        zscore(v, window),
+        rsi(c),
+        hist / price,
+        pct_b,
+        zscore(obv(c, v), window),
+        atr_full / price,
+    ]
+    return np.stack(cols, axis=-1)
+
+
+def last_values(ohlcv) -> Dict[str, np.ndarray]:
+    """Nur die letzte Zeile der Features – z.B. für Scans über viele Symbole."""
+    f = features(ohlcv)[..., -1, :]
+    return {name: f[..., i] for i, name in enumerate(FEATURE_NAMES)}
@@ -1,24 +1,48 @@
 import numpy as np
 
+from . import indicators as ind
+
 try:
     import xgboost as xgb  # optional
 except Exception:
     xgb = None
 
+# Gewichte der Fallback-Regel (Momentum-Komposit, Summe = 1)
+_WEIGHTS = {"ret_z20": 0.30, "rsi14": 0.25, "macd_atr": 0.30, "obv_z20": 0.15}
+_F = {name: i for i, name in enumerate(ind.FEATURE_NAMES)}
+
+
 def compute_features(ohlcv: np.ndarray) -> np.ndarray:
-    # ohlcv: shape (N, 5) -> O H L C V
-    # simple toy features: returns, volatility, volume zscore
-    close = ohlcv[:,3]
-    ret = np.diff(close, prepend=close[0]) / np.maximum(close, 1e-9)
-    vol = np.std(ret[-30:]) if len(ret) >= 30 else np.std(ret)
-    v = ohlcv[:,4]
-    vz = (v - v.mean()) / (v.std() + 1e-9)
-    feats = np.stack([ret, np.full_like(ret, vol), vz], axis=1)
-    return feats.astype("float32")
+    # ohlcv: shape (N, 5) -> O H L C V, oder (S, N, 5) für mehrere Symbole
+    # Spalten siehe indicators.FEATURE_NAMES; Warm-up (NaN) -> 0
+    feats = ind.features(ohlcv)
+    return np.nan_to_num(feats, nan=0.0, posinf=0.0, neginf=0.0).astype("float32")
+
+
+def _rule_score(last: np.ndarray) -> np.ndarray:
+    # last: (..., F) – letzte Feature-Zeile je Symbol
+    ret_z = np.clip(last[..., _F["ret_z20"]] / 3.0, -1.0, 1.0)
+    rsi = np.where(last[..., _F["rsi14"]] > 0, (last[..., _F["rsi14"]] - 50.0) / 50.0, 0.0)
+    atr_pct = last[..., _F["atr14_pct"]]
+    macd_atr = np.where(atr_pct > 0, np.tanh(last[..., _F["macd_hist"]] / np.maximum(atr_pct, 1e-9)), 0.0)
+    obv_z = np.clip(last[..., _F["obv_z20"]] / 3.0, -1.0, 1.0)
+    raw = (_WEIGHTS["ret_z20"] * ret_z + _WEIGHTS["rsi14"] * rsi
+           + _WEIGHTS["macd_atr"] * macd_atr + _WEIGHTS["obv_z20"] * obv_z)
+    return np.tanh(2.0 * raw)
+
+
+def _label(score: float) -> str:
+    return "buy" if score > 0.15 else ("sell" if score < -0.15 else "hold")
+
+
+def score_signals(ohlcv: np.ndarray) -> list:
+    # Batch: (S, N, 5) -> eine Bewertung je Symbol in einem Durchlauf
+    scores = _rule_score(compute_features(ohlcv)[..., -1, :])
+    return [{"score": float(s), "signal": _label(float(s))} for s in np.atleast_1d(scores)]
+
 
 def score_signal(ohlcv: np.ndarray) -> dict:
     feats = compute_features(ohlcv)
-    # Fallback model: simple rule (no xgboost on Heroku build)
-    score = float(np.tanh(feats[-1].sum()))
-    signal = "buy" if score > 0.15 else ("sell" if score < -0.15 else "hold")
-    return {"score": score, "signal": signal}
+    # Fallback model: Regel über die Indikatoren (no xgboost on Heroku build)
+    score = float(_rule_score(feats[-1]))
+    return {"score": score, "signal": _label(score)}
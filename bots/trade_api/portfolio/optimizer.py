@@ -1,5 +1,34 @@
+"""Portfolio-Optimierung (nur NumPy).
+
+- Kovarianz aus Log-Returns des Candle-Stores mit Ledoit-Wolf-Shrinkage
+  (Ziel: Einheitsmatrix × mittlere Varianz), annualisiert nach Intervall
+- Min-Varianz und Max-Sharpe als Long-only-QPs über beschleunigten
+  projizierten Gradienten (FISTA) auf dem Simplex mit Obergrenze je Asset;
+  Max-Sharpe rechnet ein λ-Raster der Mean-Variance-Nutzen in einem Batch
+- Risk-Parity über Newton auf der konvexen Spinu-Formulierung
+- Kovarianzen werden je (Universum, Intervall, Lookback) gecacht
+
+``optimize(weights_hint, sentiment)`` bleibt für den alten Hint-Pfad erhalten.
+"""
+import asyncio
+import math
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
 import numpy as np
 
+from shared.cache import AsyncTTLCache
+from shared.candles import BAR_MS, TS, C, get_store, normalize_bar
+
+OPTIMIZER_COV_TTL = float(os.getenv("TRADEAPI_OPTIMIZER_COV_TTL", "300"))
+OPTIMIZER_MAX_ASSETS = int(os.getenv("TRADEAPI_OPTIMIZER_MAX_ASSETS", "250"))
+METHODS = ("min_variance", "max_sharpe", "risk_parity")
+
+_YEAR_MS = 365 * 24 * 3600 * 1000
+_cov_cache = AsyncTTLCache("trade_api_cov", maxsize=256)
+
+
 def optimize(weights_hint: dict[str,float], sentiment: dict[str,float]|None=None) -> dict:
     # very lightweight: normalize hints and nudge by sentiment (positive -> tilt risk-on asset if present)
     if not weights_hint:
@@ -14,3 +43,228 @@ def optimize(weights_hint: dict[str,float], sentiment: dict[str,float]|None=None
         w = w * (1.0 + 0.2*pos)  # gentle tilt
         w = w / w.sum()
     return {k: float(v) for k, v in zip(keys, w)}
+
+
+# ---------------------------------------------------------------------------
+# Schätzer
+# ---------------------------------------------------------------------------
+
+def ledoit_wolf(returns: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Geschrumpfte Kovarianz von ``returns`` (T, S) und Shrinkage-Intensität δ"""
+    x = returns - returns.mean(axis=0)
+    t, n = x.shape
+    sample = x.T @ x / t
+    mu = np.trace(sample) / n
+    target = mu * np.eye(n)
+    d2 = np.sum((sample - target) ** 2)
+    x2 = x * x
+    b2 = np.sum(x2.T @ x2 / t - sample ** 2) / t
+    delta = float(min(1.0, b2 / d2)) if d2 > 0 else 1.0
+    return delta * target + (1.0 - delta) * sample, delta
+
+
+# ---------------------------------------------------------------------------
+# Löser
+# ---------------------------------------------------------------------------
+
+def _simplex_tau(v: np.ndarray, mass: np.ndarray) -> np.ndarray:
+    """Schwelle τ je Zeile mit sum(max(v - τ, 0)) = mass (Sortierung, Duchi et al.)"""
+    u = -np.sort(-v, axis=1)
+    css = np.cumsum(u, axis=1) - mass[:, None]
+    k = np.arange(1, v.shape[1] + 1)
+    rho = np.maximum(np.count_nonzero(u - css / k > 0, axis=1), 1)
+    return css[np.arange(len(v)), rho - 1] / rho
+
+
+def project_capped_simplex(v: np.ndarray, cap: float = 1.0) -> np.ndarray:
+    """Zeilenweise Projektion auf {w : sum w = 1, 0 <= w <= cap}
+
+    Exakt über die Simplex-Schwelle; Einträge über ``cap`` werden gedeckelt und
+    der Rest neu verteilt, bis nichts mehr übersteht (meist 1–3 Runden).
+    """
+    v = np.atleast_2d(v)
+    ones = np.ones(len(v))
+    if cap >= 1.0:
+        return np.maximum(v - _simplex_tau(v, ones)[:, None], 0.0)
+    capped = np.zeros(v.shape, dtype=bool)
+    # Platzhalter für gedeckelte Einträge: sicher unterhalb jeder möglichen Schwelle
+    floor = v.min(axis=1, keepdims=True) - (v.max(axis=1, keepdims=True) - v.min(axis=1, keepdims=True)) - 2.0
+    for _ in range(v.shape[1]):
+        mass = ones - cap * capped.sum(axis=1)
+        tau = _simplex_tau(np.where(capped, floor, v), mass)[:, None]
+        w = np.where(capped, cap, np.maximum(v - tau, 0.0))
+        over = ~capped & (w > cap)
+        if not over.any():
+            break
+        capped |= over
+    return w
+
+
+def _fista(mu: np.ndarray, lam: np.ndarray, cov: np.ndarray, cap: float,
+           iters: int = 1000, tol: float = 1e-7) -> np.ndarray:
+    """max mu_l·w − λ_l/2 · wᵀΣw je Zeile l (long-only, Summe 1, w <= cap)
+
+    Mit adaptivem Restart (O'Donoghue/Candès), sonst oszilliert FISTA bei
+    schlecht konditionierten Kovarianzen lange um das Optimum.
+    """
+    n = cov.shape[0]
+    eig = float(np.linalg.eigvalsh(cov)[-1]) or 1.0
+    step = (1.0 / (lam * eig))[:, None]
+    w = np.full((len(lam), n), 1.0 / n)
+    y, t = w.copy(), np.ones((len(lam), 1))
+    for _ in range(iters):
+        grad = mu - lam[:, None] * (y @ cov)
+        w_next = project_capped_simplex(y + step * grad, cap)
+        delta = w_next - w
+        if np.max(np.abs(delta)) < tol:
+            return w_next
+        # Restart je Zeile, sobald der Momentum-Schritt gegen den Gradienten läuft
+        restart = np.sum((y - w_next) * delta, axis=1, keepdims=True) > 0
+        t = np.where(restart, 1.0, t)
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        y = w_next + ((t - 1) / t_next) * delta
+        w, t = w_next, t_next
+    return w
+
+
+def min_variance(cov: np.ndarray, cap: float = 1.0) -> np.ndarray:
+    return _fista(np.zeros((1, cov.shape[0])), np.ones(1), cov, cap)[0]
+
+
+def max_sharpe(mu: np.ndarray, cov: np.ndarray, cap: float = 1.0, risk_free: float = 0.0,
+               grid: int = 16) -> np.ndarray:
+    """Bestes Sharpe-Ratio entlang der Long-only-Effizienzkurve (λ-Raster in einem Batch)"""
+    excess = mu - risk_free
+    scale = max(float(np.abs(excess).max()), 1e-12) / max(float(np.diag(cov).mean()), 1e-18)
+    lam = scale * np.logspace(-2, 2, grid)
+    ws = _fista(np.broadcast_to(excess, (grid, len(mu))), lam, cov, cap)
+    vol = np.sqrt(np.maximum(np.einsum("ij,jk,ik->i", ws, cov, ws), 1e-18))
+    return ws[int(np.argmax(ws @ excess / vol))]
+
+
+def risk_parity(cov: np.ndarray, budget: Optional[np.ndarray] = None, cap: float = 1.0,
+                iters: int = 50, tol: float = 1e-10) -> np.ndarray:
+    """Gleiche (bzw. ``budget``) Risikobeiträge: min ½yᵀΣy − Σ b·log y, w = y/Σy
+
+    Mit ``cap`` < 1 wird das Ergebnis auf {Summe 1, 0 <= w <= cap} projiziert –
+    die gedeckelten Assets tragen dann weniger Risiko als ihr Budget.
+    """
+    n = cov.shape[0]
+    b = np.full(n, 1.0 / n) if budget is None else budget / budget.sum()
+    y = b / np.sqrt(np.maximum(np.diag(cov), 1e-18))
+    f = lambda v: 0.5 * v @ cov @ v - b @ np.log(v)
+    for _ in range(iters):
+        grad = cov @ y - b / y
+        if np.max(np.abs(grad)) < tol:
+            break
+        hess = cov + np.diag(b / (y * y))
+        dy = np.linalg.solve(hess, -grad)
+        a, fy = 1.0, f(y)
+        while True:  # positiv bleiben + Armijo
+            nxt = y + a * dy
+            if np.all(nxt > 0) and f(nxt) <= fy + 1e-4 * a * grad @ dy:
+                break
+            a *= 0.5
+            if a < 1e-12:
+                nxt = y
+                break
+        y = nxt
+    w = y / y.sum()
+    if cap < 1.0 and w.max() > cap:
+        w = project_capped_simplex(w, cap)[0]
+    return w
+
+
+def portfolio_stats(w: np.ndarray, mu: np.ndarray, cov: np.ndarray, risk_free: float = 0.0) -> Dict[str, float]:
+    ret = float(w @ mu)
+    vol = float(math.sqrt(max(w @ cov @ w, 0.0)))
+    rc = w * (cov @ w) / (vol * vol) if vol > 0 else np.zeros_like(w)
+    return {
+        "expected_return": ret,
+        "volatility": vol,
+        "sharpe": (ret - risk_free) / vol if vol > 0 else 0.0,
+        "max_risk_contribution": float(rc.max()) if len(rc) else 0.0,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Daten + Cache
+# ---------------------------------------------------------------------------
+
+async def _aligned_closes(symbols: Sequence[str], bar: str, lookback: int) -> Tuple[List[str], np.ndarray]:
+    """Schlusskurse (S, T) auf gemeinsamen Zeitstempeln; Symbole ohne Daten fallen raus"""
+    store = get_store()
+    series = await asyncio.gather(*(store.get(s, bar, lookback + 1) for s in symbols), return_exceptions=True)
+    ok = [(s, a) for s, a in zip(symbols, series) if isinstance(a, np.ndarray) and len(a) > 2]
+    if not ok:
+        return [], np.empty((0, 0))
+    common = ok[0][1][:, TS]
+    for _, a in ok[1:]:
+        common = np.intersect1d(common, a[:, TS], assume_unique=True)
+    common = common[-(lookback + 1):]
+    closes = np.stack([a[np.searchsorted(a[:, TS], common), C] for _, a in ok])
+    return [s for s, _ in ok], closes
+
+
+async def covariance(symbols: Sequence[str], bar: str = "1D", lookback: int = 180) -> Dict:
+    """Annualisierte μ/Σ (geschrumpft) für ein Universum – gecacht je (Universum, bar, lookback)"""
+    bar = normalize_bar(bar)
+    universe = tuple(sorted({s.upper() for s in symbols}))
+    key = (universe, bar, lookback)
+
+    async def _build() -> Dict:
+        names, closes = await _aligned_closes(universe, bar, lookback)
+        if len(names) < 2 or closes.shape[1] < 3:
+            return {}
+        rets = np.diff(np.log(np.maximum(closes, 1e-12)), axis=1).T      # (T, S)
+        periods = _YEAR_MS / BAR_MS[bar]
+        cov, delta = ledoit_wolf(rets)
+        return {
+            "symbols": names,
+            "mu": rets.mean(axis=0) * periods,
+            "cov": cov * periods,
+            "shrinkage": delta,
+            "observations": int(rets.shape[0]),
+        }
+
+    return await _cov_cache.get_or_fetch(key, OPTIMIZER_COV_TTL, _build)
+
+
+async def optimize_universe(symbols: Sequence[str], method: str = "max_sharpe", bar: str = "1D",
+                            lookback: int = 180, max_weight: float = 1.0, risk_free: float = 0.0) -> Dict:
+    """Gewichte für ``symbols`` (bis OPTIMIZER_MAX_ASSETS) nach ``method`` oder "all"."""
+    if len(symbols) > OPTIMIZER_MAX_ASSETS:
+        raise ValueError(f"max {OPTIMIZER_MAX_ASSETS} symbols")
+    methods = METHODS if method == "all" else (method,)
+    if any(m not in METHODS for m in methods):
+        raise ValueError(f"method must be one of {', '.join(METHODS)} or 'all'")
+
+    data = await covariance(symbols, bar, lookback)
+    if not data:
+        raise ValueError("not enough candle data for the requested universe")
+    names, mu, cov = data["symbols"], data["mu"], data["cov"]
+    cap = max(float(max_weight), 1.0 / len(names))
+
+    t0 = time.perf_counter()
+    out = {}
+    for m in methods:
+        if m == "min_variance":
+            w = min_variance(cov, cap)
+        elif m == "max_sharpe":
+            w = max_sharpe(mu, cov, cap, risk_free)
+        else:
+            w = risk_parity(cov, cap=cap)
+        out[m] = {
+            "weights": {s: float(x) for s, x in zip(names, w)},
+            "stats": portfolio_stats(w, mu, cov, risk_free),
+        }
+    return {
+        "symbols": names,
+        "missing": sorted(set(s.upper() for s in symbols) - set(names)),
+        "bar": normalize_bar(bar),
+        "lookback": lookback,
+        "observations": data["observations"],
+        "shrinkage": data["shrinkage"],
+        "solve_ms": round((time.perf_counter() - t0) * 1000, 2),
+        "results": out,
+    }
@@ -1,33 +1,149 @@
-import hashlib, json, time
-from ..db import execute, fetch
-
-INIT_SQL = """
-create table if not exists tradeapi_signal_proofs (
-  id bigserial primary key,
-  telegram_id bigint not null,
-  provider text not null,
-  symbol text not null,
-  signal_json jsonb not null,
-  signal_hash text not null,
-  created_at timestamptz not null default now()
-);
-create index if not exists tradeapi_signal_proofs_tid_idx on tradeapi_signal_proofs(telegram_id);
+"""Signal-Proofs: SHA-256 je Signal, gebündelt in Merkle-Batches.
+
+``record_proof`` legt das Signal mit seinem Hash an (Batch noch offen). Der
+Batch-Job sammelt alle offenen Hashes eines Intervalls, baut daraus einen
+Merkle-Baum und speichert nur die Wurzel (``tradeapi_proof_batches``) plus je
+Signal den Inklusionspfad (O(log n) Geschwister-Hashes). Für einen späteren
+On-Chain-Anker reicht damit eine Wurzel je Intervall.
+
+Baum: Blatt = sha256(0x00 || signal_hash), Knoten = sha256(0x01 || links || rechts);
+ein überzähliger Knoten wird unverändert eine Ebene hochgereicht (kein
+Duplizieren). Pfad-Einträge: "L:<hex>" / "R:<hex>" = Geschwister links/rechts.
 """
+import hashlib, json, logging, time
+from typing import List, Optional, Tuple
 
-def ensure_table():
-    for stmt in [s.strip() for s in INIT_SQL.split(";") if s.strip()]:
-        execute(stmt + ";")
+from ..config import PROOF_BATCH_SECONDS, PROOF_BATCH_MAX
+from ..db import execute, fetch, fetchrow, transaction
+
+logger = logging.getLogger(__name__)
 
 def hash_signal(payload: dict) -> str:
     canon = json.dumps(payload, sort_keys=True, separators=(",",":")).encode()
     return hashlib.sha256(canon).hexdigest()
 
-def record_proof(telegram_id: int, provider: str, symbol: str, signal: dict) -> dict:
+# ---------- Merkle ----------
+
+def _leaf(h: str) -> bytes:
+    return hashlib.sha256(b"\x00" + bytes.fromhex(h)).digest()
+
+def _node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+def merkle_tree(hashes: List[str]) -> Tuple[str, List[List[str]]]:
+    """Wurzel + Inklusionspfad je Blatt (Reihenfolge wie ``hashes``)"""
+    if not hashes:
+        raise ValueError("no leaves")
+    level = [_leaf(h) for h in hashes]
+    paths: List[List[str]] = [[] for _ in hashes]
+    members = [[i] for i in range(len(hashes))]   # Blätter unter jedem Knoten der aktuellen Ebene
+    while len(level) > 1:
+        nxt, nxt_members = [], []
+        for i in range(0, len(level) - 1, 2):
+            left, right = level[i], level[i + 1]
+            for leaf in members[i]:
+                paths[leaf].append("R:" + right.hex())
+            for leaf in members[i + 1]:
+                paths[leaf].append("L:" + left.hex())
+            nxt.append(_node(left, right))
+            nxt_members.append(members[i] + members[i + 1])
+        if len(level) % 2:
+            nxt.append(level[-1])
+            nxt_members.append(members[-1])
+        level, members = nxt, nxt_members
+    return level[0].hex(), paths
+
+def verify_path(signal_hash: str, path: List[str], root: str) -> bool:
+    try:
+        acc = _leaf(signal_hash)
+        for step in path or []:
+            side, sib = step.split(":", 1)
+            acc = _node(bytes.fromhex(sib), acc) if side == "L" else _node(acc, bytes.fromhex(sib))
+        return acc.hex() == (root or "").lower()
+    except ValueError:
+        return False
+
+# ---------- Proofs ----------
+
+async def record_proof(telegram_id: int, provider: str, symbol: str, signal: dict) -> dict:
+    """Nur der Hash wird gespeichert – das Signal selbst hält der Aufrufer (signal_json bleibt NULL)"""
     h = hash_signal(signal)
-    execute("insert into tradeapi_signal_proofs(telegram_id, provider, symbol, signal_json, signal_hash) values (%s,%s,%s,%s,%s)",
-            (telegram_id, provider, symbol, json.dumps(signal), h))
-    return {"hash": h, "ts": int(time.time())}
+    await execute("insert into tradeapi_signal_proofs(telegram_id, provider, symbol, signal_hash) values (%s,%s,%s,%s)",
+            (telegram_id, provider, symbol, h))
+    return {"hash": h, "ts": int(time.time()), "batch": "pending"}
 
-def list_proofs(telegram_id: int, limit: int = 50) -> list[dict]:
-    rows = fetch("select provider, symbol, signal_hash, created_at from tradeapi_signal_proofs where telegram_id=%s order by id desc limit %s", (telegram_id, limit))
+async def list_proofs(telegram_id: int, limit: int = 50) -> list[dict]:
+    rows = await fetch("select provider, symbol, signal_hash, batch_id, created_at from tradeapi_signal_proofs where telegram_id=%s order by id desc limit %s", (telegram_id, limit))
     return rows
+
+async def seal_batch(limit: int = PROOF_BATCH_MAX) -> Optional[dict]:
+    """Offene Proofs (älteste zuerst, max. ``limit``) zu einem Merkle-Batch versiegeln"""
+    async with transaction() as conn:
+        cur = await conn.execute(
+            "select id, signal_hash from tradeapi_signal_proofs where batch_id is null "
+            "order by id limit %s for update skip locked", (limit,))
+        rows = await cur.fetchall()
+        if not rows:
+            return None
+        root, paths = merkle_tree([r["signal_hash"] for r in rows])
+        cur = await conn.execute(
+            "insert into tradeapi_proof_batches(merkle_root, leaf_count) values (%s,%s) returning id",
+            (root, len(rows)))
+        batch_id = (await cur.fetchone())["id"]
+        await conn.execute(
+            "update tradeapi_signal_proofs p set batch_id=%s, leaf_index=v.idx - 1, "
+            "merkle_path=string_to_array(v.path, ',') "
+            "from unnest(%s::bigint[], %s::text[]) with ordinality as v(id, path, idx) where p.id=v.id",
+            (batch_id, [r["id"] for r in rows], [",".join(p) for p in paths]))
+    return {"batch_id": batch_id, "root": root, "leaves": len(rows)}
+
+# ohne Login sichtbar: nur was zum Nachrechnen des Inklusionspfads nötig ist
+PUBLIC_FIELDS = ("signal_hash", "batch_id", "leaf_index", "merkle_path", "merkle_root", "leaf_count",
+                 "anchor_tx", "anchored_at", "verified")
+
+async def get_proof(signal_hash: Optional[str] = None, proof_id: Optional[int] = None,
+                    telegram_id: Optional[int] = None) -> Optional[dict]:
+    """Proof inkl. Batch-Wurzel und Pfad; ``verified`` = Pfad führt zur gespeicherten Wurzel.
+
+    Lookup per ``proof_id`` nur zusammen mit dem ``telegram_id`` des Besitzers.
+    """
+    if proof_id:
+        where, args = "p.id=%s and p.telegram_id=%s", (proof_id, telegram_id)
+    else:
+        where, args = "p.signal_hash=%s", ((signal_hash or "").lower(),)
+    row = await fetchrow(
+        "select p.id, p.provider, p.symbol, p.signal_hash, p.batch_id, p.leaf_index, p.merkle_path, p.created_at, "
+        "b.merkle_root, b.leaf_count, b.anchor_tx, b.anchored_at "
+        "from tradeapi_signal_proofs p left join tradeapi_proof_batches b on b.id=p.batch_id "
+        f"where {where} order by p.id desc limit 1", args)
+    if not row:
+        return None
+    out = dict(row)
+    for k in ("created_at", "anchored_at"):
+        if out.get(k) is not None:
+            out[k] = out[k].isoformat()
+    out["verified"] = bool(out["batch_id"]) and verify_path(out["signal_hash"], out["merkle_path"], out["merkle_root"])
+    return out
+
+async def seal_job(context) -> None:
+    """JobQueue-Callback: alle offenen Proofs versiegeln (ggf. mehrere Batches)"""
+    try:
+        while True:
+            res = await seal_batch()
+            if not res:
+                break
+            logger.info(f"Proof batch {res['batch_id']}: {res['leaves']} signals, root {res['root'][:16]}…")
+            if res["leaves"] < PROOF_BATCH_MAX:
+                break
+    except Exception as e:
+        logger.error(f"Proof batch error: {e}")
+
+def register_jobs(app) -> None:
+    if getattr(app, "job_queue", None):
+        app.job_queue.run_repeating(
+            seal_job,
+            interval=PROOF_BATCH_SECONDS,
+            first=60,
+            name="tradeapi_proof_batches",
+        )
+        logger.info(f"✅ Trade API proof batcher registered ({PROOF_BATCH_SECONDS}s)")
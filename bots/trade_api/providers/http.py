@@ -1,7 +1,8 @@
-import aiohttp
 from contextlib import asynccontextmanager
 
+from shared.http_clients import get_aiohttp
+
 @asynccontextmanager
 async def session():
-    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as s:
-        yield s
+    # gemeinsame Session (Keep-Alive + DNS-Cache), wird beim Shutdown geschlossen
+    yield get_aiohttp("trade_api", timeout=10)
@@ -1,11 +1,17 @@
 import numpy as np
 
+from ..ml import indicators as ind
+
 def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> float:
-    tr = np.maximum(high[1:], close[:-1]) - np.minimum(low[1:], close[:-1])
+    tr = ind.true_range(high, low, close)
     if len(tr) < period:
         return float(tr.mean()) if len(tr) else 0.0
-    import pandas as pd
-    return float(pd.Series(tr).rolling(window=period).mean().iloc[-1])
+    # Mittelwert der letzten `period` True Ranges (= rolling(period).mean().iloc[-1])
+    return float(tr[-period:].mean())
+
+def atr_batch(ohlcv: np.ndarray, period: int = 14) -> np.ndarray:
+    # (S, N, 5) -> letzter ATR-Wert je Symbol
+    return ind.atr(ohlcv[..., ind.H], ohlcv[..., ind.L], ohlcv[..., ind.C], period)[..., -1]
 
 def position_size(balance_usd: float, entry: float, atr_val: float, risk_pct: float = 0.01) -> float:
     # position size = risk capital / (ATR as $ stop width)
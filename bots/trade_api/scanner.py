@@ -0,0 +1,216 @@
+"""Trade API - Watchlist-Scanner
+
+Ein Job bewertet alle Symbole aller Watchlists in EINEM vektorisierten
+Durchlauf: Kerzen kommen aus dem Candle-Store (shared/candles.py), dann
+``score_signals`` + ``atr_batch`` über die gestapelte ``(S, N, 5)``-Matrix.
+
+Nur wenn sich der Signal-Zustand eines Symbols ändert (buy/hold/sell), wird
+für dessen Abonnenten geschrieben – je Lauf ein Multi-Row-Insert in
+``tradeapi_signals`` und einer in ``tradeapi_signal_proofs`` – und wer
+``notify`` gesetzt hat, bekommt eine Telegram-Nachricht.
+
+Tabellen: Migration ``0004_watchlist.sql``.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from shared.candles import get_store as get_candle_store, normalize_bar
+from .config import (
+    SCANNER_BALANCE_USD,
+    SCANNER_BAR,
+    SCANNER_DEFAULT_SYMBOLS,
+    SCANNER_INTERVAL_SECONDS,
+    SCANNER_LOOKBACK,
+    SCANNER_MIN_BARS,
+    SCANNER_NOTIFY_CONCURRENCY,
+)
+from .db import execute, fetch, transaction
+from .ml.xgb_signals import score_signals
+from .proof.onchain import hash_signal
+from .risk.atr import atr_batch, position_size
+
+logger = logging.getLogger(__name__)
+
+# Stop/Target in ATR-Vielfachen (position_size rechnet mit 1 ATR Stop-Breite)
+STOP_ATR = 1.0
+TARGET_ATR = 2.0
+
+
+def _levels(signal: str, entry: float, atr_val: float) -> Tuple:
+    if signal == "buy":
+        return entry - STOP_ATR * atr_val, entry + TARGET_ATR * atr_val
+    if signal == "sell":
+        return entry + STOP_ATR * atr_val, entry - TARGET_ATR * atr_val
+    return None, None
+
+
+def evaluate(symbols: List[str], series: List[np.ndarray], balance_usd: float = SCANNER_BALANCE_USD) -> List[Dict]:
+    """Signal + ATR-Sizing für viele Symbole auf einmal.
+
+    ``series`` sind (N_i, 5)-Matrizen; Symbole mit weniger als SCANNER_MIN_BARS
+    werden übersprungen, der Rest wird auf die kürzeste Länge gekürzt und gestapelt.
+    """
+    ok = [(s, a) for s, a in zip(symbols, series) if len(a) >= SCANNER_MIN_BARS]
+    if not ok:
+        return []
+    n = min(len(a) for _, a in ok)
+    stack = np.stack([a[-n:] for _, a in ok])              # (S, N, 5)
+    scored = score_signals(stack)
+    atrs = np.nan_to_num(atr_batch(stack), nan=0.0)
+    closes = stack[:, -1, 3]
+
+    out = []
+    for (symbol, _), sig, atr_val, entry in zip(ok, scored, atrs, closes):
+        entry, atr_val = float(entry), float(atr_val)
+        stop, target = _levels(sig["signal"], entry, atr_val)
+        out.append({
+            "symbol": symbol,
+            "signal": sig["signal"],
+            "score": sig["score"],
+            "atr": atr_val,
+            "entry": entry,
+            "stop_loss": stop,
+            "take_profit": target,
+            "pos_size": position_size(balance_usd, entry, atr_val),
+        })
+    return out
+
+
+def _values(rows: List[Tuple]) -> Tuple[str, List]:
+    """Platzhalter + flache Parameterliste für ein ``insert ... values (...), (...)``"""
+    width = len(rows[0])
+    group = "(" + ",".join(["%s"] * width) + ")"
+    return ",".join([group] * len(rows)), [v for r in rows for v in r]
+
+
+async def _write(changed: List[Dict], subscribers: Dict[Tuple[str, str], List[Dict]]) -> int:
+    sig_rows, proof_rows = [], []
+    for r in changed:
+        for sub in subscribers.get((r["symbol"], r["bar"]), ()):
+            sig_rows.append((
+                sub["telegram_id"], r["symbol"], r["signal"], round(abs(r["score"]), 2), round(r["score"], 2),
+                r["atr"], r["entry"], r["stop_loss"], r["take_profit"], r["pos_size"],
+            ))
+            payload = {"signal": {"score": r["score"], "signal": r["signal"]}, "atr": r["atr"],
+                       "pos_size": r["pos_size"], "entry": r["entry"], "symbol": r["symbol"],
+                       "provider": "scanner", "bar": r["bar"]}
+            proof_rows.append((sub["telegram_id"], "scanner", r["symbol"], hash_signal(payload)))
+
+    state_rows = [(r["symbol"], r["bar"], r["signal"], round(r["score"], 4)) for r in changed]
+    async with transaction() as conn:
+        if sig_rows:
+            values, params = _values(sig_rows)
+            await conn.execute(
+                "insert into tradeapi_signals (telegram_id, symbol, signal_type, confidence, strength, atr_value, "
+                "entry_price, stop_loss, take_profit, position_size) values " + values, params)
+            values, params = _values(proof_rows)
+            await conn.execute(
+                "insert into tradeapi_signal_proofs (telegram_id, provider, symbol, signal_hash) "
+                "values " + values, params)
+        if state_rows:
+            values, params = _values(state_rows)
+            await conn.execute(
+                "insert into tradeapi_signal_state (symbol, bar, signal, score) values " + values +
+                " on conflict (symbol, bar) do update set signal=excluded.signal, score=excluded.score, "
+                "changed_at=now(), scanned_at=now()", params)
+    return len(sig_rows)
+
+
+def _message(r: Dict, prev: str) -> str:
+    icon = {"buy": "🟢", "sell": "🔴"}.get(r["signal"], "⚪️")
+    text = (f"{icon} {r['symbol']} ({r['bar']}): {prev.upper()} → {r['signal'].upper()}\n"
+            f"Score {r['score']:+.2f} · Entry {r['entry']:.6g} · ATR {r['atr']:.6g}")
+    if r["stop_loss"] is not None:
+        text += f"\nSL {r['stop_loss']:.6g} · TP {r['take_profit']:.6g}"
+    return text
+
+
+async def _notify(bot, changed: List[Dict], prev_state: Dict, subscribers: Dict) -> int:
+    sem = asyncio.Semaphore(SCANNER_NOTIFY_CONCURRENCY)
+    sent = 0
+
+    async def _send(chat_id: int, text: str):
+        nonlocal sent
+        async with sem:
+            try:
+                await bot.send_message(chat_id=chat_id, text=text)
+                sent += 1
+            except Exception as e:
+                logger.debug(f"Scanner notify {chat_id} failed: {e}")
+
+    jobs = []
+    for r in changed:
+        prev = prev_state.get((r["symbol"], r["bar"]))
+        if prev is None:
+            continue  # erster Scan setzt nur den Ausgangszustand
+        text = _message(r, prev)
+        jobs += [_send(s["telegram_id"], text) for s in subscribers.get((r["symbol"], r["bar"]), ()) if s["notify"]]
+    if jobs:
+        await asyncio.gather(*jobs)
+    return sent
+
+
+async def scan(bot=None) -> Dict:
+    """Ein Scan-Lauf über alle Watchlist-Symbole"""
+    t0 = time.perf_counter()
+    subs = await fetch("select telegram_id, symbol, bar, notify from tradeapi_watchlist")
+    subscribers: Dict[Tuple[str, str], List[Dict]] = {}
+    for s in subs:
+        subscribers.setdefault((s["symbol"], s["bar"]), []).append(s)
+    for sym in SCANNER_DEFAULT_SYMBOLS:
+        subscribers.setdefault((sym, normalize_bar(SCANNER_BAR)), [])
+    if not subscribers:
+        return {"symbols": 0}
+
+    prev_state = {(r["symbol"], r["bar"]): r["signal"]
+                  for r in await fetch("select symbol, bar, signal from tradeapi_signal_state")}
+
+    # Kerzen je Intervall parallel laden (Store begrenzt die Upstream-Requests selbst)
+    store = get_candle_store()
+    by_bar: Dict[str, List[str]] = {}
+    for sym, bar in subscribers:
+        by_bar.setdefault(bar, []).append(sym)
+
+    results: List[Dict] = []
+    for bar, symbols in by_bar.items():
+        series = await asyncio.gather(*(store.ohlcv(s, bar, SCANNER_LOOKBACK) for s in symbols), return_exceptions=True)
+        series = [a if isinstance(a, np.ndarray) else np.empty((0, 5)) for a in series]
+        for r in evaluate(symbols, series):
+            r["bar"] = bar
+            results.append(r)
+
+    changed = [r for r in results if prev_state.get((r["symbol"], r["bar"])) != r["signal"]]
+    written = await _write(changed, subscribers) if changed else 0
+    if results:
+        await execute(
+            "update tradeapi_signal_state set scanned_at=now() where (symbol, bar) in (select unnest(%s::text[]), unnest(%s::text[]))",
+            ([r["symbol"] for r in results], [r["bar"] for r in results]))
+    sent = await _notify(bot, changed, prev_state, subscribers) if bot and changed else 0
+
+    stats = {"symbols": len(subscribers), "scored": len(results), "changed": len(changed),
+             "signals_written": written, "notified": sent, "seconds": round(time.perf_counter() - t0, 3)}
+    logger.info(f"Signal scan: {stats}")
+    return stats
+
+
+async def scan_job(context) -> None:
+    """JobQueue-Callback"""
+    try:
+        await scan(getattr(context, "bot", None))
+    except Exception as e:
+        logger.error(f"Signal scan error: {e}")
+
+
+def register_jobs(app) -> None:
+    if getattr(app, "job_queue", None):
+        app.job_queue.run_repeating(
+            scan_job,
+            interval=SCANNER_INTERVAL_SECONDS,
+            first=30,
+            name="tradeapi_signal_scanner",
+        )
+        logger.info(f"✅ Trade API signal scanner registered ({SCANNER_INTERVAL_SECONDS}s)")
@@ -1,21 +1,197 @@
+"""FinBERT-Sentiment als prozessweiter Worker.
+
+- Tokenizer + Modell werden EINMAL lazy geladen (nicht mehr pro Aufruf)
+- Texte eines Requests laufen gepaddet in wenigen Forward-Passes
+  (nach Länge sortiert, FINBERT_BATCH_SIZE je Pass)
+- Ergebnisse je Text liegen in einem LRU-Cache (gleiche Headlines kommen oft)
+- ``analyze_async`` blockiert den Event-Loop nicht: Inferenz in einem
+  Worker-Thread oder – mit FINBERT_WORKER=process – in einem eigenen Prozess
+- ``stats()`` liefert den Durchsatz (texts/sec) der Forward-Passes
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = os.getenv("FINBERT_MODEL", "ProsusAI/finbert")
+FINBERT_BATCH_SIZE = int(os.getenv("FINBERT_BATCH_SIZE", "32"))
+FINBERT_MAX_LENGTH = int(os.getenv("FINBERT_MAX_LENGTH", "128"))
+FINBERT_MAX_TEXTS = int(os.getenv("FINBERT_MAX_TEXTS", "20"))
+FINBERT_CACHE_SIZE = int(os.getenv("FINBERT_CACHE_SIZE", "4096"))
+FINBERT_WORKER = os.getenv("FINBERT_WORKER", "thread").lower()   # "thread" | "process"
+FINBERT_THREADS = int(os.getenv("FINBERT_THREADS", "0"))          # 0 = torch-Default
+
+NEUTRAL = {"positive": 0.33, "neutral": 0.34, "negative": 0.33}
+
+# ---------------------------------------------------------------------------
+# Modell (je Prozess einmal)
+# ---------------------------------------------------------------------------
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def _load():
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from transformers import AutoTokenizer, AutoModelForSequenceClassification
+                import torch
+                if FINBERT_THREADS > 0:
+                    torch.set_num_threads(FINBERT_THREADS)
+                t0 = time.perf_counter()
+                tok = AutoTokenizer.from_pretrained(MODEL_NAME)
+                mdl = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME).eval()
+                labels = [mdl.config.id2label[i].lower() for i in range(mdl.config.num_labels)]
+                _model = (tok, mdl, labels)
+                logger.info(f"FinBERT loaded in {time.perf_counter() - t0:.1f}s")
+    return _model
+
+
+def _infer(texts: List[str]) -> Tuple[List[Dict[str, float]], float]:
+    """Scores je Text + reine Rechenzeit; sortiert nach Länge, damit wenig gepaddet wird"""
+    import torch
+
+    tok, mdl, labels = _load()
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    out: List[Optional[Dict[str, float]]] = [None] * len(texts)
+    t0 = time.perf_counter()
+    with torch.inference_mode():
+        for s in range(0, len(order), FINBERT_BATCH_SIZE):
+            idx = order[s:s + FINBERT_BATCH_SIZE]
+            enc = tok([texts[i] for i in idx], padding=True, truncation=True,
+                      max_length=FINBERT_MAX_LENGTH, return_tensors="pt")
+            probs = torch.softmax(mdl(**enc).logits, dim=-1).tolist()
+            for i, p in zip(idx, probs):
+                out[i] = dict(zip(labels, p))
+    return out, time.perf_counter() - t0
+
+
+def _warm() -> None:
+    # Initializer des Worker-Prozesses: Modell sofort laden
+    try:
+        _load()
+    except Exception as e:
+        logger.warning(f"FinBERT warm-up failed: {e}")
+
+# ---------------------------------------------------------------------------
+# Worker (Cache + Executor + Durchsatz) im Hauptprozess
+# ---------------------------------------------------------------------------
+
+
+class SentimentWorker:
+    def __init__(self, mode: str = FINBERT_WORKER, cache_size: int = FINBERT_CACHE_SIZE):
+        self.mode = mode
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+        self._stats = {"texts": 0, "cache_hits": 0, "batches": 0, "infer_seconds": 0.0, "errors": 0}
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8", "ignore")).hexdigest()
+
+    def _lookup(self, texts: List[str]) -> Tuple[List[Optional[Dict]], List[str]]:
+        res: List[Optional[Dict]] = []
+        missing: Dict[str, None] = {}
+        with self._lock:
+            for t in texts:
+                hit = self._cache.get(self._key(t))
+                if hit is not None:
+                    self._cache.move_to_end(self._key(t))
+                    self._stats["cache_hits"] += 1
+                else:
+                    missing[t] = None
+                res.append(hit)
+        return res, list(missing)
+
+    def _store(self, texts: List[str], scores: List[Dict], seconds: float) -> Dict[str, Dict]:
+        with self._lock:
+            self._stats["texts"] += len(texts)
+            self._stats["batches"] += 1
+            self._stats["infer_seconds"] += seconds
+            for t, sc in zip(texts, scores):
+                self._cache[self._key(t)] = sc
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dict(zip(texts, scores))
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                import multiprocessing as mp
+                self._executor = ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn"), initializer=_warm)
+            else:
+                # ein Thread: das Modell rechnet selbst mehrkernig, parallele Passes bringen nichts
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="finbert")
+        return self._executor
+
+    def score(self, texts: List[str]) -> List[Dict[str, float]]:
+        """Synchron (blockierend) – Scores je Text"""
+        res, missing = self._lookup(texts)
+        if missing:
+            fresh = self._store(missing, *_infer(missing))
+            res = [r if r is not None else fresh[t] for r, t in zip(res, texts)]
+        return res
+
+    async def score_async(self, texts: List[str]) -> List[Dict[str, float]]:
+        res, missing = self._lookup(texts)
+        if missing:
+            loop = asyncio.get_running_loop()
+            scores, seconds = await loop.run_in_executor(self._get_executor(), _infer, missing)
+            fresh = self._store(missing, scores, seconds)
+            res = [r if r is not None else fresh[t] for r, t in zip(res, texts)]
+        return res
+
+    def stats(self) -> Dict:
+        s = dict(self._stats)
+        s["texts_per_sec"] = round(s["texts"] / s["infer_seconds"], 1) if s["infer_seconds"] else None
+        s["cache_size"] = len(self._cache)
+        s["mode"] = self.mode
+        return s
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+worker = SentimentWorker()
+
+
+def _average(scores: List[Dict[str, float]]) -> Dict[str, float]:
+    if not scores:
+        return dict(NEUTRAL)
+    return {k: sum(s.get(k, 0) for s in scores) / len(scores) for k in scores[0].keys()}
+
+
+def _clean(texts) -> List[str]:
+    return [t for t in (str(x).strip() for x in (texts or [])[:FINBERT_MAX_TEXTS]) if t]
+
+
 def analyze(texts: list[str]) -> dict:
     try:
-        from transformers import AutoTokenizer, AutoModelForSequenceClassification, TextClassificationPipeline
-        import torch
-        model_name = "ProsusAI/finbert"
-        tok = AutoTokenizer.from_pretrained(model_name)
-        mdl = AutoModelForSequenceClassification.from_pretrained(model_name)
-        pipe = TextClassificationPipeline(model=mdl, tokenizer=tok, return_all_scores=True, device=-1)
-        scores = []
-        for t in texts[:20]:
-            res = pipe(t)[0]
-            # labels: positive/negative/neutral
-            d = {x['label'].lower(): x['score'] for x in res}
-            scores.append(d)
-        # average
-        if not scores:
-            return {"positive":0.33,"neutral":0.34,"negative":0.33}
-        avg = {k: sum(s.get(k,0) for s in scores)/len(scores) for k in scores[0].keys()}
-        return avg
-    except Exception:
-        return {"positive":0.33,"neutral":0.34,"negative":0.33}
+        return _average(worker.score(_clean(texts)))
+    except Exception as e:
+        worker._stats["errors"] += 1
+        logger.debug(f"FinBERT analyze failed: {e}")
+        return dict(NEUTRAL)
+
+
+async def analyze_async(texts: list[str]) -> dict:
+    """Wie ``analyze``, aber ohne den Event-Loop zu blockieren"""
+    try:
+        return _average(await worker.score_async(_clean(texts)))
+    except Exception as e:
+        worker._stats["errors"] += 1
+        logger.debug(f"FinBERT analyze failed: {e}")
+        return dict(NEUTRAL)
@@ -1,23 +1,29 @@
-import json, hashlib, hmac, time, numpy as np, logging
+import asyncio, json, numpy as np, logging
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional, List
 from aiohttp import web
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton, WebAppInfo
 from telegram.ext import Application, CommandHandler, ContextTypes
 
-from .config import BOT_TOKEN, APP_BASE_URL, ALLOWED_PROVIDERS, SECRET_KEY, TELEGRAM_LOGIN_TTL_SECONDS, PRO_DEFAULT, PRO_USERS
+from .config import BOT_TOKEN, APP_BASE_URL, ALLOWED_PROVIDERS, SECRET_KEY, TELEGRAM_LOGIN_TTL_SECONDS, PRO_DEFAULT, PRO_USERS, BACKTEST_MAX_GRID
 from .db import execute, fetch, fetchrow
-from .crypto_utils import encrypt_blob, decrypt_blob
-from .providers.base import ProviderCredentials
+from .crypto_utils import encrypt_blob
+from .credentials import CredentialCache
 from .providers.kraken import KrakenProvider
 from .providers.coinbase import CoinbaseProvider
 from .providers.mexc import MexcProvider
 from .providers.base import ProviderBase
 from .ml.xgb_signals import score_signal
 from .risk.atr import atr, position_size
-from .sentiment.finbert import analyze as finbert_analyze
-from .portfolio.optimizer import optimize as portfolio_opt
-from .proof.onchain import ensure_table as ensure_proof_table, record_proof, list_proofs
+from .sentiment.finbert import analyze_async as finbert_analyze
+from .portfolio.optimizer import optimize as portfolio_opt, optimize_universe
+from .backtest import engine as backtest
+from .proof.onchain import PUBLIC_FIELDS as PROOF_PUBLIC_FIELDS, record_proof, list_proofs, get_proof, hash_signal
+from shared.candles import get_store as get_candle_store, normalize_bar, to_okx_rows
+from shared.alerts import engine as alert_engine, side_of
+from shared import initdata
+from . import alerts as price_alerts
+from .valuation import valuation, PORTFOLIO_JSON_SQL
 
 logger = logging.getLogger(__name__)
 
@@ -26,175 +32,20 @@ PROVIDER_MAP = {
     "coinbase": CoinbaseProvider,
     "mexc": MexcProvider,
 }
+CREDENTIALS = CredentialCache(PROVIDER_MAP)
 
-# SQL Schema - erweitert mit User-Settings, Portfolios, Alerts, Trading History
-INIT_SQL = """
--- API Keys (verschlüsselt)
-create table if not exists tradeapi_keys (
-  id bigserial primary key,
-  telegram_id bigint not null,
-  provider text not null,
-  label text,
-  api_fields_enc text not null,
-  created_at timestamptz not null default now(),
-  updated_at timestamptz not null default now(),
-  unique(telegram_id, provider, coalesce(label,''))
-);
-create index if not exists tradeapi_keys_tid_idx on tradeapi_keys(telegram_id);
-
--- User Settings & Preferences
-create table if not exists tradeapi_user_settings (
-  telegram_id bigint primary key,
-  theme text default 'dark',
-  notifications_enabled boolean default true,
-  alert_threshold_usd numeric(18,2) default 100.00,
-  preferred_currency text default 'USD',
-  language text default 'de',
-  created_at timestamptz not null default now(),
-  updated_at timestamptz not null default now()
-);
-
--- Portfolios
-create table if not exists tradeapi_portfolios (
-  id bigserial primary key,
-  telegram_id bigint not null,
-  name text,
-  description text,
-  total_value numeric(18,8),
-  cash numeric(18,8),
-  risk_level text,
-  created_at timestamptz not null default now(),
-  updated_at timestamptz not null default now(),
-  unique(telegram_id, name)
-);
-create index if not exists tradeapi_portfolios_tid_idx on tradeapi_portfolios(telegram_id);
-
--- Portfolio Positions
-create table if not exists tradeapi_positions (
-  id bigserial primary key,
-  portfolio_id bigint references tradeapi_portfolios(id) on delete cascade,
-  asset_symbol text,
-  quantity numeric(18,8),
-  entry_price numeric(18,8),
-  current_price numeric(18,8),
-  cost_basis numeric(18,8),
-  created_at timestamptz not null default now(),
-  updated_at timestamptz not null default now()
-);
-create index if not exists tradeapi_positions_pid_idx on tradeapi_positions(portfolio_id);
-
--- Trading Alerts
-create table if not exists tradeapi_alerts (
-  id bigserial primary key,
-  telegram_id bigint not null,
-  symbol text,
-  alert_type text,
-  target_price numeric(18,8),
-  comparison text,
-  is_active boolean default true,
-  is_triggered boolean default false,
-  created_at timestamptz not null default now(),
-  triggered_at timestamptz
-);
-create index if not exists tradeapi_alerts_tid_idx on tradeapi_alerts(telegram_id);
-create index if not exists tradeapi_alerts_active_idx on tradeapi_alerts(is_active) where is_active = true;
-
--- Trading Signals
-create table if not exists tradeapi_signals (
-  id bigserial primary key,
-  telegram_id bigint not null,
-  symbol text,
-  signal_type text,
-  confidence numeric(3,2),
-  strength numeric(3,2),
-  atr_value numeric(18,8),
-  entry_price numeric(18,8),
-  stop_loss numeric(18,8),
-  take_profit numeric(18,8),
-  position_size numeric(18,8),
-  created_at timestamptz not null default now()
-);
-create index if not exists tradeapi_signals_tid_idx on tradeapi_signals(telegram_id);
-
--- Trading History
-create table if not exists tradeapi_trades (
-  id bigserial primary key,
-  telegram_id bigint not null,
-  portfolio_id bigint references tradeapi_portfolios(id),
-  symbol text,
-  side text,
-  quantity numeric(18,8),
-  entry_price numeric(18,8),
-  exit_price numeric(18,8),
-  commission numeric(18,8),
-  pnl numeric(18,8),
-  pnl_percent numeric(5,2),
-  status text,
-  opened_at timestamptz,
-  closed_at timestamptz,
-  notes text,
-  created_at timestamptz not null default now()
-);
-create index if not exists tradeapi_trades_tid_idx on tradeapi_trades(telegram_id);
-
--- Sentiment Analysis Cache
-create table if not exists tradeapi_sentiment (
-  id bigserial primary key,
-  text text,
-  sentiment text,
-  positive numeric(3,2),
-  neutral numeric(3,2),
-  negative numeric(3,2),
-  created_at timestamptz not null default now()
-);
-create index if not exists tradeapi_sentiment_created_idx on tradeapi_sentiment(created_at);
-
--- Market Data Cache
-create table if not exists tradeapi_market_cache (
-  id bigserial primary key,
-  symbol text,
-  provider text,
-  price numeric(18,8),
-  volume numeric(18,8),
-  change_24h numeric(5,2),
-  high_24h numeric(18,8),
-  low_24h numeric(18,8),
-  created_at timestamptz not null default now(),
-  unique(symbol, provider)
-);
-create index if not exists tradeapi_market_symbol_idx on tradeapi_market_cache(symbol);
-"""
-
-
-def init_schema():
-    for stmt in [s.strip() for s in INIT_SQL.split(";") if s.strip()]:
-        execute(stmt + ";")
-    ensure_proof_table()
-
-def verify_webapp_initdata(init_data: Dict[str, Any]) -> Dict[str, Any]:
+
+def verify_webapp_initdata(init_data: Any) -> Dict[str, Any]:
+    """initData als Roh-String oder als zerlegtes Objekt (``user`` als dict) prüfen"""
     if not BOT_TOKEN:
         raise ValueError("TRADE_API_BOT_TOKEN env fehlt")
-    if "hash" not in init_data:
-        raise ValueError("missing hash")
-    pairs = []
-    for k in sorted(init_data.keys()):
-        if k == "hash": continue
-        v = init_data[k]
-        if isinstance(v, dict):
-            v = json.dumps(v, separators=(",", ":"), ensure_ascii=False)
-        pairs.append(f"{k}={v}")
-    data_check = "\n".join(pairs)
-    secret = hashlib.sha256(BOT_TOKEN.encode()).digest()
-    calc = hmac.new(secret, data_check.encode(), hashlib.sha256).hexdigest()
-    if calc != init_data["hash"]:
-        raise ValueError("bad hash")
-    auth_date = int(init_data.get("auth_date", "0"))
-    if auth_date and (time.time() - auth_date) > TELEGRAM_LOGIN_TTL_SECONDS:
-        raise ValueError("login expired")
-    user = init_data.get("user")
-    if not user or not user.get("id"):
-        raise ValueError("no user in initData")
-    return {"telegram_id": int(user["id"]), "username": user.get("username")}
+    if isinstance(init_data, str):
+        info = initdata.verify(init_data, tokens=[BOT_TOKEN], max_age=TELEGRAM_LOGIN_TTL_SECONDS)
+    else:
+        fields = {k: json.dumps(v, separators=(",", ":"), ensure_ascii=False) if isinstance(v, dict) else str(v)
+                  for k, v in (init_data or {}).items()}
+        info = initdata.verify_fields(fields, tokens=[BOT_TOKEN], max_age=TELEGRAM_LOGIN_TTL_SECONDS)
+    return {"telegram_id": info["user_id"], "username": info["user"].get("username")}
 
 def user_is_pro(telegram_id: int) -> bool:
     if telegram_id in PRO_USERS: return True
@@ -218,7 +69,7 @@ async def providers(request: web.Request):
 async def keys_list(request: web.Request):
     tid = int(request.query.get("telegram_id") or 0)
     if not tid: return await _json({"error":"telegram_id required"}, 400)
-    rows = fetch("select id, provider, coalesce(label,'') as label, created_at, updated_at from tradeapi_keys where telegram_id=%s order by provider, label", (tid,))
+    rows = await fetch("select id, provider, coalesce(label,'') as label, created_at, updated_at from tradeapi_keys where telegram_id=%s order by provider, label", (tid,))
     return await _json({"items": rows})
 
 async def keys_upsert(request: web.Request):
@@ -242,15 +93,16 @@ async def keys_upsert(request: web.Request):
     if not fields["api_key"] or not fields["api_secret"]:
         return await _json({"error":"api_key and api_secret required"}, 400)
     # Free vs Pro: wenn user nicht Pro und bereits >0 Keys vorhanden, verweigern
-    rows = fetch("select count(*) as n from tradeapi_keys where telegram_id=%s", (tid,))
+    rows = await fetch("select count(*) as n from tradeapi_keys where telegram_id=%s", (tid,))
     count = int(rows[0]["n"]) if rows else 0
     if count >= 1 and not user_is_pro(tid):
         return await _json({"error":"Mehrere APIs sind nur in der Pro-Version erlaubt."}, 402)
     blob = encrypt_blob(SECRET_KEY, fields)
-    execute(            "insert into tradeapi_keys(telegram_id, provider, label, api_fields_enc) values (%s,%s,%s,%s) "
+    await execute(            "insert into tradeapi_keys(telegram_id, provider, label, api_fields_enc) values (%s,%s,%s,%s) "
         "on conflict (telegram_id, provider, coalesce(label,'')) do update set api_fields_enc=excluded.api_fields_enc, updated_at=now()",
         (tid, provider, label, blob)
     )
+    CREDENTIALS.invalidate(tid, provider)
     return await _json({"ok": True})
 
 async def keys_delete(request: web.Request):
@@ -262,7 +114,8 @@ async def keys_delete(request: web.Request):
     tid = u["telegram_id"]
     kid = int(body.get("id") or 0)
     if not kid: return await _json({"error":"id required"}, 400)
-    execute("delete from tradeapi_keys where id=%s and telegram_id=%s", (kid, tid))
+    await execute("delete from tradeapi_keys where id=%s and telegram_id=%s", (kid, tid))
+    CREDENTIALS.invalidate(tid)
     return await _json({"ok": True})
 
 
@@ -275,13 +128,10 @@ async def keys_verify(request: web.Request):
     tid = u["telegram_id"]
     provider = (body.get("provider") or "").strip()
     if not provider: return await _json({"error":"provider required"}, 400)
-    row = fetchrow("select api_fields_enc from tradeapi_keys where telegram_id=%s and provider=%s order by updated_at desc limit 1", (tid, provider))
-    if not row: return await _json({"error":"keine Credentials gefunden"}, 404)
-    fields = decrypt_blob(SECRET_KEY, row["api_fields_enc"])
-    creds = ProviderCredentials(fields.get("api_key"), fields.get("api_secret"), fields.get("passphrase") or None, fields.get("extras") or {})
-    Prov = PROVIDER_MAP.get(provider)
-    if not Prov: return await _json({"error":"provider not implemented"}, 400)
-    p = Prov(creds)
+    if provider not in PROVIDER_MAP: return await _json({"error":"provider not implemented"}, 400)
+    # entschlüsselte Credentials + Provider-Objekt kommen aus dem Speicher-Cache
+    p = await CREDENTIALS.get(tid, provider)
+    if not p: return await _json({"error":"keine Credentials gefunden"}, 404)
     try:
         bals = await p.balances()
         return await _json({"ok": True, "balances": bals})
@@ -297,13 +147,10 @@ async def keys_ping(request: web.Request):
     tid = u["telegram_id"]
     provider = (body.get("provider") or "").strip()
     if not provider: return await _json({"error":"provider required"}, 400)
-    row = fetchrow("select api_fields_enc from tradeapi_keys where telegram_id=%s and provider=%s order by updated_at desc limit 1", (tid, provider))
-    if not row: return await _json({"error":"keine Credentials gefunden"}, 404)
-    fields = decrypt_blob(SECRET_KEY, row["api_fields_enc"])
-    creds = ProviderCredentials(fields.get("api_key"), fields.get("api_secret"), fields.get("passphrase") or None, fields.get("extras") or {})
-    Prov = PROVIDER_MAP.get(provider)
-    if not Prov: return await _json({"error":"provider not implemented"}, 400)
-    p = Prov(creds)
+    if provider not in PROVIDER_MAP: return await _json({"error":"provider not implemented"}, 400)
+    # entschlüsselte Credentials + Provider-Objekt kommen aus dem Speicher-Cache
+    p = await CREDENTIALS.get(tid, provider)
+    if not p: return await _json({"error":"keine Credentials gefunden"}, 404)
     ok = await p.ping()
     return await _json({"ok": bool(ok)})
 
@@ -317,9 +164,19 @@ async def signal_generate(request: web.Request):
     tid = u["telegram_id"]
     provider = (body.get("provider") or "").strip()
     symbol = (body.get("symbol") or "BTCUSDT").upper()
-    ohlcv = np.array(body.get("ohlcv") or [], dtype=float)
-    if ohlcv.shape[1] if ohlcv.size else 0 != 5:
-        return await _json({"error":"ohlcv must be Nx5 [O,H,L,C,V]"}, 400)
+    bar = body.get("bar") or "1H"
+    if body.get("ohlcv"):
+        # Altclients schicken die Kerzen noch selbst mit
+        ohlcv = np.array(body.get("ohlcv") or [], dtype=float)
+        if ohlcv.ndim != 2 or ohlcv.shape[1] != 5:
+            return await _json({"error":"ohlcv must be Nx5 [O,H,L,C,V]"}, 400)
+    else:
+        try:
+            ohlcv = await get_candle_store().ohlcv(symbol, bar, int(body.get("limit") or 300))
+        except ValueError as e:
+            return await _json({"error": str(e)}, 400)
+        if len(ohlcv) < 2:
+            return await _json({"error": f"no candles for {symbol} {bar}"}, 404)
     sig = score_signal(ohlcv)
     high, low, close = ohlcv[:,1], ohlcv[:,2], ohlcv[:,3]
     atr_val = float(atr(high, low, close))
@@ -327,16 +184,94 @@ async def signal_generate(request: web.Request):
     bal = float(body.get("balance_usd") or 1000.0)
     entry = float(close[-1])
     size = position_size(bal, entry, atr_val)
-    payload = {"signal": sig, "atr": atr_val, "pos_size": size, "entry": entry, "symbol": symbol, "provider": provider}
-    proof = record_proof(tid, provider or "na", symbol, payload)
+    payload = {"signal": sig, "atr": atr_val, "pos_size": size, "entry": entry, "symbol": symbol, "provider": provider,
+               "bar": bar, "candles": int(len(ohlcv))}
+    proof = await record_proof(tid, provider or "na", symbol, payload)
     return await _json({"ok": True, "payload": payload, "proof": proof})
 
 async def proof_list(request: web.Request):
     tid = int(request.query.get("telegram_id") or 0)
     if not tid: return await _json({"error":"telegram_id required"}, 400)
-    rows = list_proofs(tid, limit=50)
+    rows = await list_proofs(tid, limit=50)
     return await _json({"items": rows})
 
+async def proof_verify(request: web.Request):
+    """Inklusionsbeweis eines Signals: ?hash=… oder POST {"signal": {...}} (Hash wird berechnet) liefern nur
+    die Merkle-Felder; ?id=… nur mit initData und nur für eigene Proofs"""
+    body = await request.json() if request.method == "POST" and request.can_read_body else {}
+    signal = body.get("signal")
+    h = hash_signal(signal) if isinstance(signal, dict) else (body.get("hash") or request.query.get("hash") or "")
+    try:
+        pid = int(body.get("id") or request.query.get("id") or 0)
+    except (TypeError, ValueError):
+        return await _json({"error": "id must be an integer"}, 400)
+    if not h and not pid:
+        return await _json({"error": "hash, id or signal required"}, 400)
+    if h:
+        proof = await get_proof(signal_hash=h)
+        if proof:
+            proof = {k: proof[k] for k in PROOF_PUBLIC_FIELDS}
+    else:
+        try:
+            u = verify_webapp_initdata(body.get("initData") or request.query.get("initData") or {})
+        except Exception as e:
+            return await _json({"error": str(e)}, 401)
+        proof = await get_proof(proof_id=pid, telegram_id=u["telegram_id"])
+    if not proof:
+        return await _json({"error": "not found", "hash": h or None}, 404)
+    if h and proof["signal_hash"] != h.lower():
+        return await _json({"ok": True, "verified": False, "reason": "hash mismatch", "proof": proof})
+    return await _json({"ok": True, "verified": proof["verified"],
+                        "pending": proof["batch_id"] is None, "proof": proof})
+
+# ---------- Watchlist (Scanner-Abos) ----------
+async def watchlist_list(request: web.Request):
+    tid = int(request.query.get("telegram_id") or 0)
+    if not tid: return await _json({"error": "telegram_id required"}, 400)
+    rows = await fetch(
+        "select w.symbol, w.bar, w.notify, s.signal, s.score, s.changed_at, s.scanned_at "
+        "from tradeapi_watchlist w left join tradeapi_signal_state s on s.symbol=w.symbol and s.bar=w.bar "
+        "where w.telegram_id=%s order by w.created_at",
+        (tid,)
+    )
+    return await _json({"ok": True, "items": rows})
+
+async def watchlist_upsert(request: web.Request):
+    body = await request.json()
+    try:
+        u = verify_webapp_initdata(body.get("initData") or {})
+    except Exception as e:
+        return await _json({"error": str(e)}, 401)
+    symbol = (body.get("symbol") or "").upper()
+    try:
+        bar = normalize_bar(body.get("bar") or "1H")
+    except ValueError as e:
+        return await _json({"error": str(e)}, 400)
+    if not symbol:
+        return await _json({"error": "symbol required"}, 400)
+    notify = bool(body.get("notify", True))
+    await execute(
+        "insert into tradeapi_watchlist(telegram_id, symbol, bar, notify) values(%s,%s,%s,%s) "
+        "on conflict (telegram_id, symbol, bar) do update set notify=excluded.notify",
+        (u["telegram_id"], symbol, bar, notify)
+    )
+    return await _json({"ok": True})
+
+async def watchlist_delete(request: web.Request):
+    body = await request.json()
+    try:
+        u = verify_webapp_initdata(body.get("initData") or {})
+    except Exception as e:
+        return await _json({"error": str(e)}, 401)
+    symbol = (body.get("symbol") or "").upper()
+    bar = body.get("bar")
+    if bar:
+        await execute("delete from tradeapi_watchlist where telegram_id=%s and symbol=%s and bar=%s",
+                      (u["telegram_id"], symbol, bar))
+    else:
+        await execute("delete from tradeapi_watchlist where telegram_id=%s and symbol=%s", (u["telegram_id"], symbol))
+    return await _json({"ok": True})
+
 # ---------- Sentiment + Portfolio ----------
 async def sentiment_analyze(request: web.Request):
     body = await request.json()
@@ -345,7 +280,7 @@ async def sentiment_analyze(request: web.Request):
     except Exception as e:
         return await _json({"error": str(e)}, 401)
     texts = body.get("texts") or []
-    res = finbert_analyze(texts)
+    res = await finbert_analyze(texts)
     return await _json({"sentiment": res})
 
 async def portfolio_optimize(request: web.Request):
@@ -354,17 +289,72 @@ async def portfolio_optimize(request: web.Request):
         _ = verify_webapp_initdata(body.get("initData") or {})
     except Exception as e:
         return await _json({"error": str(e)}, 401)
+    symbols = [str(x).upper() for x in (body.get("symbols") or []) if x]
+    if symbols:
+        # echte Optimierung über den Candle-Store (Kovarianz gecacht je Universum/Lookback)
+        try:
+            res = await optimize_universe(
+                symbols,
+                method=body.get("method") or "max_sharpe",
+                bar=body.get("bar") or "1D",
+                lookback=int(body.get("lookback") or 180),
+                max_weight=float(body.get("max_weight") or 1.0),
+                risk_free=float(body.get("risk_free") or 0.0),
+            )
+        except ValueError as e:
+            return await _json({"error": str(e)}, 400)
+        first = next(iter(res["results"].values()))
+        return await _json({"weights": first["weights"], **res})
     weights_hint = body.get("weights") or {}
     sentiment = body.get("sentiment") or None
     res = portfolio_opt(weights_hint, sentiment)
     return await _json({"weights": res})
 
+# ---------- Backtest ----------
+async def backtest_run(request: web.Request):
+    """Strategie (signal | grid | dca) über Kerzen aus dem Candle-Store; mit ``grid`` als Parameter-Gitter"""
+    body = await request.json()
+    try:
+        _ = verify_webapp_initdata(body.get("initData") or {})
+    except Exception as e:
+        return await _json({"error": str(e)}, 401)
+    symbol = (body.get("symbol") or "BTCUSDT").upper()
+    bar = body.get("bar") or "1H"
+    strategy = body.get("strategy") or "signal"
+    try:
+        params = body.get("params") or {}
+        grid = body.get("grid") or None
+        if not isinstance(params, dict):
+            raise ValueError("params must be an object")
+        if grid is not None and not (isinstance(grid, dict)
+                                     and all(isinstance(v, list) and v for v in grid.values())):
+            raise ValueError("grid must map parameter names to non-empty lists")
+        capital = float(body.get("capital") or 10000.0)
+        limit = int(body.get("limit") or 1000)
+        ohlcv = await get_candle_store().ohlcv(symbol, bar, limit)
+        if len(ohlcv) < 50:
+            return await _json({"error": "not enough candles"}, 400)
+        fill = backtest.fill_from(body)
+        if grid:
+            combos = 1
+            for v in grid.values():
+                combos *= len(v)
+            if combos > BACKTEST_MAX_GRID:
+                return await _json({"error": f"grid too large ({combos} > {BACKTEST_MAX_GRID})"}, 400)
+            results = await asyncio.to_thread(backtest.run_grid, ohlcv, strategy,
+                                              {**{k: [v] for k, v in params.items()}, **grid}, bar, fill, capital)
+            return await _json({"ok": True, "symbol": symbol, "bar": bar, "results": results})
+        res = await asyncio.to_thread(backtest.run, ohlcv, strategy, params, bar, fill, capital, bool(body.get("curve")))
+    except (ValueError, TypeError) as e:
+        return await _json({"error": str(e)}, 400)
+    return await _json({"ok": True, "symbol": symbol, "bar": bar, "result": res})
+
 # ---------- User Settings ----------
 async def get_user_settings(request: web.Request):
     tid = int(request.query.get("telegram_id") or 0)
     if not tid: return await _json({"error": "telegram_id required"}, 400)
     
-    row = fetchrow(
+    row = await fetchrow(
         "select theme, notifications_enabled, alert_threshold_usd, preferred_currency, language "
         "from tradeapi_user_settings where telegram_id=%s",
         (tid,)
@@ -372,7 +362,7 @@ async def get_user_settings(request: web.Request):
     
     if not row:
         # Create default settings
-        execute(
+        await execute(
             "insert into tradeapi_user_settings(telegram_id) values(%s) on conflict do nothing",
             (tid,)
         )
@@ -395,7 +385,7 @@ async def update_user_settings(request: web.Request):
     currency = body.get("preferred_currency", "USD")
     language = body.get("language", "de")
     
-    execute(
+    await execute(
         "insert into tradeapi_user_settings(telegram_id, theme, notifications_enabled, alert_threshold_usd, preferred_currency, language) "
         "values(%s,%s,%s,%s,%s,%s) "
         "on conflict(telegram_id) do update set theme=excluded.theme, notifications_enabled=excluded.notifications_enabled, "
@@ -410,11 +400,8 @@ async def list_portfolios(request: web.Request):
     tid = int(request.query.get("telegram_id") or 0)
     if not tid: return await _json({"error": "telegram_id required"}, 400)
     
-    rows = fetch(
-        "select id, name, description, total_value, cash, risk_level, created_at, updated_at "
-        "from tradeapi_portfolios where telegram_id=%s order by created_at desc",
-        (tid,)
-    )
+    fields = ("id", "name", "description", "total_value", "cash", "risk_level", "created_at", "updated_at")
+    rows = [{k: p.row.get(k) for k in fields} for p in await valuation.user_portfolios(tid)]
     
     return await _json({"ok": True, "portfolios": rows})
 
@@ -432,11 +419,12 @@ async def create_portfolio(request: web.Request):
     initial_cash = float(body.get("initial_cash") or 10000.0)
     
     try:
-        row = fetchrow(
+        row = await fetchrow(
             "insert into tradeapi_portfolios(telegram_id, name, description, cash, total_value, risk_level) "
             "values(%s,%s,%s,%s,%s,%s) returning id",
             (tid, name, description, initial_cash, initial_cash, risk_level)
         )
+        valuation.forget_user(tid)
         return await _json({"ok": True, "portfolio_id": row["id"]})
     except Exception as e:
         return await _json({"error": f"Portfolio bereits vorhanden oder Fehler: {str(e)}"}, 400)
@@ -445,25 +433,15 @@ async def get_portfolio(request: web.Request):
     pid = int(request.query.get("portfolio_id") or 0)
     if not pid: return await _json({"error": "portfolio_id required"}, 400)
     
-    portfolio = fetchrow("select * from tradeapi_portfolios where id=%s", (pid,))
-    if not portfolio: return await _json({"error": "not found"}, 404)
-    
-    positions = fetch("select * from tradeapi_positions where portfolio_id=%s", (pid,))
-    
-    # Calculate totals
-    total_invested = sum(float(p.get("cost_basis") or 0) for p in positions)
-    total_current = sum(float(p.get("current_price", 0)) * float(p.get("quantity", 0)) for p in positions)
+    # aus dem Speicher (valuation.py); beim ersten Zugriff eine Query inkl. Positionen
+    port = await valuation.portfolio(pid)
+    if not port: return await _json({"error": "not found"}, 404)
     
     return await _json({
         "ok": True,
-        "portfolio": portfolio,
-        "positions": positions,
-        "summary": {
-            "total_invested": total_invested,
-            "total_current": total_current,
-            "unrealized_pnl": total_current - total_invested,
-            "unrealized_pnl_percent": ((total_current - total_invested) / total_invested * 100) if total_invested > 0 else 0
-        }
+        "portfolio": port.row,
+        "positions": list(port.positions.values()),
+        "summary": port.summary()
     })
 
 async def add_position(request: web.Request):
@@ -486,19 +464,17 @@ async def add_position(request: web.Request):
     
     cost_basis = quantity * entry_price
     
-    execute(
+    await execute(
         "insert into tradeapi_positions(portfolio_id, asset_symbol, quantity, entry_price, current_price, cost_basis) "
         "values(%s,%s,%s,%s,%s,%s)",
         (pid, symbol, quantity, entry_price, current_price, cost_basis)
     )
     
-    # Update portfolio value
-    positions = fetch("select sum(quantity * current_price) as total from tradeapi_positions where portfolio_id=%s", (pid,))
-    cash = fetchrow("select cash from tradeapi_portfolios where id=%s", (pid,))
-    
-    if positions and positions[0]["total"]:
-        new_total = float(positions[0]["total"]) + float(cash["cash"])
-        execute("update tradeapi_portfolios set total_value=%s, updated_at=now() where id=%s", (new_total, pid))
+    # Portfolio neu in die Bewertung laden (inkl. neuer Position, Live-Preise) und Wert sichern
+    valuation.forget_portfolio(pid)
+    port = await valuation.portfolio(pid)
+    if port:
+        await execute("update tradeapi_portfolios set total_value=%s, updated_at=now() where id=%s", (port.value, pid))
     
     return await _json({"ok": True, "message": "Position hinzugefügt"})
 
@@ -517,7 +493,7 @@ async def list_alerts(request: web.Request):
     
     query += " order by created_at desc limit 100"
     
-    rows = fetch(query, tuple(params))
+    rows = await fetch(query, tuple(params))
     return await _json({"ok": True, "alerts": rows})
 
 async def create_alert(request: web.Request):
@@ -536,13 +512,15 @@ async def create_alert(request: web.Request):
     if not symbol or target_price <= 0:
         return await _json({"error": "Symbol und Target Price erforderlich"}, 400)
     
-    execute(
+    row = await fetchrow(
         "insert into tradeapi_alerts(telegram_id, symbol, alert_type, target_price, comparison, is_active) "
-        "values(%s,%s,%s,%s,%s,true)",
+        "values(%s,%s,%s,%s,%s,true) returning id, telegram_id, symbol, target_price, comparison",
         (tid, symbol, alert_type, target_price, comparison)
     )
+    if row and alert_type == "price" and side_of(comparison):
+        alert_engine.add(price_alerts.to_alert(row))
     
-    return await _json({"ok": True, "message": "Alert erstellt"})
+    return await _json({"ok": True, "message": "Alert erstellt", "alert_id": row["id"] if row else None})
 
 async def delete_alert(request: web.Request):
     body = await request.json()
@@ -556,7 +534,10 @@ async def delete_alert(request: web.Request):
     
     if not aid: return await _json({"error": "alert_id required"}, 400)
     
-    execute("delete from tradeapi_alerts where id=%s and telegram_id=%s", (aid, tid))
+    row = await fetchrow("delete from tradeapi_alerts where id=%s and telegram_id=%s returning id", (aid, tid))
+    if row:
+        # nur eigene Alerts aus der Engine nehmen
+        alert_engine.remove(price_alerts.SOURCE, aid)
     return await _json({"ok": True})
 
 # ---------- Market Data & Price Update ----------
@@ -565,7 +546,7 @@ async def get_market_price(request: web.Request):
     provider = request.query.get("provider", "kraken")
     
     # Try cache first
-    row = fetchrow(
+    row = await fetchrow(
         "select price, volume, change_24h, high_24h, low_24h, created_at from tradeapi_market_cache "
         "where symbol=%s and provider=%s and created_at > now() - interval '1 minute'",
         (symbol, provider)
@@ -576,45 +557,54 @@ async def get_market_price(request: web.Request):
     
     return await _json({"ok": True, "cached": False, "data": None})
 
+async def get_market_candles(request: web.Request):
+    """Kerzen aus dem lokalen Candle-Store (lädt nur die neuesten Bars nach)"""
+    symbol = request.query.get("symbol", "BTCUSDT").upper()
+    bar = request.query.get("bar", "1H")
+    try:
+        limit = int(request.query.get("limit") or 300)
+        rows = await get_candle_store().get(symbol, bar, limit)
+    except ValueError as e:
+        return await _json({"error": str(e)}, 400)
+    return await _json({"ok": True, "symbol": symbol, "bar": bar, "candles": to_okx_rows(rows)})
+
 # ---------- Dashboard & Analytics ----------
+DASHBOARD_SQL = (
+    "select "
+    "case when %(load)s then (select coalesce(jsonb_agg(x.portfolio), '[]'::jsonb) from ("
+    + PORTFOLIO_JSON_SQL + " where p.telegram_id=%(tid)s order by p.created_at desc) x) end as portfolios, "
+    "(select coalesce(jsonb_agg(to_jsonb(s)), '[]'::jsonb) from ("
+    "  select symbol, signal_type, confidence, entry_price, position_size, created_at "
+    "  from tradeapi_signals where telegram_id=%(tid)s order by created_at desc limit 5) s) as signals, "
+    "(select coalesce(jsonb_agg(to_jsonb(a)), '[]'::jsonb) from ("
+    "  select symbol, alert_type, target_price from tradeapi_alerts "
+    "  where telegram_id=%(tid)s and is_active=true order by created_at desc limit 5) a) as alerts, "
+    "(select to_jsonb(u) from (select theme, language from tradeapi_user_settings "
+    "  where telegram_id=%(tid)s limit 1) u) as settings"
+)
+
 async def get_dashboard(request: web.Request):
     tid = int(request.query.get("telegram_id") or 0)
     if not tid: return await _json({"error": "telegram_id required"}, 400)
     
-    # Get portfolios
-    portfolios = fetch(
-        "select id, name, total_value from tradeapi_portfolios where telegram_id=%s order by created_at desc",
-        (tid,)
-    )
-    
-    # Get recent signals
-    signals = fetch(
-        "select symbol, signal_type, confidence, entry_price, position_size, created_at "
-        "from tradeapi_signals where telegram_id=%s order by created_at desc limit 5",
-        (tid,)
-    )
-    
-    # Get active alerts
-    alerts = fetch(
-        "select symbol, alert_type, target_price from tradeapi_alerts "
-        "where telegram_id=%s and is_active=true order by created_at desc limit 5",
-        (tid,)
-    )
-    
-    # Get settings
-    settings = fetchrow("select theme, language from tradeapi_user_settings where telegram_id=%s", (tid,))
-    if not settings:
-        settings = {"theme": "dark", "language": "de"}
+    # Ein Roundtrip: Signale, Alerts, Settings – Portfolios nur, wenn der User
+    # noch nicht in der Bewertung liegt (sonst kommen die Werte aus dem Speicher)
+    load = not valuation.is_loaded(tid)
+    row = await fetchrow(DASHBOARD_SQL, {"tid": tid, "load": load})
+    if load:
+        valuation.hydrate(tid, row["portfolios"] or [])
+    ports = await valuation.user_portfolios(tid)
     
-    total_portfolio_value = sum(float(p.get("total_value") or 0) for p in portfolios)
+    portfolios = [{"id": p.id, "name": p.row.get("name"), "total_value": p.value} for p in ports]
+    signals = row["signals"] or []
+    alerts = row["alerts"] or []
+    settings = row["settings"] or {"theme": "dark", "language": "de"}
     
     return await _json({
         "ok": True,
         "dashboard": {
-            "total_portfolio_value": total_portfolio_value,
+            "total_portfolio_value": sum(p["total_value"] for p in portfolios),
             "portfolio_count": len(portfolios),
-            "active_alerts": len(alerts),
-            "recent_signals": len(signals),
             "portfolios": portfolios,
             "recent_signals": signals,
             "active_alerts": alerts,
@@ -645,18 +635,15 @@ async def _start(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
 async def _me(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     tid = update.effective_user.id
     
-    keys = fetch(
+    keys = await fetch(
         "select provider, coalesce(label,'') as label, updated_at from tradeapi_keys "
         "where telegram_id=%s order by provider, label",
         (tid,)
     )
     
-    portfolios = fetch(
-        "select name, total_value from tradeapi_portfolios where telegram_id=%s",
-        (tid,)
-    )
+    portfolios = [{"name": p.row.get("name"), "total_value": p.value} for p in await valuation.user_portfolios(tid)]
     
-    alerts = fetch(
+    alerts = await fetch(
         "select count(*) as count from tradeapi_alerts where telegram_id=%s and is_active=true",
         (tid,)
     )
@@ -729,8 +716,6 @@ def register_jobs(application: Application):
 
 def register_miniapp_routes(webapp: web.Application, application: Application):
     """Register HTTP API routes"""
-    init_schema()
-    
     # Auth & Providers
     webapp.router.add_post( "/tradeapi/auth",               tradeapi_auth)
     webapp.router.add_get(  "/tradeapi/providers",          providers)
@@ -745,10 +730,16 @@ def register_miniapp_routes(webapp: web.Application, application: Application):
     # Signals & Risk
     webapp.router.add_post( "/tradeapi/signal/generate",    signal_generate)
     webapp.router.add_get(  "/tradeapi/proof/list",         proof_list)
+    webapp.router.add_get(  "/tradeapi/proof/verify",       proof_verify)
+    webapp.router.add_post( "/tradeapi/proof/verify",       proof_verify)
+    webapp.router.add_get(  "/tradeapi/watchlist",          watchlist_list)
+    webapp.router.add_post( "/tradeapi/watchlist",          watchlist_upsert)
+    webapp.router.add_post( "/tradeapi/watchlist/delete",   watchlist_delete)
     
     # Sentiment & Portfolio
     webapp.router.add_post( "/tradeapi/sentiment/analyze",  sentiment_analyze)
     webapp.router.add_post( "/tradeapi/portfolio/optimize", portfolio_optimize)
+    webapp.router.add_post( "/tradeapi/backtest",           backtest_run)
     
     # User Settings
     webapp.router.add_get(  "/tradeapi/settings",           get_user_settings)
@@ -767,6 +758,7 @@ def register_miniapp_routes(webapp: web.Application, application: Application):
     
     # Market Data
     webapp.router.add_get(  "/tradeapi/market/price",       get_market_price)
+    webapp.router.add_get(  "/tradeapi/market/candles",     get_market_candles)
     
     # Dashboard
     webapp.router.add_get(  "/tradeapi/dashboard",          get_dashboard)
@@ -0,0 +1,234 @@
+"""Trade API - Portfolio-Bewertung im Speicher (Mark-to-Market).
+
+Portfolios eines Users werden einmal geladen (eine Query inkl. Positionen als
+json_agg) und danach aus dem Speicher bedient. Positionen sind nach Preis-Key
+indiziert (``alerts.price_key``: BTCUSDT -> "btc"); ein Tick aus dem Market-
+Snapshot (shared/ticks.py) fasst nur die Positionen der geänderten Symbole an
+und verschiebt den Portfolio-Wert um ``qty * (neu - alt)``.
+
+current_price/total_value gehen gesammelt zurück in die DB (write-behind,
+alle VALUATION_FLUSH_SECONDS; ein UPDATE … FROM unnest je Tabelle).
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+
+from shared import ticks
+from .alerts import price_key
+from .config import VALUATION_FLUSH_SECONDS, VALUATION_MAX_USERS
+from .db import fetch, fetchrow, transaction
+
+logger = logging.getLogger(__name__)
+
+# Portfolio-Zeile + Positionen als JSON (Zahlen/Zeitstempel direkt serialisierbar)
+PORTFOLIO_JSON_SQL = (
+    "select row_to_json(p)::jsonb || jsonb_build_object('positions', coalesce("
+    "(select jsonb_agg(to_jsonb(x) order by x.id) from tradeapi_positions x where x.portfolio_id=p.id), "
+    "'[]'::jsonb)) as portfolio from tradeapi_portfolios p"
+)
+
+
+def _f(v) -> float:
+    try:
+        return float(v or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+@dataclass
+class _Portfolio:
+    id: int
+    telegram_id: int
+    row: Dict
+    positions: Dict[int, Dict] = field(default_factory=dict)
+    cash: float = 0.0
+    invested: float = 0.0
+    market: float = 0.0
+
+    @property
+    def value(self) -> float:
+        return self.cash + self.market
+
+    def summary(self) -> Dict:
+        pnl = self.market - self.invested
+        return {
+            "total_invested": self.invested,
+            "total_current": self.market,
+            "unrealized_pnl": pnl,
+            "unrealized_pnl_percent": (pnl / self.invested * 100) if self.invested > 0 else 0,
+        }
+
+
+class PortfolioValuation:
+    def __init__(self, max_users: int = VALUATION_MAX_USERS):
+        self.max_users = max_users
+        self._ports: Dict[int, _Portfolio] = {}
+        self._users: "OrderedDict[int, List[int]]" = OrderedDict()   # vollständig geladene User (LRU)
+        self._by_key: Dict[str, Set[Tuple[int, int]]] = {}           # Preis-Key -> {(portfolio_id, position_id)}
+        self._dirty_pos: Set[Tuple[int, int]] = set()
+        self._dirty_port: Set[int] = set()
+        self._flushed_at = time.monotonic()
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.stats = {"ticks": 0, "marks": 0, "loads": 0, "flushes": 0}
+
+    # ---------------------------------------------------------- Index
+
+    def _put(self, data: Dict) -> _Portfolio:
+        positions = data.pop("positions", None) or []
+        pid = int(data["id"])
+        self._drop(pid)
+        port = _Portfolio(pid, int(data["telegram_id"]), data, cash=_f(data.get("cash")))
+        last = ticks.last_prices()
+        for pos in positions:
+            key = price_key(pos.get("asset_symbol") or "")
+            live = last.get(key)
+            if live and live > 0:
+                pos["current_price"] = live
+            qty = _f(pos.get("quantity"))
+            port.invested += _f(pos.get("cost_basis"))
+            port.market += qty * _f(pos.get("current_price"))
+            port.positions[int(pos["id"])] = pos
+            self._by_key.setdefault(key, set()).add((pid, int(pos["id"])))
+        port.row["total_value"] = port.value
+        self._ports[pid] = port
+        return port
+
+    def _drop(self, pid: int) -> None:
+        port = self._ports.pop(pid, None)
+        if port is None:
+            return
+        for pos_id, pos in port.positions.items():
+            key = price_key(pos.get("asset_symbol") or "")
+            refs = self._by_key.get(key)
+            if refs:
+                refs.discard((pid, pos_id))
+                if not refs:
+                    del self._by_key[key]
+        ids = self._users.get(port.telegram_id)
+        if ids and pid in ids:
+            ids.remove(pid)
+
+    def hydrate(self, telegram_id: int, portfolios: List[Dict]) -> List[_Portfolio]:
+        """Alle Portfolios eines Users aus PORTFOLIO_JSON_SQL-Zeilen übernehmen"""
+        self.forget_user(telegram_id)
+        ports = [self._put(dict(p)) for p in portfolios]
+        self._users[telegram_id] = [p.id for p in ports]
+        while len(self._users) > self.max_users:
+            old, _ = self._users.popitem(last=False)
+            self.forget_user(old)
+        self.stats["loads"] += 1
+        return ports
+
+    def forget_user(self, telegram_id: int) -> None:
+        for pid in self._users.pop(telegram_id, None) or []:
+            self._drop(pid)
+        for pid in [p.id for p in self._ports.values() if p.telegram_id == telegram_id]:
+            self._drop(pid)
+
+    def forget_portfolio(self, pid: int) -> None:
+        self._drop(pid)
+
+    def is_loaded(self, telegram_id: int) -> bool:
+        return telegram_id in self._users
+
+    # ---------------------------------------------------------- Lesen
+
+    async def user_portfolios(self, telegram_id: int) -> List[_Portfolio]:
+        ids = self._users.get(telegram_id)
+        if ids is None:
+            rows = await fetch(PORTFOLIO_JSON_SQL + " where p.telegram_id=%s order by p.created_at desc", (telegram_id,))
+            return self.hydrate(telegram_id, [r["portfolio"] for r in rows])
+        self._users.move_to_end(telegram_id)
+        return [self._ports[i] for i in ids if i in self._ports]
+
+    async def portfolio(self, pid: int) -> Optional[_Portfolio]:
+        port = self._ports.get(pid)
+        if port is None:
+            row = await fetchrow(PORTFOLIO_JSON_SQL + " where p.id=%s", (pid,))
+            if not row:
+                return None
+            port = self._put(dict(row["portfolio"]))
+            self.stats["loads"] += 1
+            ids = self._users.get(port.telegram_id)
+            if ids is not None and pid not in ids:
+                ids.insert(0, pid)
+        return port
+
+    # ---------------------------------------------------------- Ticks
+
+    async def on_prices(self, prices: Mapping[str, float]) -> int:
+        marks = 0
+        for key, refs in self._by_key.items():
+            price = prices.get(key)
+            if price is None or price <= 0:
+                continue
+            for pid, pos_id in refs:
+                port = self._ports[pid]
+                pos = port.positions[pos_id]
+                old = _f(pos.get("current_price"))
+                if old == price:
+                    continue
+                port.market += _f(pos.get("quantity")) * (price - old)
+                port.row["total_value"] = port.value
+                pos["current_price"] = price
+                self._dirty_pos.add((pid, pos_id))
+                self._dirty_port.add(pid)
+                marks += 1
+        self.stats["ticks"] += 1
+        self.stats["marks"] += marks
+        if time.monotonic() - self._flushed_at >= VALUATION_FLUSH_SECONDS:
+            await self.flush()
+        return marks
+
+    async def flush(self) -> int:
+        """Geänderte Marks gesammelt in die DB schreiben"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            self._flushed_at = time.monotonic()
+            dirty_pos, dirty_port = self._dirty_pos, self._dirty_port
+            self._dirty_pos, self._dirty_port = set(), set()
+            pos_rows = [(pos_id, _f(self._ports[pid].positions[pos_id]["current_price"]))
+                        for pid, pos_id in dirty_pos
+                        if pid in self._ports and pos_id in self._ports[pid].positions]
+            port_rows = [(pid, self._ports[pid].value) for pid in dirty_port if pid in self._ports]
+            if not pos_rows and not port_rows:
+                return 0
+            try:
+                async with transaction() as conn:
+                    if pos_rows:
+                        ids, px = zip(*pos_rows)
+                        await conn.execute(
+                            "update tradeapi_positions t set current_price=v.price, updated_at=now() "
+                            "from unnest(%s::bigint[], %s::numeric[]) as v(id, price) where t.id=v.id",
+                            (list(ids), list(px)))
+                    if port_rows:
+                        ids, totals = zip(*port_rows)
+                        await conn.execute(
+                            "update tradeapi_portfolios t set total_value=v.total, updated_at=now() "
+                            "from unnest(%s::bigint[], %s::numeric[]) as v(id, total) where t.id=v.id",
+                            (list(ids), list(totals)))
+            except Exception as e:
+                # beim nächsten Flush erneut versuchen
+                logger.warning(f"Valuation flush failed: {e}")
+                self._dirty_pos |= dirty_pos
+                self._dirty_port |= dirty_port
+                return 0
+            self.stats["flushes"] += 1
+            return len(pos_rows) + len(port_rows)
+
+    def info(self) -> Dict:
+        return {
+            "users": len(self._users),
+            "portfolios": len(self._ports),
+            "symbols": len(self._by_key),
+            "dirty": len(self._dirty_port),
+            **self.stats,
+        }
+
+
+valuation = PortfolioValuation()
+ticks.subscribe("trade_api_valuation", valuation.on_prices)
@@ -0,0 +1,48 @@
+"""Trade DEX Bot - Preis-Alerts (tradedex_alerts) an der gemeinsamen Alert-Engine
+
+Ticks liefert der Market-Data-Ingestor nach jedem Refresh (market_data.py).
+"""
+
+import asyncio
+import logging
+from typing import List, Tuple
+
+from shared.alerts import Alert, AlertSource, engine, side_of
+
+logger = logging.getLogger(__name__)
+
+SOURCE = "trade_dex"
+
+
+def to_alert(row) -> Alert:
+    key = (row.get("token_address") or row.get("symbol") or "").lower()
+    return Alert(SOURCE, int(row["id"]), int(row["user_id"]), key, side_of(row.get("condition_type")),
+                 float(row["condition_value"]), row.get("symbol") or "")
+
+
+async def load() -> List[Alert]:
+    from . import database
+
+    rows = await asyncio.to_thread(database.get_active_price_alerts)
+    alerts = []
+    for r in rows:
+        if side_of(r.get("condition_type")) and (r.get("token_address") or r.get("symbol")):
+            alerts.append(to_alert(r))
+    return alerts
+
+
+async def mark_triggered(hits: List[Tuple[Alert, float]]) -> None:
+    from . import database
+
+    ok = await asyncio.to_thread(database.mark_alerts_triggered, [(a.id, price) for a, price in hits])
+    if not ok:
+        raise RuntimeError("tradedex_alerts update failed")
+
+
+def _fmt(a: Alert, price: float) -> str:
+    word = "above" if a.side == "above" else "below"
+    return f"🔔 {a.label or a.key} is {word} ${a.threshold:,.8g} (now ${price:,.8g})"
+
+
+def register(app) -> None:
+    engine.register(AlertSource(SOURCE, load, mark_triggered, bot=getattr(app, "bot", None), fmt=_fmt))
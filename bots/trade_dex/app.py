@@ -10,9 +10,12 @@ try:
     from . import handlers
     from . import miniapp
     from . import database
+    from . import market_data
+    from . import alerts
+    from . import executor
 except ImportError as e:
     logger.error(f"Failed to import modules: {e}")
-    handlers = miniapp = database = None
+    handlers = miniapp = database = market_data = alerts = executor = None
 
 
 def register(app: Application):
@@ -25,10 +28,16 @@ def register(app: Application):
         miniapp.register_miniapp(app)
         logger.info("DEX miniapp registered")
 
+    if alerts:
+        alerts.register(app)
+
 
 def register_jobs(app: Application):
     """Register background jobs"""
-    pass
+    if market_data:
+        market_data.register_jobs(app)
+    if executor:
+        executor.register_jobs(app)
 
 
 def init_schema():
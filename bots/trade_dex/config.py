@@ -177,6 +177,17 @@ API_RATE_LIMITS = {
 # Request timeouts
 REQUEST_TIMEOUT = 30
 
+# Timeout je Provider beim parallelen Fan-out im ExchangeService (Sekunden)
+PROVIDER_TIMEOUTS = {
+    "okx": float(os.getenv("TRADEDEX_TIMEOUT_OKX", "3")),
+    "pancakeswap": float(os.getenv("TRADEDEX_TIMEOUT_PANCAKESWAP", "5")),
+    "aerodome": float(os.getenv("TRADEDEX_TIMEOUT_AERODOME", "5")),
+}
+# Gesamtbudget für eine Swap-Quote über alle DEXe
+SWAP_QUOTE_DEADLINE = float(os.getenv("TRADEDEX_SWAP_QUOTE_DEADLINE", "6"))
+# max. gleichzeitige OKX-Requests für Funding Rates
+FUNDING_RATE_CONCURRENCY = int(os.getenv("TRADEDEX_FUNDING_CONCURRENCY", "5"))
+
 # ============================================================================
 # CACHE CONFIGURATION
 # ============================================================================
@@ -189,6 +200,29 @@ CACHE_DURATIONS = {
     "balances": 300,       # 5 minutes
 }
 
+# Frische je Provider für den Request-Cache im ExchangeService (Sekunden)
+PROVIDER_CACHE_TTL = {
+    "okx": int(os.getenv("TRADEDEX_CACHE_TTL_OKX", "5")),
+    "pancakeswap": int(os.getenv("TRADEDEX_CACHE_TTL_PANCAKESWAP", "15")),
+    "aerodome": int(os.getenv("TRADEDEX_CACHE_TTL_AERODOME", "30")),
+}
+
+# Market-Data-Ingestor (market_data.py)
+MARKET_REFRESH_SECONDS = int(os.getenv("TRADEDEX_MARKET_REFRESH_SECONDS", "30"))
+MARKET_PERSIST_SECONDS = int(os.getenv("TRADEDEX_MARKET_PERSIST_SECONDS", "300"))
+# älter als das -> API fällt auf Live-Abfrage zurück
+MARKET_MAX_STALENESS_SECONDS = int(os.getenv("TRADEDEX_MARKET_MAX_STALENESS", "120"))
+MARKET_QUOTE_CURRENCY = "USDT"
+
+# Strategie-Executor (executor.py)
+EXECUTOR_TICK_SECONDS = int(os.getenv("TRADEDEX_EXECUTOR_TICK_SECONDS", "30"))
+EXECUTOR_WHEEL_SLOTS = int(os.getenv("TRADEDEX_EXECUTOR_WHEEL_SLOTS", "512"))
+EXECUTOR_RELOAD_SECONDS = int(os.getenv("TRADEDEX_EXECUTOR_RELOAD_SECONDS", "300"))
+EXECUTOR_CONCURRENCY = int(os.getenv("TRADEDEX_EXECUTOR_CONCURRENCY", "8"))
+# "simulate": Fills aus Snapshot-Quotes, nur als Execution protokolliert;
+# "submit": registrierter Submitter je DEX (schreibt Swaps + Strategie-Zähler)
+EXECUTOR_MODE = os.getenv("TRADEDEX_EXECUTOR_MODE", "simulate").lower()
+
 # ============================================================================
 # NOTIFICATION CONFIGURATION
 # ============================================================================
@@ -1,266 +1,36 @@
 """Trade DEX Bot - Database"""
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 import logging
-import os
 import json
 from typing import Optional
+from pathlib import Path
+
+from shared import pgpool
+from shared.migrations import run_migrations
 
 logger = logging.getLogger(__name__)
 
 def get_db_connection():
+    """Gepoolte Verbindung – conn.close() gibt sie an den Pool zurück."""
     try:
-        return psycopg2.connect(os.getenv("DATABASE_URL"))
+        return pgpool.connect("trade_dex")
     except Exception as e:
         logger.error(f"DB error: {e}")
         return None
 
-def migrate_tradedex_schema(cur) -> None:
-    """
-    Migration/Repair für ältere Deployments.
-    Fix: fehlende Spalten wie dex_name (CREATE TABLE IF NOT EXISTS ergänzt keine Columns).
-    """
-    # Pools
-    cur.execute("ALTER TABLE tradedex_pools ADD COLUMN IF NOT EXISTS pool_address VARCHAR(255);")
-    cur.execute("ALTER TABLE tradedex_pools ADD COLUMN IF NOT EXISTS dex_name VARCHAR(50);")
-    cur.execute("ALTER TABLE tradedex_pools ADD COLUMN IF NOT EXISTS tvl_usd DOUBLE PRECISION DEFAULT 0;")
-    cur.execute("ALTER TABLE tradedex_pools ADD COLUMN IF NOT EXISTS volume_24h_usd DOUBLE PRECISION DEFAULT 0;")
-    # Positions
-    cur.execute("ALTER TABLE tradedex_positions ADD COLUMN IF NOT EXISTS dex_name VARCHAR(50);")
-
-    # Unique constraint nur anlegen, wenn nicht vorhanden
-    cur.execute("""
-    DO $$
-    BEGIN
-        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'unique_pool') THEN
-            ALTER TABLE tradedex_pools ADD CONSTRAINT unique_pool UNIQUE (dex_name, pool_address);
-        END IF;
-        -- Constraint nur anlegen, wenn beide Spalten wirklich existieren
-        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'unique_pool')
-           AND EXISTS (
-               SELECT 1 FROM information_schema.columns
-               WHERE table_name='tradedex_pools' AND column_name='dex_name'
-           )
-           AND EXISTS (
-               SELECT 1 FROM information_schema.columns
-               WHERE table_name='tradedex_pools' AND column_name='pool_address'
-           )
-        THEN
-           ALTER TABLE tradedex_pools ADD CONSTRAINT unique_pool UNIQUE (dex_name, pool_address);
-        END IF;
-    END $$;
-    """)
+
+MIGRATIONS_DIR = Path(__file__).with_name("migrations")
+
 
 def init_all_schemas():
     """Initialize DEX database schemas"""
-    conn = get_db_connection()
-    if not conn:
-        return
-    
     try:
-        cur = conn.cursor()
-        
-        # ============ DEX Configuration ============
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradedex_dex_config (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(50) UNIQUE,
-                enabled BOOLEAN DEFAULT TRUE,
-                chain VARCHAR(50),
-                api_url VARCHAR(255),
-                subgraph_url VARCHAR(255),
-                config JSONB,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # ============ DEX Pools ============
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradedex_pools (
-                id SERIAL PRIMARY KEY,
-                dex_name VARCHAR(50),
-                pool_address VARCHAR(255) UNIQUE,
-                token_a VARCHAR(255),
-                token_b VARCHAR(255),
-                symbol_a VARCHAR(20),
-                symbol_b VARCHAR(20),
-                reserve_a NUMERIC(25,8),
-                reserve_b NUMERIC(25,8),
-                tvl_usd NUMERIC(18,2),
-                volume_24h NUMERIC(18,2),
-                fee_percent NUMERIC(5,4),
-                apr NUMERIC(8,4),
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                CONSTRAINT unique_pool UNIQUE(dex_name, pool_address)
-            )
-        """)
-        
-        # ============ User Pool Positions ============
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradedex_positions (
-                id SERIAL PRIMARY KEY,
-                user_id BIGINT NOT NULL,
-                pool_id INTEGER REFERENCES tradedex_pools(id),
-                dex_name VARCHAR(50),
-                liquidity_share NUMERIC(25,8),
-                token_a_amount NUMERIC(25,8),
-                token_b_amount NUMERIC(25,8),
-                value_usd NUMERIC(18,2),
-                unclaimed_fees NUMERIC(25,8),
-                entry_price NUMERIC(25,8),
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # ============ Swap History ============
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradedex_swaps (
-                id SERIAL PRIMARY KEY,
-                user_id BIGINT NOT NULL,
-                dex_name VARCHAR(50),
-                token_from VARCHAR(255),
-                token_to VARCHAR(255),
-                symbol_from VARCHAR(20),
-                symbol_to VARCHAR(20),
-                amount_in NUMERIC(25,8),
-                amount_out NUMERIC(25,8),
-                expected_amount_out NUMERIC(25,8),
-                price_impact NUMERIC(8,4),
-                slippage NUMERIC(8,4),
-                fee_paid NUMERIC(25,8),
-                tx_hash VARCHAR(255),
-                status VARCHAR(20),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # ============ Wallet Balances ============
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradedex_balances (
-                id SERIAL PRIMARY KEY,
-                user_id BIGINT NOT NULL,
-                token_address VARCHAR(255),
-                symbol VARCHAR(20),
-                amount NUMERIC(25,8),
-                amount_usd NUMERIC(18,2),
-                chain VARCHAR(50),
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                CONSTRAINT unique_balance UNIQUE(user_id, token_address)
-            )
-        """)
-        
-        # ============ Trading Alerts ============
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradedex_alerts (
-                id SERIAL PRIMARY KEY,
-                user_id BIGINT NOT NULL,
-                alert_type VARCHAR(50),
-                token_address VARCHAR(255),
-                symbol VARCHAR(20),
-                condition_type VARCHAR(50),
-                condition_value NUMERIC(25,8),
-                current_value NUMERIC(25,8),
-                active BOOLEAN DEFAULT TRUE,
-                triggered BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                triggered_at TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # ============ Trading Strategies ============
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradedex_strategies (
-                id SERIAL PRIMARY KEY,
-                user_id BIGINT NOT NULL,
-                name VARCHAR(255) NOT NULL,
-                strategy_type VARCHAR(50),
-                dex_name VARCHAR(50),
-                token_from VARCHAR(255),
-                token_to VARCHAR(255),
-                config JSONB,
-                active BOOLEAN DEFAULT TRUE,
-                total_executed NUMERIC(25,8),
-                total_profit_loss NUMERIC(25,8),
-                start_at TIMESTAMP,
-                end_at TIMESTAMP,
-                last_executed TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # ============ Strategy Executions ============
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradedex_strategy_executions (
-                id SERIAL PRIMARY KEY,
-                strategy_id INTEGER REFERENCES tradedex_strategies(id),
-                user_id BIGINT NOT NULL,
-                executed_amount NUMERIC(25,8),
-                received_amount NUMERIC(25,8),
-                price NUMERIC(25,8),
-                tx_hash VARCHAR(255),
-                status VARCHAR(20),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # ============ Token Price History ============
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradedex_price_history (
-                id SERIAL PRIMARY KEY,
-                token_address VARCHAR(255),
-                symbol VARCHAR(20),
-                chain VARCHAR(50),
-                price_usd NUMERIC(25,8),
-                price_change_24h NUMERIC(8,4),
-                volume_24h NUMERIC(25,2),
-                market_cap NUMERIC(25,2),
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # ============ User Settings ============
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tradedex_user_settings (
-                id SERIAL PRIMARY KEY,
-                user_id BIGINT UNIQUE NOT NULL,
-                default_dex VARCHAR(50),
-                default_slippage NUMERIC(5,2),
-                default_gas_price VARCHAR(50),
-                notifications_enabled BOOLEAN DEFAULT TRUE,
-                alert_threshold_pct NUMERIC(5,2),
-                auto_approve_swaps BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Create indexes for faster queries
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tradedex_swaps_user_id ON tradedex_swaps(user_id)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tradedex_positions_user_id ON tradedex_positions(user_id)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tradedex_balances_user_id ON tradedex_balances(user_id)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tradedex_alerts_user_id ON tradedex_alerts(user_id)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tradedex_strategies_user_id ON tradedex_strategies(user_id)")
-        migrate_tradedex_schema(cur)
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tradedex_pools_dex ON tradedex_pools(dex_name);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tradedex_price_history_token ON tradedex_price_history(token_address, timestamp DESC)")
-        
-        conn.commit()
-        logger.info("DEX schemas initialized successfully")
+        run_migrations("trade_dex", MIGRATIONS_DIR)
+        return True
     except Exception as e:
-        logger.error(f"Schema error: {e}")
-        conn.rollback()
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
+        logger.error(f"Schema migration error: {e}")
+        return False
 
 
 def get_pools() -> list:
@@ -310,20 +80,58 @@ def get_user_positions(user_id: int) -> list:
 
 def log_swap(user_id: int, token_from: str, token_to: str, amount_in: float, amount_out: float, tx_hash: str) -> bool:
     """Log a swap transaction"""
+    return log_execution_batch(swaps=[{
+        "user_id": user_id, "token_from": token_from, "token_to": token_to,
+        "amount_in": amount_in, "amount_out": amount_out, "tx_hash": tx_hash,
+    }])
+
+
+_SWAP_COLUMNS = ("user_id", "dex_name", "token_from", "token_to", "amount_in", "amount_out",
+                 "expected_amount_out", "price_impact", "slippage", "fee_paid", "tx_hash", "status")
+_EXECUTION_COLUMNS = ("strategy_id", "user_id", "executed_amount", "received_amount", "price", "tx_hash", "status")
+
+
+def log_execution_batch(executions: Optional[list] = None, swaps: Optional[list] = None) -> bool:
+    """Write strategy executions and swaps (dicts) in one transaction.
+
+    Submitted executions also bump last_executed / total_executed of their strategy;
+    simulated ones are only logged.
+    """
+    executions, swaps = executions or [], swaps or []
+    if not executions and not swaps:
+        return True
     conn = get_db_connection()
     if not conn:
         return False
     
+    cur = None
     try:
         cur = conn.cursor()
-        cur.execute("""
-            INSERT INTO tradedex_swaps (user_id, token_from, token_to, amount_in, amount_out, tx_hash)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """, (user_id, token_from, token_to, amount_in, amount_out, tx_hash))
+        if swaps:
+            execute_values(cur, f"INSERT INTO tradedex_swaps ({', '.join(_SWAP_COLUMNS)}) VALUES %s",
+                           [tuple(s.get(c) for c in _SWAP_COLUMNS) for s in swaps])
+        if executions:
+            execute_values(cur, f"INSERT INTO tradedex_strategy_executions ({', '.join(_EXECUTION_COLUMNS)}) VALUES %s",
+                           [tuple(e.get(c, "pending" if c == "status" else None) for c in _EXECUTION_COLUMNS)
+                            for e in executions])
+            totals: dict = {}
+            for e in executions:
+                if e.get("strategy_id") and e.get("status") == "submitted":
+                    totals[e["strategy_id"]] = totals.get(e["strategy_id"], 0.0) + float(e.get("executed_amount") or 0)
+            if totals:
+                execute_values(cur, """
+                    UPDATE tradedex_strategies AS s
+                    SET last_executed = CURRENT_TIMESTAMP,
+                        total_executed = COALESCE(s.total_executed, 0) + v.amount,
+                        updated_at = CURRENT_TIMESTAMP
+                    FROM (VALUES %s) AS v(id, amount)
+                    WHERE s.id = v.id
+                """, list(totals.items()), template="(%s::int, %s::numeric)")
         conn.commit()
         return True
     except Exception as e:
-        logger.error(f"Error logging swap: {e}")
+        logger.error(f"Error logging executions: {e}")
+        conn.rollback()
         return False
     finally:
         if cur:
@@ -387,6 +195,62 @@ def get_user_alerts(user_id: int, active_only: bool = True) -> list:
             conn.close()
 
 
+def get_active_price_alerts() -> list:
+    """All active, not yet triggered alerts (for the alert engine)"""
+    conn = get_db_connection()
+    if not conn:
+        return []
+    
+    cur = None
+    try:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute("""
+            SELECT id, user_id, token_address, symbol, condition_type, condition_value
+            FROM tradedex_alerts
+            WHERE active = TRUE AND COALESCE(triggered, FALSE) = FALSE AND condition_value > 0
+        """)
+        return cur.fetchall()
+    except Exception as e:
+        logger.error(f"Error fetching active alerts: {e}")
+        raise
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+
+
+def mark_alerts_triggered(rows: list) -> bool:
+    """Mark alerts as triggered in one statement; rows: (alert_id, current_value)"""
+    if not rows:
+        return True
+    conn = get_db_connection()
+    if not conn:
+        return False
+    
+    cur = None
+    try:
+        cur = conn.cursor()
+        execute_values(cur, """
+            UPDATE tradedex_alerts AS a
+            SET triggered = TRUE, active = FALSE, current_value = v.current_value,
+                triggered_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+            FROM (VALUES %s) AS v(id, current_value)
+            WHERE a.id = v.id
+        """, rows, template="(%s::int, %s::numeric)")
+        conn.commit()
+        return True
+    except Exception as e:
+        logger.error(f"Error marking alerts triggered: {e}")
+        conn.rollback()
+        return False
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+
+
 def delete_alert(alert_id: int) -> bool:
     """Delete an alert"""
     conn = get_db_connection()
@@ -483,22 +347,37 @@ def update_strategy_status(strategy_id: int, active: bool) -> bool:
 
 def log_strategy_execution(strategy_id: int, user_id: int, amount: float, received: float, tx_hash: str) -> bool:
     """Log a strategy execution"""
+    return log_execution_batch(executions=[{
+        "strategy_id": strategy_id, "user_id": user_id, "executed_amount": amount,
+        "received_amount": received, "tx_hash": tx_hash, "status": "pending",
+    }])
+
+
+def get_active_strategies() -> list:
+    """All active strategies (for the strategy executor).
+
+    last_run_at is the latest logged execution, simulated ones included; last_executed
+    only moves on submitted swaps.
+    """
     conn = get_db_connection()
     if not conn:
-        return False
+        return []
     
+    cur = None
     try:
-        cur = conn.cursor()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
         cur.execute("""
-            INSERT INTO tradedex_strategy_executions 
-            (strategy_id, user_id, executed_amount, received_amount, tx_hash, status)
-            VALUES (%s, %s, %s, %s, %s, 'pending')
-        """, (strategy_id, user_id, amount, received, tx_hash))
-        conn.commit()
-        return True
+            SELECT s.id, s.user_id, s.name, s.strategy_type, s.dex_name, s.token_from, s.token_to, s.config,
+                   s.start_at, s.end_at, s.last_executed,
+                   (SELECT MAX(e.created_at) FROM tradedex_strategy_executions e
+                    WHERE e.strategy_id = s.id) AS last_run_at
+            FROM tradedex_strategies s
+            WHERE s.active = TRUE AND (s.end_at IS NULL OR s.end_at > CURRENT_TIMESTAMP)
+        """)
+        return cur.fetchall()
     except Exception as e:
-        logger.error(f"Error logging strategy execution: {e}")
-        return False
+        logger.error(f"Error fetching active strategies: {e}")
+        raise
     finally:
         if cur:
             cur.close()
@@ -677,6 +556,47 @@ def save_pool_data(dex_name: str, pool_address: str, token_a: str, token_b: str,
             conn.close()
 
 
+def save_pools_bulk(rows: list) -> int:
+    """Bulk-Upsert von Pool-Snapshots (ein Statement statt eines Roundtrips pro Pool)
+
+    rows: Tupel (dex_name, pool_address, token_a, token_b, symbol_a, symbol_b,
+                 reserve_a, reserve_b, tvl_usd, volume_24h, fee_percent, apr)
+    """
+    if not rows:
+        return 0
+    conn = get_db_connection()
+    if not conn:
+        return 0
+    
+    cur = None
+    try:
+        cur = conn.cursor()
+        execute_values(cur, """
+            INSERT INTO tradedex_pools
+            (dex_name, pool_address, token_a, token_b, symbol_a, symbol_b,
+             reserve_a, reserve_b, tvl_usd, volume_24h, fee_percent, apr)
+            VALUES %s
+            ON CONFLICT (dex_name, pool_address)
+            DO UPDATE SET reserve_a = EXCLUDED.reserve_a,
+                          reserve_b = EXCLUDED.reserve_b,
+                          tvl_usd = EXCLUDED.tvl_usd,
+                          volume_24h = EXCLUDED.volume_24h,
+                          apr = EXCLUDED.apr,
+                          last_updated = CURRENT_TIMESTAMP
+        """, rows, page_size=500)
+        conn.commit()
+        return len(rows)
+    except Exception as e:
+        logger.error(f"Error bulk saving pools: {e}")
+        conn.rollback()
+        return 0
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+
+
 def get_top_pools(dex_name: Optional[str] = None, limit: int = 20) -> list:
     """Get top pools by TVL"""
     conn = get_db_connection()
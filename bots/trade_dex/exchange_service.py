@@ -7,6 +7,16 @@ from enum import Enum
 import asyncio
 import os
 
+from shared.cache import AsyncTTLCache
+from shared.candles import get_store as get_candle_store, to_okx_rows
+
+from .config import (
+    CACHE_DURATIONS,
+    FUNDING_RATE_CONCURRENCY,
+    PROVIDER_CACHE_TTL,
+    PROVIDER_TIMEOUTS,
+    SWAP_QUOTE_DEADLINE,
+)
 from .providers import (
     PancakeSwapProvider,
     AerodomeProvider,
@@ -57,6 +67,39 @@ class ExchangeService:
         self.okx_api_key = okx_api_key or os.getenv("OKX_API_KEY")
         self.okx_secret = okx_secret or os.getenv("OKX_SECRET_KEY")
         self.okx_passphrase = okx_passphrase or os.getenv("OKX_PASSPHRASE")
+        
+        # Single-Flight + TTL je Provider/Methode/Argumente
+        self.cache = AsyncTTLCache("trade_dex")
+    
+    async def _cached(self, provider: str, key: tuple, fetch, ttl: Optional[float] = None):
+        """Upstream-Call über den Request-Cache (gleichzeitige identische Calls teilen sich einen)"""
+        return await self.cache.get_or_fetch(
+            (provider, *key), PROVIDER_CACHE_TTL.get(provider, 10) if ttl is None else ttl, fetch
+        )
+    
+    async def _timed(self, provider: str, coro, default=None):
+        """Provider-Call mit eigenem Timeout; Fehler/Timeout -> default"""
+        try:
+            return await asyncio.wait_for(coro, PROVIDER_TIMEOUTS.get(provider, 5))
+        except asyncio.TimeoutError:
+            logger.debug(f"{provider} timed out after {PROVIDER_TIMEOUTS.get(provider, 5)}s")
+        except Exception as e:
+            logger.debug(f"{provider} error: {e}")
+        return default
+    
+    def cache_stats(self) -> Dict:
+        return self.cache.stats()
+    
+    async def _okx_tickers(self) -> Dict[str, Dict]:
+        """Alle OKX-Spot-Ticker (ein Request) als instId -> Ticker"""
+        async def fetch():
+            return {t["instId"]: t for t in await self.okx.get_tickers() if t.get("instId")}
+        return await self._cached("okx", ("tickers", "SPOT"), fetch)
+    
+    async def _aerodome_pools(self) -> List[Dict]:
+        """Komplette Aerodome-Poolliste, einmal pro TTL geladen und lokal gefiltert"""
+        return await self._cached("aerodome", ("pools",), self.aerodome.get_pools,
+                                  ttl=CACHE_DURATIONS.get("pools", 300))
     
     async def init(self):
         """Initialize all providers"""
@@ -127,14 +170,18 @@ class ExchangeService:
         
         if dex in (None, "pancakeswap") and self.pancake:
             try:
-                token_pools = await self.pancake.get_liquidity_pools_for_token(token)
+                token_pools = await self._cached(
+                    "pancakeswap", ("pools_for_token", token.lower()),
+                    lambda: self.pancake.get_liquidity_pools_for_token(token),
+                    ttl=CACHE_DURATIONS.get("pools", 300)
+                )
                 pools.extend([{**p, "dex": "pancakeswap"} for p in token_pools])
             except Exception as e:
                 logger.error(f"Error fetching PancakeSwap pools: {e}")
         
         if dex in (None, "aerodome") and self.aerodome:
             try:
-                token_pools = await self.aerodome.get_pools()
+                token_pools = await self._aerodome_pools()
                 # Filter for pools containing the token
                 filtered = [p for p in token_pools 
                           if token.lower() in [p.get("token0", {}).get("id", "").lower(),
@@ -150,18 +197,18 @@ class ExchangeService:
         try:
             if dex == "okx" and self.okx:
                 # Try OKX
-                ticker = await self.okx.get_ticker(token)
+                ticker = await self._cached("okx", ("ticker", token), lambda: self.okx.get_ticker(token))
                 if ticker:
                     return float(ticker.get("last", 0))
             
             # Fallback to others
             if self.pancake:
-                price = await self.pancake.get_price(token)
+                price = await self._pancake_price(token)
                 if price:
                     return price
             
             if self.aerodome:
-                prices = await self.aerodome.get_prices_batch([token])
+                prices = await self._aerodome_prices([token])
                 if token.lower() in prices:
                     return prices[token.lower()]
         except Exception as e:
@@ -170,40 +217,53 @@ class ExchangeService:
         return None
     
     async def get_prices_multi(self, tokens: List[str]) -> Dict[str, float]:
-        """Get prices for multiple tokens from best available source"""
-        prices = {}
+        """Get prices for multiple tokens from best available source
         
-        # Try OKX first if available
-        if self.okx:
-            try:
-                # Map to OKX instrument IDs (e.g., BTC-USD, ETH-USD)
-                results = await self.okx.get_price_24h_change([f"{t.upper()}-USDT" for t in tokens])
-                for token in tokens:
-                    key = f"{token.upper()}-USDT"
-                    if key in results:
-                        prices[token.lower()] = results[key]["last_price"]
-            except Exception as e:
-                logger.debug(f"OKX multi-price error: {e}")
+        Alle Provider laufen parallel (je mit eigenem Timeout); bei mehreren
+        Treffern gilt die Priorität OKX > PancakeSwap > Aerodome.
+        """
+        if not tokens:
+            return {}
         
-        # Fill gaps from other sources
-        missing = [t for t in tokens if t.lower() not in prices]
+        async def okx_prices() -> Dict[str, float]:
+            # Map to OKX instrument IDs (e.g., BTC-USDT, ETH-USDT)
+            tickers = await self._okx_tickers()
+            out = {}
+            for token in tokens:
+                ticker = tickers.get(f"{token.upper()}-USDT")
+                if ticker:
+                    out[token.lower()] = float(ticker.get("last", 0))
+            return out
         
-        if missing and self.pancake:
-            try:
-                pancake_prices = await self.pancake.get_prices_batch(missing)
-                prices.update(pancake_prices)
-            except Exception as e:
-                logger.debug(f"PancakeSwap batch price error: {e}")
+        async def pancake_prices() -> Dict[str, float]:
+            results = await asyncio.gather(*(self._pancake_price(t) for t in tokens),
+                                           return_exceptions=True)
+            return {t.lower(): p for t, p in zip(tokens, results) if isinstance(p, float)}
         
-        if missing and self.aerodome:
-            try:
-                aerodome_prices = await self.aerodome.get_prices_batch(missing)
-                prices.update(aerodome_prices)
-            except Exception as e:
-                logger.debug(f"Aerodome batch price error: {e}")
+        sources = []
+        if self.okx:
+            sources.append(("okx", okx_prices()))
+        if self.pancake:
+            sources.append(("pancakeswap", pancake_prices()))
+        if self.aerodome:
+            sources.append(("aerodome", self._aerodome_prices(tokens)))
+        
+        results = await asyncio.gather(*(self._timed(name, coro, {}) for name, coro in sources))
         
+        prices = {}
+        for found in reversed(results):  # höchste Priorität zuletzt -> gewinnt
+            prices.update(found or {})
         return prices
     
+    async def _pancake_price(self, token: str) -> Optional[float]:
+        return await self._cached("pancakeswap", ("price", token.lower()),
+                                  lambda: self.pancake.get_price(token))
+    
+    async def _aerodome_prices(self, tokens: List[str]) -> Dict[str, float]:
+        key = tuple(sorted({t.lower() for t in tokens}))
+        return await self._cached("aerodome", ("prices", key),
+                                  lambda: self.aerodome.get_prices_batch(list(key)))
+    
     async def get_24h_volume(self, token: str, dex: Optional[str] = None) -> Optional[float]:
         """Get 24h trading volume"""
         if dex == "pancakeswap" or (not dex and self.pancake):
@@ -257,31 +317,47 @@ class ExchangeService:
         token_in: str,
         token_out: str,
         amount_in: Decimal,
-        slippage: float = 0.5
+        slippage: float = 0.5,
+        first_good: bool = False,
+        deadline: Optional[float] = None
     ) -> Dict:
-        """Find best swap route across all DEXes"""
-        
-        results = {}
+        """Find best swap route across all DEXes
         
+        Quotes laufen parallel (Latenz = max statt Summe der Provider).
+        first_good=True liefert die erste gültige Quote innerhalb der Deadline,
+        sonst wird bis zur Deadline auf alle gewartet und die beste gewählt.
+        """
+        quotes = {}
         if self.pancake:
-            try:
-                result = await self.pancake.calculate_swap_amount_out(
-                    token_in, token_out, amount_in, slippage
-                )
-                if "error" not in result:
-                    results["pancakeswap"] = result
-            except Exception as e:
-                logger.debug(f"PancakeSwap routing error: {e}")
-        
+            quotes["pancakeswap"] = self.pancake.calculate_swap_amount_out(
+                token_in, token_out, amount_in, slippage
+            )
         if self.aerodome:
-            try:
-                result = await self.aerodome.calculate_swap_output(
-                    token_in, token_out, amount_in, slippage
+            quotes["aerodome"] = self.aerodome.calculate_swap_output(
+                token_in, token_out, amount_in, slippage
+            )
+        
+        tasks = {asyncio.create_task(self._timed(name, coro)): name for name, coro in quotes.items()}
+        loop = asyncio.get_running_loop()
+        end = loop.time() + (deadline or SWAP_QUOTE_DEADLINE)
+        results = {}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, end - loop.time()), return_when=asyncio.FIRST_COMPLETED
                 )
-                if "error" not in result:
-                    results["aerodome"] = result
-            except Exception as e:
-                logger.debug(f"Aerodome routing error: {e}")
+                if not done:
+                    break
+                for task in done:
+                    result = task.result()
+                    if result and "error" not in result:
+                        results[tasks[task]] = result
+                if first_good and results:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
         
         # Find best route
         if results:
@@ -313,7 +389,17 @@ class ExchangeService:
         bar: str = "1H",
         limit: int = 100
     ) -> List:
-        """Get OHLC candlestick data from OKX"""
+        """Get OHLC candlestick data (OKX format, newest first)
+
+        Served from the shared candle store – only bars newer than the last
+        stored one are fetched from OKX, limit is no longer capped at 300.
+        """
+        try:
+            rows = await get_candle_store().get(token_pair, bar, limit)
+            if len(rows):
+                return to_okx_rows(rows)
+        except Exception as e:
+            logger.error(f"Candle store error: {e}")
         if self.okx:
             try:
                 return await self.okx.get_candlesticks(token_pair, bar, limit)
@@ -334,15 +420,27 @@ class ExchangeService:
     async def get_funding_rates(self, tokens: List[str]) -> Dict[str, Optional[float]]:
         """Get funding rates for perpetual contracts"""
         rates = {}
-        if self.okx:
-            try:
-                for token in tokens:
-                    inst_id = f"{token.upper()}-USDT-SWAP"
-                    funding = await self.okx.get_funding_rate(inst_id)
-                    if funding:
-                        rates[token] = funding["funding_rate"]
-            except Exception as e:
-                logger.error(f"Funding rate error: {e}")
+        if not self.okx or not tokens:
+            return rates
+        
+        # OKX hat keinen Batch-Endpoint für Funding Rates -> begrenzt parallel
+        sem = asyncio.Semaphore(FUNDING_RATE_CONCURRENCY)
+        
+        async def one(token: str):
+            inst_id = f"{token.upper()}-USDT-SWAP"
+            async with sem:
+                return await self._timed("okx", self._cached(
+                    "okx", ("funding_rate", inst_id), lambda: self.okx.get_funding_rate(inst_id),
+                    ttl=60
+                ))
+        
+        try:
+            results = await asyncio.gather(*(one(t) for t in tokens))
+            for token, funding in zip(tokens, results):
+                if funding:
+                    rates[token] = funding["funding_rate"]
+        except Exception as e:
+            logger.error(f"Funding rate error: {e}")
         return rates
     
     async def get_liquidity_positions(
@@ -375,3 +473,20 @@ async def create_exchange_service(
     )
     await service.init()
     return service
+
+
+_shared_service: Optional[ExchangeService] = None
+_shared_lock: Optional[asyncio.Lock] = None
+
+
+async def get_exchange_service() -> ExchangeService:
+    """App-weite ExchangeService-Instanz (Provider + HTTP-Pools werden wiederverwendet)"""
+    global _shared_service, _shared_lock
+    if _shared_service is not None:
+        return _shared_service
+    if _shared_lock is None:
+        _shared_lock = asyncio.Lock()
+    async with _shared_lock:
+        if _shared_service is None:
+            _shared_service = await create_exchange_service()
+    return _shared_service
@@ -0,0 +1,386 @@
+"""Trade DEX Bot - Strategie-Executor
+
+Aktive ``tradedex_strategies`` liegen in einem Timing Wheel (EXECUTOR_WHEEL_SLOTS
+Slots à EXECUTOR_TICK_SECONDS): Einplanen und Entnehmen kosten O(1) je
+Strategie, ein Tick schaut nur in die Slots seit dem letzten Tick, statt jede
+Strategie auf Fälligkeit zu prüfen.
+
+Je Tick:
+1. fällige Strategien aus dem Wheel nehmen
+2. gegen den aktuellen Market-Snapshot bewerten (dca/scheduled: fester Betrag,
+   grid: Level-Kreuzungen seit der letzten Bewertung)
+3. Swaps simulieren (Quote aus den Snapshot-Reserven) oder – mit
+   EXECUTOR_MODE=submit – über den registrierten Submitter des DEX einreichen,
+   höchstens EXECUTOR_CONCURRENCY gleichzeitig
+4. alle Executions/Swaps des Ticks in einer Transaktion schreiben
+   (``database.log_execution_batch``)
+
+Simulierte Fills landen nur als ``status='simulated'`` in
+``tradedex_strategy_executions`` – keine Zeilen in ``tradedex_swaps`` und kein
+last_executed/total_executed, die bleiben echten (eingereichten) Swaps vorbehalten.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .config import (
+    DCA_CONFIG,
+    GRID_CONFIG,
+    SCHEDULED_CONFIG,
+    EXECUTOR_CONCURRENCY,
+    EXECUTOR_MODE,
+    EXECUTOR_RELOAD_SECONDS,
+    EXECUTOR_TICK_SECONDS,
+    EXECUTOR_WHEEL_SLOTS,
+)
+from .market_data import DEX_FEES, MarketSnapshot, get_snapshot, quote_from_snapshot
+
+logger = logging.getLogger(__name__)
+
+# (strategy_row, token_in, token_out, amount_in, quote) -> tx_hash
+Submitter = Callable[[Dict, str, str, float, Dict], Awaitable[str]]
+SUBMITTERS: Dict[str, Submitter] = {}
+
+
+def set_submitter(dex: str, submitter: Submitter) -> None:
+    SUBMITTERS[dex] = submitter
+
+
+def _f(value, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _clamp(x: float, lo: float, hi: float) -> float:
+    return max(lo, min(hi, x))
+
+
+class TimeWheel:
+    """Hashed Timing Wheel: Slot = Fälligkeits-Tick mod Slots"""
+
+    def __init__(self, slots: int = EXECUTOR_WHEEL_SLOTS, tick_seconds: float = EXECUTOR_TICK_SECONDS,
+                 now: Optional[float] = None):
+        self.tick_seconds = tick_seconds
+        self._slots: List[Dict[int, int]] = [{} for _ in range(max(1, slots))]
+        self._where: Dict[int, int] = {}
+        self.current = self.tick_of(time.time() if now is None else now) - 1
+
+    def tick_of(self, ts: float) -> int:
+        return int(ts // self.tick_seconds)
+
+    def schedule(self, key: int, due_ts: float) -> None:
+        self.remove(key)
+        due = max(self.tick_of(due_ts), self.current + 1)
+        slot = due % len(self._slots)
+        self._slots[slot][key] = due
+        self._where[key] = slot
+
+    def remove(self, key: int) -> None:
+        slot = self._where.pop(key, None)
+        if slot is not None:
+            self._slots[slot].pop(key, None)
+
+    def advance(self, now: float) -> List[int]:
+        """Alle bis ``now`` fälligen Keys entnehmen"""
+        target = self.tick_of(now)
+        span = min(target - self.current, len(self._slots))
+        due: List[int] = []
+        for t in range(target - span + 1, target + 1):
+            slot = self._slots[t % len(self._slots)]
+            ready = [k for k, d in slot.items() if d <= target]
+            for k in ready:
+                del slot[k]
+                del self._where[k]
+            due.extend(ready)
+        self.current = max(self.current, target)
+        return due
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+
+@dataclass
+class _Strategy:
+    row: Dict
+    config: Dict
+    interval: float
+    grid_center: Optional[float] = None
+    grid_level: Optional[int] = None
+    runs: int = 0
+    last_run: Optional[float] = None
+
+    @property
+    def id(self) -> int:
+        return int(self.row["id"])
+
+    @property
+    def kind(self) -> str:
+        return (self.row.get("strategy_type") or "").lower()
+
+
+def _config(row: Dict) -> Dict:
+    cfg = row.get("config") or {}
+    if isinstance(cfg, str):
+        try:
+            cfg = json.loads(cfg)
+        except ValueError:
+            cfg = {}
+    return cfg if isinstance(cfg, dict) else {}
+
+
+def _interval(kind: str, cfg: Dict) -> Optional[float]:
+    if kind == "dca":
+        hours = _clamp(_f(cfg.get("interval_hours"), 24), DCA_CONFIG["min_interval_hours"], DCA_CONFIG["max_interval_hours"])
+        return hours * 3600
+    if kind == "scheduled":
+        minutes = _clamp(_f(cfg.get("interval_minutes"), 60),
+                         SCHEDULED_CONFIG["min_interval_minutes"], SCHEDULED_CONFIG["max_interval_minutes"])
+        return minutes * 60
+    if kind == "grid":
+        return EXECUTOR_TICK_SECONDS
+    return None
+
+
+def _ts(value) -> Optional[float]:
+    return value.timestamp() if hasattr(value, "timestamp") else None
+
+
+def _last_run(row: Dict) -> Optional[float]:
+    runs = [t for t in (_ts(row.get("last_run_at")), _ts(row.get("last_executed"))) if t]
+    return max(runs) if runs else None
+
+
+def _next_due(row: Dict, interval: float, last: Optional[float], now: float) -> float:
+    start = _ts(row.get("start_at")) or now
+    return max(start, last + interval if last else now)
+
+
+class StrategyExecutor:
+    def __init__(self, mode: str = EXECUTOR_MODE, concurrency: int = EXECUTOR_CONCURRENCY):
+        self.mode = mode
+        self.wheel = TimeWheel()
+        self.strategies: Dict[int, _Strategy] = {}
+        self._sem = asyncio.Semaphore(max(1, concurrency))
+        self._lock: Optional[asyncio.Lock] = None
+        self._loaded_at = 0.0
+        self._warned_submit = False
+        self.stats = {"ticks": 0, "evaluated": 0, "executed": 0, "failed": 0, "skipped_stale": 0, "reloads": 0}
+
+    # ---------------------------------------------------------- Laden
+
+    def request_reload(self) -> None:
+        """Nach Anlegen/Umschalten einer Strategie: beim nächsten Tick neu laden"""
+        self._loaded_at = 0.0
+
+    async def reload(self, now: Optional[float] = None) -> int:
+        from . import database
+
+        now = time.time() if now is None else now
+        rows = await asyncio.to_thread(database.get_active_strategies)
+        fresh: Dict[int, _Strategy] = {}
+        for row in rows:
+            row = dict(row)
+            cfg = _config(row)
+            interval = _interval((row.get("strategy_type") or "").lower(), cfg)
+            if interval is None:
+                continue
+            sid = int(row["id"])
+            old = self.strategies.get(sid)
+            if old is not None:
+                # Zustand (Grid-Level, Termin) behalten, Konfiguration übernehmen
+                changed = old.interval != interval
+                old.row, old.config, old.interval = row, cfg, interval
+                fresh[sid] = old
+                if changed:
+                    # neues Intervall gilt ab dem letzten Lauf, nicht erst nach dem alten Termin
+                    last = old.last_run or _last_run(row)
+                    self.wheel.schedule(sid, _next_due(row, interval, last, now))
+                continue
+            # letzter Lauf aus der DB (auch simulierte) – sonst liefe nach jedem Neustart alles sofort
+            st = _Strategy(row, cfg, interval, last_run=_last_run(row))
+            fresh[sid] = st
+            self.wheel.schedule(sid, _next_due(row, interval, st.last_run, now))
+        for sid in set(self.strategies) - set(fresh):
+            self.wheel.remove(sid)
+        self.strategies = fresh
+        self._loaded_at = time.monotonic()
+        self.stats["reloads"] += 1
+        return len(fresh)
+
+    # ---------------------------------------------------------- Bewertung
+
+    def _orders(self, st: _Strategy, snap: MarketSnapshot) -> List[Tuple[str, str, float]]:
+        """Swaps (token_in, token_out, amount_in) die jetzt fällig sind"""
+        row, cfg = st.row, st.config
+        t_from, t_to = row.get("token_from") or "", row.get("token_to") or ""
+        if st.kind in ("dca", "scheduled"):
+            amount = _f(cfg.get("amount"))
+            if st.kind == "dca":
+                amount = min(amount, DCA_CONFIG["max_amount"]) if amount >= DCA_CONFIG["min_amount"] else 0.0
+            return [(t_from, t_to, amount)] if amount > 0 else []
+
+        # grid: Level relativ zum Mittelpunkt; je gekreuztem Level ein Kauf (fallend) bzw. Verkauf (steigend)
+        price = snap.price(t_to)
+        if not price:
+            return []
+        levels = int(_clamp(_f(cfg.get("levels") or cfg.get("grid_levels"), 10),
+                            GRID_CONFIG["min_grid_levels"], GRID_CONFIG["max_grid_levels"]))
+        spread = _clamp(_f(cfg.get("spread_pct") or cfg.get("spread"), 2.0), GRID_CONFIG["min_spread"], GRID_CONFIG["max_spread"])
+        if st.grid_center is None:
+            st.grid_center = _f(cfg.get("center_price")) or price
+        step = st.grid_center * spread / 100.0
+        half = levels // 2
+        level = int(_clamp(math.floor((price - st.grid_center) / step), -half, half))
+        prev, st.grid_level = st.grid_level, level
+        if prev is None or level == prev:
+            return []
+        per_level = _f(cfg.get("amount_per_level") or cfg.get("amount"))
+        if per_level <= 0:
+            return []
+        crossed = abs(level - prev)
+        if level < prev:
+            return [(t_from, t_to, per_level * crossed)]
+        price_from = snap.price(t_from) or 1.0
+        return [(t_to, t_from, per_level * crossed * price_from / price)]
+
+    @staticmethod
+    def _quote(snap: MarketSnapshot, dex: str, token_in: str, token_out: str, amount: float,
+               slippage: float) -> Optional[Dict]:
+        quote = quote_from_snapshot(snap, token_in, token_out, Decimal(str(amount)), dex, slippage)
+        if quote is not None:
+            return quote
+        # kein Pool im Snapshot: über USD-Preise abschätzen
+        p_in, p_out = snap.price(token_in), snap.price(token_out)
+        if not p_in or not p_out:
+            return None
+        fee = float(DEX_FEES.get(dex, Decimal("0.003")))
+        out = amount * p_in / p_out * (1 - fee)
+        return {"amount_out": str(out), "min_amount_out": str(out * (100 - slippage) / 100),
+                "price_impact": 0.0, "slippage": slippage, "fee": str(amount * fee), "pool": None}
+
+    async def _execute(self, st: _Strategy, order: Tuple[str, str, float],
+                       snap: MarketSnapshot) -> Tuple[Dict, Optional[Dict]]:
+        token_in, token_out, amount = order
+        dex = (st.row.get("dex_name") or "pancakeswap").lower()
+        slippage = _f(st.config.get("slippage"), 0.5)
+        execution = {"strategy_id": st.id, "user_id": st.row["user_id"], "executed_amount": amount}
+        async with self._sem:
+            quote = self._quote(snap, dex, token_in, token_out, amount, slippage)
+            if quote is None:
+                return {**execution, "status": "no_quote"}, None
+            received = _f(quote["amount_out"])
+            submitter = SUBMITTERS.get(dex) if self.mode == "submit" else None
+            if self.mode == "submit" and submitter is None and not self._warned_submit:
+                self._warned_submit = True
+                logger.warning(f"Strategy executor: no submitter for {dex}, simulating")
+            if submitter is None:
+                # nur protokollieren – kein Swap, keine Zähler an der Strategie
+                execution.update(received_amount=received, price=amount / received if received else None,
+                                 status="simulated")
+                return execution, None
+            try:
+                tx_hash = await submitter(st.row, token_in, token_out, amount, quote)
+            except Exception as e:
+                logger.warning(f"Strategy {st.id} submit failed: {e}")
+                return {**execution, "status": "failed"}, None
+        status = "submitted"
+        execution.update(received_amount=received, price=amount / received if received else None,
+                         tx_hash=tx_hash, status=status)
+        swap = {
+            "user_id": st.row["user_id"], "dex_name": dex, "token_from": token_in, "token_to": token_out,
+            "amount_in": amount, "amount_out": received, "expected_amount_out": received,
+            "price_impact": quote.get("price_impact"), "slippage": slippage, "fee_paid": _f(quote.get("fee")),
+            "tx_hash": tx_hash, "status": status,
+        }
+        return execution, swap
+
+    # ---------------------------------------------------------- Tick
+
+    async def tick(self, now: Optional[float] = None) -> Dict:
+        from . import database
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.time() if now is None else now
+            if time.monotonic() - self._loaded_at >= EXECUTOR_RELOAD_SECONDS:
+                try:
+                    await self.reload(now)
+                except Exception as e:
+                    logger.error(f"Strategy reload failed: {e}")
+            self.stats["ticks"] += 1
+            due = [self.strategies[sid] for sid in self.wheel.advance(now) if sid in self.strategies]
+            if not due:
+                return {"due": 0}
+
+            snap = get_snapshot()
+            if not snap.is_fresh():
+                # ohne aktuelle Preise nichts ausführen, im nächsten Tick erneut
+                self.stats["skipped_stale"] += len(due)
+                for st in due:
+                    self.wheel.schedule(st.id, now + self.wheel.tick_seconds)
+                return {"due": len(due), "stale": True}
+
+            jobs = []
+            for st in due:
+                self.stats["evaluated"] += 1
+                try:
+                    orders = self._orders(st, snap)
+                except Exception as e:
+                    logger.warning(f"Strategy {st.id} evaluation failed: {e}")
+                    orders = []
+                jobs.extend(self._execute(st, o, snap) for o in orders)
+                st.runs += 1
+                st.last_run = now
+                self.wheel.schedule(st.id, now + st.interval)
+
+            results = await asyncio.gather(*jobs, return_exceptions=True)
+            executions, swaps = [], []
+            for r in results:
+                if isinstance(r, Exception):
+                    logger.warning(f"Strategy execution error: {r}")
+                    continue
+                executions.append(r[0])
+                if r[1]:
+                    swaps.append(r[1])
+            ok = sum(1 for e in executions if e["status"] in ("simulated", "submitted"))
+            self.stats["executed"] += ok
+            self.stats["failed"] += len(results) - ok
+            if executions:
+                await asyncio.to_thread(database.log_execution_batch, executions, swaps)
+            return {"due": len(due), "orders": len(jobs), "executed": ok}
+
+    def info(self) -> Dict:
+        return {"mode": self.mode, "strategies": len(self.strategies), "scheduled": len(self.wheel), **self.stats}
+
+
+executor = StrategyExecutor()
+
+
+async def tick_job(context) -> None:
+    """JobQueue-Callback"""
+    try:
+        res = await executor.tick()
+        if res.get("orders"):
+            logger.info(f"Strategy executor: {res}")
+    except Exception as e:
+        logger.error(f"Strategy executor error: {e}")
+
+
+def register_jobs(app) -> None:
+    if getattr(app, "job_queue", None):
+        app.job_queue.run_repeating(
+            tick_job,
+            interval=EXECUTOR_TICK_SECONDS,
+            first=20,
+            name="tradedex_strategy_executor",
+        )
+        logger.info(f"✅ DEX strategy executor registered ({EXECUTOR_TICK_SECONDS}s, {EXECUTOR_MODE})")
@@ -16,7 +16,7 @@ except ImportError:
 
 try:
     from . import database
-    from .exchange_service import create_exchange_service
+    from .exchange_service import get_exchange_service
 except ImportError as e:
     logger.error(f"Import error: {e}")
     database = None
@@ -119,7 +119,7 @@ async def cmd_pools(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def cmd_markets(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show market data from OKX"""
     try:
-        service = await create_exchange_service()
+        service = await get_exchange_service()
         
         # Get some top tokens
         tokens = ["BTC", "ETH", "EMRD", "TON", "SOL"]
@@ -137,7 +137,6 @@ async def cmd_markets(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         await update.message.reply_text(market_text, parse_mode="Markdown", reply_markup=keyboard)
         
-        await service.close()
     except Exception as e:
         logger.error(f"Error in markets command: {e}")
         await update.message.reply_text("❌ Fehler beim Laden der Marktdaten")
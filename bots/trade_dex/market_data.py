@@ -0,0 +1,305 @@
+"""Trade DEX Bot - Market-Data-Ingestor
+
+Ein Hintergrund-Job holt im Intervall (MARKET_REFRESH_SECONDS) alle OKX-Spot-Ticker
+(ein Request für alle Paare) sowie die Pools von PancakeSwap und Aerodome und
+veröffentlicht daraus einen versionierten, unveränderlichen Snapshot:
+
+    token -> Preis (USD), Symbol -> 24h-Statistik, Pool -> Reserven
+
+Die API liest nur noch diesen Snapshot (inkl. ``staleness_seconds``) und fragt
+die Provider nur dann live an, wenn der Snapshot zu alt ist oder der Wert fehlt.
+``tradedex_pools`` wird per Bulk-Upsert aus dem Snapshot aktualisiert, und jeder
+neue Stand wird als Preis-Tick veröffentlicht (shared/ticks.py – Alerts, Bewertung).
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from shared import ticks
+from .config import (
+    MARKET_MAX_STALENESS_SECONDS,
+    MARKET_PERSIST_SECONDS,
+    MARKET_QUOTE_CURRENCY,
+    MARKET_REFRESH_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Pool-Fee je DEX (wie in den Providern)
+DEX_FEES = {
+    "pancakeswap": Decimal("0.0025"),
+    "aerodome": Decimal("0.003"),
+}
+
+
+def _f(value, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """Unveränderlicher Marktdaten-Stand; wird bei jedem Refresh komplett ersetzt"""
+    version: int = 0
+    updated_at: float = 0.0
+    prices: Dict[str, float] = field(default_factory=dict)
+    stats_24h: Dict[str, Dict] = field(default_factory=dict)
+    pools: Dict[str, Dict] = field(default_factory=dict)
+    token_index: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    pair_index: Dict[Tuple[str, str], Tuple[str, ...]] = field(default_factory=dict)
+
+    @property
+    def staleness_seconds(self) -> Optional[float]:
+        if not self.updated_at:
+            return None
+        return round(time.time() - self.updated_at, 3)
+
+    def is_fresh(self, max_age: float = MARKET_MAX_STALENESS_SECONDS) -> bool:
+        age = self.staleness_seconds
+        return age is not None and age <= max_age
+
+    def meta(self) -> Dict:
+        return {
+            "snapshot_version": self.version,
+            "as_of": self.updated_at or None,
+            "staleness_seconds": self.staleness_seconds,
+        }
+
+    def price(self, token: str) -> Optional[float]:
+        return self.prices.get((token or "").lower())
+
+    def pools_for_token(self, token: str, dex: Optional[str] = None) -> List[Dict]:
+        keys = self.token_index.get((token or "").lower(), ())
+        return [self.pools[k] for k in keys if dex in (None, self.pools[k]["dex"])]
+
+    def pools_for_pair(self, token_a: str, token_b: str, dex: Optional[str] = None) -> List[Dict]:
+        pair = tuple(sorted(((token_a or "").lower(), (token_b or "").lower())))
+        keys = self.pair_index.get(pair, ())
+        return [self.pools[k] for k in keys if dex in (None, self.pools[k]["dex"])]
+
+
+def _pool_tokens(pool: Dict) -> Tuple[Dict, Dict]:
+    return pool.get("token0") or {}, pool.get("token1") or {}
+
+
+def _build_snapshot(version: int, tickers: List[Dict], pools: List[Dict]) -> MarketSnapshot:
+    prices: Dict[str, float] = {}
+    stats: Dict[str, Dict] = {}
+    suffix = f"-{MARKET_QUOTE_CURRENCY}"
+
+    for t in tickers:
+        inst_id = t.get("instId", "")
+        if not inst_id.endswith(suffix):
+            continue
+        last = _f(t.get("last"))
+        if last <= 0:
+            continue
+        symbol = inst_id[: -len(suffix)].lower()
+        open_24h = _f(t.get("open24h"))
+        prices[symbol] = last
+        stats[symbol] = {
+            "inst_id": inst_id,
+            "last_price": last,
+            "open_24h": open_24h,
+            "high_24h": _f(t.get("high24h")),
+            "low_24h": _f(t.get("low24h")),
+            "volume_24h": _f(t.get("vol24h")),
+            "change_24h_pct": ((last - open_24h) / open_24h * 100) if open_24h else 0.0,
+        }
+
+    pool_map: Dict[str, Dict] = {}
+    token_index: Dict[str, List[str]] = {}
+    pair_index: Dict[Tuple[str, str], List[str]] = {}
+    for p in pools:
+        address = (p.get("id") or "").lower()
+        if not address:
+            continue
+        key = f"{p['dex']}:{address}"
+        pool_map[key] = p
+        t0, t1 = _pool_tokens(p)
+        a0, a1 = (t0.get("id") or "").lower(), (t1.get("id") or "").lower()
+        for tok in {a0, a1, (t0.get("symbol") or "").lower(), (t1.get("symbol") or "").lower()} - {""}:
+            token_index.setdefault(tok, []).append(key)
+        if a0 and a1:
+            pair_index.setdefault(tuple(sorted((a0, a1))), []).append(key)
+
+        # DEX-Preis aus den Reserven ableiten (CEX-Preis hat Vorrang)
+        reserve_usd = _f(p.get("reserveUSD"))
+        for tok, reserve in ((t0, p.get("reserve0")), (t1, p.get("reserve1"))):
+            r = _f(reserve)
+            if reserve_usd > 0 and r > 0:
+                px = reserve_usd / 2 / r
+                for name in ((tok.get("id") or "").lower(), (tok.get("symbol") or "").lower()):
+                    if name and name not in prices:
+                        prices[name] = px
+
+    return MarketSnapshot(
+        version=version,
+        updated_at=time.time(),
+        prices=prices,
+        stats_24h=stats,
+        pools=pool_map,
+        token_index={k: tuple(v) for k, v in token_index.items()},
+        pair_index={k: tuple(v) for k, v in pair_index.items()},
+    )
+
+
+def _pool_rows(snapshot: MarketSnapshot) -> List[tuple]:
+    rows = []
+    for p in snapshot.pools.values():
+        t0, t1 = _pool_tokens(p)
+        rows.append((
+            p["dex"], p["id"].lower(),
+            t0.get("id"), t1.get("id"),
+            (t0.get("symbol") or "")[:20], (t1.get("symbol") or "")[:20],
+            _f(p.get("reserve0")), _f(p.get("reserve1")),
+            _f(p.get("reserveUSD")), _f(p.get("volumeUSD")),
+            float(DEX_FEES.get(p["dex"], 0)) * 100, _f(p.get("apr")),
+        ))
+    return rows
+
+
+def quote_from_snapshot(
+    snapshot: MarketSnapshot,
+    token_in: str,
+    token_out: str,
+    amount_in: Decimal,
+    dex: str,
+    slippage: float = 0.5,
+) -> Optional[Dict]:
+    """Constant-Product-Quote aus den Snapshot-Reserven (None, wenn Pool unbekannt)"""
+    pools = snapshot.pools_for_pair(token_in, token_out, dex)
+    if not pools:
+        return None
+    pool = max(pools, key=lambda p: _f(p.get("reserveUSD")))
+    t0, _ = _pool_tokens(pool)
+    if (t0.get("id") or "").lower() == token_in.lower():
+        reserve_in, reserve_out = Decimal(str(pool["reserve0"])), Decimal(str(pool["reserve1"]))
+    else:
+        reserve_in, reserve_out = Decimal(str(pool["reserve1"])), Decimal(str(pool["reserve0"]))
+    if reserve_in <= 0 or reserve_out <= 0:
+        return None
+
+    fee = DEX_FEES.get(dex, Decimal("0.003"))
+    amount_in_with_fee = amount_in * (1 - fee)
+    amount_out = (reserve_out * amount_in_with_fee) / (reserve_in + amount_in_with_fee)
+    price_impact = (amount_in / (reserve_in + amount_in)) * 100
+    min_amount = amount_out * (Decimal(100 - slippage) / Decimal(100))
+    return {
+        "amount_out": str(amount_out),
+        "min_amount_out": str(min_amount),
+        "price_impact": float(price_impact),
+        "slippage": slippage,
+        "fee": str(amount_in * fee),
+        "pool": pool["id"],
+    }
+
+
+class MarketDataIngestor:
+    """Hält den aktuellen Snapshot und aktualisiert ihn aus den Providern"""
+
+    def __init__(self):
+        self._snapshot = MarketSnapshot()
+        self._lock = asyncio.Lock()
+        self._last_persist = 0.0
+
+    @property
+    def snapshot(self) -> MarketSnapshot:
+        return self._snapshot
+
+    @staticmethod
+    async def _fetch(label: str, coro):
+        try:
+            return await coro
+        except Exception as e:
+            logger.warning(f"Market data {label} fetch failed: {e}")
+            return None
+
+    async def refresh(self) -> MarketSnapshot:
+        """Einen Refresh-Zyklus ausführen; fehlerhafte Quellen behalten ihren letzten Stand"""
+        from .exchange_service import get_exchange_service
+
+        async with self._lock:
+            service = await get_exchange_service()
+            prev = self._snapshot
+            tasks = {
+                "okx": service.okx.get_tickers() if service.okx else None,
+                "pancakeswap": service.pancake.get_pool_data() if service.pancake else None,
+                "aerodome": service.aerodome.get_pools() if service.aerodome else None,
+            }
+            labels = [k for k, v in tasks.items() if v is not None]
+            results = await asyncio.gather(*(self._fetch(k, tasks[k]) for k in labels))
+            fetched = dict(zip(labels, results))
+
+            tickers = fetched.get("okx")
+            if not tickers:
+                tickers = [{"instId": s["inst_id"], "last": s["last_price"], "open24h": s["open_24h"],
+                            "high24h": s["high_24h"], "low24h": s["low_24h"], "vol24h": s["volume_24h"]}
+                           for s in prev.stats_24h.values()]
+            pools: List[Dict] = []
+            for dex in ("pancakeswap", "aerodome"):
+                fresh = fetched.get(dex)
+                if fresh:
+                    pools.extend({**p, "dex": dex} for p in fresh)
+                else:
+                    pools.extend(p for p in prev.pools.values() if p["dex"] == dex)
+
+            if not any(fetched.values()):
+                logger.warning("Market data refresh: no provider returned data, keeping v%s", prev.version)
+                return prev
+
+            snap = _build_snapshot(prev.version + 1, tickers, pools)
+            self._snapshot = snap
+            logger.debug(f"Market snapshot v{snap.version}: {len(snap.prices)} prices, {len(snap.pools)} pools")
+
+            # Preis-Tick an Alert-Engine, Portfolio-Bewertung, … (shared/ticks.py)
+            results = await ticks.publish(snap.prices)
+            if results.get("alerts"):
+                logger.info(f"Market snapshot v{snap.version}: {results['alerts']} alerts triggered")
+
+            if fetched.get("pancakeswap") or fetched.get("aerodome"):
+                now = time.monotonic()
+                if now - self._last_persist >= MARKET_PERSIST_SECONDS:
+                    self._last_persist = now
+                    await self._persist(snap)
+            return snap
+
+    @staticmethod
+    async def _persist(snapshot: MarketSnapshot) -> None:
+        from . import database
+
+        rows = _pool_rows(snapshot)
+        saved = await asyncio.to_thread(database.save_pools_bulk, rows)
+        logger.info(f"Market snapshot v{snapshot.version}: {saved} pools persisted")
+
+
+ingestor = MarketDataIngestor()
+
+
+def get_snapshot() -> MarketSnapshot:
+    return ingestor.snapshot
+
+
+async def refresh_job(context) -> None:
+    """JobQueue-Callback"""
+    try:
+        await ingestor.refresh()
+    except Exception as e:
+        logger.error(f"Market data refresh error: {e}")
+
+
+def register_jobs(app) -> None:
+    if getattr(app, "job_queue", None):
+        app.job_queue.run_repeating(
+            refresh_job,
+            interval=MARKET_REFRESH_SECONDS,
+            first=5,
+            name="tradedex_market_data",
+        )
+        logger.info(f"✅ DEX market data job registered ({MARKET_REFRESH_SECONDS}s)")
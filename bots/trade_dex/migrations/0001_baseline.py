@@ -0,0 +1,234 @@
+"""0001 – Bestandsschema des Trade-DEX-Bots (früher bei jedem Boot via init_all_schemas).
+
+Das DDL ist hier eingefroren: Schemaänderungen gehören in eine neue
+Migrationsdatei, nicht in diese Datei oder in database.py.
+"""
+
+
+def _repair_columns(cur) -> None:
+    """
+    Migration/Repair für ältere Deployments.
+    Fix: fehlende Spalten wie dex_name (CREATE TABLE IF NOT EXISTS ergänzt keine Columns).
+    """
+    # Pools
+    cur.execute("ALTER TABLE tradedex_pools ADD COLUMN IF NOT EXISTS pool_address VARCHAR(255);")
+    cur.execute("ALTER TABLE tradedex_pools ADD COLUMN IF NOT EXISTS dex_name VARCHAR(50);")
+    cur.execute("ALTER TABLE tradedex_pools ADD COLUMN IF NOT EXISTS tvl_usd DOUBLE PRECISION DEFAULT 0;")
+    cur.execute("ALTER TABLE tradedex_pools ADD COLUMN IF NOT EXISTS volume_24h_usd DOUBLE PRECISION DEFAULT 0;")
+    # Positions
+    cur.execute("ALTER TABLE tradedex_positions ADD COLUMN IF NOT EXISTS dex_name VARCHAR(50);")
+
+    # Unique constraint nur anlegen, wenn nicht vorhanden
+    cur.execute("""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'unique_pool') THEN
+            ALTER TABLE tradedex_pools ADD CONSTRAINT unique_pool UNIQUE (dex_name, pool_address);
+        END IF;
+        -- Constraint nur anlegen, wenn beide Spalten wirklich existieren
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'unique_pool')
+           AND EXISTS (
+               SELECT 1 FROM information_schema.columns
+               WHERE table_name='tradedex_pools' AND column_name='dex_name'
+           )
+           AND EXISTS (
+               SELECT 1 FROM information_schema.columns
+               WHERE table_name='tradedex_pools' AND column_name='pool_address'
+           )
+        THEN
+           ALTER TABLE tradedex_pools ADD CONSTRAINT unique_pool UNIQUE (dex_name, pool_address);
+        END IF;
+    END $$;
+    """)
+
+
+def upgrade(cur):
+    # ============ DEX Configuration ============
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tradedex_dex_config (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(50) UNIQUE,
+            enabled BOOLEAN DEFAULT TRUE,
+            chain VARCHAR(50),
+            api_url VARCHAR(255),
+            subgraph_url VARCHAR(255),
+            config JSONB,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # ============ DEX Pools ============
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tradedex_pools (
+            id SERIAL PRIMARY KEY,
+            dex_name VARCHAR(50),
+            pool_address VARCHAR(255) UNIQUE,
+            token_a VARCHAR(255),
+            token_b VARCHAR(255),
+            symbol_a VARCHAR(20),
+            symbol_b VARCHAR(20),
+            reserve_a NUMERIC(25,8),
+            reserve_b NUMERIC(25,8),
+            tvl_usd NUMERIC(18,2),
+            volume_24h NUMERIC(18,2),
+            fee_percent NUMERIC(5,4),
+            apr NUMERIC(8,4),
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT unique_pool UNIQUE(dex_name, pool_address)
+        )
+    """)
+    
+    # ============ User Pool Positions ============
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tradedex_positions (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            pool_id INTEGER REFERENCES tradedex_pools(id),
+            dex_name VARCHAR(50),
+            liquidity_share NUMERIC(25,8),
+            token_a_amount NUMERIC(25,8),
+            token_b_amount NUMERIC(25,8),
+            value_usd NUMERIC(18,2),
+            unclaimed_fees NUMERIC(25,8),
+            entry_price NUMERIC(25,8),
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # ============ Swap History ============
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tradedex_swaps (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            dex_name VARCHAR(50),
+            token_from VARCHAR(255),
+            token_to VARCHAR(255),
+            symbol_from VARCHAR(20),
+            symbol_to VARCHAR(20),
+            amount_in NUMERIC(25,8),
+            amount_out NUMERIC(25,8),
+            expected_amount_out NUMERIC(25,8),
+            price_impact NUMERIC(8,4),
+            slippage NUMERIC(8,4),
+            fee_paid NUMERIC(25,8),
+            tx_hash VARCHAR(255),
+            status VARCHAR(20),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # ============ Wallet Balances ============
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tradedex_balances (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            token_address VARCHAR(255),
+            symbol VARCHAR(20),
+            amount NUMERIC(25,8),
+            amount_usd NUMERIC(18,2),
+            chain VARCHAR(50),
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT unique_balance UNIQUE(user_id, token_address)
+        )
+    """)
+    
+    # ============ Trading Alerts ============
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tradedex_alerts (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            alert_type VARCHAR(50),
+            token_address VARCHAR(255),
+            symbol VARCHAR(20),
+            condition_type VARCHAR(50),
+            condition_value NUMERIC(25,8),
+            current_value NUMERIC(25,8),
+            active BOOLEAN DEFAULT TRUE,
+            triggered BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            triggered_at TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # ============ Trading Strategies ============
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tradedex_strategies (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            name VARCHAR(255) NOT NULL,
+            strategy_type VARCHAR(50),
+            dex_name VARCHAR(50),
+            token_from VARCHAR(255),
+            token_to VARCHAR(255),
+            config JSONB,
+            active BOOLEAN DEFAULT TRUE,
+            total_executed NUMERIC(25,8),
+            total_profit_loss NUMERIC(25,8),
+            start_at TIMESTAMP,
+            end_at TIMESTAMP,
+            last_executed TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # ============ Strategy Executions ============
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tradedex_strategy_executions (
+            id SERIAL PRIMARY KEY,
+            strategy_id INTEGER REFERENCES tradedex_strategies(id),
+            user_id BIGINT NOT NULL,
+            executed_amount NUMERIC(25,8),
+            received_amount NUMERIC(25,8),
+            price NUMERIC(25,8),
+            tx_hash VARCHAR(255),
+            status VARCHAR(20),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # ============ Token Price History ============
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tradedex_price_history (
+            id SERIAL PRIMARY KEY,
+            token_address VARCHAR(255),
+            symbol VARCHAR(20),
+            chain VARCHAR(50),
+            price_usd NUMERIC(25,8),
+            price_change_24h NUMERIC(8,4),
+            volume_24h NUMERIC(25,2),
+            market_cap NUMERIC(25,2),
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # ============ User Settings ============
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tradedex_user_settings (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT UNIQUE NOT NULL,
+            default_dex VARCHAR(50),
+            default_slippage NUMERIC(5,2),
+            default_gas_price VARCHAR(50),
+            notifications_enabled BOOLEAN DEFAULT TRUE,
+            alert_threshold_pct NUMERIC(5,2),
+            auto_approve_swaps BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Create indexes for faster queries
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tradedex_swaps_user_id ON tradedex_swaps(user_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tradedex_positions_user_id ON tradedex_positions(user_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tradedex_balances_user_id ON tradedex_balances(user_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tradedex_alerts_user_id ON tradedex_alerts(user_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tradedex_strategies_user_id ON tradedex_strategies(user_id)")
+    _repair_columns(cur)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tradedex_pools_dex ON tradedex_pools(dex_name);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tradedex_price_history_token ON tradedex_price_history(token_address, timestamp DESC)")
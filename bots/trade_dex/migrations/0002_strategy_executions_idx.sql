@@ -0,0 +1,3 @@
+-- 0002 – letzter Lauf je Strategie (Executor-Reload) ohne Full Scan über die Executions
+create index if not exists idx_tradedex_strategy_executions_strategy
+    on tradedex_strategy_executions(strategy_id, created_at desc);
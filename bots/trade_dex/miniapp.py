@@ -45,7 +45,12 @@ def register_miniapp(app: Application):
 async def register_miniapp_routes(webapp: web.Application, app: Application):
     """Register HTTP routes for DEX operations"""
     from . import database
-    from .exchange_service import create_exchange_service
+    from .exchange_service import get_exchange_service
+    from .market_data import get_snapshot, quote_from_snapshot
+    from .routing import best_route
+    from . import alerts as dex_alerts
+    from .executor import executor as strategy_executor
+    from shared.alerts import engine as alert_engine, side_of
     
     # ============ POOL ENDPOINTS ============
     
@@ -73,13 +78,20 @@ async def register_miniapp_routes(webapp: web.Application, app: Application):
             token = data.get("token", "").lower()
             dex = data.get("dex")
             
-            service = await create_exchange_service()
-            pools = await service.get_pools_for_token(token, dex)
-            await service.close()
+            snapshot = get_snapshot()
+            pools = snapshot.pools_for_token(token, dex) if snapshot.is_fresh() else []
+            source = "snapshot"
+            if not pools:
+                # Snapshot enthält nur die Top-Pools – unbekannte Tokens live nachschlagen
+                service = await get_exchange_service()
+                pools = await service.get_pools_for_token(token, dex)
+                source = "live"
             
             return web.json_response({
                 "status": "ok",
-                "pools": pools
+                "pools": pools,
+                "source": source,
+                **snapshot.meta()
             })
         except Exception as e:
             logger.error(f"Pool search error: {e}")
@@ -99,20 +111,39 @@ async def register_miniapp_routes(webapp: web.Application, app: Application):
             dex = data.get("dex", "pancakeswap")
             slippage = float(data.get("slippage", 0.5))
             
-            service = await create_exchange_service()
-            
-            if data.get("best_route"):
-                # Find best route across all DEXes
-                result = await service.find_best_swap_route(token_in, token_out, amount_in, slippage)
-            else:
-                # Use specific DEX
-                result = await service.calculate_swap(token_in, token_out, amount_in, dex, slippage)
-            
-            await service.close()
+            snapshot = get_snapshot()
+            result = None
+            source = "snapshot"
+            
+            if snapshot.is_fresh():
+                if data.get("best_route"):
+                    # Multi-Hop / Split über alle DEXe, rein lokal
+                    result = best_route(
+                        snapshot, token_in, token_out, amount_in, slippage,
+                        max_hops=int(data.get("max_hops", 3)),
+                        split=data.get("split", True) is not False
+                    )
+                else:
+                    result = quote_from_snapshot(snapshot, token_in, token_out, amount_in, dex, slippage)
+            
+            if result is None:
+                source = "live"
+                service = await get_exchange_service()
+                if data.get("best_route"):
+                    # Find best route across all DEXes
+                    result = await service.find_best_swap_route(
+                        token_in, token_out, amount_in, slippage,
+                        first_good=bool(data.get("first_good"))
+                    )
+                else:
+                    # Use specific DEX
+                    result = await service.calculate_swap(token_in, token_out, amount_in, dex, slippage)
             
             return web.json_response({
                 "status": "ok",
-                "result": result
+                "result": result,
+                "source": source,
+                **snapshot.meta()
             })
         except Exception as e:
             logger.error(f"Swap calc error: {e}")
@@ -175,15 +206,21 @@ async def register_miniapp_routes(webapp: web.Application, app: Application):
             token = data.get("token")
             dex = data.get("dex", "okx")
             
-            service = await create_exchange_service()
-            price = await service.get_token_price(token, dex)
-            await service.close()
+            snapshot = get_snapshot()
+            price = snapshot.price(token) if snapshot.is_fresh() else None
+            source = "snapshot"
+            if price is None:
+                source = "live"
+                service = await get_exchange_service()
+                price = await service.get_token_price(token, dex)
             
             return web.json_response({
                 "status": "ok",
                 "token": token,
                 "price": float(price) if price else None,
-                "dex": dex
+                "dex": dex,
+                "source": source,
+                **snapshot.meta()
             })
         except Exception as e:
             logger.error(f"Price error: {e}")
@@ -197,13 +234,23 @@ async def register_miniapp_routes(webapp: web.Application, app: Application):
             data = await request.json()
             tokens = data.get("tokens", [])
             
-            service = await create_exchange_service()
-            prices = await service.get_prices_multi(tokens)
-            await service.close()
+            snapshot = get_snapshot()
+            prices = {}
+            if snapshot.is_fresh():
+                for token in tokens:
+                    price = snapshot.price(token)
+                    if price is not None:
+                        prices[token.lower()] = price
+            missing = [t for t in tokens if t.lower() not in prices]
+            if missing:
+                service = await get_exchange_service()
+                prices.update(await service.get_prices_multi(missing))
             
             return web.json_response({
                 "status": "ok",
-                "prices": prices
+                "prices": prices,
+                "live": missing,
+                **snapshot.meta()
             })
         except Exception as e:
             logger.error(f"Prices error: {e}")
@@ -218,9 +265,8 @@ async def register_miniapp_routes(webapp: web.Application, app: Application):
             token = data.get("token")
             dex = data.get("dex")
             
-            service = await create_exchange_service()
+            service = await get_exchange_service()
             volume = await service.get_24h_volume(token, dex)
-            await service.close()
             
             return web.json_response({
                 "status": "ok",
@@ -239,9 +285,8 @@ async def register_miniapp_routes(webapp: web.Application, app: Application):
             data = await request.json()
             token_pair = data.get("token_pair")
             
-            service = await create_exchange_service()
+            service = await get_exchange_service()
             depth = await service.get_market_depth(token_pair)
-            await service.close()
             
             return web.json_response({
                 "status": "ok",
@@ -261,9 +306,8 @@ async def register_miniapp_routes(webapp: web.Application, app: Application):
             bar = data.get("bar", "1H")
             limit = data.get("limit", 100)
             
-            service = await create_exchange_service()
+            service = await get_exchange_service()
             candles = await service.get_candlesticks(token_pair, bar, limit)
-            await service.close()
             
             return web.json_response({
                 "status": "ok",
@@ -327,6 +371,11 @@ async def register_miniapp_routes(webapp: web.Application, app: Application):
             condition_value = float(data.get("condition_value", 0))
             
             alert_id = database.add_alert(user_id, alert_type, token_address, symbol, condition_type, condition_value) if database else None
+            if alert_id and side_of(condition_type) and condition_value > 0 and (token_address or symbol):
+                alert_engine.add(dex_alerts.to_alert({
+                    "id": alert_id, "user_id": user_id, "token_address": token_address, "symbol": symbol,
+                    "condition_type": condition_type, "condition_value": condition_value,
+                }))
             
             return web.json_response({
                 "status": "ok",
@@ -346,6 +395,8 @@ async def register_miniapp_routes(webapp: web.Application, app: Application):
             alert_id = data.get("alert_id")
             
             success = database.delete_alert(alert_id) if database else False
+            if success:
+                alert_engine.remove(dex_alerts.SOURCE, int(alert_id))
             
             return web.json_response({
                 "status": "ok" if success else "error",
@@ -392,6 +443,8 @@ async def register_miniapp_routes(webapp: web.Application, app: Application):
             strategy_id = database.create_strategy(
                 user_id, name, strategy_type, dex_name, token_from, token_to, config
             ) if database else None
+            if strategy_id:
+                strategy_executor.request_reload()
             
             return web.json_response({
                 "status": "ok",
@@ -412,6 +465,8 @@ async def register_miniapp_routes(webapp: web.Application, app: Application):
             active = data.get("active", True)
             
             success = database.update_strategy_status(strategy_id, active) if database else False
+            if success:
+                strategy_executor.request_reload()
             
             return web.json_response({
                 "status": "ok" if success else "error",
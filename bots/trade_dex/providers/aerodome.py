@@ -1,12 +1,13 @@
 """Aerodome DEX Integration (Evmos/Cosmos)"""
 
 import logging
-import httpx
 import json
 from typing import Dict, List, Optional
 from decimal import Decimal
 import asyncio
 
+from shared.http_clients import get_aiohttp
+
 logger = logging.getLogger(__name__)
 
 # Aerodome API and configuration
@@ -34,13 +35,13 @@ class AerodomeProvider:
         self.session = None
     
     async def init(self):
-        """Initialize HTTP session"""
-        self.session = httpx.AsyncClient(timeout=30)
+        """Initialize HTTP session (shared keep-alive client)"""
+        self.session = get_aiohttp("trade_dex", timeout=30)
     
     async def close(self):
         """Close HTTP session"""
-        if self.session:
-            await self.session.aclose()
+        # gemeinsamer Client bleibt offen (shared.http_clients.close_all beim Shutdown)
+        self.session = None
     
     async def __aenter__(self):
         await self.init()
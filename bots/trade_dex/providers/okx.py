@@ -1,7 +1,6 @@
 """OKX Exchange API Integration"""
 
 import logging
-import httpx
 import hmac
 import hashlib
 import base64
@@ -10,6 +9,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import json
 
+from shared.http_clients import get_aiohttp
+
 logger = logging.getLogger(__name__)
 
 # OKX API Configuration
@@ -28,13 +29,13 @@ class OKXProvider:
         self.session = None
     
     async def init(self):
-        """Initialize HTTP session"""
-        self.session = httpx.AsyncClient(timeout=30)
+        """Initialize HTTP session (shared keep-alive client)"""
+        self.session = get_aiohttp("trade_dex", timeout=30)
     
     async def close(self):
         """Close HTTP session"""
-        if self.session:
-            await self.session.aclose()
+        # gemeinsamer Client bleibt offen (shared.http_clients.close_all beim Shutdown)
+        self.session = None
     
     async def __aenter__(self):
         await self.init()
@@ -0,0 +1,227 @@
+"""Trade DEX Bot - Swap-Routing über den Pool-Snapshot
+
+Sucht Pfade mit 1–3 Hops über alle PancakeSwap- und Aerodome-Pools aus dem
+MarketSnapshot (market_data.py) und verteilt die Eingabemenge optional auf
+mehrere pool-disjunkte Routen, um den Price Impact zu minimieren.
+
+Alle Berechnungen laufen lokal (keine Netzwerk-Calls) und vektorisiert mit
+NumPy: die Constant-Product-Formel aus ``calculate_swap_amount_out`` wird für
+alle Kandidatenpfade × Kandidatenmengen in einem Schritt ausgewertet.
+"""
+
+import logging
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .market_data import DEX_FEES, MarketSnapshot
+
+logger = logging.getLogger(__name__)
+
+MAX_HOPS = 3
+MAX_PATHS = 200          # Obergrenze Kandidatenpfade je Quote
+MAX_SPLIT_ROUTES = 4     # max. parallele Routen beim Split
+SPLIT_STEPS = 40         # Granularität der Aufteilung (1/40 der Menge je Schritt)
+
+
+@dataclass(frozen=True)
+class Edge:
+    pool_key: str
+    pool_id: str
+    dex: str
+    token_in: str
+    token_out: str
+    reserve_in: float
+    reserve_out: float
+    fee: float
+
+
+class PoolGraph:
+    """Token-Graph eines Snapshots (Adjazenzliste token -> ausgehende Pool-Kanten)"""
+
+    def __init__(self, snapshot: MarketSnapshot):
+        self.version = snapshot.version
+        self.adj: Dict[str, List[Edge]] = {}
+        self.symbols: Dict[str, str] = {}
+        liquidity: Dict[str, float] = {}
+
+        for key, p in snapshot.pools.items():
+            t0, t1 = p.get("token0") or {}, p.get("token1") or {}
+            a0, a1 = (t0.get("id") or "").lower(), (t1.get("id") or "").lower()
+            try:
+                r0, r1 = float(p.get("reserve0") or 0), float(p.get("reserve1") or 0)
+            except (TypeError, ValueError):
+                continue
+            if not a0 or not a1 or r0 <= 0 or r1 <= 0:
+                continue
+            fee = float(DEX_FEES.get(p["dex"], Decimal("0.003")))
+            pid = p.get("id", "")
+            self.adj.setdefault(a0, []).append(Edge(key, pid, p["dex"], a0, a1, r0, r1, fee))
+            self.adj.setdefault(a1, []).append(Edge(key, pid, p["dex"], a1, a0, r1, r0, fee))
+
+            # Symbol -> Adresse (bei Mehrdeutigkeit gewinnt die höhere Liquidität)
+            tvl = float(p.get("reserveUSD") or 0)
+            for tok, addr in ((t0, a0), (t1, a1)):
+                sym = (tok.get("symbol") or "").lower()
+                if sym and tvl >= liquidity.get(sym, -1.0):
+                    liquidity[sym] = tvl
+                    self.symbols[sym] = addr
+
+    def resolve(self, token: str) -> Optional[str]:
+        t = (token or "").lower()
+        if t in self.adj:
+            return t
+        return self.symbols.get(t)
+
+    def paths(self, src: str, dst: str, max_hops: int = MAX_HOPS, dex: Optional[str] = None) -> List[Tuple[Edge, ...]]:
+        """Alle einfachen Pfade src -> dst mit <= max_hops Kanten (DFS)"""
+        found: List[Tuple[Edge, ...]] = []
+        # Knoten mit direkter Kante zu dst – nur diese kommen als vorletzter Hop in Frage
+        near_dst = {e.token_out for e in self.adj.get(dst, ()) if not dex or e.dex == dex}
+        stack: List[Tuple[str, Tuple[Edge, ...], frozenset]] = [(src, (), frozenset((src,)))]
+        while stack:
+            node, path, seen = stack.pop()
+            depth = len(path) + 1
+            for edge in self.adj.get(node, ()):
+                if dex and edge.dex != dex:
+                    continue
+                nxt = edge.token_out
+                if nxt == dst:
+                    found.append(path + (edge,))
+                elif depth < max_hops and nxt not in seen and (depth < max_hops - 1 or nxt in near_dst):
+                    stack.append((nxt, path + (edge,), seen | {nxt}))
+        return found
+
+
+def _path_arrays(paths: List[Tuple[Edge, ...]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Reserven/Fees als (P, MAX_HOPS)-Matrizen; fehlende Hops sind Identitäts-Hops"""
+    n = len(paths)
+    r_in = np.ones((n, MAX_HOPS))
+    r_out = np.ones((n, MAX_HOPS))
+    fee = np.zeros((n, MAX_HOPS))
+    ident = np.ones((n, MAX_HOPS), dtype=bool)
+    for i, path in enumerate(paths):
+        for h, e in enumerate(path):
+            r_in[i, h], r_out[i, h], fee[i, h], ident[i, h] = e.reserve_in, e.reserve_out, e.fee, False
+    # Grenzkurs (ohne Impact, nach Fee) je Pfad – Basis für price_impact
+    spot = ((r_out / r_in) * (1.0 - fee)).prod(axis=1)
+    return np.stack([r_in, r_out, fee]), ident, spot
+
+
+def simulate(arrays: np.ndarray, ident: np.ndarray, amounts: np.ndarray) -> np.ndarray:
+    """Ausgabemengen für amounts (P, K) – jede Zeile ein Pfad, jede Spalte eine Menge"""
+    r_in, r_out, fee = arrays
+    out = amounts.astype(float, copy=True)
+    for h in range(MAX_HOPS):
+        a = out * (1.0 - fee[:, h])[:, None]
+        hop = r_out[:, h][:, None] * a / (r_in[:, h][:, None] + a)
+        out = np.where(ident[:, h][:, None], out, hop)
+    return out
+
+
+def _disjoint(paths: List[Tuple[Edge, ...]], order: np.ndarray, limit: int) -> List[int]:
+    """Beste Pfade, die sich keinen Pool teilen (sonst beeinflussen sich die Splits)"""
+    chosen, used = [], set()
+    for i in order:
+        pools = {e.pool_key for e in paths[i]}
+        if pools & used:
+            continue
+        chosen.append(int(i))
+        used |= pools
+        if len(chosen) >= limit:
+            break
+    return chosen
+
+
+def _split(arrays: np.ndarray, ident: np.ndarray, amount: float, steps: int) -> np.ndarray:
+    """Greedy Water-Filling: jeder Teilbetrag geht an die Route mit dem höchsten Grenzertrag"""
+    n = arrays.shape[1]
+    chunk = amount / steps
+    # Ausgabe für 0..steps Chunks je Route vorab in einem Rutsch berechnen
+    grid = simulate(arrays, ident, np.outer(np.ones(n), np.arange(steps + 1) * chunk))
+    marginal = np.diff(grid, axis=1)
+    rows = np.arange(n)
+    filled = np.zeros(n, dtype=int)
+    for _ in range(steps):
+        gains = np.where(filled < steps, marginal[rows, np.minimum(filled, steps - 1)], -np.inf)
+        filled[int(np.argmax(gains))] += 1
+    return filled * chunk
+
+
+_graph_cache: Dict[str, PoolGraph] = {}
+
+
+def graph_for(snapshot: MarketSnapshot) -> PoolGraph:
+    g = _graph_cache.get("current")
+    if g is None or g.version != snapshot.version:
+        g = _graph_cache["current"] = PoolGraph(snapshot)
+    return g
+
+
+def best_route(
+    snapshot: MarketSnapshot,
+    token_in: str,
+    token_out: str,
+    amount_in: Decimal,
+    slippage: float = 0.5,
+    max_hops: int = MAX_HOPS,
+    split: bool = True,
+    dex: Optional[str] = None,
+) -> Optional[Dict]:
+    """Beste (ggf. aufgeteilte) Route aus dem Snapshot; None, wenn kein Pfad existiert"""
+    graph = graph_for(snapshot)
+    src, dst = graph.resolve(token_in), graph.resolve(token_out)
+    amount = float(amount_in)
+    if not src or not dst or src == dst or amount <= 0:
+        return None
+
+    paths = graph.paths(src, dst, max(1, min(max_hops, MAX_HOPS)), dex)
+    if not paths:
+        return None
+
+    arrays, ident, spot = _path_arrays(paths)
+    single = simulate(arrays, ident, np.full((len(paths), 1), amount))[:, 0]
+    order = np.argsort(-single)
+    if len(order) > MAX_PATHS:
+        order = order[:MAX_PATHS]
+
+    candidates = _disjoint(paths, order, MAX_SPLIT_ROUTES if split else 1)
+    alloc = np.array([amount])
+    if len(candidates) > 1:
+        alloc = _split(arrays[:, candidates], ident[candidates], amount, SPLIT_STEPS)
+    outs = simulate(arrays[:, candidates], ident[candidates], alloc[:, None])[:, 0]
+
+    # Split nur nehmen, wenn er die beste Einzelroute schlägt
+    if outs.sum() <= single[order[0]]:
+        candidates, alloc, outs = [int(order[0])], np.array([amount]), np.array([single[order[0]]])
+
+    total_out = float(outs.sum())
+    ideal = float((alloc * spot[candidates]).sum())
+    price_impact = max(0.0, (1 - total_out / ideal) * 100) if ideal > 0 else 0.0
+    min_out = total_out * (100 - slippage) / 100
+
+    routes = []
+    for idx, a, o in zip(candidates, alloc, outs):
+        if a <= 0:
+            continue
+        path = paths[idx]
+        routes.append({
+            "share": round(float(a) / amount, 4),
+            "amount_in": str(a),
+            "amount_out": str(float(o)),
+            "tokens": [path[0].token_in] + [e.token_out for e in path],
+            "pools": [e.pool_id for e in path],
+            "dexes": [e.dex for e in path],
+        })
+    routes.sort(key=lambda r: -r["share"])
+
+    return {
+        "best_dex": routes[0]["dexes"][0] if len({d for r in routes for d in r["dexes"]}) == 1 else "split",
+        "amount_out": str(total_out),
+        "min_amount_out": str(min_out),
+        "price_impact": price_impact,
+        "routes": routes,
+        "paths_evaluated": len(paths),
+    }
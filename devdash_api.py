@@ -3,7 +3,8 @@ sys.path.append(str(pathlib.Path(__file__).parent))  # lokales Modulverzeichnis
 import re, httpx
 from typing import Tuple, Dict, Any, List, Optional
 from aiohttp import web
-from psycopg_pool import ConnectionPool
+from shared.db import get_db
+from shared.http_clients import get_httpx
 from decimal import Decimal, getcontext
 import jwt
 from functools import partial
@@ -13,7 +14,8 @@ try:
 except Exception:  # optional; we only raise if verify is actually used
     VerifyKey = None
     BadSignatureError = Exception
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
+from collections import OrderedDict
 from decimal import Decimal
 import json
 
@@ -44,7 +46,7 @@ NEARBLOCKS_API = os.getenv("NEARBLOCKS_API", "https://api.nearblocks.io")
 TON_API_BASE   = os.getenv("TON_API_BASE", "https://tonapi.io")
 TON_API_KEY    = os.getenv("TON_API_KEY", "")
 
-pool = ConnectionPool(DB_URL, min_size=1, max_size=5, kwargs={"autocommit": True})
+_db = get_db("devdash")
 
 # ------------------------------ helpers ------------------------------
 
@@ -98,6 +100,7 @@ async def dev_login(request: web.Request):
         username=coalesce(excluded.username, dashboard_users.username),
         updated_at=now()
     """, (tg_id, body.get("username")))
+    _forget_user_role(tg_id)
     tok = _jwt_issue(tg_id, role="dev", tier="pro")
     return _json({"access_token": tok, "token_type": "bearer"}, request)
 
@@ -158,32 +161,10 @@ async def _to_thread(func, *a, **kw):
     return await asyncio.to_thread(func, *a, **kw)
 
 
-def _fetch(sql: str, params: Tuple = ()) -> List[Dict[str, Any]]:
-    with pool.connection() as con, con.cursor() as cur:
-        cur.execute(sql, params)
-        cols = [c.name for c in cur.description] if cur.description else []
-        rows = cur.fetchall() if cur.description else []
-        return [dict(zip(cols, r)) for r in rows]
-
-
-def _fetchrow(sql: str, params: Tuple = ()) -> Optional[Dict[str, Any]]:
-    with pool.connection() as con, con.cursor() as cur:
-        cur.execute(sql, params)
-        row = cur.fetchone()
-        if not row:
-            return None
-        cols = [c.name for c in cur.description]
-        return dict(zip(cols, row))
-
-
-def _execute(sql: str, params: Tuple = ()) -> None:
-    with pool.connection() as con, con.cursor() as cur:
-        cur.execute(sql, params)
-
-
-async def fetch(sql: str, params: Tuple = ()): return await _to_thread(_fetch, sql, params)
-async def fetchrow(sql: str, params: Tuple = ()): return await _to_thread(_fetchrow, sql, params)
-async def execute(sql: str, params: Tuple = ()): return await _to_thread(_execute, sql, params)
+# DB-Zugriff über den gemeinsamen async Pool (shared/db.py), Sub-Pool "devdash"
+async def fetch(sql: str, params: Tuple = ()) -> List[Dict[str, Any]]: return await _db.fetch(sql, params)
+async def fetchrow(sql: str, params: Tuple = ()) -> Optional[Dict[str, Any]]: return await _db.fetchrow(sql, params)
+async def execute(sql: str, params: Tuple = ()) -> None: await _db.execute(sql, params)
 
 
 # --------------------------- bootstrap tables ---------------------------
@@ -369,17 +350,18 @@ async def ensure_tables():
         ON CONFLICT (chain, account_id) DO NOTHING;
         """)
         log.info("✅ All tables initialized successfully")
+        await ensure_rollups()
     except Exception as e:
         log.error("❌ Error during table initialization: %s", e, exc_info=True)
 
 async def _telegram_getme(token: str) -> dict:
-    async with httpx.AsyncClient(timeout=10.0) as cx:
-        r = await cx.get(f"https://api.telegram.org/bot{token}/getMe")
-        r.raise_for_status()
-        data = r.json()
-        if not data.get("ok"):
-            raise RuntimeError(f"getMe failed: {data}")
-        return data["result"]
+    cx = get_httpx("devdash")
+    r = await cx.get(f"https://api.telegram.org/bot{token}/getMe", timeout=10.0)
+    r.raise_for_status()
+    data = r.json()
+    if not data.get("ok"):
+        raise RuntimeError(f"getMe failed: {data}")
+    return data["result"]
 
 async def scan_env_bots() -> int:
     """
@@ -414,14 +396,50 @@ async def scan_env_bots() -> int:
     return added
 
 # ------------------------------ tokens (JWT) ------------------------------
+# Verifizierte Tokens (sha256 -> user_id, exp) als LRU: Mini-App-Seiten feuern
+# beim Laden ein Dutzend Requests mit demselben Token parallel ab.
+AUTH_CACHE_MAX     = int(os.getenv("DEVDASH_AUTH_CACHE_MAX", "4096"))
+USER_CACHE_SECONDS = float(os.getenv("DEVDASH_USER_CACHE_SECONDS", "300"))
+
+_token_cache: "OrderedDict[bytes, Tuple[int, float]]" = OrderedDict()
+_user_roles: Dict[int, Tuple[float, Dict[str, Any]]] = {}   # telegram_id -> (gültig bis, {role, tier})
+
 def _jwt_issue(telegram_id: int, role: str = "dev", tier: str = "pro") -> str:
     payload = {"sub": str(telegram_id), "role": role, "tier": tier,
-               "exp": datetime.datetime.utcnow() + datetime.timedelta(days=7)}
+               "exp": datetime.utcnow() + timedelta(days=7)}
     return jwt.encode(payload, SECRET_KEY, algorithm="HS256")
 
 def _jwt_verify(token: str) -> int:
+    key = hashlib.sha256(token.encode()).digest()
+    hit = _token_cache.get(key)
+    if hit is not None:
+        if hit[1] > time.time():
+            _token_cache.move_to_end(key)
+            return hit[0]
+        del _token_cache[key]
     data = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-    return int(data.get("sub"))
+    uid = int(data.get("sub"))
+    if data.get("exp"):   # Tokens ohne exp nicht cachen
+        _token_cache[key] = (uid, float(data["exp"]))
+        if len(_token_cache) > AUTH_CACHE_MAX:
+            _token_cache.popitem(last=False)
+    return uid
+
+async def _user_role(telegram_id: int) -> Dict[str, Any]:
+    """role/tier aus dashboard_users, im Speicher gecacht ({} = unbekannt)"""
+    now = time.monotonic()
+    hit = _user_roles.get(telegram_id)
+    if hit and hit[0] > now:
+        return hit[1]
+    row = await fetchrow("select role, tier from dashboard_users where telegram_id=%s", (telegram_id,))
+    info = dict(row) if row else {}
+    _user_roles[telegram_id] = (now + USER_CACHE_SECONDS, info)
+    if len(_user_roles) > AUTH_CACHE_MAX:
+        _user_roles.pop(next(iter(_user_roles)))
+    return info
+
+def _forget_user_role(telegram_id: int) -> None:
+    _user_roles.pop(int(telegram_id), None)
 
 # ----------------------- Telegram login verify -----------------------
 
@@ -450,7 +468,7 @@ def verify_telegram_auth(auth: Dict[str, Any]) -> Dict[str, Any]:
 # ------------------------------ utils ------------------------------
 
 def _json_default(o):
-    if isinstance(o, (datetime.datetime, datetime.date)):
+    if isinstance(o, (datetime, date)):
         return o.isoformat()
     if isinstance(o, Decimal):
         return str(o)
@@ -543,7 +561,8 @@ async def auth_telegram(request: web.Request):
         return _json({"error": f"Database error: {str(e)}"}, request, status=500)
     
     try:
-        row = await fetchrow("select role,tier from dashboard_users where telegram_id=%s", (user["id"],))
+        _forget_user_role(user["id"])
+        row = await _user_role(user["id"])
         if not row:
             log.warning("User not found after insert: %s", user["id"])
             role, tier = "dev", "pro"
@@ -581,16 +600,18 @@ async def me(request: web.Request):
 async def overview(request: web.Request):
     await _auth_user(request)
 
-    def cnt(sql):
+    async def cnt(sql):
         try:
-            r = _fetchrow(sql)
+            r = await fetchrow(sql)
             return (r or {}).get("c", 0)
         except Exception:
             return 0
 
-    users_total = await _to_thread(lambda: cnt("select count(1) as c from dashboard_users"))
-    ads_active = await _to_thread(lambda: cnt("select count(1) as c from dashboard_ads where is_active=true"))
-    bots_active = await _to_thread(lambda: cnt("select count(1) as c from dashboard_bots where is_active=true"))
+    users_total, ads_active, bots_active = await asyncio.gather(
+        cnt("select count(1) as c from dashboard_users"),
+        cnt("select count(1) as c from dashboard_ads where is_active=true"),
+        cnt("select count(1) as c from dashboard_bots where is_active=true"),
+    )
     return _json({"users_total": users_total, "ads_active": ads_active, "bots_active": bots_active}, request)
 
 
@@ -683,22 +704,22 @@ async def near_verify(request: web.Request):
 
     # (Optional) sanity‑check that public key belongs to account via RPC (access key list)
     try:
-        async with httpx.AsyncClient(timeout=8.0) as client:
-            payload = {
-                "jsonrpc": "2.0",
-                "id": "verify-key",
-                "method": "query",
-                "params": {
-                    "request_type": "view_access_key_list",
-                    "finality": "final",
-                    "account_id": account_id,
-                },
-            }
-            r = await client.post(NEAR_RPC_URL, json=payload)
-            r.raise_for_status()
-            keys = [k.get("public_key") for k in r.json().get("result", {}).get("keys", [])]
-            if public_key not in keys:
-                log.warning("public key not in access_key_list for %s", account_id)
+        client = get_httpx("devdash")
+        payload = {
+            "jsonrpc": "2.0",
+            "id": "verify-key",
+            "method": "query",
+            "params": {
+                "request_type": "view_access_key_list",
+                "finality": "final",
+                "account_id": account_id,
+            },
+        }
+        r = await client.post(NEAR_RPC_URL, json=payload, timeout=8.0)
+        r.raise_for_status()
+        keys = [k.get("public_key") for k in r.json().get("result", {}).get("keys", [])]
+        if public_key not in keys:
+            log.warning("public key not in access_key_list for %s", account_id)
     except Exception as e:
         log.warning("rpc verify_owner failed: %s", e)
 
@@ -715,23 +736,23 @@ async def near_verify(request: web.Request):
 # ------------------------------ NEAR Token (NEP‑141) ------------------------------
 async def _rpc_view_function(contract_id: str, method: str, args: Dict[str, Any]):
     args_b64 = base64.b64encode(json.dumps(args).encode()).decode()
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        payload = {
-            "jsonrpc": "2.0",
-            "id": "view",
-            "method": "query",
-            "params": {
-                "request_type": "call_function",
-                "finality": "final",
-                "account_id": contract_id,
-                "method_name": method,
-                "args_base64": args_b64,
-            },
-        }
-        r = await client.post(NEAR_RPC_URL, json=payload)
-        r.raise_for_status()
-        res = r.json()["result"]["result"]
-        return json.loads(bytes(res).decode())
+    client = get_httpx("devdash")
+    payload = {
+        "jsonrpc": "2.0",
+        "id": "view",
+        "method": "query",
+        "params": {
+            "request_type": "call_function",
+            "finality": "final",
+            "account_id": contract_id,
+            "method_name": method,
+            "args_base64": args_b64,
+        },
+    }
+    r = await client.post(NEAR_RPC_URL, json=payload, timeout=10.0)
+    r.raise_for_status()
+    res = r.json()["result"]["result"]
+    return json.loads(bytes(res).decode())
 
 
 async def near_token_summary(request: web.Request):
@@ -769,14 +790,14 @@ async def near_token_summary(request: web.Request):
 
 # ------------------------------ NEAR Account Overview ------------------------------
 async def _rpc_view_account_near(account_id: str):
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        payload = {
-            "jsonrpc": "2.0","id":"view_account","method":"query",
-            "params":{"request_type":"view_account","finality":"final","account_id":account_id}
-        }
-        r = await client.post(NEAR_RPC_URL, json=payload)
-        r.raise_for_status()
-        return r.json()["result"]
+    client = get_httpx("devdash")
+    payload = {
+        "jsonrpc": "2.0","id":"view_account","method":"query",
+        "params":{"request_type":"view_account","finality":"final","account_id":account_id}
+    }
+    r = await client.post(NEAR_RPC_URL, json=payload, timeout=10.0)
+    r.raise_for_status()
+    return r.json()["result"]
 
 def yocto_to_near_str(yocto: str) -> str:
     try: return str(Decimal(yocto) / Decimal(10**24))
@@ -828,10 +849,10 @@ async def near_payments(request: web.Request):
     if not account_id:
         raise web.HTTPBadRequest(text="account_id required")
     url = f"{NEARBLOCKS_API}/v1/account/{account_id}/activity?limit={limit}&order=desc"
-    async with httpx.AsyncClient(timeout=10.0) as cx:
-        r = await cx.get(url, headers={"accept":"application/json"})
-        r.raise_for_status()
-        j = r.json()
+    cx = get_httpx("devdash")
+    r = await cx.get(url, headers={"accept":"application/json"}, timeout=10.0)
+    r.raise_for_status()
+    j = r.json()
     # Filter: nur eingehende Native-NEAR Transfers
     items = []
     for it in j.get("activity", []):
@@ -865,10 +886,10 @@ async def ton_payments(request: web.Request):
     headers={}
     if TON_API_KEY: headers["Authorization"] = f"Bearer {TON_API_KEY}"
     url = f"{TON_API_BASE}/v2/accounts/{address}/events?limit={limit}&subject_only=true"
-    async with httpx.AsyncClient(timeout=10.0) as cx:
-        r = await cx.get(url, headers=headers)
-        r.raise_for_status()
-        j = r.json()
+    cx = get_httpx("devdash")
+    r = await cx.get(url, headers=headers, timeout=10.0)
+    r.raise_for_status()
+    j = r.json()
     items=[]
     for ev in j.get("events", []):
         for act in ev.get("actions", []):
@@ -888,42 +909,117 @@ async def wallets_overview(request: web.Request):
     watches = await fetch("select id, chain, account_id, label, meta, created_at from dashboard_watch_accounts order by id asc")
     return _json({"me": me, "watch": watches}, request)
 # ------------------------------ Bot Mesh ------------------------------
+# Ein Hintergrund-Poller fragt alle aktiven Endpoints parallel ab (Timeout je
+# Endpoint, gemeinsames Limit) und hält den letzten Stand im Speicher; die
+# Dashboard-Endpoints liefern diesen Snapshot sofort aus.
+MESH_POLL_SECONDS    = float(os.getenv("DEVDASH_MESH_POLL_SECONDS", "30"))   # 0 = kein Hintergrund-Poller
+MESH_HEALTH_TIMEOUT  = float(os.getenv("DEVDASH_MESH_HEALTH_TIMEOUT", "5"))
+MESH_METRICS_TIMEOUT = float(os.getenv("DEVDASH_MESH_METRICS_TIMEOUT", "8"))
+MESH_CONCURRENCY     = int(os.getenv("DEVDASH_MESH_CONCURRENCY", "16"))
+
+_mesh: Dict[str, Any] = {"health": {}, "metrics": {}, "polled_at": None, "duration_ms": None}
+_mesh_inflight: Optional[asyncio.Task] = None
+_mesh_poller: Optional[asyncio.Task] = None
+
+async def _mesh_get(client, sem: asyncio.Semaphore, r: Dict[str, Any], path: str, timeout: float, kind: str) -> Dict[str, Any]:
+    url = r["base_url"].rstrip("/") + path
+    headers = {"x-api-key": r["api_key"]} if r["api_key"] else {}
+    async with sem:
+        try:
+            # httpx-Timeout gilt je Phase – wait_for begrenzt den ganzen Request
+            resp = await asyncio.wait_for(client.get(url, headers=headers, timeout=timeout), timeout + 1.0)
+            if kind == "metrics":
+                return resp.json()
+            is_json = resp.headers.get("content-type", "").startswith("application/json")
+            return {"status": resp.status_code, "body": resp.json() if is_json else resp.text[:200]}
+        except Exception as e:
+            return {"error": str(e) or type(e).__name__}
+
+async def _mesh_poll() -> Dict[str, Any]:
+    rows = await fetch("select bot_username, base_url, health_path, metrics_path, api_key from dashboard_bot_endpoints where is_active=true order by bot_username")
+    client = get_httpx("devdash")
+    sem = asyncio.Semaphore(MESH_CONCURRENCY)
+    t0 = time.monotonic()
+    health, metrics = await asyncio.gather(
+        asyncio.gather(*(_mesh_get(client, sem, r, r["health_path"], MESH_HEALTH_TIMEOUT, "health") for r in rows)),
+        asyncio.gather(*(_mesh_get(client, sem, r, r["metrics_path"], MESH_METRICS_TIMEOUT, "metrics") for r in rows)),
+    )
+    seen = [r for r, h in zip(rows, health) if "error" not in h]
+    if seen:
+        # ein UPDATE für alle erreichbaren Endpoints
+        await execute("""
+            update dashboard_bot_endpoints e set last_seen=now()
+            from unnest(%s::text[], %s::text[]) as v(bot_username, base_url)
+            where e.bot_username=v.bot_username and e.base_url=v.base_url
+        """, ([r["bot_username"] for r in seen], [r["base_url"] for r in seen]))
+    _mesh.update(
+        health={r["bot_username"]: h for r, h in zip(rows, health)},
+        metrics={r["bot_username"]: m for r, m in zip(rows, metrics)},
+        polled_at=time.time(),
+        duration_ms=round((time.monotonic() - t0) * 1000, 1),
+    )
+    return _mesh
+
+async def _mesh_refresh() -> Dict[str, Any]:
+    """Ein Poll-Durchlauf; parallele Aufrufer warten auf denselben"""
+    global _mesh_inflight
+    if _mesh_inflight is None or _mesh_inflight.done():
+        _mesh_inflight = asyncio.get_running_loop().create_task(_mesh_poll())
+    return await asyncio.shield(_mesh_inflight)
+
+async def _mesh_snapshot(request: web.Request) -> Dict[str, Any]:
+    age = time.time() - _mesh["polled_at"] if _mesh["polled_at"] else None
+    stale = age is None or age > max(MESH_POLL_SECONDS, 1.0) * 3
+    if stale or request.query.get("refresh") in ("1", "true"):
+        await _mesh_refresh()
+    return _mesh
+
+def _mesh_json(data: Any, request: web.Request) -> web.Response:
+    resp = _json(data, request)
+    resp.headers["X-Mesh-Polled-At"] = str(_mesh["polled_at"] or "")
+    resp.headers["X-Mesh-Poll-Ms"] = str(_mesh["duration_ms"] or "")
+    return resp
+
 async def mesh_health(request: web.Request):
     await _auth_user(request)
-    rows = await fetch("select bot_username, base_url, health_path, api_key from dashboard_bot_endpoints where is_active=true order by bot_username")
-    out = {}
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        for r in rows:
-            url = r["base_url"].rstrip("/") + r["health_path"]
-            headers = {"x-api-key": r["api_key"]} if r["api_key"] else {}
-            try:
-                resp = await client.get(url, headers=headers)
-                out[r["bot_username"]] = {"status": resp.status_code, "body": resp.json() if resp.headers.get("content-type","" ).startswith("application/json") else await resp.aread()[:200].decode(errors='ignore')}
-                await execute("update dashboard_bot_endpoints set last_seen=now() where bot_username=%s and base_url=%s", (r["bot_username"], r["base_url"]))
-            except Exception as e:
-                out[r["bot_username"]] = {"error": str(e)}
-    return _json(out, request)
+    snap = await _mesh_snapshot(request)
+    return _mesh_json(snap["health"], request)
 
 
 async def mesh_metrics(request: web.Request):
     await _auth_user(request)
-    rows = await fetch("select bot_username, base_url, metrics_path, api_key from dashboard_bot_endpoints where is_active=true order by bot_username")
-    out = {}
-    async with httpx.AsyncClient(timeout=8.0) as client:
-        for r in rows:
-            url = r["base_url"].rstrip("/") + r["metrics_path"]
-            headers = {"x-api-key": r["api_key"]} if r["api_key"] else {}
-            try:
-                resp = await client.get(url, headers=headers)
-                out[r["bot_username"]] = resp.json()
-            except Exception as e:
-                out[r["bot_username"]] = {"error": str(e)}
-    return _json(out, request)
+    snap = await _mesh_snapshot(request)
+    return _mesh_json(snap["metrics"], request)
+
+async def _mesh_loop():
+    while True:
+        try:
+            await _mesh_refresh()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning(f"[mesh] poll failed: {e}")
+        await asyncio.sleep(MESH_POLL_SECONDS)
+
+async def start_mesh_poller(_app=None):
+    global _mesh_poller
+    if MESH_POLL_SECONDS > 0 and (_mesh_poller is None or _mesh_poller.done()):
+        _mesh_poller = asyncio.get_running_loop().create_task(_mesh_loop())
+
+async def stop_mesh_poller(_app=None):
+    global _mesh_poller
+    if _mesh_poller is not None:
+        _mesh_poller.cancel()
+        try:
+            await _mesh_poller
+        except (asyncio.CancelledError, Exception):
+            pass
+        _mesh_poller = None
 
 async def auth_check(request: web.Request):
     try:
         uid = await _auth_user(request)
-        return _json({"ok": True, "sub": uid}, request)
+        return _json({"ok": True, "sub": uid, **await _user_role(uid)}, request)
     except web.HTTPUnauthorized as e:
         return _json({"ok": False, "error": e.text}, request, status=401)
 
@@ -1008,6 +1104,170 @@ async def ads_update(request: web.Request):
     return _json({"ok": True}, request)
 
 
+# ------------------------------ Analytics Rollups ------------------------------
+# Die Reports lesen aus Tages-Rollups statt jedes Mal dashboard_token_events /
+# dashboard_ad_events komplett zu aggregieren. Ein Hintergrund-Job rechnet je
+# Lauf nur die Tage ab dem letzten Lauf minus einem Tag neu (spät committete
+# Events), beim ersten Lauf alles. User-Segmente liegen in einer Materialized
+# View (refresh concurrently). Antworten werden je Pfad + Query-Parametern kurz
+# gecacht und nach jedem Refresh verworfen. Bis der erste Lauf dieses Prozesses
+# durch ist, beantworten die Reports Live-Aggregate mit denselben Spalten.
+# Schema: devdash_migrations/ (über shared.migrations, aus ensure_tables).
+ROLLUP_SECONDS         = int(os.getenv("DEVDASH_ROLLUP_SECONDS", "300"))     # 0 = kein Hintergrund-Job
+ANALYTICS_CACHE_SECONDS = float(os.getenv("DEVDASH_ANALYTICS_CACHE_SECONDS", "60"))
+ANALYTICS_CACHE_MAX    = int(os.getenv("DEVDASH_ANALYTICS_CACHE_MAX", "512"))
+
+MIGRATIONS_DIR = pathlib.Path(__file__).with_name("devdash_migrations")
+
+# name -> (Rollup-Tabelle, Quelle, Zeitspalte, Aggregat-Select mit {where})
+_ROLLUPS = {
+    "token_daily": ("dashboard_token_daily", "dashboard_token_events", "happened_at", """
+        insert into dashboard_token_daily(day, kind, cnt, total, min_amount, max_amount)
+        select happened_at::date, kind, count(*), sum(amount), min(amount), max(amount)
+        from dashboard_token_events {where}
+        group by 1, 2
+    """),
+    "ad_daily": ("dashboard_ad_daily", "dashboard_ad_events", "created_at", """
+        insert into dashboard_ad_daily(day, ad_id, event_type, cnt)
+        select created_at::date, ad_id, event_type, count(*)
+        from dashboard_ad_events {where}
+        group by 1, 2, 3
+    """),
+}
+
+# Rollup -> Live-Aggregat mit denselben Spalten (vor dem ersten Refresh)
+_LIVE_SOURCES = {
+    "dashboard_token_daily": """(
+        select happened_at::date as day, kind, count(*) as cnt, sum(amount) as total,
+               min(amount) as min_amount, max(amount) as max_amount
+        from dashboard_token_events group by 1, 2)""",
+    "dashboard_ad_daily": """(
+        select created_at::date as day, ad_id, event_type, count(*) as cnt
+        from dashboard_ad_events group by 1, 2, 3)""",
+    "dashboard_user_segments_mv": """(
+        select tier, role, count(*) as user_count, count(near_account_id) as near_connected,
+               count(ton_address) as ton_connected, min(created_at) as first_user, max(created_at) as last_user
+        from dashboard_users group by tier, role)""",
+}
+
+_report_cache: Dict[Tuple[str, Tuple], Tuple[float, Any]] = {}
+_rollup_task: Optional[asyncio.Task] = None
+_rollup_inflight: Optional[asyncio.Task] = None
+_rollups_refreshed_at: Optional[float] = None
+
+async def ensure_rollups():
+    from shared.migrations import run_migrations
+    try:
+        await asyncio.to_thread(run_migrations, "devdash", MIGRATIONS_DIR)
+        log.info("✅ analytics rollups ready")
+    except Exception as e:
+        log.warning("rollup schema: %s", e)
+
+async def _refresh_daily(name: str) -> Optional[int]:
+    """Tages-Rollup ab (letzter Lauf - 1 Tag) neu aufbauen; 0 = Quelle fehlt, None = läuft schon woanders"""
+    table, source, ts_col, insert_sql = _ROLLUPS[name]
+    async with _db.transaction() as conn:
+        cur = await conn.execute("select to_regclass(%s) is not null as ok, pg_try_advisory_xact_lock(hashtext(%s)) as locked",
+                                 (source, "devdash_rollup:" + name))
+        row = await cur.fetchone()
+        if not row["ok"]:
+            return 0
+        if not row["locked"]:
+            return None
+        cur = await conn.execute("select built_through from dashboard_rollup_state where name=%s", (name,))
+        state = await cur.fetchone()
+        since = state["built_through"] - timedelta(days=1) if state and state["built_through"] else None
+        if since is None:
+            await conn.execute(f"delete from {table}")
+            cur = await conn.execute(insert_sql.format(where=""))
+        else:
+            await conn.execute(f"delete from {table} where day >= %s", (since,))
+            cur = await conn.execute(insert_sql.format(where=f"where {ts_col} >= %s"), (since,))
+        await conn.execute("""
+            insert into dashboard_rollup_state(name, built_through, refreshed_at) values (%s, current_date, now())
+            on conflict (name) do update set built_through=excluded.built_through, refreshed_at=excluded.refreshed_at
+        """, (name,))
+        return cur.rowcount
+
+async def refresh_user_segments() -> None:
+    await execute("refresh materialized view concurrently dashboard_user_segments_mv")
+
+async def _refresh_rollups() -> Dict[str, Any]:
+    global _rollups_refreshed_at
+    out: Dict[str, Any] = {}
+    for name in _ROLLUPS:
+        try:
+            out[name] = await _refresh_daily(name)
+        except Exception as e:
+            log.warning("rollup %s failed: %s", name, e)
+            out[name] = {"error": str(e)}
+    try:
+        await refresh_user_segments()
+        out["user_segments"] = True
+    except Exception as e:
+        log.warning("rollup user_segments failed: %s", e)
+        out["user_segments"] = {"error": str(e)}
+    _report_cache.clear()
+    # erst umschalten, wenn wirklich jedes Rollup gebaut ist (nicht gesperrt / fehlgeschlagen)
+    if out["user_segments"] is True and all(isinstance(out[name], int) for name in _ROLLUPS):
+        _rollups_refreshed_at = time.time()
+    return out
+
+async def refresh_rollups() -> Dict[str, Any]:
+    """Alle Rollups aktualisieren; parallele Aufrufer warten auf denselben Lauf"""
+    global _rollup_inflight
+    if _rollup_inflight is None or _rollup_inflight.done():
+        _rollup_inflight = asyncio.get_running_loop().create_task(_refresh_rollups())
+    return await asyncio.shield(_rollup_inflight)
+
+def _rollup_source(name: str) -> str:
+    """Rollup-Relation für Reports – vor dem ersten Lauf dieses Prozesses das
+    Live-Aggregat, statt den Request auf den (Erst-)Backfill warten zu lassen"""
+    if _rollups_refreshed_at is None:
+        return f"{_LIVE_SOURCES[name]} as {name}"
+    return name
+
+async def _cached_report(request: web.Request, build, ttl: float = ANALYTICS_CACHE_SECONDS) -> Any:
+    """Report-Antwort je Pfad + Query-Parametern für ``ttl`` Sekunden wiederverwenden"""
+    key = (request.path, tuple(sorted(request.query.items())))
+    now = time.monotonic()
+    hit = _report_cache.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+    data = await build()
+    if len(_report_cache) >= ANALYTICS_CACHE_MAX:
+        for k in [k for k, (exp, _) in _report_cache.items() if exp <= now] or list(_report_cache)[:ANALYTICS_CACHE_MAX // 4]:
+            _report_cache.pop(k, None)
+    _report_cache[key] = (now + ttl, data)
+    return data
+
+async def _rollup_loop():
+    while True:
+        try:
+            res = await refresh_rollups()
+            log.debug("rollups refreshed: %s", res)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning(f"[rollup] refresh failed: {e}")
+        await asyncio.sleep(ROLLUP_SECONDS)
+
+async def start_rollups(_app=None):
+    global _rollup_task
+    if ROLLUP_SECONDS > 0 and (_rollup_task is None or _rollup_task.done()):
+        _rollup_task = asyncio.get_running_loop().create_task(_rollup_loop())
+
+async def stop_rollups(_app=None):
+    global _rollup_task
+    if _rollup_task is not None:
+        _rollup_task.cancel()
+        try:
+            await _rollup_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        _rollup_task = None
+
+
 # ------------------------------ Metrics & Analytics ------------------------------
 async def metrics_overview(request: web.Request):
     """Übersicht: Benutzer, Werbungen, Bots, Events"""
@@ -1029,20 +1289,17 @@ async def metrics_timeseries(request: web.Request):
     """Zeitreihen-Metriken (letzte N Tage)"""
     await _auth_user(request)
     days = int(request.query.get("days", "14"))
-    
-    rows = await fetch("""
-        select 
-            date_trunc('day', happened_at)::date as day,
-            kind,
-            count(*) as cnt,
-            sum(amount) as total_amount
-        from dashboard_token_events
-        where happened_at > now() - interval '%s days'
-        group by day, kind
-        order by day asc
-    """, (days,))
-    
-    return _json({"timeseries": rows}, request)
+
+    async def build():
+        rows = await fetch(f"""
+            select day, kind, cnt, total as total_amount
+            from {_rollup_source("dashboard_token_daily")}
+            where day >= (now() - make_interval(days => %s))::date
+            order by day asc
+        """, (days,))
+        return {"timeseries": rows}
+
+    return _json(await _cached_report(request, build), request)
 
 
 async def bot_metrics(request: web.Request):
@@ -1116,6 +1373,12 @@ async def token_events_create(request: web.Request):
         insert into dashboard_token_events(kind, amount, unit, actor_telegram_id, ref, note, happened_at)
         values (%s, %s, %s, %s, %s::jsonb, %s, now())
     """, (kind, amount, unit, actor_telegram_id, json.dumps(ref), note))
+    # heutigen Tag sofort nachziehen, damit die Reports das Event zeigen
+    try:
+        await _refresh_daily("token_daily")
+    except Exception as e:
+        log.warning("rollup token_daily failed: %s", e)
+    _report_cache.clear()
     
     return _json({"ok": True}, request, status=201)
 
@@ -1160,6 +1423,12 @@ async def user_update_tier(request: web.Request):
     else:
         await execute("update dashboard_users set tier=%s, updated_at=now() where telegram_id=%s",
                      (tier, telegram_id))
+    _forget_user_role(telegram_id)
+    try:
+        await refresh_user_segments()
+    except Exception as e:
+        log.warning("rollup user_segments failed: %s", e)
+    _report_cache.clear()
     
     return _json({"ok": True}, request)
 
@@ -1168,46 +1437,37 @@ async def ad_performance_report(request):
     await _auth_user(request)
     ad_id = request.query.get("ad_id")
     days = int(request.query.get("days", "30"))
-    
-    sql = """
-        SELECT 
-            ad_id,
-            event_type,
-            COUNT(*) as count,
-            COUNT(DISTINCT telegram_id) as unique_users,
-            COUNT(DISTINCT bot_username) as bot_count
-        FROM dashboard_ad_events
-        WHERE created_at > now() - interval '%s days'
-    """
-    params = (days,)
-    
-    if ad_id:
-        sql += " AND ad_id = %s"
-        params = params + (ad_id,)
-    
-    sql += " GROUP BY ad_id, event_type ORDER BY ad_id"
-    
-    rows = await fetch(sql, params)
-    
-    # Calculate CTR (Click-Through Rate)
-    data = {}
-    for row in rows:
-        aid = row['ad_id']
-        if aid not in data:
-            data[aid] = {'impressions': 0, 'clicks': 0}
-        
-        if row['event_type'] == 'impression':
-            data[aid]['impressions'] = row['count']
-        elif row['event_type'] == 'click':
-            data[aid]['clicks'] = row['count']
-    
-    # Add CTR
-    for aid in data:
-        impressions = data[aid]['impressions']
-        clicks = data[aid]['clicks']
-        data[aid]['ctr'] = (clicks / impressions * 100) if impressions > 0 else 0
-    
-    return _json({"report": data}, request)
+
+    async def build():
+        sql = f"""
+            SELECT ad_id, event_type, SUM(cnt) as count
+            FROM {_rollup_source("dashboard_ad_daily")}
+            WHERE day >= (now() - make_interval(days => %s))::date
+        """
+        params = (days,)
+        if ad_id:
+            sql += " AND ad_id = %s"
+            params = params + (ad_id,)
+        sql += " GROUP BY ad_id, event_type ORDER BY ad_id"
+        rows = await fetch(sql, params)
+
+        # Calculate CTR (Click-Through Rate)
+        data = {}
+        for row in rows:
+            aid = row['ad_id']
+            if aid not in data:
+                data[aid] = {'impressions': 0, 'clicks': 0}
+            if row['event_type'] == 'impression':
+                data[aid]['impressions'] = row['count']
+            elif row['event_type'] == 'click':
+                data[aid]['clicks'] = row['count']
+        for aid in data:
+            impressions = data[aid]['impressions']
+            clicks = data[aid]['clicks']
+            data[aid]['ctr'] = (clicks / impressions * 100) if impressions > 0 else 0
+        return {"report": data}
+
+    return _json(await _cached_report(request, build), request)
 
 
 async def ad_roi_analysis(request):
@@ -1250,29 +1510,17 @@ async def ad_roi_analysis(request):
 async def user_segments_analysis(request):
     """Analysiere Benutzer nach Segmenten"""
     await _auth_user(request)
-    
-    sql = """
-        SELECT 
-            tier,
-            role,
-            COUNT(*) as user_count,
-            COUNT(CASE WHEN near_account_id IS NOT NULL THEN 1 END) as near_connected,
-            COUNT(CASE WHEN ton_address IS NOT NULL THEN 1 END) as ton_connected,
-            MIN(created_at) as first_user,
-            MAX(created_at) as last_user
-        FROM dashboard_users
-        GROUP BY tier, role
-        ORDER BY user_count DESC
-    """
-    
-    rows = await fetch(sql)
-    
-    return _json({
-        "segments": rows,
-        "total_users": sum(r['user_count'] for r in rows),
-        "connected_near": sum(r['near_connected'] for r in rows),
-        "connected_ton": sum(r['ton_connected'] for r in rows)
-    }, request)
+
+    async def build():
+        rows = await fetch(f"select * from {_rollup_source('dashboard_user_segments_mv')} order by user_count desc")
+        return {
+            "segments": rows,
+            "total_users": sum(r['user_count'] for r in rows),
+            "connected_near": sum(r['near_connected'] for r in rows),
+            "connected_ton": sum(r['ton_connected'] for r in rows)
+        }
+
+    return _json(await _cached_report(request, build), request)
 
 
 async def user_retention_analysis(request):
@@ -1318,61 +1566,56 @@ async def token_economics_summary(request):
     """Zusammenfassung der Token-Ökonomie"""
     await _auth_user(request)
     days = int(request.query.get("days", "30"))
-    
-    sql = """
-        SELECT 
-            kind,
-            COUNT(*) as transaction_count,
-            SUM(CAST(amount AS numeric)) as total_amount,
-            AVG(CAST(amount AS numeric)) as avg_amount,
-            MIN(CAST(amount AS numeric)) as min_amount,
-            MAX(CAST(amount AS numeric)) as max_amount
-        FROM dashboard_token_events
-        WHERE happened_at > now() - interval '%s days'
-        GROUP BY kind
-        ORDER BY total_amount DESC
-    """
-    
-    rows = await fetch(sql, (days,))
-    
-    # Calculate totals
-    total_minted = sum(float(r['total_amount'] or 0) for r in rows if r['kind'] == 'mint')
-    total_burned = sum(float(r['total_amount'] or 0) for r in rows if r['kind'] == 'burn')
-    
-    return _json({
-        "summary": rows,
-        "total_minted": total_minted,
-        "total_burned": total_burned,
-        "net_supply_change": total_minted - total_burned,
-        "period_days": days
-    }, request)
+
+    async def build():
+        rows = await fetch(f"""
+            SELECT
+                kind,
+                SUM(cnt) as transaction_count,
+                SUM(total) as total_amount,
+                SUM(total) / NULLIF(SUM(cnt), 0) as avg_amount,
+                MIN(min_amount) as min_amount,
+                MAX(max_amount) as max_amount
+            FROM {_rollup_source("dashboard_token_daily")}
+            WHERE day >= (now() - make_interval(days => %s))::date
+            GROUP BY kind
+            ORDER BY total_amount DESC
+        """, (days,))
+
+        # Calculate totals
+        total_minted = sum(float(r['total_amount'] or 0) for r in rows if r['kind'] == 'mint')
+        total_burned = sum(float(r['total_amount'] or 0) for r in rows if r['kind'] == 'burn')
+        return {
+            "summary": rows,
+            "total_minted": total_minted,
+            "total_burned": total_burned,
+            "net_supply_change": total_minted - total_burned,
+            "period_days": days
+        }
+
+    return _json(await _cached_report(request, build), request)
 
 
 async def token_velocity_analysis(request):
     """Analysiere Token Velocity"""
     await _auth_user(request)
-    
-    sql = """
-        SELECT 
-            DATE_TRUNC('day', happened_at)::DATE as day,
-            kind,
-            SUM(CAST(amount AS numeric)) as daily_volume,
-            COUNT(*) as transaction_count
-        FROM dashboard_token_events
-        WHERE happened_at > now() - interval '90 days'
-        GROUP BY day, kind
-        ORDER BY day DESC
-    """
-    
-    rows = await fetch(sql)
-    
-    return _json({
-        "velocity": rows,
-        "chart_data": {
-            "dates": list(set(r['day'] for r in rows)),
-            "volumes": [r['daily_volume'] for r in rows]
+
+    async def build():
+        rows = await fetch(f"""
+            SELECT day, kind, total as daily_volume, cnt as transaction_count
+            FROM {_rollup_source("dashboard_token_daily")}
+            WHERE day >= current_date - 90
+            ORDER BY day DESC
+        """)
+        return {
+            "velocity": rows,
+            "chart_data": {
+                "dates": list(set(r['day'] for r in rows)),
+                "volumes": [r['daily_volume'] for r in rows]
+            }
         }
-    }, request)
+
+    return _json(await _cached_report(request, build), request)
 
 
 # ============================================================================
@@ -1397,19 +1640,22 @@ async def bot_health_dashboard(request):
         GROUP BY db.username, db.title, db.is_active
     """
     
-    rows = await fetch(sql)
-    
-    # Calculate health scores
-    for row in rows:
-        endpoints = row['endpoint_count'] or 0
-        healthy = row['healthy_endpoints'] or 0
-        row['health_score'] = (healthy / endpoints * 100) if endpoints > 0 else 0
-        row['status'] = 'healthy' if row['health_score'] >= 80 else 'warning' if row['health_score'] >= 50 else 'critical'
-    
-    return _json({
-        "bots": rows,
-        "overall_health": sum(r['health_score'] for r in rows) / len(rows) if rows else 0
-    }, request)
+    async def build():
+        rows = await fetch(sql)
+
+        # Calculate health scores
+        for row in rows:
+            endpoints = row['endpoint_count'] or 0
+            healthy = row['healthy_endpoints'] or 0
+            row['health_score'] = (healthy / endpoints * 100) if endpoints > 0 else 0
+            row['status'] = 'healthy' if row['health_score'] >= 80 else 'warning' if row['health_score'] >= 50 else 'critical'
+        return {
+            "bots": rows,
+            "overall_health": sum(r['health_score'] for r in rows) / len(rows) if rows else 0
+        }
+
+    # klein, aber last_seen-abhängig: nur kurz cachen statt Rollup
+    return _json(await _cached_report(request, build, ttl=min(ANALYTICS_CACHE_SECONDS, 15)), request)
 
 
 # ============================================================================
@@ -1461,14 +1707,14 @@ async def webhook_test(request):
         return _json({"error": "Webhook nicht gefunden"}, request, status=404)
     
     # Send test payload
-    import httpx
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            await client.post(
-                webhook['url'],
-                json={"test": True, "timestamp": datetime.utcnow().isoformat()},
-                headers={"X-Webhook-Secret": webhook['secret'] or ""}
-            )
+        client = get_httpx("devdash")
+        await client.post(
+            webhook['url'],
+            json={"test": True, "timestamp": datetime.utcnow().isoformat()},
+            headers={"X-Webhook-Secret": webhook['secret'] or ""},
+            timeout=10.0,
+        )
         return _json({"ok": True, "status": "delivered"}, request)
     except Exception as e:
         return _json({"ok": False, "error": str(e)}, request, status=400)
@@ -1478,56 +1724,98 @@ async def webhook_test(request):
 # EXPORT & REPORTS
 # ============================================================================
 
+EXPORT_CHUNK_BYTES = int(os.getenv("DEVDASH_EXPORT_CHUNK_BYTES", "65536"))
+
+def _export_response(request: web.Request, content_type: str, filename: str) -> web.StreamResponse:
+    """Chunked Download-Antwort; ``?gzip=1`` komprimiert (Content-Encoding)"""
+    resp = web.StreamResponse(headers={
+        "Content-Type": content_type,
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    })
+    # cors_middleware kann Header nach prepare() nicht mehr setzen
+    for k, v in _cors_headers(request).items():
+        resp.headers[k] = v
+    resp.headers["Vary"] = "Origin"
+    if request.query.get("gzip") in ("1", "true"):
+        resp.enable_compression(web.ContentCoding.gzip)
+    resp.enable_chunked_encoding()
+    return resp
+
+def _abort_export(request: web.Request, what: str, e: Exception) -> None:
+    # Header sind schon raus – Verbindung kappen, damit der Client keinen "fertigen" Export sieht
+    log.error("export %s aborted: %s", what, e)
+    if request.transport is not None:
+        request.transport.close()
+
+async def _stream_csv(request: web.Request, filename: str, sql: str, params: Tuple = ()) -> web.StreamResponse:
+    """``COPY (sql) TO STDOUT`` direkt in die Antwort streamen – Speicher bleibt flach"""
+    resp = _export_response(request, "text/csv; charset=utf-8", filename)
+    async with _db.connection() as conn:
+        cur = conn.cursor()
+        async with cur.copy(f"copy ({sql}) to stdout with (format csv, header)", params) as copy:
+            await resp.prepare(request)
+            try:
+                buf = bytearray()
+                async for chunk in copy:
+                    buf += chunk
+                    if len(buf) >= EXPORT_CHUNK_BYTES:
+                        await resp.write(bytes(buf))
+                        buf.clear()
+                if buf:
+                    await resp.write(bytes(buf))
+            except Exception as e:
+                _abort_export(request, filename, e)
+                return resp
+    await resp.write_eof()
+    return resp
+
+
 async def export_users_csv(request):
     """Exportiere Benutzerliste als CSV"""
     await _auth_user(request)
-    
-    rows = await fetch("""
+    return await _stream_csv(request, "users.csv", """
         select telegram_id, username, first_name, last_name, role, tier, created_at
         from dashboard_users
         order by created_at desc
     """)
-    
-    # CSV Header
-    csv = "telegram_id,username,first_name,last_name,role,tier,created_at\n"
-    
-    # CSV Rows
-    for row in rows:
-        csv += f"{row['telegram_id']},{row['username']},{row['first_name']},{row['last_name']},{row['role']},{row['tier']},{row['created_at']}\n"
-    
-    return web.Response(
-        text=csv,
-        content_type="text/csv",
-        headers={"Content-Disposition": 'attachment; filename="users.csv"'}
-    )
 
 
+ADS_REPORT_SQL = """
+    select 
+        da.name,
+        da.placement,
+        da.bot_slug,
+        count(case when dae.event_type = 'impression' then 1 end) as impressions,
+        count(case when dae.event_type = 'click' then 1 end) as clicks,
+        count(distinct dae.telegram_id) as unique_users
+    from dashboard_ads da
+    left join dashboard_ad_events dae on da.id = dae.ad_id
+    group by da.name, da.placement, da.bot_slug
+    order by clicks desc
+"""
+
 async def export_ads_report(request):
-    """Exportiere Ad-Performance Report"""
+    """Exportiere Ad-Performance Report (JSON, ``?format=csv`` als CSV)"""
     await _auth_user(request)
-    
-    sql = """
-        select 
-            da.name,
-            da.placement,
-            da.bot_slug,
-            count(case when dae.event_type = 'impression' then 1 end) as impressions,
-            count(case when dae.event_type = 'click' then 1 end) as clicks,
-            count(distinct dae.telegram_id) as unique_users
-        from dashboard_ads da
-        left join dashboard_ad_events dae on da.id = dae.ad_id
-        group by da.name, da.placement, da.bot_slug
-        order by clicks desc
-    """
-    
-    rows = await fetch(sql)
-    
-    # JSON Export
-    return _json({
-        "report": rows,
-        "generated_at": datetime.utcnow().isoformat(),
-        "total_ads": len(rows)
-    }, request)
+    if request.query.get("format") == "csv":
+        return await _stream_csv(request, "ads-report.csv", ADS_REPORT_SQL)
+
+    # JSON Export – Zeilen einzeln aus dem Cursor (stream) in die Antwort schreiben
+    resp = _export_response(request, "application/json; charset=utf-8", "ads-report.json")
+    await resp.prepare(request)
+    total = 0
+    try:
+        async with _db.connection() as conn:
+            await resp.write(b'{"report": [')
+            async for row in conn.cursor().stream(ADS_REPORT_SQL):
+                await resp.write(((", " if total else "") + _json_dumps(row)).encode())
+                total += 1
+    except Exception as e:
+        _abort_export(request, "ads-report", e)
+        return resp
+    await resp.write(f'], "generated_at": "{datetime.utcnow().isoformat()}", "total_ads": {total}}}'.encode())
+    await resp.write_eof()
+    return resp
 
 # ------------------------------ route wiring ------------------------------
 async def options_root(request: web.Request):
@@ -1583,6 +1871,10 @@ def register_devdash_routes(app: web.Application):
     # Mesh
     app.router.add_route("GET", "/devdash/mesh/health",         mesh_health)
     app.router.add_route("GET", "/devdash/mesh/metrics",        mesh_metrics)
+    app.on_startup.append(start_mesh_poller)
+    app.on_cleanup.append(stop_mesh_poller)
+    app.on_startup.append(start_rollups)
+    app.on_cleanup.append(stop_rollups)
     
     # CORS
     app.router.add_route("OPTIONS", "/devdash/{tail:.*}", options_handler)
@@ -0,0 +1,66 @@
+"""0001 – Tages-Rollups und User-Segment-View der DevDash-Analytics.
+
+Bisher bei jedem Start via devdash_api.ensure_rollups(). Setzt dashboard_users
+voraus; devdash_api.ensure_tables() legt die Tabelle an und migriert danach.
+dashboard_ad_events legen die Bots an – der Index darauf entsteht nur, wenn
+die Tabelle zum Migrationszeitpunkt schon existiert.
+"""
+
+
+def upgrade(cur):
+    cur.execute("""
+        create table if not exists dashboard_token_events (
+          id serial primary key,
+          happened_at timestamp not null default now(),
+          kind text not null check (kind in ('mint','burn','reward','fee','redeem','manual')),
+          amount numeric(36, 18) not null,
+          unit text not null default 'EMRLD',
+          actor_telegram_id bigint,
+          ref jsonb,
+          note text
+        )
+    """)
+    cur.execute("create index if not exists dashboard_token_events_happened_idx on dashboard_token_events(happened_at)")
+    cur.execute("""
+        create table if not exists dashboard_token_daily (
+          day date not null,
+          kind text not null,
+          cnt bigint not null,
+          total numeric not null,
+          min_amount numeric,
+          max_amount numeric,
+          primary key(day, kind)
+        )
+    """)
+    cur.execute("""
+        create table if not exists dashboard_ad_daily (
+          day date not null,
+          ad_id bigint not null,
+          event_type text not null,
+          cnt bigint not null,
+          primary key(day, ad_id, event_type)
+        )
+    """)
+    cur.execute("""
+        create table if not exists dashboard_rollup_state (
+          name text primary key,
+          built_through date,
+          refreshed_at timestamptz
+        )
+    """)
+    cur.execute("""
+        create materialized view if not exists dashboard_user_segments_mv as
+        select tier, role,
+               count(*) as user_count,
+               count(near_account_id) as near_connected,
+               count(ton_address) as ton_connected,
+               min(created_at) as first_user,
+               max(created_at) as last_user
+        from dashboard_users
+        group by tier, role
+    """)
+    # Voraussetzung für refresh ... concurrently
+    cur.execute("create unique index if not exists dashboard_user_segments_mv_key on dashboard_user_segments_mv(tier, role)")
+    cur.execute("select to_regclass('dashboard_ad_events') is not null")
+    if cur.fetchone()[0]:
+        cur.execute("create index if not exists dashboard_ad_events_created_idx on dashboard_ad_events(created_at)")
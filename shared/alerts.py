@@ -0,0 +1,259 @@
+"""Preis-Alert-Engine für trade_api und trade_dex.
+
+Alle aktiven Alerts liegen je Symbol in zwei sortierten Listen:
+
+    above: Schwellen aufsteigend – ausgelöst wird das Präfix mit t <= Preis
+    below: Schwellen aufsteigend – ausgelöst wird das Suffix mit t >= Preis
+
+Pro Tick und Symbol reicht damit eine Bisektion (O(log n)); angefasst werden
+nur die tatsächlich gekreuzten Alerts statt jedes Alert bei jedem Check.
+
+Die Bots melden ihre Alert-Tabellen als ``AlertSource`` an (Laden, Markieren,
+Bot zum Benachrichtigen). Ticks kommen aus dem Market-Data-Snapshot von
+trade_dex (über shared/ticks.py an ``on_prices``); Nachrichten laufen über
+eine Queue mit globalem Rate-Limit und Cooldown je Chat (Telegram: ~30 msg/s,
+1 msg/s je Chat).
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+from shared import ticks
+
+logger = logging.getLogger(__name__)
+
+ALERT_RELOAD_SECONDS = float(os.getenv("ALERT_RELOAD_SECONDS", "60"))
+ALERT_NOTIFY_PER_SECOND = float(os.getenv("ALERT_NOTIFY_PER_SECOND", "20"))
+ALERT_CHAT_COOLDOWN_SECONDS = float(os.getenv("ALERT_CHAT_COOLDOWN_SECONDS", "1.0"))
+ALERT_QUEUE_MAX = int(os.getenv("ALERT_QUEUE_MAX", "10000"))
+
+ABOVE, BELOW = "above", "below"
+_SIDES = {
+    "above": ABOVE, "price_above": ABOVE, "gt": ABOVE, ">": ABOVE, ">=": ABOVE, "cross_up": ABOVE,
+    "below": BELOW, "price_below": BELOW, "lt": BELOW, "<": BELOW, "<=": BELOW, "cross_down": BELOW,
+}
+
+
+def side_of(comparison: Optional[str]) -> Optional[str]:
+    return _SIDES.get((comparison or "").strip().lower())
+
+
+@dataclass(frozen=True)
+class Alert:
+    source: str
+    id: int
+    chat_id: int
+    key: str            # Preis-Key im Snapshot (Symbol oder Adresse, lowercase)
+    side: str
+    threshold: float
+    label: str = ""
+
+
+@dataclass
+class AlertSource:
+    """Alert-Tabelle eines Bots"""
+    name: str
+    load: Callable[[], Awaitable[List[Alert]]]
+    mark_triggered: Callable[[List[Tuple[Alert, float]]], Awaitable[None]]
+    bot: object = None
+    fmt: Optional[Callable[[Alert, float], str]] = None
+
+
+@dataclass
+class _Book:
+    """Sortierte Schwellen eines Symbols (Keys und Alerts parallel)"""
+    above_t: List[float] = field(default_factory=list)
+    above: List[Alert] = field(default_factory=list)
+    below_t: List[float] = field(default_factory=list)
+    below: List[Alert] = field(default_factory=list)
+
+    def add(self, a: Alert) -> None:
+        keys, items = (self.above_t, self.above) if a.side == ABOVE else (self.below_t, self.below)
+        i = bisect.bisect_right(keys, a.threshold)
+        keys.insert(i, a.threshold)
+        items.insert(i, a)
+
+    def remove(self, a: Alert) -> bool:
+        keys, items = (self.above_t, self.above) if a.side == ABOVE else (self.below_t, self.below)
+        lo, hi = bisect.bisect_left(keys, a.threshold), bisect.bisect_right(keys, a.threshold)
+        for i in range(lo, hi):
+            if items[i] == a:
+                del keys[i], items[i]
+                return True
+        return False
+
+    def crossed(self, price: float) -> List[Alert]:
+        """Gekreuzte Alerts entfernen und zurückgeben"""
+        hit: List[Alert] = []
+        i = bisect.bisect_right(self.above_t, price)
+        if i:
+            hit += self.above[:i]
+            del self.above_t[:i], self.above[:i]
+        j = bisect.bisect_left(self.below_t, price)
+        if j < len(self.below_t):
+            hit += self.below[j:]
+            del self.below_t[j:], self.below[j:]
+        return hit
+
+    def __len__(self) -> int:
+        return len(self.above) + len(self.below)
+
+
+class Notifier:
+    """Nachrichten-Queue mit globalem Rate-Limit und Cooldown je Chat"""
+
+    def __init__(self, per_second: float = ALERT_NOTIFY_PER_SECOND, chat_cooldown: float = ALERT_CHAT_COOLDOWN_SECONDS):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self.chat_cooldown = chat_cooldown
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._last_chat: Dict[int, float] = {}
+        self.stats = {"queued": 0, "sent": 0, "failed": 0, "dropped": 0}
+
+    def enqueue(self, bot, chat_id: int, text: str) -> None:
+        if bot is None:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=ALERT_QUEUE_MAX)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        try:
+            self._queue.put_nowait((bot, chat_id, text))
+            self.stats["queued"] += 1
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+
+    async def _run(self) -> None:
+        while True:
+            bot, chat_id, text = await self._queue.get()
+            try:
+                wait = self._last_chat.get(chat_id, 0.0) + self.chat_cooldown - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                await bot.send_message(chat_id=chat_id, text=text)
+                self.stats["sent"] += 1
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.debug(f"Alert notify {chat_id} failed: {e}")
+            finally:
+                self._last_chat[chat_id] = time.monotonic()
+                self._queue.task_done()
+            if len(self._last_chat) > 10000:
+                cutoff = time.monotonic() - self.chat_cooldown
+                self._last_chat = {k: v for k, v in self._last_chat.items() if v > cutoff}
+            if self.interval:
+                await asyncio.sleep(self.interval)
+
+
+def _default_fmt(a: Alert, price: float) -> str:
+    arrow = "📈" if a.side == ABOVE else "📉"
+    word = "über" if a.side == ABOVE else "unter"
+    return f"{arrow} Alert: {a.label or a.key.upper()} ist {word} {a.threshold:.8g} (aktuell {price:.8g})"
+
+
+class AlertEngine:
+    def __init__(self):
+        self.sources: Dict[str, AlertSource] = {}
+        self.books: Dict[str, _Book] = {}
+        self.notifier = Notifier()
+        self._loaded_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self.stats = {"ticks": 0, "triggered": 0, "reloads": 0}
+
+    def register(self, source: AlertSource) -> None:
+        self.sources[source.name] = source
+
+    # ---------------------------------------------------------- Pflege
+
+    def add(self, alert: Alert) -> None:
+        """Neuen Alert sofort aufnehmen (ohne auf den nächsten Reload zu warten)"""
+        self.books.setdefault(alert.key, _Book()).add(alert)
+
+    def remove(self, source: str, alert_id: int) -> None:
+        for key, book in list(self.books.items()):
+            for a in book.above + book.below:
+                if a.source == source and a.id == alert_id:
+                    book.remove(a)
+            if not len(book):
+                del self.books[key]
+
+    async def reload(self) -> int:
+        """Alle aktiven Alerts aller Quellen neu laden (ersetzt die Bücher komplett)"""
+        books: Dict[str, _Book] = {}
+        total = 0
+        for src in list(self.sources.values()):
+            try:
+                alerts = await src.load()
+            except Exception as e:
+                logger.warning(f"Alert source {src.name} load failed: {e}")
+                # bisherigen Stand dieser Quelle behalten
+                alerts = [a for b in self.books.values() for a in b.above + b.below if a.source == src.name]
+            for a in alerts:
+                books.setdefault(a.key, _Book()).add(a)
+            total += len(alerts)
+        self.books = books
+        self._loaded_at = time.monotonic()
+        self.stats["reloads"] += 1
+        return total
+
+    # ---------------------------------------------------------- Ticks
+
+    async def on_prices(self, prices: Mapping[str, float]) -> int:
+        """Preise eines Snapshots verarbeiten; gibt die Zahl ausgelöster Alerts zurück"""
+        if not self.sources:
+            return 0
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if time.monotonic() - self._loaded_at >= ALERT_RELOAD_SECONDS:
+                await self.reload()
+            self.stats["ticks"] += 1
+
+            fired: Dict[str, List[Tuple[Alert, float]]] = {}
+            for key, book in list(self.books.items()):
+                price = prices.get(key)
+                if price is None or price <= 0:
+                    continue
+                for a in book.crossed(price):
+                    fired.setdefault(a.source, []).append((a, price))
+                if not len(book):
+                    del self.books[key]
+            if not fired:
+                return 0
+
+            count = 0
+            for name, hits in fired.items():
+                src = self.sources.get(name)
+                if src is None:
+                    continue
+                try:
+                    await src.mark_triggered(hits)
+                except Exception as e:
+                    # nicht markiert -> beim nächsten Reload wieder aktiv, Nachricht erst dann
+                    logger.error(f"Alert source {name} mark failed: {e}")
+                    continue
+                fmt = src.fmt or _default_fmt
+                for a, price in hits:
+                    self.notifier.enqueue(src.bot, a.chat_id, fmt(a, price))
+                count += len(hits)
+            self.stats["triggered"] += count
+            return count
+
+    def info(self) -> Dict:
+        return {
+            "sources": list(self.sources),
+            "symbols": len(self.books),
+            "alerts": sum(len(b) for b in self.books.values()),
+            **self.stats,
+            "notifier": dict(self.notifier.stats),
+        }
+
+
+engine = AlertEngine()
+ticks.subscribe("alerts", engine.on_prices)
@@ -0,0 +1,145 @@
+"""Kleiner async TTL-Cache mit Single-Flight.
+
+Gleichzeitige Aufrufe mit demselben Key teilen sich EINEN laufenden
+Upstream-Call (statt n identischer Requests, wenn viele Mini-App-Nutzer
+gleichzeitig dieselbe Seite öffnen). Ergebnisse bleiben ``ttl`` Sekunden
+gültig; leere Ergebnisse (None, {}, []) nur ``negative_ttl`` Sekunden.
+
+    cache = AsyncTTLCache("trade_dex")
+    price = await cache.get_or_fetch(("okx", "ticker", "BTC"), 5, lambda: okx.get_ticker("BTC"))
+
+Fehler werden nicht gecacht, aber an alle wartenden Aufrufer weitergereicht.
+
+Der Upstream-Call läuft als eigener Task des Caches (``SingleFlight``): wird
+der Aufrufer abgebrochen, der ihn gestartet hat (wait_for-Timeout, verworfener
+Fan-out-Task), warten die übrigen Aufrufer weiter auf dasselbe Ergebnis. Der
+Task wird erst abgebrochen, wenn niemand mehr darauf wartet.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+# alle lebenden Caches – für /health
+_registry: "weakref.WeakSet[AsyncTTLCache]" = weakref.WeakSet()
+
+
+class SingleFlight:
+    """Höchstens ein laufender Task je Key; alle Aufrufer warten geshieldet darauf."""
+
+    def __init__(self) -> None:
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._tasks
+
+    async def do(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._tasks[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda t, k=key: self._done(k, t))
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if self._tasks.get(key) is task:
+                self._waiters[key] -= 1
+                if self._waiters[key] == 0 and not task.done():
+                    # letzter Wartender weg -> Upstream-Call abbrechen; ein
+                    # neuer Aufrufer startet einen frischen Task
+                    self._forget(key)
+                    task.cancel()
+
+    def _forget(self, key: Hashable) -> None:
+        self._tasks.pop(key, None)
+        self._waiters.pop(key, None)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            self._forget(key)
+        if not task.cancelled():
+            task.exception()  # kein "exception was never retrieved" ohne Wartende
+
+
+class AsyncTTLCache:
+    def __init__(self, name: str, maxsize: int = 4096, negative_ttl: float = 2.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.negative_ttl = negative_ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight = SingleFlight()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0, "evictions": 0}
+        _registry.add(self)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        item = self._data.get(key)
+        if item is None:
+            return False, None
+        expires, value = item
+        if expires < time.monotonic():
+            del self._data[key]
+            return False, None
+        self._data.move_to_end(key)
+        return True, value
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        if not value and value != 0:
+            ttl = min(ttl, self.negative_ttl)
+        if ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        if key is None:
+            self._data.clear()
+        else:
+            self._data.pop(key, None)
+
+    async def get_or_fetch(self, key: Hashable, ttl: float, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        hit, value = self.get(key)
+        if hit:
+            self._stats["hits"] += 1
+            return value
+
+        if key in self._inflight:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["misses"] += 1
+        return await self._inflight.do(key, lambda: self._fetch(key, ttl, fetch))
+
+    async def _fetch(self, key: Hashable, ttl: float, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+        self.set(key, value, ttl)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"] + self._stats["coalesced"]
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "inflight": len(self._inflight),
+            "hit_ratio": round((self._stats["hits"] + self._stats["coalesced"]) / lookups, 4) if lookups else None,
+            **self._stats,
+        }
+
+
+def cache_stats() -> List[Dict[str, Any]]:
+    """Kennzahlen (Hits, Misses, zusammengelegte Calls, …) aller Caches im Prozess."""
+    return [c.stats() for c in list(_registry)]
@@ -0,0 +1,309 @@
+"""Server-seitiger OHLCV-Speicher (Kerzen) für Signale, ATR-Sizing und Charts.
+
+Pro (Symbol, Intervall) liegt EINE kompakte float64-Matrix ``(N, 6)`` mit den
+Spalten ts(ms), O, H, L, C, V im Speicher. Persistiert wird blockweise: je
+``CANDLE_CHUNK_BARS`` Kerzen eine Zeile in ``market_candle_chunks`` mit den
+Spalten als Bytes (spaltenweise, little-endian) – statt tausender Einzelzeilen.
+
+Nachgeladen wird inkrementell über die öffentliche OKX-API:
+
+- neueste Bars: ``/market/candles?before=<letzter ts>`` – nur das Delta; ist
+  die Lücke größer als eine Seite, wird rückwärts per ``after`` aufgefüllt
+- Historie:     ``/market/candles`` bzw. ``/market/history-candles`` mit
+  ``after=<ältester ts>``, Seite für Seite, bis ``limit`` Bars vorhanden sind
+
+    store = get_store()
+    ohlcv = await store.ohlcv("BTCUSDT", "1H", 500)   # (N, 5) O H L C V
+    rows  = await store.get("BTC-USDT", "15m", 200)   # (N, 6) inkl. ts
+
+Die letzte (offene) Kerze wird bei jedem Refresh überschrieben. Upstream wird
+je Serie höchstens alle ``CANDLE_REFRESH_SECONDS`` gefragt; gleichzeitige
+Anfragen für dieselbe Serie teilen sich einen Refresh. Außer der Reihe wird
+nur für ein größeres ``limit`` als bisher versucht nachgeladen – und nie
+mehr, sobald OKX keine ältere Historie liefert.
+
+Die Tabelle legt Migration ``bots/trade_api/migrations/0003_candle_chunks.sql`` an.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from shared.db import get_db
+from shared.http_clients import get_aiohttp
+
+logger = logging.getLogger(__name__)
+
+OKX_MARKET_URL = os.getenv("OKX_MARKET_URL", "https://www.okx.com/api/v5/market")
+CANDLE_MAX_BARS = int(os.getenv("CANDLE_MAX_BARS", "5000"))            # je Serie im Speicher
+CANDLE_CHUNK_BARS = int(os.getenv("CANDLE_CHUNK_BARS", "1024"))         # Kerzen je DB-Block
+CANDLE_REFRESH_SECONDS = float(os.getenv("CANDLE_REFRESH_SECONDS", "10"))
+CANDLE_FETCH_CONCURRENCY = int(os.getenv("CANDLE_FETCH_CONCURRENCY", "4"))
+
+TS, O, H, L, C, V = range(6)
+COLUMNS = 6
+PAGE_LIMIT = 300          # /market/candles
+HISTORY_PAGE_LIMIT = 100  # /market/history-candles
+
+BAR_MS: Dict[str, int] = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1H": 3_600_000, "2H": 7_200_000, "4H": 14_400_000, "6H": 21_600_000, "12H": 43_200_000,
+    "1D": 86_400_000, "1W": 604_800_000,
+}
+_QUOTES = ("USDT", "USDC", "USD", "EUR", "BTC", "ETH")
+
+_db = get_db("market")
+
+
+def okx_inst_id(symbol: str) -> str:
+    """``BTCUSDT`` / ``btc/usdt`` / ``BTC-USDT`` -> ``BTC-USDT``"""
+    s = (symbol or "").strip().upper().replace("/", "-").replace("_", "-")
+    if "-" in s:
+        return s
+    for q in _QUOTES:
+        if s.endswith(q) and len(s) > len(q):
+            return f"{s[:-len(q)]}-{q}"
+    return s
+
+
+def normalize_bar(bar: str) -> str:
+    b = (bar or "1H").strip()
+    if b[-1:] in ("h", "d", "w"):
+        b = b[:-1] + b[-1].upper()
+    if b not in BAR_MS:
+        raise ValueError(f"unsupported bar '{bar}' (allowed: {', '.join(BAR_MS)})")
+    return b
+
+
+def _parse_okx(rows: List[List[str]]) -> np.ndarray:
+    """OKX liefert [ts, o, h, l, c, vol, ...] neueste zuerst -> aufsteigend sortiert"""
+    if not rows:
+        return np.empty((0, COLUMNS))
+    arr = np.array([r[:COLUMNS] for r in rows], dtype=np.float64)
+    return arr[np.argsort(arr[:, TS], kind="stable")]
+
+
+def merge(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """Vereinigt zwei Serien nach ts; bei gleichem ts gewinnt ``new``"""
+    if not len(old):
+        return new
+    if not len(new):
+        return old
+    cat = np.concatenate([old, new])
+    cat = cat[np.argsort(cat[:, TS], kind="stable")]
+    ts = cat[:, TS]
+    keep = np.append(ts[1:] != ts[:-1], True)
+    return cat[keep]
+
+
+def _chunk_ids(ts: np.ndarray, span: int) -> np.ndarray:
+    return (ts.astype(np.int64) // span) * span
+
+
+def to_okx_rows(arr: np.ndarray) -> List[List[str]]:
+    """Zurück ins OKX-Format (neueste zuerst) – für bestehende Chart-Clients"""
+    return [[str(int(r[TS]))] + [repr(float(x)) for x in r[O:]] for r in arr[::-1]]
+
+
+class CandleStore:
+    """In-Memory-Serien mit Postgres-Blöcken als Persistenz und OKX als Quelle"""
+
+    def __init__(self, max_bars: int = CANDLE_MAX_BARS, chunk_bars: int = CANDLE_CHUNK_BARS):
+        self.max_bars = max_bars
+        self.chunk_bars = chunk_bars
+        self._series: Dict[Tuple[str, str], np.ndarray] = {}
+        self._checked: Dict[Tuple[str, str], float] = {}
+        self._depth: Dict[Tuple[str, str], int] = {}   # größtes bereits versuchtes limit
+        self._exhausted: set = set()                     # ältere Historie gibt es upstream nicht
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._loaded: set = set()
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._stats = {"local": 0, "refreshes": 0, "pages": 0, "bars_fetched": 0, "chunks_saved": 0, "errors": 0}
+
+    # ------------------------------------------------------------------ public
+
+    async def get(self, symbol: str, bar: str = "1H", limit: int = 300, refresh: bool = True) -> np.ndarray:
+        """Die letzten ``limit`` Kerzen als ``(N, 6)``-Matrix [ts, O, H, L, C, V]"""
+        key = (okx_inst_id(symbol), normalize_bar(bar))
+        limit = max(1, min(int(limit), self.max_bars))
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if key not in self._loaded:
+                await self._load(key)
+            arr = self._series.get(key, np.empty((0, COLUMNS)))
+            due = time.monotonic() - self._checked.get(key, 0.0) >= CANDLE_REFRESH_SECONDS
+            deeper = len(arr) < limit and limit > self._depth.get(key, 0) and key not in self._exhausted
+            if refresh and (due or deeper):
+                arr = await self._update(key, arr, limit)
+            else:
+                self._stats["local"] += 1
+        return arr[-limit:]
+
+    async def ohlcv(self, symbol: str, bar: str = "1H", limit: int = 300, refresh: bool = True) -> np.ndarray:
+        """Wie ``get``, aber ohne ts-Spalte: ``(N, 5)`` O H L C V (Format von score_signal/atr)"""
+        return (await self.get(symbol, bar, limit, refresh))[:, O:]
+
+    def peek(self, symbol: str, bar: str = "1H") -> np.ndarray:
+        """Aktueller Stand im Speicher, ohne DB/Netzwerk"""
+        return self._series.get((okx_inst_id(symbol), normalize_bar(bar)), np.empty((0, COLUMNS)))
+
+    def stats(self) -> Dict:
+        return {
+            "series": len(self._series),
+            "bars": int(sum(len(a) for a in self._series.values())),
+            **self._stats,
+        }
+
+    # ------------------------------------------------------------------ upstream
+
+    async def _update(self, key: Tuple[str, str], arr: np.ndarray, need: int) -> np.ndarray:
+        inst_id, bar = key
+        self._stats["refreshes"] += 1
+        # auch ein fehlgeschlagener Versuch zählt – sonst hämmert jeder Aufruf auf OKX
+        self._depth[key] = max(self._depth.get(key, 0), need)
+        try:
+            fresh = await self._fetch_newer(inst_id, bar, arr)
+            combined = merge(arr, fresh)
+            if 0 < len(combined) < need and key not in self._exhausted:
+                missing = need - len(combined)
+                older = await self._fetch_older(inst_id, bar, int(combined[0, TS]), missing)
+                if len(older) < missing:
+                    self._exhausted.add(key)
+                fresh = merge(older, fresh)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Candle refresh {inst_id} {bar} failed: {e}")
+            return arr
+        finally:
+            self._checked[key] = time.monotonic()
+
+        if not len(fresh):
+            return arr
+        merged = merge(arr, fresh)[-self.max_bars:]
+        self._series[key] = merged
+        if key not in self._loaded:
+            # DB-Stand unbekannt (Laden fehlgeschlagen): Blöcke aus der Teil-Serie
+            # würden vollständigere Blöcke in der DB überschreiben
+            return merged
+        try:
+            await self._persist(key, merged, fresh[:, TS])
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Candle persist {inst_id} {bar} failed: {e}")
+        return merged
+
+    async def _page(self, inst_id: str, bar: str, *, before: Optional[int] = None,
+                    after: Optional[int] = None, history: bool = False) -> np.ndarray:
+        params = {"instId": inst_id, "bar": bar, "limit": str(HISTORY_PAGE_LIMIT if history else PAGE_LIMIT)}
+        if before is not None:
+            params["before"] = str(before)
+        if after is not None:
+            params["after"] = str(after)
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(CANDLE_FETCH_CONCURRENCY)
+        path = "/history-candles" if history else "/candles"
+        async with self._sem:
+            session = get_aiohttp("market", timeout=10)
+            async with session.get(f"{OKX_MARKET_URL}{path}", params=params) as resp:
+                data = await resp.json()
+        if data.get("code") != "0":
+            raise RuntimeError(f"OKX {path}: {data.get('code')} {data.get('msg')}")
+        self._stats["pages"] += 1
+        page = _parse_okx(data.get("data") or [])
+        self._stats["bars_fetched"] += len(page)
+        return page
+
+    async def _fetch_newer(self, inst_id: str, bar: str, arr: np.ndarray) -> np.ndarray:
+        """Nur Bars ab der letzten gespeicherten Kerze (inkl. – die kann noch offen sein)"""
+        if not len(arr):
+            return await self._page(inst_id, bar)
+        last = int(arr[-1, TS])
+        page = await self._page(inst_id, bar, before=last - 1)
+        # Lücke größer als eine Seite (z.B. nach längerer Pause): rückwärts auffüllen
+        max_pages = math.ceil(self.max_bars / PAGE_LIMIT)
+        while len(page) >= PAGE_LIMIT and page[0, TS] > last and max_pages > 0:
+            older = await self._page(inst_id, bar, after=int(page[0, TS]))
+            older = older[older[:, TS] >= last]
+            if not len(older):
+                break
+            page = merge(older, page)
+            max_pages -= 1
+        return page
+
+    async def _fetch_older(self, inst_id: str, bar: str, first_ts: int, missing: int) -> np.ndarray:
+        """Historie vor ``first_ts`` nachladen (Backfill), bis ``missing`` Bars da sind"""
+        out = np.empty((0, COLUMNS))
+        history = False
+        while len(out) < missing:
+            page = await self._page(inst_id, bar, after=first_ts, history=history)
+            if not len(page):
+                if history:
+                    break
+                history = True  # /candles liefert nur die jüngsten ~1440 Bars
+                continue
+            out = merge(page, out)
+            first_ts = int(page[0, TS])
+        return out
+
+    # ------------------------------------------------------------------ Postgres
+
+    async def _load(self, key: Tuple[str, str]) -> None:
+        inst_id, bar = key
+        try:
+            rows = await _db.fetch(
+                "select n_bars, data from market_candle_chunks where symbol=%s and bar=%s "
+                "order by chunk_start desc limit %s",
+                (inst_id, bar, math.ceil(self.max_bars / self.chunk_bars) + 1),
+            )
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Candle load {inst_id} {bar} failed: {e}")
+            return  # nächster Aufruf versucht es erneut (bis dahin wird nichts persistiert)
+        blocks = [np.frombuffer(bytes(r["data"]), dtype="<f8").reshape(COLUMNS, r["n_bars"]).T for r in reversed(rows)]
+        if blocks:
+            stored = np.ascontiguousarray(np.concatenate(blocks))
+            # zwischenzeitlich (ohne DB) geholte Bars behalten
+            self._series[key] = merge(stored, self._series.get(key, np.empty((0, COLUMNS))))[-self.max_bars:]
+        self._loaded.add(key)
+
+    async def _persist(self, key: Tuple[str, str], arr: np.ndarray, touched_ts: np.ndarray) -> None:
+        """Nur die Blöcke neu schreiben, in denen neue/aktualisierte Bars liegen"""
+        inst_id, bar = key
+        span = BAR_MS[bar] * self.chunk_bars
+        ids = _chunk_ids(arr[:, TS], span)
+        params = []
+        for cid in np.unique(_chunk_ids(touched_ts, span)):
+            block = arr[ids == cid]
+            if not len(block):
+                continue
+            params.append((
+                inst_id, bar, int(cid), len(block), int(block[0, TS]), int(block[-1, TS]),
+                block.T.astype("<f8").tobytes(),
+            ))
+        if not params:
+            return
+        await _db.executemany(
+            "insert into market_candle_chunks (symbol, bar, chunk_start, n_bars, first_ts, last_ts, data) "
+            "values (%s,%s,%s,%s,%s,%s,%s) "
+            "on conflict (symbol, bar, chunk_start) do update set n_bars=excluded.n_bars, "
+            "first_ts=excluded.first_ts, last_ts=excluded.last_ts, data=excluded.data, updated_at=now()",
+            params,
+        )
+        self._stats["chunks_saved"] += len(params)
+
+
+_store: Optional[CandleStore] = None
+
+
+def get_store() -> CandleStore:
+    """Prozessweiter Kerzen-Speicher (von trade_api und trade_dex gemeinsam genutzt)"""
+    global _store
+    if _store is None:
+        _store = CandleStore()
+    return _store
@@ -0,0 +1,219 @@
+"""Gemeinsame async Datenbankschicht für alle Bots (psycopg3 + psycopg_pool).
+
+Ein physischer Pool pro Prozess statt eigener Pools / Einzelverbindungen je Bot.
+Jeder Bot bekommt über ``get_db("<bot>")`` einen logischen Sub-Pool mit
+
+- eigener Quote (max. gleichzeitig belegte Verbindungen), damit ein hängender
+  Bot nicht das komplette Heroku-Verbindungslimit blockiert,
+- eigenem ``statement_timeout``,
+- Prepared-Statement-Cache (psycopg3 bereitet wiederholte Queries pro
+  Verbindung automatisch serverseitig vor, siehe DB_PREPARE_THRESHOLD).
+
+Migrationspfad für die bisherigen ``database.py``-Module:
+
+1. async Code:  ``db = get_db("learning")`` und ``await db.fetch(sql, params)``
+   bzw. ``async with db.transaction() as conn:`` für mehrere Statements.
+   SQL bleibt unverändert (``%s``-Platzhalter wie bei psycopg2).
+2. sync Code (PTB-Handler über ``asyncio.to_thread``) bleibt vorerst auf
+   psycopg2, nutzt aber ``pool_size_for()``/``statement_timeout_for()`` aus
+   diesem Modul, damit alle Pools aus derselben Konfiguration dimensioniert werden.
+3. asyncpg (Crossposter) ebenso – bis die Queries auf ``%s`` umgestellt sind.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+logger = logging.getLogger(__name__)
+
+DB_URL = os.getenv("DATABASE_URL")
+POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+POOL_MAX = int(os.getenv("DB_POOL_MAX", "15"))
+ACQUIRE_TIMEOUT = float(os.getenv("DB_ACQUIRE_TIMEOUT", "10"))
+STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+# "off" schaltet serverseitige Prepared Statements ab (z.B. hinter PgBouncer im Transaction-Mode)
+_prep = os.getenv("DB_PREPARE_THRESHOLD", "2").strip().lower()
+PREPARE_THRESHOLD: Optional[int] = None if _prep in ("off", "none", "") else int(_prep)
+PREPARED_MAX = int(os.getenv("DB_PREPARED_MAX", "128"))
+
+# Quote = Obergrenze gleichzeitiger Verbindungen je Bot (kein Reservat).
+# Override per Env, z.B. DB_QUOTA_TRADE_API=6 / DB_TIMEOUT_MS_DEVDASH=30000
+DEFAULT_QUOTAS: Dict[str, int] = {
+    "content": 6, "devdash": 4, "trade_api": 4, "trade_dex": 4, "support": 3,
+    "crossposter": 3, "learning": 2, "dao": 2, "affliate": 2,
+}
+DEFAULT_TIMEOUTS_MS: Dict[str, int] = {
+    "devdash": 30000,  # Reports/Exports dürfen länger laufen
+}
+
+
+def pool_size_for(bot_key: str) -> int:
+    env = os.getenv(f"DB_QUOTA_{bot_key.upper()}")
+    return max(1, int(env)) if env else DEFAULT_QUOTAS.get(bot_key, 2)
+
+
+def statement_timeout_for(bot_key: str) -> int:
+    env = os.getenv(f"DB_TIMEOUT_MS_{bot_key.upper()}")
+    return int(env) if env else DEFAULT_TIMEOUTS_MS.get(bot_key, STATEMENT_TIMEOUT_MS)
+
+
+_pool: Optional[AsyncConnectionPool] = None
+_pool_lock: Optional[asyncio.Lock] = None
+# aktuell gesetzter statement_timeout je physischer Verbindung (spart SET pro Checkout)
+_conn_timeout: "weakref.WeakKeyDictionary[Any, int]" = weakref.WeakKeyDictionary()
+
+
+async def _configure(conn) -> None:
+    conn.prepare_threshold = PREPARE_THRESHOLD
+    conn.prepared_max = PREPARED_MAX
+
+
+async def get_pool() -> AsyncConnectionPool:
+    """Öffnet den prozessweiten Pool beim ersten Zugriff."""
+    global _pool, _pool_lock
+    if _pool is not None:
+        return _pool
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+    async with _pool_lock:
+        if _pool is None:
+            if not DB_URL:
+                raise RuntimeError("DATABASE_URL ist nicht gesetzt")
+            pool = AsyncConnectionPool(
+                DB_URL,
+                min_size=POOL_MIN,
+                max_size=POOL_MAX,
+                open=False,
+                configure=_configure,
+                kwargs={
+                    "autocommit": True,
+                    "row_factory": dict_row,
+                    "options": f"-c statement_timeout={STATEMENT_TIMEOUT_MS}",
+                },
+                name="emerald-shared",
+            )
+            await pool.open()
+            _pool = pool
+            logger.info("🔌 Shared DB pool %s-%s geöffnet", POOL_MIN, POOL_MAX)
+    return _pool
+
+
+async def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+        logger.info("Shared DB pool geschlossen")
+
+
+def setup_aiohttp(app) -> None:
+    """Bindet den Pool an den Lebenszyklus einer aiohttp-App (öffnen beim Start, schließen beim Cleanup)."""
+    async def _open(_app) -> None:
+        await get_pool()
+
+    async def _close(_app) -> None:
+        await close_pool()
+
+    app.on_startup.append(_open)
+    app.on_cleanup.append(_close)
+
+
+class BotDB:
+    """Logischer Sub-Pool eines Bots auf dem gemeinsamen Pool."""
+
+    def __init__(self, bot_key: str, quota: int, statement_timeout_ms: int):
+        self.bot_key = bot_key
+        self.quota = quota
+        self.statement_timeout_ms = statement_timeout_ms
+        self._sem = asyncio.Semaphore(quota)
+        self._stats = {"acquired": 0, "queries": 0, "errors": 0, "wait_ms": 0.0, "in_use": 0}
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[Any]:
+        t0 = time.monotonic()
+        async with self._sem:
+            pool = await get_pool()
+            async with pool.connection(timeout=ACQUIRE_TIMEOUT) as conn:
+                self._stats["wait_ms"] += (time.monotonic() - t0) * 1000
+                self._stats["acquired"] += 1
+                self._stats["in_use"] += 1
+                try:
+                    if _conn_timeout.get(conn, STATEMENT_TIMEOUT_MS) != self.statement_timeout_ms:
+                        await conn.execute(
+                            "SELECT set_config('statement_timeout', %s, false)",
+                            (str(self.statement_timeout_ms),),
+                        )
+                        _conn_timeout[conn] = self.statement_timeout_ms
+                    yield conn
+                finally:
+                    self._stats["in_use"] -= 1
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[Any]:
+        """Mehrere Statements atomar (COMMIT bei Erfolg, sonst ROLLBACK)."""
+        async with self.connection() as conn:
+            async with conn.transaction():
+                yield conn
+
+    async def _run(self, sql: str, params: Sequence[Any], mode: str):
+        self._stats["queries"] += 1
+        try:
+            async with self.connection() as conn:
+                cur = await conn.execute(sql, params)
+                if mode == "all":
+                    return await cur.fetchall() if cur.description else []
+                if mode == "one":
+                    return await cur.fetchone() if cur.description else None
+                return cur.rowcount
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+
+    async def fetch(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        return await self._run(sql, params, "all")
+
+    async def fetchrow(self, sql: str, params: Sequence[Any] = ()) -> Optional[Dict[str, Any]]:
+        return await self._run(sql, params, "one")
+
+    async def fetchval(self, sql: str, params: Sequence[Any] = ()) -> Any:
+        row = await self._run(sql, params, "one")
+        return next(iter(row.values())) if row else None
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        return await self._run(sql, params, "rowcount")
+
+    async def executemany(self, sql: str, seq_of_params: Sequence[Sequence[Any]]) -> None:
+        self._stats["queries"] += 1
+        async with self.transaction() as conn:
+            async with conn.cursor() as cur:
+                await cur.executemany(sql, seq_of_params)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"bot_key": self.bot_key, "quota": self.quota,
+                "statement_timeout_ms": self.statement_timeout_ms, **self._stats}
+
+
+_bots: Dict[str, BotDB] = {}
+
+
+def get_db(bot_key: str) -> BotDB:
+    db = _bots.get(bot_key)
+    if db is None:
+        db = _bots[bot_key] = BotDB(bot_key, pool_size_for(bot_key), statement_timeout_for(bot_key))
+    return db
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Snapshot für Health/DevDash: physischer Pool + Nutzung je Bot."""
+    return {
+        "pool": _pool.get_stats() if _pool is not None else None,
+        "bots": {k: db.stats() for k, db in _bots.items()},
+    }
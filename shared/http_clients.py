@@ -0,0 +1,106 @@
+"""Prozessweite HTTP-Clients für ausgehende Provider-/Webhook-/Ping-Aufrufe.
+
+Bisher wurde pro Aufruf ein neuer ``httpx.AsyncClient`` bzw. eine neue
+``aiohttp.ClientSession`` gebaut – jeder Preis-Lookup, Mesh-Ping oder
+Discord-Post zahlte damit DNS + TCP + TLS erneut. Hier lebt je Zweck
+(z.B. "trade_dex", "crossposter", "devdash") genau ein Client mit
+Keep-Alive-Pool pro Upstream-Host:
+
+    client = get_httpx("trade_dex")                  # httpx, HTTP/2 falls h2 installiert
+    r = await client.get(url, timeout=5.0)           # Timeout pro Request überschreibbar
+
+    session = get_aiohttp("trade_api")               # aiohttp, DNS-Cache im Connector
+
+Die Clients werden NICHT vom Aufrufer geschlossen, sondern einmal beim
+Shutdown über ``close_all()`` (bzw. ``setup_aiohttp(app)`` → on_cleanup).
+"""
+from __future__ import annotations
+
+import logging
+import os
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_LIMIT_PER_HOST = int(os.getenv("HTTP_LIMIT_PER_HOST", "20"))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "60"))
+HTTP_DNS_TTL_SECONDS = int(os.getenv("HTTP_DNS_TTL_SECONDS", "300"))
+HTTP_DEFAULT_TIMEOUT = float(os.getenv("HTTP_DEFAULT_TIMEOUT", "30"))
+
+try:  # HTTP/2 nur, wenn das h2-Paket vorhanden ist (httpx[http2])
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = os.getenv("HTTP_DISABLE_HTTP2", "0") != "1"
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_httpx_clients: Dict[str, httpx.AsyncClient] = {}
+_aiohttp_sessions: Dict[str, "aiohttp.ClientSession"] = {}  # noqa: F821
+
+
+def get_httpx(name: str, timeout: Optional[float] = None, **kwargs) -> httpx.AsyncClient:
+    """Gemeinsamer ``httpx.AsyncClient`` für ``name`` (wird beim ersten Aufruf angelegt)."""
+    client = _httpx_clients.get(name)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=timeout or HTTP_DEFAULT_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_SECONDS,
+            ),
+            http2=HTTP2_AVAILABLE,
+            **kwargs,
+        )
+        _httpx_clients[name] = client
+        logger.debug("HTTP client '%s' angelegt (http2=%s)", name, HTTP2_AVAILABLE)
+    return client
+
+
+def get_aiohttp(name: str, timeout: Optional[float] = None):
+    """Gemeinsame ``aiohttp.ClientSession`` für ``name`` mit DNS-Cache und Keep-Alive."""
+    import aiohttp
+
+    session = _aiohttp_sessions.get(name)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_MAX_CONNECTIONS,
+            limit_per_host=HTTP_LIMIT_PER_HOST,
+            ttl_dns_cache=HTTP_DNS_TTL_SECONDS,
+            use_dns_cache=True,
+            keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=timeout or HTTP_DEFAULT_TIMEOUT),
+        )
+        _aiohttp_sessions[name] = session
+        logger.debug("aiohttp session '%s' angelegt", name)
+    return session
+
+
+async def close_all() -> None:
+    """Schließt alle Clients (Shutdown)."""
+    for name, client in list(_httpx_clients.items()):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning("HTTP client '%s' close failed: %s", name, e)
+    _httpx_clients.clear()
+    for name, session in list(_aiohttp_sessions.items()):
+        try:
+            await session.close()
+        except Exception as e:
+            logger.warning("aiohttp session '%s' close failed: %s", name, e)
+    _aiohttp_sessions.clear()
+
+
+def setup_aiohttp(app) -> None:
+    """Schließt alle Clients im on_cleanup der aiohttp-App."""
+    async def _close(_app) -> None:
+        await close_all()
+
+    app.on_cleanup.append(_close)
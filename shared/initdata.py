@@ -0,0 +1,186 @@
+"""Gemeinsame Prüfung von Telegram-WebApp-initData für alle Mini-Apps.
+
+Secrets werden je Bot-Token einmal vorberechnet (``register_token``; alle
+``BOT*_TOKEN``-Envs beim Import). Erfolgreiche Prüfungen landen in einem LRU,
+Key = sha256(data_check_string + hash), gültig bis ``auth_date + INITDATA_TTL``
+– die Mini-App schickt bei jedem Request dieselbe initData, also kostet nur
+der erste Request HMACs.
+
+Welcher Bot signiert hat, verrät initData nicht. Der Header ``X-Telegram-Bot``
+(Bot-ID = Token-Präfix vor ":" oder ein registrierter Alias) führt direkt zum
+richtigen Secret; ohne Hinweis werden alle registrierten Tokens probiert.
+
+    info = initdata.verify(raw, hint=initdata.bot_hint(request))
+    info["user_id"], info["user"], info["auth_date"], info["bot_id"]
+
+Secret je Token: HMAC_SHA256("WebAppData", token) laut Telegram-Doku, dazu
+sha256(token) wie in den bisherigen Einzel-Implementierungen.
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import os
+import re
+import time
+import urllib.parse
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+INITDATA_TTL = int(os.getenv("TELEGRAM_LOGIN_TTL_SECONDS", "86400"))
+INITDATA_CACHE_MAX = int(os.getenv("INITDATA_CACHE_MAX", "10000"))
+BOT_HINT_HEADER = "X-Telegram-Bot"
+
+
+class InitDataError(ValueError):
+    pass
+
+
+_secrets: Dict[str, Tuple[bytes, ...]] = {}   # bot_id -> (webapp_secret, legacy_secret)
+_aliases: Dict[str, str] = {}                 # alias (lowercase) -> bot_id
+_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "hmacs": 0}
+
+
+def _bot_id(token: str) -> str:
+    return token.split(":", 1)[0]
+
+
+def register_token(token: Optional[str], *aliases: Optional[str]) -> Optional[str]:
+    """Secrets für ``token`` vorberechnen; liefert die Bot-ID"""
+    token = (token or "").strip()
+    if not token:
+        return None
+    bid = _bot_id(token)
+    if bid not in _secrets:
+        _secrets[bid] = (
+            hmac.new(b"WebAppData", token.encode(), hashlib.sha256).digest(),
+            hashlib.sha256(token.encode()).digest(),
+        )
+    for a in aliases:
+        if a:
+            _aliases[str(a).lstrip("@").lower()] = bid
+    return bid
+
+
+def register_env_tokens() -> int:
+    n = 0
+    for key, token in os.environ.items():
+        if re.fullmatch(r"BOT([A-Z0-9_]+)?_TOKEN|TELEGRAM_BOT_TOKEN(_[A-Z0-9_]+)?|TRADE_API_BOT_TOKEN", key):
+            if register_token(token, key):
+                n += 1
+    return n
+
+
+def bot_hint(request) -> Optional[str]:
+    """Bot-Hinweis aus Header (oder ``?bot=``) eines aiohttp-Requests"""
+    try:
+        return request.headers.get(BOT_HINT_HEADER) or request.query.get("bot") or None
+    except Exception:
+        return None
+
+
+def _resolve(ref: Optional[str]) -> Optional[str]:
+    if not ref:
+        return None
+    ref = str(ref).strip()
+    if ref in _secrets:
+        return ref
+    return _aliases.get(ref.lstrip("@").lower())
+
+
+def _candidates(hint: Optional[str], tokens: Optional[Iterable[str]]) -> List[str]:
+    if tokens is not None:
+        # nur diese Bots zulassen (z.B. Crossposter: eigener Token)
+        allowed = [b for b in (register_token(t) for t in tokens) if b]
+    else:
+        allowed = list(_secrets)
+    first = _resolve(hint)
+    if first in allowed:
+        allowed.remove(first)
+        allowed.insert(0, first)
+    return allowed
+
+
+def _check(fields: Mapping[str, str], hint: Optional[str], tokens: Optional[Iterable[str]],
+           max_age: Optional[int]) -> Dict[str, Any]:
+    recv_hash = fields.get("hash")
+    if not recv_hash:
+        raise InitDataError("missing hash")
+    check_str = "\n".join(f"{k}={v}" for k, v in sorted(fields.items()) if k != "hash")
+    key = hashlib.sha256(f"{check_str}\n{recv_hash}".encode()).digest()
+    candidates = _candidates(hint, tokens)
+    now = time.time()
+    max_age = INITDATA_TTL if max_age is None else max_age
+
+    info = _cache.get(key)
+    if info is not None and info["expires"] > now and info["bot_id"] in candidates:
+        _cache.move_to_end(key)
+        _stats["hits"] += 1
+    else:
+        _stats["misses"] += 1
+        info = None
+        msg = check_str.encode()
+        for bid in candidates:
+            for secret in _secrets[bid]:
+                _stats["hmacs"] += 1
+                if hmac.compare_digest(hmac.new(secret, msg, hashlib.sha256).hexdigest(), recv_hash):
+                    info = {"bot_id": bid}
+                    break
+            if info:
+                break
+        if info is None:
+            raise InitDataError("bad hash")
+        try:
+            user = json.loads(fields.get("user") or "{}")
+        except ValueError:
+            user = {}
+        info.update(
+            user=user if isinstance(user, dict) else {},
+            user_id=int((user or {}).get("id") or 0) if isinstance(user, dict) else 0,
+            auth_date=int(fields.get("auth_date") or 0),
+            fields=dict(fields),
+        )
+        info["expires"] = (info["auth_date"] or now) + INITDATA_TTL
+        if info["expires"] > now:
+            _cache[key] = info
+            while len(_cache) > INITDATA_CACHE_MAX:
+                _cache.popitem(last=False)
+
+    if max_age and info["auth_date"] and now - info["auth_date"] > max_age:
+        raise InitDataError("login expired")
+    if not info["user_id"]:
+        raise InitDataError("no user in initData")
+    return dict(info)
+
+
+def verify(init_data: Optional[str], hint: Optional[str] = None, tokens: Optional[Iterable[str]] = None,
+           max_age: Optional[int] = None) -> Dict[str, Any]:
+    """Roh-initData prüfen. ``tokens`` schränkt auf diese Bots ein, ``max_age=0`` = auth_date egal"""
+    if not init_data:
+        raise InitDataError("missing initData")
+    fields = dict(urllib.parse.parse_qsl(init_data, keep_blank_values=True))
+    return _check(fields, hint, tokens, max_age)
+
+
+def verify_fields(fields: Mapping[str, str], hint: Optional[str] = None, tokens: Optional[Iterable[str]] = None,
+                  max_age: Optional[int] = None) -> Dict[str, Any]:
+    """Wie ``verify`` für bereits zerlegte initData (Werte als Strings, inkl. ``hash``)"""
+    return _check(fields, hint, tokens, max_age)
+
+
+def user_id(init_data: Optional[str], hint: Optional[str] = None, tokens: Optional[Iterable[str]] = None,
+            max_age: Optional[int] = 0) -> int:
+    """user.id bei gültiger Signatur, sonst 0"""
+    try:
+        return verify(init_data, hint, tokens, max_age)["user_id"]
+    except (InitDataError, ValueError):
+        return 0
+
+
+def stats() -> Dict[str, Any]:
+    return {"bots": len(_secrets), "cached": len(_cache), **_stats}
+
+
+register_env_tokens()
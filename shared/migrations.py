@@ -0,0 +1,211 @@
+"""Versionierte Schema-Migrationen für alle Bots.
+
+Jeder Bot legt seine Schritte als Dateien in ``bots/<bot>/migrations/`` ab:
+
+    0001_baseline.py     ->  def upgrade(cur): ...
+    0002_add_index.sql   ->  reines SQL
+
+Angewendete Versionen stehen in ``schema_migrations`` (bot_key, version,
+checksum). Beim Boot genügt im Normalfall EIN SELECT auf diese Tabelle
+(Fast-Path) – es laufen keine ``CREATE/ALTER ... IF NOT EXISTS`` mehr und
+damit keine Catalog-Locks gegen den Live-Traffic anderer Dynos.
+Nur wenn Versionen fehlen, wird ein Advisory-Lock genommen und die
+ausstehenden Schritte laufen jeweils in einer eigenen Transaktion.
+
+Die Prüfsumme umfasst nur die Migrationsdatei selbst. Das DDL gehört deshalb
+in die Datei (nicht in importierte Hilfsfunktionen), und eine angewendete
+Datei wird nie mehr geändert – Schemaänderungen sind immer eine neue Datei.
+
+Python-Migrationen mit ``ATOMIC = False`` laufen im Autocommit-Modus (z.B. für
+``CREATE INDEX CONCURRENTLY``). Sie müssen wiederholbar sein: bricht so ein
+Schritt ab, bleibt alles bis dahin Ausgeführte stehen und der Schritt läuft
+beim nächsten Boot erneut.
+"""
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import psycopg2
+from psycopg2 import errors as pg_errors
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_TABLE = "schema_migrations"
+_FILE_RE = re.compile(r"^(\d{4})_([a-z0-9_]+)\.(sql|py)$")
+
+# Pro Prozess nur einmal prüfen (init_all_schemas wird z.T. mehrfach gerufen)
+_done: set[str] = set()
+_done_lock = threading.Lock()
+
+
+class MigrationError(RuntimeError):
+    """Migration fehlgeschlagen oder Checksumme passt nicht zur DB."""
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    path: Path
+
+    @property
+    def kind(self) -> str:
+        return self.path.suffix.lstrip(".")
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.path.read_bytes()).hexdigest()
+
+    def apply(self, cur) -> None:
+        if self.kind == "sql":
+            cur.execute(self.path.read_text(encoding="utf-8"))
+            return
+        spec = importlib.util.spec_from_file_location(
+            f"_migration_{self.path.parent.parent.name}_{self.version:04d}", self.path
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        if not hasattr(module, "upgrade"):
+            raise MigrationError(f"{self.path.name}: upgrade(cur) fehlt")
+        if getattr(module, "ATOMIC", True):
+            module.upgrade(cur)
+            return
+        # CONCURRENTLY & Co. dürfen nicht in einem Transaktionsblock laufen
+        conn = cur.connection
+        conn.commit()
+        conn.autocommit = True
+        try:
+            module.upgrade(cur)
+        finally:
+            conn.autocommit = False
+
+
+def discover(migrations_dir: Path | str) -> List[Migration]:
+    """Liest die Migrationsdateien eines Bots, sortiert nach Version."""
+    found: Dict[int, Migration] = {}
+    for p in sorted(Path(migrations_dir).iterdir()):
+        m = _FILE_RE.match(p.name)
+        if not m:
+            continue
+        version = int(m.group(1))
+        if version in found:
+            raise MigrationError(f"Doppelte Migrationsversion {version:04d} in {migrations_dir}")
+        found[version] = Migration(version=version, name=m.group(2), path=p)
+    return [found[v] for v in sorted(found)]
+
+
+def _lock_key(bot_key: str) -> int:
+    # stabiler 32-bit Key je Bot für pg_advisory_lock
+    return zlib.crc32(f"{MIGRATIONS_TABLE}:{bot_key}".encode())
+
+
+def _fetch_applied(cur, bot_key: str) -> Optional[Dict[int, str]]:
+    """Fast-Path: ein einziger Lookup. None, wenn die Tabelle noch fehlt."""
+    try:
+        cur.execute(
+            f"SELECT version, checksum FROM {MIGRATIONS_TABLE} WHERE bot_key = %s",
+            (bot_key,),
+        )
+    except pg_errors.UndefinedTable:
+        cur.connection.rollback()
+        return None
+    return {int(v): c for v, c in cur.fetchall()}
+
+
+def _verify(bot_key: str, migrations: List[Migration], applied: Dict[int, str]) -> List[Migration]:
+    """Prüft Checksummen der angewendeten Schritte und liefert die ausstehenden."""
+    pending = []
+    for mig in migrations:
+        known = applied.get(mig.version)
+        if known is None:
+            pending.append(mig)
+        elif known != mig.checksum:
+            raise MigrationError(
+                f"[{bot_key}] Checksumme von {mig.version:04d}_{mig.name} weicht ab – "
+                "angewendete Migrationen dürfen nicht mehr geändert werden"
+            )
+    return pending
+
+
+def run_migrations(bot_key: str, migrations_dir: Path | str, dsn: Optional[str] = None) -> int:
+    """
+    Wendet alle ausstehenden Migrationen eines Bots an.
+    Gibt die Anzahl neu angewendeter Schritte zurück (0 = Fast-Path).
+    """
+    with _done_lock:
+        if bot_key in _done:
+            return 0
+
+    migrations = discover(migrations_dir)
+    dsn = dsn or os.getenv("DATABASE_URL")
+    if not dsn:
+        raise MigrationError("DATABASE_URL ist nicht gesetzt")
+
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            applied = _fetch_applied(cur, bot_key)
+            conn.commit()
+            if applied is not None and not _verify(bot_key, migrations, applied):
+                logger.debug("[%s] Schema aktuell (v%s)", bot_key, max(applied, default=0))
+                with _done_lock:
+                    _done.add(bot_key)
+                return 0
+
+            # Slow-Path: serialisiert über alle Dynos
+            cur.execute("SELECT pg_advisory_lock(%s)", (_lock_key(bot_key),))
+            try:
+                cur.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+                        bot_key     TEXT        NOT NULL,
+                        version     INTEGER     NOT NULL,
+                        name        TEXT        NOT NULL,
+                        checksum    TEXT        NOT NULL,
+                        duration_ms INTEGER,
+                        applied_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                        PRIMARY KEY (bot_key, version)
+                    )
+                """)
+                conn.commit()
+                # erneut lesen – ein anderer Dyno kann inzwischen migriert haben
+                pending = _verify(bot_key, migrations, _fetch_applied(cur, bot_key) or {})
+                conn.commit()
+
+                for mig in pending:
+                    t0 = time.monotonic()
+                    logger.info("[%s] Migration %04d_%s ...", bot_key, mig.version, mig.name)
+                    try:
+                        mig.apply(cur)
+                        cur.execute(
+                            f"INSERT INTO {MIGRATIONS_TABLE} (bot_key, version, name, checksum, duration_ms) "
+                            "VALUES (%s, %s, %s, %s, %s)",
+                            (bot_key, mig.version, mig.name, mig.checksum,
+                             int((time.monotonic() - t0) * 1000)),
+                        )
+                        conn.commit()
+                    except Exception as e:
+                        conn.rollback()
+                        raise MigrationError(f"[{bot_key}] {mig.version:04d}_{mig.name} fehlgeschlagen: {e}") from e
+            finally:
+                try:
+                    cur.execute("SELECT pg_advisory_unlock(%s)", (_lock_key(bot_key),))
+                    conn.commit()
+                except Exception:
+                    pass
+
+        logger.info("[%s] %d Migration(en) angewendet", bot_key, len(pending))
+        with _done_lock:
+            _done.add(bot_key)
+        return len(pending)
+    finally:
+        conn.close()
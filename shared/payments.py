@@ -13,12 +13,11 @@ logger = logging.getLogger(__name__)
 
 try:
     from bots.content.database import (
-        ensure_payments_schema, create_payment_order, mark_payment_paid,
+        create_payment_order, mark_payment_paid,
         set_pro_until, get_subscription_info
     )
 except ImportError:
     # Fallback wenn database nicht verfügbar (z.B. in anderen Bots)
-    def ensure_payments_schema(*args, **kwargs): pass
     def create_payment_order(*args, **kwargs): pass
     def mark_payment_paid(*args, **kwargs): return False, None, None
     def set_pro_until(*args, **kwargs): pass
@@ -151,7 +150,6 @@ def create_checkout(chat_id: int, provider: str, plan_key: str, user_id: int, we
     Erstelle einen Checkout für verschiedene Payment Provider.
     webhook_url: für Coinbase Callback
     """
-    ensure_payments_schema()
     plan = PLANS.get(plan_key, {})
     if not plan:
         return {"error": f"Unknown plan: {plan_key}"}
@@ -0,0 +1,158 @@
+"""Gepoolte psycopg2-Verbindungen (sync) für die bisherigen database.py-Module.
+
+Bisher öffnete z.B. ``cast_vote`` oder ``kb_search`` pro Aufruf eine neue
+SSL-Verbindung (TCP + TLS + Auth, je nach Region 20–80 ms) und schloss sie
+danach wieder. Hier bekommt jeder Bot einen ``ThreadedConnectionPool``, dessen
+Größe aus derselben Quote kommt wie der async Pool (shared/db.py).
+
+Zwei APIs:
+
+    with pooled_connection("dao") as conn:      # neuer Code
+        ...
+
+    conn = connect("dao")                       # Drop-in für psycopg2.connect():
+    ...                                         # conn.close() gibt die Verbindung
+    conn.close()                                # an den Pool zurück
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+import psycopg2
+from psycopg2 import extensions, pool
+
+from shared.db import pool_size_for
+
+logger = logging.getLogger(__name__)
+
+ACQUIRE_TIMEOUT = float(os.getenv("DB_ACQUIRE_TIMEOUT", "10"))
+# Verbindungen, die länger idle waren, vor der Ausgabe kurz anpingen
+IDLE_PING_SECONDS = float(os.getenv("DB_IDLE_PING_SECONDS", "60"))
+
+
+class BotPool:
+    """psycopg2-Pool eines Bots, blockiert (mit Timeout) statt PoolError bei Vollauslastung."""
+
+    def __init__(self, bot_key: str, dsn: str, maxconn: int):
+        self.bot_key = bot_key
+        self.maxconn = maxconn
+        self._pool = pool.ThreadedConnectionPool(1, maxconn, dsn)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._last_used: Dict[int, float] = {}
+
+    def getconn(self):
+        if not self._slots.acquire(timeout=ACQUIRE_TIMEOUT):
+            raise pool.PoolError(f"[{self.bot_key}] keine freie DB-Verbindung nach {ACQUIRE_TIMEOUT}s")
+        try:
+            conn = self._pool.getconn()
+            if conn.closed or self._stale(conn):
+                self._pool.putconn(conn, close=True)
+                conn = self._pool.getconn()
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _stale(self, conn) -> bool:
+        last = self._last_used.get(id(conn))
+        if last is None or time.monotonic() - last < IDLE_PING_SECONDS:
+            return False
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return False
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            return True
+
+    def putconn(self, conn) -> None:
+        try:
+            broken = bool(conn.closed)
+            if not broken and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                # nie eine offene/abgebrochene TX zurück in den Pool
+                try:
+                    conn.rollback()
+                except Exception:
+                    broken = True
+            if broken:
+                self._last_used.pop(id(conn), None)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+            self._pool.putconn(conn, close=broken)
+        finally:
+            self._slots.release()
+
+    def closeall(self) -> None:
+        self._pool.closeall()
+
+
+class PooledConnection:
+    """Proxy um eine Pool-Verbindung; ``close()`` gibt sie an den Pool zurück."""
+
+    __slots__ = ("_pool", "_conn")
+
+    def __init__(self, bot_pool: BotPool, conn):
+        self._pool = bot_pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.putconn(conn)
+
+
+_pools: Dict[str, BotPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(bot_key: str) -> BotPool:
+    p = _pools.get(bot_key)
+    if p is not None:
+        return p
+    with _pools_lock:
+        p = _pools.get(bot_key)
+        if p is None:
+            dsn = os.getenv("DATABASE_URL")
+            if not dsn:
+                raise RuntimeError("DATABASE_URL ist nicht gesetzt")
+            p = _pools[bot_key] = BotPool(bot_key, dsn, pool_size_for(bot_key))
+            logger.info("🔌 [%s] psycopg2-Pool 1-%s initialisiert", bot_key, p.maxconn)
+    return p
+
+
+def connect(bot_key: str) -> PooledConnection:
+    """Drop-in für ``psycopg2.connect(DATABASE_URL)``."""
+    bot_pool = get_pool(bot_key)
+    return PooledConnection(bot_pool, bot_pool.getconn())
+
+
+@contextmanager
+def pooled_connection(bot_key: str) -> Iterator[PooledConnection]:
+    """Verbindung für die Dauer des Blocks; offene Transaktionen werden zurückgerollt."""
+    conn = connect(bot_key)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def close_all() -> None:
+    with _pools_lock:
+        for p in _pools.values():
+            p.closeall()
+        _pools.clear()
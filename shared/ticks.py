@@ -0,0 +1,46 @@
+"""Preis-Ticks im Prozess verteilen.
+
+Der Market-Data-Ingestor von trade_dex veröffentlicht nach jedem Refresh die
+Preise seines Snapshots (Symbol/Adresse lowercase -> USD); Alert-Engine,
+Portfolio-Bewertung usw. hängen sich als Abonnenten an:
+
+    ticks.subscribe("alerts", engine.on_prices)
+    await ticks.publish(snapshot.prices)
+
+Ein fehlerhafter Abonnent blockiert die anderen nicht.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Awaitable, Callable, Dict, Mapping
+
+logger = logging.getLogger(__name__)
+
+Listener = Callable[[Mapping[str, float]], Awaitable[object]]
+_listeners: Dict[str, Listener] = {}
+_last: Mapping[str, float] = {}
+
+
+def subscribe(name: str, listener: Listener) -> None:
+    _listeners[name] = listener
+
+
+def unsubscribe(name: str) -> None:
+    _listeners.pop(name, None)
+
+
+def last_prices() -> Mapping[str, float]:
+    """Preise des letzten Ticks (leer, solange noch keiner kam)"""
+    return _last
+
+
+async def publish(prices: Mapping[str, float]) -> Dict[str, object]:
+    global _last
+    _last = prices
+    results: Dict[str, object] = {}
+    for name, listener in list(_listeners.items()):
+        try:
+            results[name] = await listener(prices)
+        except Exception as e:
+            logger.error(f"Tick listener {name} failed: {e}")
+    return results